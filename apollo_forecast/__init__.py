@@ -0,0 +1,35 @@
+"""
+In-process forecast engine for what-if scenarios: the trend factors, run rates and month-end
+projection of the dbt forecast models (macros/forecast/*.sql), computed with NumPy over dense
+[series, month] and [series, day] arrays, for many scenarios per pass.
+"""
+
+from .cube import GRAINS, SalesCube
+from .monthend import METHODS, DailySales, MonthEndProjection, monthend_projection
+from .trend import (
+	FORECAST_METHODS,
+	RunDates,
+	Scenario,
+	ScenarioResults,
+	TrendFactors,
+	evaluate_scenarios,
+	forecast_volumes,
+	trend_factors,
+)
+
+__all__ = [
+	"DailySales",
+	"FORECAST_METHODS",
+	"GRAINS",
+	"METHODS",
+	"MonthEndProjection",
+	"RunDates",
+	"SalesCube",
+	"Scenario",
+	"ScenarioResults",
+	"TrendFactors",
+	"evaluate_scenarios",
+	"forecast_volumes",
+	"monthend_projection",
+	"trend_factors",
+]
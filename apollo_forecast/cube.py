@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Series key fields per forecast grain (the group-by of the distributor and chain models)
+GRAINS: Dict[str, Tuple[str, ...]] = {
+	"distributor": ("market_code", "distributor_id", "variant_size_pack_id"),
+	"chain": ("market_code", "distributor_id", "parent_chain_code", "variant_size_pack_id"),
+}
+
+
+def month_of(value: Any) -> np.datetime64:
+	return np.datetime64(value, "M") if not isinstance(value, np.datetime64) else value.astype("datetime64[M]")
+
+
+def key_fields(grain: str) -> Tuple[str, ...]:
+	if grain not in GRAINS:
+		raise ValueError(f"Unknown grain '{grain}'. Use one of {sorted(GRAINS)}.")
+	return GRAINS[grain]
+
+
+@dataclass
+class SalesCube:
+	"""
+	Monthly case-equivalent depletions as a dense [series, month] array over consecutive months.
+
+	A series is one key of the grain (market x distributor x variant size pack, plus parent chain
+	for the chain grain). Only keys with sales get a row: the full cross product is almost
+	entirely empty. `present` marks months that have a source row, even a zero one; the SQL's
+	prior-year windows only see months that have a row, so the engine needs it too.
+	"""
+	grain: str
+	keys: List[Tuple[str, ...]]
+	months: np.ndarray  # datetime64[M]
+	values: np.ndarray  # float64 [series, month]
+	present: np.ndarray  # bool [series, month]
+	_codes: Dict[str, Tuple[Dict[str, int], np.ndarray]] = field(default_factory=dict, init=False, repr=False)
+
+	@classmethod
+	def from_records(cls, records: Iterable[Sequence[Any]], grain: str = "distributor") -> "SalesCube":
+		"""
+		Rows of (*key fields of the grain, month_date, case_equivalent_quantity). Repeated cells
+		are summed and a None quantity counts as 0, like `sum(coalesce(quantity, 0))`.
+		"""
+		width = len(key_fields(grain))
+		index: Dict[Tuple[str, ...], int] = {}
+		rows: List[int] = []
+		months: List[np.datetime64] = []
+		quantities: List[float] = []
+		for record in records:
+			key = tuple(record[:width])
+			rows.append(index.setdefault(key, len(index)))
+			months.append(month_of(record[width]))
+			quantities.append(float(record[width + 1] or 0.0))
+		if not rows:
+			empty = np.array([], dtype="datetime64[M]")
+			return cls(grain, [], empty, np.zeros((0, 0)), np.zeros((0, 0), dtype=bool))
+		month_arr = np.array(months, dtype="datetime64[M]")
+		first, last = month_arr.min(), month_arr.max()
+		cols = (month_arr - first).astype(np.int64)
+		shape = (len(index), int((last - first).astype(np.int64)) + 1)
+		values = np.zeros(shape)
+		present = np.zeros(shape, dtype=bool)
+		np.add.at(values, (np.array(rows), cols), np.array(quantities))
+		present[np.array(rows), cols] = True
+		return cls(grain, list(index), np.arange(first, last + 1), values, present)
+
+	@property
+	def max_month(self) -> date:
+		"""Latest month with a source row (the models' max(month_date))."""
+		return self.months[-1].astype("datetime64[D]").item()
+
+	def month_index(self, month: Any) -> int:
+		offset = int((month_of(month) - self.months[0]).astype(np.int64))
+		if not 0 <= offset < len(self.months):
+			raise ValueError(f"{month} is outside the cube ({self.months[0]} to {self.months[-1]})")
+		return offset
+
+	def select(self, **values: Sequence[str]) -> np.ndarray:
+		"""Boolean series mask for key field values, e.g. select(market_code=["USANY1"])."""
+		mask = np.ones(len(self.keys), dtype=bool)
+		for name, wanted in values.items():
+			labels, codes = self.codes(name)
+			mask &= np.isin(codes, [labels[v] for v in wanted if v in labels])
+		return mask
+
+	def codes(self, name: str) -> Tuple[Dict[str, int], np.ndarray]:
+		"""Integer codes of one key field per series (label -> code, [series] codes), cached."""
+		if name not in self._codes:
+			pos = key_fields(self.grain).index(name)
+			labels: Dict[str, int] = {}
+			codes = np.array([labels.setdefault(key[pos], len(labels)) for key in self.keys], dtype=np.int64)
+			self._codes[name] = (labels, codes)
+		return self._codes[name]
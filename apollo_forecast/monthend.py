@@ -0,0 +1,226 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cube import key_fields
+
+# Day slots per month in the [series, day] arrays
+MONTH_DAYS = 31
+# Prior-year invoices count toward the partial month when invoice_date + 364 days <= progress date
+COMPARISON_OFFSET_DAYS = 364
+METHODS = ("actuals", "factor_based", "straight_line_avg_biz_day")
+
+
+def _dayofweek(days: np.ndarray) -> np.ndarray:
+	"""Snowflake DAYOFWEEK (0 = Sunday) of datetime64[D] values."""
+	return (days.astype(np.int64) + 4) % 7  # 1970-01-01 was a Thursday
+
+
+def _month_start(value: date) -> date:
+	return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+	index = value.year * 12 + value.month - 1 + months
+	return date(index // 12, index % 12 + 1, 1)
+
+
+def business_calendar(month: date) -> Tuple[int, date]:
+	"""(weekdays in the month, its last weekday), as month_calendar_details computes them."""
+	start = _month_start(month)
+	days = [start + timedelta(days=i) for i in range((_add_months(start, 1) - start).days)]
+	weekdays = [d for d in days if d.isoweekday() <= 5]
+	return len(weekdays), weekdays[-1]
+
+
+def business_days_elapsed(progress: np.ndarray) -> np.ndarray:
+	"""The macro's business-day count from the 1st of the month through `progress` (datetime64[D])."""
+	first = progress.astype("datetime64[M]").astype("datetime64[D]")
+	elapsed = (progress - first).astype(np.int64)
+	first_dow = _dayofweek(first)
+	return (
+		elapsed + 1
+		- np.floor_divide(elapsed + first_dow - 1, 7) * 2
+		- (first_dow == 0)
+		- (_dayofweek(progress) == 6)
+	)
+
+
+@dataclass
+class DailySales:
+	"""
+	Invoice-day sales for one target month (CY) and the same month a year earlier (PY), as dense
+	[series, day] arrays with day 0 = the 1st. `*_present` marks days with an invoice row, even
+	a zero one, because the progress date is the last such day.
+	"""
+	grain: str
+	keys: List[Tuple[str, ...]]
+	month: date
+	cy_ceq: np.ndarray
+	cy_phys: np.ndarray
+	cy_present: np.ndarray
+	py_ceq: np.ndarray
+	py_phys: np.ndarray
+	py_present: np.ndarray
+
+	@classmethod
+	def from_records(cls, records: Iterable[Sequence[Any]], month: date, grain: str = "distributor") -> "DailySales":
+		"""
+		Rows of (*key fields of the grain, invoice_date, phys_quantity, case_equivalent_quantity);
+		rows outside the target month and its prior-year month are ignored.
+		"""
+		width = len(key_fields(grain))
+		cy_start = _month_start(month)
+		py_start = date(cy_start.year - 1, cy_start.month, 1)
+		index: Dict[Tuple[str, ...], int] = {}
+		cells: List[Tuple[int, bool, int, float, float]] = []
+		for record in records:
+			day = record[width]
+			start = _month_start(day)
+			if start not in (cy_start, py_start):
+				continue
+			key = tuple(record[:width])
+			cells.append((
+				index.setdefault(key, len(index)), start == cy_start, day.day - 1,
+				float(record[width + 1] or 0.0), float(record[width + 2] or 0.0),
+			))
+		shape = (len(index), MONTH_DAYS)
+		arrays = {name: np.zeros(shape) for name in ("cy_ceq", "cy_phys", "py_ceq", "py_phys")}
+		flags = {name: np.zeros(shape, dtype=bool) for name in ("cy_present", "py_present")}
+		for period in ("cy", "py"):
+			picked = [c for c in cells if c[1] == (period == "cy")]
+			if not picked:
+				continue
+			rows = np.array([c[0] for c in picked])
+			days = np.array([c[2] for c in picked])
+			np.add.at(arrays[f"{period}_phys"], (rows, days), np.array([c[3] for c in picked]))
+			np.add.at(arrays[f"{period}_ceq"], (rows, days), np.array([c[4] for c in picked]))
+			flags[f"{period}_present"][rows, days] = True
+		return cls(grain, list(index), cy_start, **arrays, **flags)
+
+	def progress_groups(self) -> np.ndarray:
+		"""Group id per series for the market-level progress date: its key without distributor_id."""
+		drop = key_fields(self.grain).index("distributor_id")
+		ids: Dict[Tuple[str, ...], int] = {}
+		return np.array([ids.setdefault(k[:drop] + k[drop + 1:], len(ids)) for k in self.keys], dtype=np.int64)
+
+
+@dataclass
+class MonthEndProjection:
+	"""forecast__monthend_projection output per series, shaped [..., series]."""
+	keys: List[Tuple[str, ...]]
+	month: date
+	# Series the macro returns a row for: its progress group has current-month invoices
+	valid: np.ndarray
+	market_max_invoice_date: np.ndarray  # datetime64[D]
+	method: np.ndarray  # index into METHODS
+	projected_case_equivalent_quantity: np.ndarray
+	projected_phys_quantity: np.ndarray
+	current_month_actual_ceq_todate: np.ndarray
+	prev_year_full_month_ceq: np.ndarray
+	prev_year_partial_ceq: np.ndarray
+
+	@property
+	def is_projected(self) -> np.ndarray:
+		return self.method != METHODS.index("actuals")
+
+	def method_names(self) -> np.ndarray:
+		return np.array(METHODS, dtype=object)[self.method]
+
+
+def _project(
+	actual: np.ndarray,
+	full: np.ndarray,
+	partial: np.ndarray,
+	elapsed: np.ndarray,
+	total_days: int,
+	is_actuals: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""The macro's projection CASE for one measure: (projected value, method index)."""
+	with np.errstate(divide="ignore", invalid="ignore"):
+		factor = np.where(partial != 0, full / np.where(partial != 0, partial, 1.0), np.nan)
+		per_day = np.where(elapsed != 0, actual / np.where(elapsed != 0, elapsed, 1), 0.0)
+	has_factor = ~np.isnan(factor) & (factor > 0)
+	factored = actual * np.nan_to_num(factor)
+	straight = actual + per_day * np.maximum(0, total_days - elapsed)
+	cap = 2 * full
+	has_py = full > 0
+	value = np.select(
+		[
+			is_actuals,
+			has_factor & has_py & (factored <= cap),
+			has_factor & has_py & (straight <= cap),
+			has_factor & has_py,
+			has_factor,
+			has_py,
+		],
+		[actual, factored, straight, cap, factored, np.minimum(straight, cap)],
+		default=straight,
+	)
+	method = np.select(
+		[is_actuals, has_factor & has_py & (factored > cap) & (straight <= cap), has_factor],
+		[METHODS.index("actuals"), METHODS.index("straight_line_avg_biz_day"), METHODS.index("factor_based")],
+		default=METHODS.index("straight_line_avg_biz_day"),
+	)
+	return value, method
+
+
+def monthend_projection(
+	daily: DailySales,
+	control_date: date,
+	cy_scale: Optional[np.ndarray] = None,
+	py_scale: Optional[np.ndarray] = None,
+) -> MonthEndProjection:
+	"""
+	forecast__monthend_projection for the target month. The progress date of each series is
+	the last current-month invoice day of its market (per parent chain at the chain grain) and
+	variant size pack. That date splits the prior-year month into the partial part matching
+	today's progress and the full month, and drives the projection. `control_date` is the
+	latest invoice date overall: months before its month only report actuals.
+
+	`cy_scale` / `py_scale` ([..., series]) scale the current and prior-year quantities for
+	what-if evaluation. Invoice days, and so the progress dates, stay as recorded.
+	"""
+	groups = daily.progress_groups()
+	days = np.arange(MONTH_DAYS)
+	last_day = np.where(daily.cy_present.any(axis=1), np.where(daily.cy_present, days, -1).max(axis=1), -1)
+	group_last = np.full(groups.max() + 1 if len(groups) else 0, -1, dtype=np.int64)
+	np.maximum.at(group_last, groups, last_day)
+	progress_day = group_last[groups]
+	valid = progress_day >= 0
+	month_start = np.datetime64(daily.month, "D")
+	progress = month_start + np.maximum(progress_day, 0)
+
+	py_start = date(daily.month.year - 1, daily.month.month, 1)
+	lag = (daily.month - py_start).days - COMPARISON_OFFSET_DAYS
+	in_partial = days[None, :] <= (progress_day + lag)[:, None]
+
+	cy_scale = np.ones(len(daily.keys)) if cy_scale is None else np.asarray(cy_scale)
+	py_scale = np.ones(len(daily.keys)) if py_scale is None else np.asarray(py_scale)
+	total_days, last_business_day = business_calendar(daily.month)
+	elapsed = business_days_elapsed(progress)
+	is_actuals = (daily.month < _month_start(control_date)) | (progress >= np.datetime64(last_business_day, "D"))
+	is_actuals = np.broadcast_to(is_actuals, np.broadcast_shapes(cy_scale.shape, py_scale.shape))
+
+	measures = {}
+	for name, cy, py in (("ceq", daily.cy_ceq, daily.py_ceq), ("phys", daily.cy_phys, daily.py_phys)):
+		actual = cy.sum(axis=1) * cy_scale
+		full = py.sum(axis=1) * py_scale
+		partial = (py * in_partial).sum(axis=1) * py_scale
+		measures[name] = (actual, full, partial, *_project(actual, full, partial, elapsed, total_days, is_actuals))
+
+	actual, full, partial, ceq, method = measures["ceq"]
+	return MonthEndProjection(
+		keys=daily.keys,
+		month=daily.month,
+		valid=valid,
+		market_max_invoice_date=progress,
+		method=method,
+		projected_case_equivalent_quantity=ceq,
+		projected_phys_quantity=measures["phys"][3],
+		current_month_actual_ceq_todate=actual,
+		prev_year_full_month_ceq=full,
+		prev_year_partial_ceq=partial,
+	)
@@ -0,0 +1,116 @@
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cube import SalesCube, key_fields
+from .monthend import DailySales
+
+# depletions_forecast_sales_history columns, in order
+COLUMNS = (
+	"invoice_date", "year", "month", "month_date", "market_name", "market_code",
+	"distributor_id", "distributor_name", "parent_chain_code", "parent_chain_name",
+	"is_forecast_chain", "variant_size_pack_id", "phys_quantity", "case_equivalent_quantity",
+)
+# Parent chain codes the chain models leave out (is_forecast_chain = false)
+NON_FORECAST_CHAINS = (None, "", "33333")
+
+
+@dataclass(frozen=True)
+class Dims:
+	markets: int = 4
+	distributors_per_market: int = 3
+	chains_per_distributor: int = 3
+	variant_size_packs: int = 12
+	months: int = 30
+	# Share of (series, month) cells with sales, and of sold days within such a month
+	density: float = 0.6
+	day_density: float = 0.3
+	# Share of series without sales in the last 18 months
+	stopped: float = 0.1
+
+
+def _is_forecast_chain(code: Optional[str]) -> bool:
+	return code not in NON_FORECAST_CHAINS
+
+
+def sales_history(dims: Dims, end: date, seed: int = 42) -> List[Tuple[Any, ...]]:
+	"""
+	Daily sales rows shaped like depletions_forecast_sales_history, ending at `end` (a partial
+	month whose last invoice day varies by market). Quantities are multiples of 0.25 so float
+	and number(38,8) sums agree exactly; some rows are zero and some chains are excluded codes.
+	"""
+	rng = random.Random(seed)
+	first = date(end.year, end.month, 1)
+	for _ in range(dims.months - 1):
+		first = date(first.year - (first.month == 1), (first.month - 2) % 12 + 1, 1)
+	rows: List[Tuple[Any, ...]] = []
+	for m in range(dims.markets):
+		market = f"MKT{m:02d}"
+		market_end = end - timedelta(days=rng.randint(0, 3))
+		for d in range(dims.distributors_per_market):
+			distributor = f"{m:02d}{d:03d}"
+			chains = [rng.choice(NON_FORECAST_CHAINS) if c == 0 else f"CH{m}{d}{c}" for c in range(dims.chains_per_distributor)]
+			for chain in chains:
+				for v in range(dims.variant_size_packs):
+					vsp = f"VSP{v:03d}"
+					scale = rng.choice((0.5, 1, 4, 20))
+					# Some series stop selling early and drop out of the forecast
+					series_end = first + timedelta(days=200) if rng.random() < dims.stopped else market_end
+					day = first
+					while day <= series_end:
+						month_start = date(day.year, day.month, 1)
+						next_month = date(day.year + (day.month == 12), day.month % 12 + 1, 1)
+						if rng.random() < dims.density:
+							while day < next_month and day <= series_end:
+								if rng.random() < dims.day_density:
+									phys = rng.randint(0, int(8 * scale)) / 4
+									ceq = phys * rng.choice((0.5, 1, 2.25))
+									rows.append((
+										day, day.year, day.month, month_start, f"Market {m}", market,
+										distributor, f"Distributor {distributor}", chain,
+										None if chain is None else f"Chain {chain}", _is_forecast_chain(chain),
+										vsp, phys, ceq,
+									))
+								day += timedelta(days=1)
+						day = next_month
+	return rows
+
+
+def _key(row: Sequence[Any], grain: str) -> Tuple[str, ...]:
+	column = {name: i for i, name in enumerate(COLUMNS)}
+	return tuple(row[column[name]] for name in key_fields(grain))
+
+
+def _rows_for(rows: Sequence[Sequence[Any]], grain: str) -> List[Sequence[Any]]:
+	return [r for r in rows if grain != "chain" or r[COLUMNS.index("is_forecast_chain")]]
+
+
+def cube_from_history(rows: Sequence[Sequence[Any]], grain: str = "distributor") -> SalesCube:
+	"""The models' monthly source_data: distributor grain sums over chains, chain grain keeps forecast chains."""
+	month_col, ceq_col = COLUMNS.index("month_date"), COLUMNS.index("case_equivalent_quantity")
+	return SalesCube.from_records(
+		((*_key(r, grain), r[month_col], r[ceq_col]) for r in _rows_for(rows, grain)),
+		grain=grain,
+	)
+
+
+def daily_from_history(rows: Sequence[Sequence[Any]], month: date, grain: str = "distributor") -> DailySales:
+	day_col, phys_col, ceq_col = (COLUMNS.index(c) for c in ("invoice_date", "phys_quantity", "case_equivalent_quantity"))
+	return DailySales.from_records(
+		((*_key(r, grain), r[day_col], r[phys_col], r[ceq_col]) for r in _rows_for(rows, grain)),
+		month=month,
+		grain=grain,
+	)
+
+
+def random_cube(series: int, months: int, end: date, seed: int = 42, density: float = 0.6) -> SalesCube:
+	"""A large monthly cube straight from NumPy, for benchmarks (no daily rows)."""
+	rng = np.random.default_rng(seed)
+	last = np.datetime64(end, "M")
+	present = rng.random((series, months)) < density
+	values = np.where(present, rng.gamma(2.0, 25.0, (series, months)).round(2), 0.0)
+	keys = [(f"MKT{i % 40:02d}", f"{i // 40:05d}", f"VSP{i % 997:03d}") for i in range(series)]
+	return SalesCube("distributor", keys, np.arange(last - months + 1, last + 1), values, present)
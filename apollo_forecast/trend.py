@@ -0,0 +1,285 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .cube import SalesCube, month_of
+
+WINDOWS = (3, 6, 12)
+# least(coalesce(cy / nullif(py, 0), 1.0), 1.5)
+TREND_FACTOR_CAP = 1.5
+# depletions_forecast_init_draft's distinct_methods, in order
+FORECAST_METHODS = ("three_month", "six_month", "twelve_month", "flat", "run_rate")
+FORECAST_HORIZON = 12
+# Months of history a trend factor reads: the 12-month window and its prior year
+HISTORY_MONTHS = 24
+
+
+@dataclass(frozen=True)
+class RunDates:
+	latest_complete_month: np.datetime64  # datetime64[M]
+	forecast_generation_month: np.datetime64
+
+	@classmethod
+	def for_max_data_month(cls, max_data_month_date: date) -> "RunDates":
+		"""The init_draft run_details: a month is complete once its last day has data."""
+		month = month_of(max_data_month_date)
+		month_end = (month + 1).astype("datetime64[D]") - 1
+		if np.datetime64(max_data_month_date, "D") == month_end:
+			return cls(month, month + 1)
+		return cls(month - 1, month)
+
+
+@dataclass
+class TrendFactors:
+	"""Rolling sums and factors at the latest complete month, shaped [..., series]."""
+	cy_3m_sum: np.ndarray
+	cy_6m_sum: np.ndarray
+	cy_12m_sum: np.ndarray
+	py_3m_sum: np.ndarray
+	py_6m_sum: np.ndarray
+	py_12m_sum: np.ndarray
+	run_rate_3m: np.ndarray
+	trend_factor_3m: np.ndarray
+	trend_factor_6m: np.ndarray
+	trend_factor_12m: np.ndarray
+	# Series the model forecasts: sales since January of the year before the latest data month
+	active: np.ndarray
+
+	def method_factor(self, method: str) -> np.ndarray:
+		"""The trend_factor column of trend_factors_unpivoted for one forecast method."""
+		if method == "flat":
+			return np.ones_like(self.trend_factor_3m)
+		if method == "run_rate":
+			return self.run_rate_3m
+		return {
+			"three_month": self.trend_factor_3m,
+			"six_month": self.trend_factor_6m,
+			"twelve_month": self.trend_factor_12m,
+		}[method]
+
+
+def capped_trend_factor(cy: np.ndarray, py: np.ndarray) -> np.ndarray:
+	safe = np.where(py != 0, py, 1.0)
+	return np.minimum(np.where(py != 0, cy / safe, 1.0), TREND_FACTOR_CAP)
+
+
+def _months(values: np.ndarray, lo: int, hi: int) -> np.ndarray:
+	"""values[..., lo:hi] with zero months for negative indices (before the cube starts)."""
+	if lo >= 0:
+		return values[..., lo:hi]
+	pad = np.zeros(values.shape[:-1] + (min(-lo, hi - lo),))
+	return np.concatenate([pad, values[..., 0:max(hi, 0)]], axis=-1)
+
+
+def _has_row(cube: SalesCube, latest_complete_month: Any) -> np.ndarray:
+	"""[series, month] months that have a rolling_sums row: sales, or densified months."""
+	latest = month_of(latest_complete_month)
+	end = cube.month_index(latest)
+	# all_months_for_densification adds SEQ4() - 1 months (SEQ4 starts at 0) to January
+	december = end - int((latest - latest.astype("datetime64[Y]").astype("datetime64[M]")).astype(np.int64)) - 1
+	has_row = cube.present.copy()
+	has_row[:, max(december, 0):end + 1] = True
+	return has_row
+
+
+def trend_factors(
+	cube: SalesCube,
+	latest_complete_month: Optional[Any] = None,
+	values: Optional[np.ndarray] = None,
+) -> TrendFactors:
+	"""
+	The init_draft rolling_sums and forecast__calc_trend_factors, for every series at once.
+
+	`values` replaces the cube's history (same [series, month] layout, optionally with leading
+	scenario axes). CY sums cover the last N months up to the latest complete month. Each PY
+	sum adds up the value 12 months before each month of the same window. The SQL only has
+	rows for months with sales, plus densified rows from the December before the latest
+	complete month's year, so an earlier window month adds its prior year only if that month
+	had sales.
+	"""
+	values = cube.values if values is None else values
+	if latest_complete_month is None:
+		latest_complete_month = RunDates.for_max_data_month(cube.max_month).latest_complete_month
+	end = cube.month_index(latest_complete_month)
+	has_row = _has_row(cube, latest_complete_month)
+
+	sums = {}
+	for window in WINDOWS:
+		lo = end - window + 1
+		sums[f"cy_{window}m_sum"] = _months(values, lo, end + 1).sum(axis=-1)
+		sums[f"py_{window}m_sum"] = (_months(values, lo - 12, end - 11) * _months(has_row, lo, end + 1)).sum(axis=-1)
+
+	data_year = cube.months[-1].astype("datetime64[Y]")
+	since = cube.month_index(max((data_year - 1).astype("datetime64[M]"), cube.months[0]))
+	return TrendFactors(
+		**sums,
+		run_rate_3m=sums["cy_3m_sum"] / 3,
+		trend_factor_3m=capped_trend_factor(sums["cy_3m_sum"], sums["py_3m_sum"]),
+		trend_factor_6m=capped_trend_factor(sums["cy_6m_sum"], sums["py_6m_sum"]),
+		trend_factor_12m=capped_trend_factor(sums["cy_12m_sum"], sums["py_12m_sum"]),
+		active=cube.present[:, since:].any(axis=-1),
+	)
+
+
+def forecast_volumes(
+	cube: SalesCube,
+	factors: TrendFactors,
+	latest_complete_month: Optional[Any] = None,
+	values: Optional[np.ndarray] = None,
+	projected: Optional[np.ndarray] = None,
+	control_area: Optional[np.ndarray] = None,
+) -> np.ndarray:
+	"""
+	init_draft forecast_rows volumes, shaped [..., method, series, month] for the 12 months
+	after the latest complete month (methods in FORECAST_METHODS order).
+
+	Each month is the prior year's actual times the method's trend factor, or the 3-month run
+	rate, floored at 0. With `projected` ([..., series], NaN where the month-end projection has
+	no row), the first month (the forecast generation month) is the projection instead. Series
+	outside the Control area get 0 when they have no projection. Control series
+	(`control_area`) keep their trend forecast.
+	"""
+	values = cube.values if values is None else values
+	if latest_complete_month is None:
+		latest_complete_month = RunDates.for_max_data_month(cube.max_month).latest_complete_month
+	end = cube.month_index(latest_complete_month)
+	py = _months(values, end - FORECAST_HORIZON + 1, end + 1)  # [..., series, month]
+	volumes = []
+	for method in FORECAST_METHODS:
+		factor = factors.method_factor(method)[..., None]
+		if method == "run_rate":
+			volume = np.broadcast_to(factor, py.shape).copy()
+		else:
+			volume = py * factor
+		if projected is not None:
+			control = np.zeros(projected.shape[-1], dtype=bool) if control_area is None else control_area
+			first = np.where(
+				control,
+				np.where(np.isnan(projected), volume[..., 0], projected),
+				np.nan_to_num(projected, nan=0.0),
+			)
+			volume[..., 0] = first
+		volumes.append(np.maximum(volume, 0.0))
+	return np.stack(volumes, axis=-3)
+
+
+@dataclass(frozen=True)
+class Scenario:
+	"""
+	A what-if on the sales history: `scale` multiplies the months from `start` to `end`
+	(inclusive; default the whole history) of the series whose key fields match `where`
+	({field: values}; empty matches every series).
+	"""
+	name: str
+	scale: float
+	where: Mapping[str, Sequence[str]] = field(default_factory=dict)
+	start: Optional[date] = None
+	end: Optional[date] = None
+
+
+@dataclass
+class ScenarioResults:
+	names: List[str]
+	factors: TrendFactors  # [scenario, series]
+	volumes: np.ndarray  # total forecast volume of the active series, [scenario, method, month]
+
+
+def _span_sums(prefix: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+	"""[scenario, series] sums of months [lo, hi) per scenario from a [series, month + 1] prefix sum."""
+	last = prefix.shape[1] - 1
+	lo = np.minimum(lo, last)
+	hi = np.clip(hi, lo, last)
+	return (prefix[:, hi] - prefix[:, lo]).T
+
+
+def evaluate_scenarios(
+	cube: SalesCube,
+	scenarios: Sequence[Scenario],
+	latest_complete_month: Optional[Any] = None,
+	batch: int = 32,
+) -> ScenarioResults:
+	"""
+	Trend factors and forecast totals for many scenarios, `batch` of them per vectorized pass.
+
+	A scenario scales one block of series x months, so each rolling sum is the baseline sum
+	plus (scale - 1) times the block's share of the window. That share comes from month prefix
+	sums, so scaled histories are never materialized. Only the forecast months of series some
+	scenario in the pass touches form a [batch, series, month] stack (the 0 floor of each volume
+	is not linear); every other series keeps its baseline volume. For
+	arbitrary edits, pass edited histories to trend_factors(values=...) and forecast_volumes().
+	"""
+	if latest_complete_month is None:
+		latest_complete_month = RunDates.for_max_data_month(cube.max_month).latest_complete_month
+	end = cube.month_index(latest_complete_month)
+	base = trend_factors(cube, latest_complete_month)
+	active = base.active
+	values = _months(cube.values, end - HISTORY_MONTHS + 1, end + 1)
+	has_row = _months(_has_row(cube, latest_complete_month), end - HISTORY_MONTHS + 1, end + 1)
+	first_month = month_of(latest_complete_month) - (HISTORY_MONTHS - 1)
+	prefix = np.concatenate([np.zeros((len(cube.keys), 1)), values.cumsum(axis=1)], axis=1)
+	# Prior-year months weighted by whether the month a year later has a row
+	py_prefix = np.concatenate([np.zeros((len(cube.keys), 1)), (values[:, :12] * has_row[:, 12:]).cumsum(axis=1)], axis=1)
+	forecast_py = values[:, HISTORY_MONTHS - FORECAST_HORIZON:]  # [series, month]
+
+	def offset(month: Any, default: int) -> int:
+		if month is None:
+			return default
+		return int(np.clip((month_of(month) - first_month).astype(np.int64), 0, HISTORY_MONTHS))
+
+	base_volumes = forecast_volumes(cube, base, latest_complete_month)  # [method, series, month]
+	base_totals = base_volumes[:, active].sum(axis=1)
+
+	parts: List[TrendFactors] = []
+	totals: List[np.ndarray] = []
+	for start in range(0, len(scenarios), batch):
+		chunk = scenarios[start:start + batch]
+		delta = np.stack([
+			(cube.select(**s.where) if s.where else np.ones(len(cube.keys), dtype=bool)) * (s.scale - 1.0)
+			for s in chunk
+		])  # [scenario, series]
+		lo = np.array([offset(s.start, 0) for s in chunk])
+		hi = np.array([offset(month_of(s.end) + 1 if s.end else None, HISTORY_MONTHS) for s in chunk])
+
+		sums = {}
+		for window in WINDOWS:
+			cy_lo = np.maximum(lo, HISTORY_MONTHS - window)
+			py_lo, py_hi = np.maximum(lo, 12 - window), np.minimum(hi, 12)
+			sums[f"cy_{window}m_sum"] = getattr(base, f"cy_{window}m_sum") + delta * _span_sums(prefix, cy_lo, hi)
+			sums[f"py_{window}m_sum"] = getattr(base, f"py_{window}m_sum") + delta * _span_sums(py_prefix, py_lo, py_hi)
+		factors = TrendFactors(
+			**sums,
+			run_rate_3m=sums["cy_3m_sum"] / 3,
+			trend_factor_3m=capped_trend_factor(sums["cy_3m_sum"], sums["py_3m_sum"]),
+			trend_factor_6m=capped_trend_factor(sums["cy_6m_sum"], sums["py_6m_sum"]),
+			trend_factor_12m=capped_trend_factor(sums["cy_12m_sum"], sums["py_12m_sum"]),
+			active=active,
+		)
+
+		# Only (scenario, series) pairs inside a block move; every other series keeps its baseline volume
+		pair_scenario, pair_series = np.nonzero((delta != 0) & active)
+		months = np.arange(HISTORY_MONTHS - FORECAST_HORIZON, HISTORY_MONTHS)
+		in_span = (months >= lo[:, None]) & (months < hi[:, None])  # [scenario, month]
+		pair_delta = delta[pair_scenario, pair_series][:, None] * in_span[pair_scenario]
+		py = forecast_py[pair_series] * (1.0 + pair_delta)  # [pair, month]
+		chunk_totals = []
+		for m, method in enumerate(FORECAST_METHODS):
+			factor = factors.method_factor(method)[pair_scenario, pair_series][:, None]
+			volume = np.broadcast_to(factor, py.shape) if method == "run_rate" else py * factor
+			change = np.maximum(volume, 0.0) - base_volumes[m, pair_series]
+			moved = np.zeros((len(chunk), FORECAST_HORIZON))
+			np.add.at(moved, pair_scenario, change)
+			chunk_totals.append(base_totals[m] + moved)
+		parts.append(factors)
+		totals.append(np.stack(chunk_totals, axis=1))
+
+	stacked = {
+		name: np.concatenate([getattr(p, name) for p in parts])
+		for name in TrendFactors.__dataclass_fields__ if name != "active"
+	}
+	return ScenarioResults(
+		names=[s.name for s in scenarios],
+		factors=TrendFactors(**stacked, active=active),
+		volumes=np.concatenate(totals),
+	)
@@ -0,0 +1,36 @@
+"""
+Serving-layer helpers for the app backend: a read-through cache over the forecast UDTFs with
+market/FGMD-scoped invalidation when the forecast write procedures run, and a chunked,
+concurrent client for the batch-save procedures.
+"""
+
+from .backends import CacheBackend, InMemoryBackend, RedisBackend
+from .batch_save import BatchSaveResult, BatchSaver, BatchValidationError, FakeBatchSaveExecutor, validate_records
+from .cache import ForecastCache, cache_key
+from .columnar import ColumnarResult
+from .executor import FakeQueryExecutor, QueryExecutor, SnowflakeExecutor, StatementNotSent
+from .invalidation import PROCEDURE_SCOPES, Scope
+from .routines import PROCEDURES, UDTFS, bind_params
+
+__all__ = [
+	"BatchSaveResult",
+	"BatchSaver",
+	"BatchValidationError",
+	"CacheBackend",
+	"ColumnarResult",
+	"FakeBatchSaveExecutor",
+	"FakeQueryExecutor",
+	"ForecastCache",
+	"InMemoryBackend",
+	"PROCEDURES",
+	"PROCEDURE_SCOPES",
+	"QueryExecutor",
+	"RedisBackend",
+	"Scope",
+	"SnowflakeExecutor",
+	"StatementNotSent",
+	"UDTFS",
+	"bind_params",
+	"cache_key",
+	"validate_records",
+]
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Protocol, Set, Tuple
+
+
+class CacheBackend(Protocol):
+	"""
+	Storage for encoded results. Entries carry tags (e.g. a market) so writes can invalidate
+	exactly the entries they affect; `epoch` is a counter bumped on every invalidation.
+	"""
+
+	def get(self, key: str) -> Optional[bytes]: ...
+
+	def set(self, key: str, value: bytes, ttl_s: float, tags: Iterable[str] = ()) -> None: ...
+
+	def delete(self, keys: Iterable[str]) -> int: ...
+
+	def tagged(self, tag: str) -> Set[str]: ...
+
+	def untag(self, tag: str, keys: Iterable[str]) -> None: ...
+
+	def epoch(self) -> int: ...
+
+	def bump_epoch(self) -> int: ...
+
+
+class InMemoryBackend:
+	"""Process-local LRU cache with per-entry TTL, bounded by entry count and total bytes."""
+
+	def __init__(
+		self,
+		max_entries: int = 1024,
+		max_bytes: int = 256 * 1024 * 1024,
+		clock: Callable[[], float] = time.monotonic,
+	):
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self._clock = clock
+		self._entries: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+		self._tags: Dict[str, Set[str]] = {}
+		self._bytes = 0
+		self._epoch = 0
+		self._lock = threading.Lock()
+		self.evictions = 0
+
+	def _drop(self, key: str) -> bool:
+		entry = self._entries.pop(key, None)
+		if entry is None:
+			return False
+		_, value, tags = entry
+		self._bytes -= len(value)
+		for tag in tags:
+			members = self._tags.get(tag)
+			if members is not None:
+				members.discard(key)
+				if not members:
+					del self._tags[tag]
+		return True
+
+	def get(self, key: str) -> Optional[bytes]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			if entry[0] <= self._clock():
+				self._drop(key)
+				return None
+			self._entries.move_to_end(key)
+			return entry[1]
+
+	def set(self, key: str, value: bytes, ttl_s: float, tags: Iterable[str] = ()) -> None:
+		if len(value) > self.max_bytes:
+			return
+		with self._lock:
+			self._drop(key)
+			tags = tuple(tags)
+			self._entries[key] = (self._clock() + ttl_s, value, tags)
+			self._bytes += len(value)
+			for tag in tags:
+				self._tags.setdefault(tag, set()).add(key)
+			while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+				oldest = next(iter(self._entries))
+				self._drop(oldest)
+				self.evictions += 1
+
+	def delete(self, keys: Iterable[str]) -> int:
+		with self._lock:
+			return sum(1 for key in list(keys) if self._drop(key))
+
+	def tagged(self, tag: str) -> Set[str]:
+		with self._lock:
+			return set(self._tags.get(tag, ()))
+
+	def untag(self, tag: str, keys: Iterable[str]) -> None:
+		with self._lock:
+			members = self._tags.get(tag)
+			if members is not None:
+				members.difference_update(keys)
+				if not members:
+					del self._tags[tag]
+
+	def epoch(self) -> int:
+		return self._epoch
+
+	def bump_epoch(self) -> int:
+		with self._lock:
+			self._epoch += 1
+			return self._epoch
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	@property
+	def size_bytes(self) -> int:
+		return self._bytes
+
+
+class RedisBackend:
+	"""
+	Backend over a redis-py compatible client (GET/SET PX/DEL/SADD/SREM/SMEMBERS/PEXPIRE/INCR).
+	TTL is enforced by Redis; LRU eviction comes from the server's `maxmemory-policy allkeys-lru`.
+	Tag sets live under `<prefix>tag:` and expire with the entry most recently added to them.
+	"""
+
+	def __init__(self, client: Any, prefix: str = "apollo:serving:"):
+		self.client = client
+		self.prefix = prefix
+		self._epoch_key = f"{prefix}epoch"
+
+	@classmethod
+	def from_url(cls, url: str, **kwargs: Any) -> "RedisBackend":
+		try:
+			import redis  # type: ignore
+		except ImportError as e:
+			raise RuntimeError("RedisBackend.from_url requires the 'redis' package (pip install redis)") from e
+		return cls(redis.Redis.from_url(url), **kwargs)
+
+	def _tag_key(self, tag: str) -> str:
+		return f"{self.prefix}tag:{tag}"
+
+	def get(self, key: str) -> Optional[bytes]:
+		return self.client.get(key)
+
+	def set(self, key: str, value: bytes, ttl_s: float, tags: Iterable[str] = ()) -> None:
+		ttl_ms = max(1, int(ttl_s * 1000))
+		pipe = self.client.pipeline()
+		pipe.set(key, value, px=ttl_ms)
+		for tag in tags:
+			tag_key = self._tag_key(tag)
+			pipe.sadd(tag_key, key)
+			pipe.pexpire(tag_key, ttl_ms)
+		pipe.execute()
+
+	def delete(self, keys: Iterable[str]) -> int:
+		keys = list(keys)
+		return int(self.client.delete(*keys)) if keys else 0
+
+	def tagged(self, tag: str) -> Set[str]:
+		return {k.decode() if isinstance(k, bytes) else k for k in self.client.smembers(self._tag_key(tag))}
+
+	def untag(self, tag: str, keys: Iterable[str]) -> None:
+		keys = list(keys)
+		if keys:
+			self.client.srem(self._tag_key(tag), *keys)
+
+	def epoch(self) -> int:
+		value = self.client.get(self._epoch_key)
+		return int(value) if value is not None else 0
+
+	def bump_epoch(self) -> int:
+		return int(self.client.incr(self._epoch_key))
@@ -0,0 +1,500 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .executor import QueryExecutor, QueryResult, StatementNotSent, routine_name
+from .routines import PROCEDURES, bind_params, lookup, normalize_fgmd, render_call
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHUNK_RECORDS = 500
+DEFAULT_MAX_CHUNK_BYTES = 1_000_000
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_S = 0.5
+# The budget procedure only accepts the generated methods
+BUDGET_METHODS = frozenset(("three_month", "six_month", "twelve_month", "flat", "run_rate"))
+
+
+@dataclass(frozen=True)
+class BatchProcedure:
+	"""A batch-save procedure: its JSON parameter and the codes of its pre-flight exceptions."""
+	name: str
+	json_param: str
+	locked_code: int  # market published / budget cycle approved (checked in the warehouse only)
+	duplicate_code: int
+	required_code: int
+	volume_code: int
+	allowed_methods: Optional[FrozenSet[str]] = None
+
+	@property
+	def codes(self) -> Tuple[int, ...]:
+		return (self.locked_code, self.duplicate_code, self.required_code, self.volume_code)
+
+
+BATCH_PROCEDURES: Dict[str, BatchProcedure] = {p.name: p for p in (
+	BatchProcedure("SP_BATCH_SAVE_FORECASTS", "P_FORECASTS_JSON", -20091, -20092, -20093, -20094),
+	BatchProcedure("SP_BATCH_SAVE_BUDGETS", "P_BUDGETS_JSON", -20011, -20012, -20013, -20014, BUDGET_METHODS),
+)}
+
+
+class ProcedureError(Exception):
+	"""A procedure exception with its code, shaped like the connector's errors (`errno`, `msg`)."""
+
+	def __init__(self, errno: int, msg: str):
+		super().__init__(f"{errno}: {msg}")
+		self.errno = errno
+		self.msg = msg
+
+
+class BatchValidationError(ValueError):
+	def __init__(self, procedure: str, errors: List["RowError"]):
+		codes = sorted({e.code for e in errors})
+		super().__init__(f"{procedure}: {len(errors)} invalid record(s) (codes {', '.join(map(str, codes))})")
+		self.errors = errors
+
+
+@dataclass(frozen=True)
+class RowError:
+	index: int  # position in the records passed to save()/validate_records()
+	code: int  # the procedure exception the record would raise
+	message: str
+
+
+_CODE_RE = re.compile(r"-?200\d\d")
+
+
+def error_code(exc: BaseException) -> Optional[int]:
+	"""Procedure exception code of an error (connector `errno`, else a code in the message)."""
+	errno = getattr(exc, "errno", None)
+	if isinstance(errno, int) and errno:
+		return -abs(errno)
+	match = _CODE_RE.search(str(exc))
+	return -abs(int(match.group(0))) if match else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+	"""
+	Only calls that never reached the warehouse are retried. The procedures are not idempotent
+	(each call adds a forecast version), so a call that may have committed is never resent.
+	"""
+	return isinstance(exc, StatementNotSent)
+
+
+def call_outcome(exc: BaseException) -> str:
+	"""
+	"not_sent" (the statement never ran), "failed" (a pre-flight exception: the procedure
+	rolled back) or "unknown" (timeouts, dropped connections and other errors that can come
+	after the COMMIT).
+	"""
+	if isinstance(exc, StatementNotSent):
+		return "not_sent"
+	if error_code(exc) in {c for p in BATCH_PROCEDURES.values() for c in p.codes}:
+		return "failed"
+	return "unknown"
+
+
+def _text(value: Any) -> Optional[str]:
+	# `value:field::VARCHAR`: JSON null is NULL, numbers become their text
+	if value is None:
+		return None
+	if isinstance(value, bool):
+		return str(value).lower()
+	return str(value)
+
+
+def _integer(value: Any) -> Optional[int]:
+	# `value:field::INTEGER` rounds numbers and numeric strings
+	if value is None or value == "":
+		return None
+	return int(round(float(value)))
+
+
+def _has_volume(record: Mapping[str, Any]) -> bool:
+	# `value:manual_case_equivalent_volume IS NOT NULL` is also true for a JSON null (a VARIANT null)
+	return "manual_case_equivalent_volume" in record
+
+
+def validate_records(procedure: str, records: Sequence[Mapping[str, Any]]) -> List[RowError]:
+	"""
+	Every record the procedure's pre-flight checks would reject, with the exception code it would
+	raise: missing market_code/forecast_method (and, for budgets, a method outside the generated
+	ones), missing variant_size_pack_id/forecast_year/month on a volume record, and volume records
+	sharing market x customer x variant size pack x year x month (all members are reported).
+	"""
+	spec = BATCH_PROCEDURES[lookup(PROCEDURES, procedure).name]
+	errors: List[RowError] = []
+	keys: Dict[Tuple[Any, ...], List[int]] = {}
+	for index, record in enumerate(records):
+		if not isinstance(record, Mapping):
+			errors.append(RowError(index, spec.required_code, "record is not a JSON object"))
+			continue
+		method = _text(record.get("forecast_method"))
+		if not _text(record.get("market_code")):
+			errors.append(RowError(index, spec.required_code, "market_code is required"))
+		if method is None or not method.strip():
+			errors.append(RowError(index, spec.required_code, "forecast_method is required"))
+		elif spec.allowed_methods is not None and method.lower() not in spec.allowed_methods:
+			errors.append(RowError(index, spec.required_code, f"forecast_method '{method}' is not one of {sorted(spec.allowed_methods)}"))
+		if not _has_volume(record):
+			continue
+		try:
+			year, month = _integer(record.get("forecast_year")), _integer(record.get("month"))
+		except (TypeError, ValueError):
+			errors.append(RowError(index, spec.volume_code, "forecast_year and month must be numbers"))
+			continue
+		missing = [
+			name for name, value in (
+				("variant_size_pack_id", _text(record.get("variant_size_pack_id")) or None),
+				("forecast_year", year),
+				("month", month),
+			) if value is None
+		]
+		if missing:
+			errors.append(RowError(index, spec.volume_code, f"{', '.join(missing)} required with a volume"))
+		key = (
+			_text(record.get("market_code")),
+			_text(record.get("customer_id")) or "N/A",
+			_text(record.get("variant_size_pack_id")),
+			year,
+			month,
+		)
+		keys.setdefault(key, []).append(index)
+	for key, indexes in keys.items():
+		if len(indexes) > 1:
+			errors.extend(
+				RowError(i, spec.duplicate_code, f"duplicate volume record for {key} (records {indexes})") for i in indexes
+			)
+	return sorted(errors, key=lambda e: (e.index, e.code))
+
+
+@dataclass
+class Chunk:
+	index: int
+	markets: List[str]
+	rows: List[int]  # positions in the records passed to save()
+	payload: str  # JSON array sent as the procedure's JSON parameter
+
+
+def _encoded(record: Mapping[str, Any]) -> str:
+	return json.dumps(record, separators=(",", ":"), default=str)
+
+
+def plan_chunks(
+	records: Sequence[Mapping[str, Any]],
+	rows: Optional[Sequence[int]] = None,
+	max_records: int = DEFAULT_MAX_CHUNK_RECORDS,
+	max_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+) -> List[Chunk]:
+	"""
+	Pack records into chunks of at most `max_records` records and `max_bytes` of JSON, grouped
+	by market: whole markets are packed together while they fit, and a larger market is split
+	between variant size packs, so every record of one market x variant size pack (whose
+	primary method the procedure updates) lands in the same call. A single group over the limits
+	gets a chunk of its own. `rows` restricts the plan to those positions.
+	"""
+	groups: "OrderedDict[str, OrderedDict[str, List[int]]]" = OrderedDict()
+	for i in rows if rows is not None else range(len(records)):
+		record = records[i]
+		market = _text(record.get("market_code")) or ""
+		groups.setdefault(market, OrderedDict()).setdefault(_text(record.get("variant_size_pack_id")) or "", []).append(i)
+
+	chunks: List[Chunk] = []
+	pending: List[int] = []
+	pending_markets: List[str] = []
+	pending_bytes = 2  # []
+
+	def flush() -> None:
+		nonlocal pending, pending_markets, pending_bytes
+		if pending:
+			payload = "[" + ",".join(_encoded(records[i]) for i in pending) + "]"
+			chunks.append(Chunk(len(chunks), pending_markets, pending, payload))
+		pending, pending_markets, pending_bytes = [], [], 2
+
+	for market in sorted(groups):
+		for group in groups[market].values():
+			size = sum(len(_encoded(records[i])) + 1 for i in group)
+			if pending and (len(pending) + len(group) > max_records or pending_bytes + size > max_bytes):
+				flush()
+			pending.extend(group)
+			pending_bytes += size
+			if not pending_markets or pending_markets[-1] != market:
+				pending_markets.append(market)
+	flush()
+	return chunks
+
+
+@dataclass
+class ChunkResult:
+	chunk: int
+	markets: List[str]
+	rows: List[int]
+	attempts: int
+	elapsed_s: float
+	message: Optional[str] = None  # the procedure's return value
+	error: Optional[str] = None
+	error_code: Optional[int] = None
+	outcome: str = "saved"  # "saved" | "failed" | "not_sent" | "unknown" (see call_outcome)
+
+	@property
+	def ok(self) -> bool:
+		return self.outcome == "saved"
+
+
+@dataclass
+class BatchSaveResult:
+	procedure: str
+	chunks: List[ChunkResult] = field(default_factory=list)
+	invalid: List[RowError] = field(default_factory=list)  # records left out (skip_invalid=True)
+	elapsed_s: float = 0.0
+
+	@property
+	def ok(self) -> bool:
+		return not self.invalid and all(c.ok for c in self.chunks)
+
+	@property
+	def saved_rows(self) -> List[int]:
+		return sorted(i for c in self.chunks if c.ok for i in c.rows)
+
+	@property
+	def failed_rows(self) -> List[int]:
+		"""Records that were not saved (rejected by the procedure, or never sent)."""
+		return sorted(i for c in self.chunks if c.outcome in ("failed", "not_sent") for i in c.rows)
+
+	@property
+	def failed_markets(self) -> List[str]:
+		return sorted({m for c in self.chunks if c.outcome in ("failed", "not_sent") for m in c.markets})
+
+	@property
+	def unknown_rows(self) -> List[int]:
+		"""Records whose call may or may not have committed; check the warehouse before resending."""
+		return sorted(i for c in self.chunks if c.outcome == "unknown" for i in c.rows)
+
+	@property
+	def unknown_markets(self) -> List[str]:
+		return sorted({m for c in self.chunks if c.outcome == "unknown" for m in c.markets})
+
+	def describe(self) -> str:
+		saved = sum(1 for c in self.chunks if c.ok)
+		retried = sum(c.attempts - 1 for c in self.chunks)
+		text = (
+			f"{self.procedure}: {len(self.saved_rows)} record(s) saved in {saved}"
+			f"/{len(self.chunks)} chunk(s), {retried} retry(ies), {self.elapsed_s:.2f}s"
+		)
+		if self.failed_markets:
+			text += f"; failed markets: {', '.join(self.failed_markets)}"
+		if self.unknown_markets:
+			text += f"; outcome unknown for markets: {', '.join(self.unknown_markets)}"
+		if self.invalid:
+			text += f"; {len({e.index for e in self.invalid})} invalid record(s) left out"
+		return text
+
+
+class BatchSaver:
+	"""
+	Client for SP_BATCH_SAVE_FORECASTS / SP_BATCH_SAVE_BUDGETS that replaces one large call.
+
+	- Records are validated locally first with the procedures' own pre-flight rules, so a bad
+	  record is reported by position instead of rejecting the whole batch in the warehouse.
+	- Valid records are split into market-grouped chunks (plan_chunks) sent as separate calls,
+	  up to `max_in_flight` at once. The calls run on this saver's worker threads, so with
+	  SnowflakeExecutor (one connection per thread) they reuse a pool of `max_in_flight`
+	  connections across saves.
+	- Each call is its own transaction: a published market or approved cycle fails only its
+	  chunks, and the result lists saved and failed records.
+	- Only calls that were never sent (StatementNotSent, e.g. a failed connect) are retried, up
+	  to `max_attempts` times with exponential backoff. The procedures are not idempotent, so a
+	  timeout or dropped connection after sending is reported as an unknown outcome
+	  (`unknown_rows`) instead of being resent.
+	- With `cache`, the markets of each chunk that may have written are invalidated, as
+	  ForecastCache.call_procedure does.
+	"""
+
+	def __init__(
+		self,
+		executor: QueryExecutor,
+		cache: Any = None,
+		max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+		max_chunk_records: int = DEFAULT_MAX_CHUNK_RECORDS,
+		max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+		max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+		backoff_s: float = DEFAULT_BACKOFF_S,
+		retryable: Callable[[BaseException], bool] = is_retryable,
+		sleep: Callable[[float], None] = time.sleep,
+	):
+		self.executor = executor
+		self.cache = cache
+		self.max_in_flight = max(1, max_in_flight)
+		self.max_chunk_records = max_chunk_records
+		self.max_chunk_bytes = max_chunk_bytes
+		self.max_attempts = max(1, max_attempts)
+		self.backoff_s = backoff_s
+		self.retryable = retryable
+		self._sleep = sleep
+		self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="batch-save")
+
+	def __enter__(self) -> "BatchSaver":
+		return self
+
+	def __exit__(self, *exc: Any) -> None:
+		self.close()
+
+	def close(self) -> None:
+		self._pool.shutdown(wait=True)
+
+	def save_forecasts(
+		self,
+		records: Sequence[Mapping[str, Any]],
+		forecast_generation_month_date: Any,
+		user_id: str,
+		forecast_status: str,
+		skip_invalid: bool = False,
+	) -> BatchSaveResult:
+		return self.save(
+			"SP_BATCH_SAVE_FORECASTS",
+			records,
+			skip_invalid=skip_invalid,
+			forecast_generation_month_date=forecast_generation_month_date,
+			user_id=user_id,
+			forecast_status=forecast_status,
+		)
+
+	def save_budgets(
+		self,
+		records: Sequence[Mapping[str, Any]],
+		budget_cycle_date: Any,
+		user_id: str,
+		skip_invalid: bool = False,
+	) -> BatchSaveResult:
+		return self.save("SP_BATCH_SAVE_BUDGETS", records, skip_invalid=skip_invalid, budget_cycle_date=budget_cycle_date, user_id=user_id)
+
+	def save(self, procedure: str, records: Sequence[Mapping[str, Any]], skip_invalid: bool = False, **params: Any) -> BatchSaveResult:
+		"""
+		Validate, chunk and submit `records`; `params` are the procedure's other parameters.
+		Invalid records raise BatchValidationError before anything is sent, unless `skip_invalid`
+		leaves them out (listed in the result's `invalid`).
+		"""
+		started = time.perf_counter()
+		routine = lookup(PROCEDURES, procedure)
+		spec = BATCH_PROCEDURES[routine.name]
+		invalid = validate_records(routine.name, records)
+		if invalid and not skip_invalid:
+			raise BatchValidationError(routine.name, invalid)
+		bad = {e.index for e in invalid}
+		chunks = plan_chunks(
+			records,
+			[i for i in range(len(records)) if i not in bad],
+			self.max_chunk_records,
+			self.max_chunk_bytes,
+		)
+		futures = [self._pool.submit(self._submit, routine.name, spec, chunk, params) for chunk in chunks]
+		result = BatchSaveResult(routine.name, [f.result() for f in futures], invalid)
+		result.elapsed_s = time.perf_counter() - started
+		logger.info(result.describe())
+		return result
+
+	def _submit(self, procedure: str, spec: BatchProcedure, chunk: Chunk, params: Mapping[str, Any]) -> ChunkResult:
+		routine = lookup(PROCEDURES, procedure)
+		bound = bind_params(routine, params, **{spec.json_param: chunk.payload})
+		sql, values = render_call(routine, bound, procedure=True)
+		started = time.perf_counter()
+		attempt = 0
+		while True:
+			attempt += 1
+			try:
+				_, rows = self.executor.execute(sql, values)
+				message = str(rows[0][0]) if rows and rows[0] else None
+				result = ChunkResult(chunk.index, chunk.markets, chunk.rows, attempt, time.perf_counter() - started, message=message)
+			except Exception as exc:
+				if attempt < self.max_attempts and self.retryable(exc):
+					delay = self.backoff_s * 2 ** (attempt - 1)
+					logger.warning(f"{procedure} chunk {chunk.index} attempt {attempt} not sent ({exc}); retrying in {delay:.1f}s")
+					self._sleep(delay)
+					continue
+				result = ChunkResult(
+					chunk.index, chunk.markets, chunk.rows, attempt, time.perf_counter() - started,
+					error=str(exc), error_code=error_code(exc), outcome=call_outcome(exc),
+				)
+				if result.outcome == "unknown":
+					logger.error(f"{procedure} chunk {chunk.index} ({', '.join(chunk.markets)}): outcome unknown ({exc}); not resent")
+			if self.cache is not None and result.outcome in ("saved", "unknown"):
+				self.cache.invalidate_for_call(procedure, bound)
+			return result
+
+
+@dataclass
+class FakeBatchSaveExecutor:
+	"""
+	In-memory SP_BATCH_SAVE_FORECASTS / SP_BATCH_SAVE_BUDGETS for tests and local runs.
+
+	Each call sleeps `latency_s + per_record_s * records`, then raises what the procedure would,
+	in its order: -20091 for a market in `published_markets` (-20011 for a cycle in
+	`approved_cycles`), then the duplicate, required-field and volume-field codes. A share
+	`failure_rate` of calls fails to connect (StatementNotSent, nothing runs) and a share
+	`lost_response_rate` commits and then loses the response (ConnectionResetError). Saved
+	records are kept per procedure in `saved`, once per committed call, so a resent chunk
+	shows up twice; `max_in_flight` is the most calls seen running at once.
+	"""
+	published_markets: Set[str] = field(default_factory=set)
+	approved_cycles: Set[str] = field(default_factory=set)
+	latency_s: float = 0.0
+	per_record_s: float = 0.0
+	failure_rate: float = 0.0
+	lost_response_rate: float = 0.0
+	seed: int = 0
+	calls: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+	saved: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+	max_in_flight: int = 0
+
+	def __post_init__(self) -> None:
+		self._lock = threading.Lock()
+		self._random = random.Random(self.seed)
+		self._in_flight = 0
+
+	def execute(self, sql: str, params: Mapping[str, Any]) -> QueryResult:
+		procedure = routine_name(sql)
+		spec = BATCH_PROCEDURES.get(procedure)
+		if spec is None:
+			raise ProcedureError(2003, f"Unknown procedure {procedure}")
+		records = json.loads(params[spec.json_param])
+		with self._lock:
+			not_sent = self._random.random() < self.failure_rate
+			lost = self._random.random() < self.lost_response_rate
+			if not_sent:
+				raise StatementNotSent("Simulated connect failure")
+			self.calls.append((procedure, dict(params)))
+			self._in_flight += 1
+			self.max_in_flight = max(self.max_in_flight, self._in_flight)
+		try:
+			time.sleep(self.latency_s + self.per_record_s * len(records))
+			self._preflight(spec, records, params)
+			with self._lock:
+				self.saved.setdefault(procedure, []).extend(records)
+			if lost:
+				raise ConnectionResetError("Simulated lost response (connection reset after COMMIT)")
+			return [procedure], [(f"SUCCESS: Processed batch of {len(records)} record(s).",)]
+		finally:
+			with self._lock:
+				self._in_flight -= 1
+
+	def _preflight(self, spec: BatchProcedure, records: List[Dict[str, Any]], params: Mapping[str, Any]) -> None:
+		if spec.name == "SP_BATCH_SAVE_BUDGETS":
+			if normalize_fgmd(params.get("P_BUDGET_CYCLE_DATE")) in self.approved_cycles:
+				raise ProcedureError(spec.locked_code, "Cannot save batch; the budget cycle is approved (locked).")
+		elif self.published_markets & {_text(r.get("market_code")) for r in records}:
+			raise ProcedureError(spec.locked_code, "Cannot save batch; at least one forecast belongs to a published market.")
+		codes = {e.code for e in validate_records(spec.name, records)}
+		for code, message in (
+			(spec.duplicate_code, "Duplicate data found in JSON for records with volume."),
+			(spec.required_code, "Missing required field."),
+			(spec.volume_code, "Missing required fields for volume update."),
+		):
+			if code in codes:
+				raise ProcedureError(code, message)
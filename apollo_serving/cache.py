@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from .backends import CacheBackend, InMemoryBackend
+from .columnar import ColumnarResult
+from .executor import QueryExecutor, QueryResult
+from .invalidation import IMPLICIT_FGMD, Scope, scopes_for_call
+from .routines import PROCEDURES, UDTFS, Routine, bind_params, lookup, market_scope, normalize_fgmd, render_call
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_S = float(os.getenv("APOLLO_SERVING_TTL_S", "900"))
+ALL_MARKETS = "*"
+_ALL_TAG = "all"
+
+
+def cache_key(namespace: str, routine: Routine, bound: Mapping[str, Any], fgmd: Optional[str]) -> str:
+	"""`<namespace>:<routine>:<fgmd|->:<digest of canonical params>`."""
+	canonical = json.dumps(bound, sort_keys=True, separators=(",", ":"), default=str)
+	digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+	return f"{namespace}:{routine.name}:{fgmd or IMPLICIT_FGMD}:{digest}"
+
+
+def _key_fgmd(key: str) -> str:
+	return key.rsplit(":", 2)[-2]
+
+
+def _fgmd_matches(scope_fgmd: Optional[str], key_fgmd: str) -> bool:
+	if scope_fgmd is None:
+		return True
+	if scope_fgmd == IMPLICIT_FGMD:
+		return key_fgmd == IMPLICIT_FGMD
+	return key_fgmd in (scope_fgmd, IMPLICIT_FGMD)
+
+
+@dataclass
+class CacheStats:
+	hits: int = 0
+	misses: int = 0
+	stores: int = 0
+	stale_skips: int = 0  # results not stored because a write invalidated the cache mid-query
+	invalidated: int = 0
+
+
+class ForecastCache:
+	"""
+	Read-through cache for the forecast UDTFs with write invalidation.
+
+	- `query()` normalizes UDTF parameters into a canonical key, serves hits from the backend and
+	  runs the UDTF through the executor on a miss (one in-flight query per key per process).
+	- `call_procedure()` runs a write procedure and then invalidates only the market/FGMD entries
+	  it can affect (see invalidation.PROCEDURE_SCOPES); `invalidate_for_call()` does the same for
+	  calls made elsewhere.
+	- `division_markets(division) -> markets` narrows division-level invalidation; without it a
+	  division publish invalidates every market for the affected FGMDs.
+	"""
+
+	def __init__(
+		self,
+		executor: QueryExecutor,
+		backend: Optional[CacheBackend] = None,
+		ttl_s: float = DEFAULT_TTL_S,
+		namespace: str = "apollo:serving",
+		division_markets: Optional[Callable[[str], Iterable[str]]] = None,
+	):
+		self.executor = executor
+		self.backend = backend if backend is not None else InMemoryBackend()
+		self.ttl_s = ttl_s
+		self.namespace = namespace
+		self.division_markets = division_markets
+		self.stats = CacheStats()
+		self._inflight: Dict[str, list] = {}  # key -> [lock, waiters]
+		self._inflight_guard = threading.Lock()
+
+	def _tag(self, name: str) -> str:
+		return f"{self.namespace}:{name}"
+
+	def _market_tag(self, market: str) -> str:
+		return self._tag(f"market:{market}")
+
+	def key_for(self, udtf: str, params: Optional[Mapping[str, Any]] = None, fgmd: Any = None, **kwargs: Any) -> str:
+		routine = lookup(UDTFS, udtf)
+		bound = bind_params(routine, params, **kwargs)
+		return cache_key(self.namespace, routine, bound, self._fgmd(routine, bound, fgmd))
+
+	@staticmethod
+	def _fgmd(routine: Routine, bound: Mapping[str, Any], fgmd: Any) -> Optional[str]:
+		if fgmd is not None:
+			return normalize_fgmd(fgmd)
+		return bound.get(routine.fgmd_param) if routine.fgmd_param else None
+
+	def query(
+		self,
+		udtf: str,
+		params: Optional[Mapping[str, Any]] = None,
+		fgmd: Any = None,
+		**kwargs: Any,
+	) -> ColumnarResult:
+		"""
+		Result of `udtf` for `params`. Pass `fgmd` when the caller knows the FGMD the UDTF will
+		read (the depletions UDTFs read the current valid FGMD); it narrows invalidation.
+		"""
+		routine = lookup(UDTFS, udtf)
+		bound = bind_params(routine, params, **kwargs)
+		key = cache_key(self.namespace, routine, bound, self._fgmd(routine, bound, fgmd))
+
+		blob = self.backend.get(key)
+		if blob is not None:
+			self.stats.hits += 1
+			return ColumnarResult.from_bytes(blob)
+
+		with self._key_lock(key):
+			blob = self.backend.get(key)
+			if blob is not None:
+				self.stats.hits += 1
+				return ColumnarResult.from_bytes(blob)
+			self.stats.misses += 1
+			epoch = self.backend.epoch()
+			sql, values = render_call(routine, bound)
+			columns, rows = self.executor.execute(sql, values)
+			result = ColumnarResult.from_rows(columns, rows)
+			if self.backend.epoch() != epoch:
+				# A write landed while the query ran; the result may predate it
+				self.stats.stale_skips += 1
+				return result
+			markets = market_scope(routine, bound) or [ALL_MARKETS]
+			tags = [self._tag(_ALL_TAG), *(self._market_tag(m) for m in markets)]
+			self.backend.set(key, result.to_bytes(), self.ttl_s, tags)
+			self.stats.stores += 1
+			return result
+
+	def _key_lock(self, key: str) -> "_KeyLock":
+		return _KeyLock(self, key)
+
+	def call_procedure(self, procedure: str, params: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> QueryResult:
+		"""Run a write procedure, then invalidate the cached results it affects."""
+		routine = lookup(PROCEDURES, procedure)
+		bound = bind_params(routine, params, **kwargs)
+		sql, values = render_call(routine, bound, procedure=True)
+		try:
+			return self.executor.execute(sql, values)
+		finally:
+			# Invalidate even when the call fails: it may have committed part of its work
+			self._invalidate_scopes(scopes_for_call(routine.name, bound))
+
+	def invalidate_for_call(self, procedure: str, params: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> int:
+		"""Invalidate what a procedure call made outside this cache (e.g. by another service) affects."""
+		routine = lookup(PROCEDURES, procedure)
+		bound = bind_params(routine, params, **kwargs)
+		return self._invalidate_scopes(scopes_for_call(routine.name, bound))
+
+	def invalidate(self, markets: Optional[Iterable[str]] = None, fgmd: Any = None) -> int:
+		"""Invalidate entries for `markets` (default: all) and `fgmd` (default: all FGMDs)."""
+		fgmd = normalize_fgmd(fgmd)
+		scopes = [Scope(market=m, fgmd=fgmd) for m in markets] if markets is not None else [Scope(fgmd=fgmd)]
+		return self._invalidate_scopes(scopes)
+
+	def _resolve(self, scope: Scope) -> List[Optional[str]]:
+		if scope.market is not None:
+			return [scope.market]
+		if scope.division is not None and self.division_markets is not None:
+			return list(self.division_markets(scope.division))
+		return [None]
+
+	def _invalidate_scopes(self, scopes: Iterable[Scope]) -> int:
+		self.backend.bump_epoch()
+		doomed: Set[str] = set()
+		untag: Dict[str, Set[str]] = {}
+		for scope in scopes:
+			for market in self._resolve(scope):
+				tags = (
+					[self._tag(_ALL_TAG)] if market is None
+					else [self._market_tag(market), self._market_tag(ALL_MARKETS)]
+				)
+				for tag in tags:
+					keys = {k for k in self.backend.tagged(tag) if _fgmd_matches(scope.fgmd, _key_fgmd(k))}
+					doomed |= keys
+					untag.setdefault(tag, set()).update(keys)
+		removed = self.backend.delete(doomed)
+		untag.setdefault(self._tag(_ALL_TAG), set()).update(doomed)
+		for tag, keys in untag.items():
+			self.backend.untag(tag, keys)
+		self.stats.invalidated += removed
+		if removed:
+			logger.info(f"Invalidated {removed} cached result(s)")
+		return removed
+
+
+class _KeyLock:
+	"""Per-key lock so concurrent misses for one key run a single query (dropped when unused)."""
+
+	def __init__(self, cache: ForecastCache, key: str):
+		self.cache, self.key = cache, key
+
+	def __enter__(self) -> None:
+		with self.cache._inflight_guard:
+			entry = self.cache._inflight.setdefault(self.key, [threading.Lock(), 0])
+			entry[1] += 1
+			self.entry = entry
+		entry[0].acquire()
+
+	def __exit__(self, *exc: Any) -> None:
+		self.entry[0].release()
+		with self.cache._inflight_guard:
+			self.entry[1] -= 1
+			if self.entry[1] == 0:
+				del self.cache._inflight[self.key]
@@ -0,0 +1,113 @@
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+FORMAT_VERSION = 1
+COMPRESS_LEVEL = 6
+# Dictionary-encode a string column when distinct values are at most this share of its rows
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def _kind(values: Sequence[Any]) -> str:
+	kinds = set()
+	for v in values:
+		if v is None:
+			continue
+		if isinstance(v, bool):
+			kinds.add("bool")
+		elif isinstance(v, int):
+			kinds.add("int")
+		elif isinstance(v, float):
+			kinds.add("float")
+		elif isinstance(v, Decimal):
+			kinds.add("decimal")
+		elif isinstance(v, datetime):
+			kinds.add("datetime")
+		elif isinstance(v, date):
+			kinds.add("date")
+		elif isinstance(v, str):
+			kinds.add("str")
+		else:
+			kinds.add("json")
+		if len(kinds) > 1:
+			break
+	if kinds == {"int", "float"}:
+		return "float"
+	return kinds.pop() if len(kinds) == 1 else ("null" if not kinds else "json")
+
+
+_ENCODE: Dict[str, Callable[[Any], Any]] = {
+	"decimal": str,
+	"datetime": lambda v: v.isoformat(),
+	"date": lambda v: v.isoformat(),
+}
+_DECODE: Dict[str, Callable[[Any], Any]] = {
+	"decimal": Decimal,
+	"datetime": datetime.fromisoformat,
+	"date": date.fromisoformat,
+}
+
+
+@dataclass
+class ColumnarResult:
+	"""A query result held column by column; serializes to compact, compressed bytes."""
+	columns: List[str]
+	vectors: List[List[Any]]
+
+	@classmethod
+	def from_rows(cls, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> "ColumnarResult":
+		vectors: List[List[Any]] = [[] for _ in columns]
+		for row in rows:
+			for i, value in enumerate(row):
+				vectors[i].append(value)
+		return cls(list(columns), vectors)
+
+	@property
+	def num_rows(self) -> int:
+		return len(self.vectors[0]) if self.vectors else 0
+
+	def rows(self) -> Iterator[Tuple[Any, ...]]:
+		return zip(*self.vectors) if self.vectors else iter(())
+
+	def records(self) -> List[Dict[str, Any]]:
+		return [dict(zip(self.columns, row)) for row in self.rows()]
+
+	def to_bytes(self) -> bytes:
+		encoded = []
+		for name, values in zip(self.columns, self.vectors):
+			kind = _kind(values)
+			convert = _ENCODE.get(kind)
+			data = [convert(v) if convert and v is not None else v for v in values] if convert else values
+			column: Dict[str, Any] = {"name": name, "type": kind}
+			if kind == "str":
+				distinct = list(dict.fromkeys(v for v in data if v is not None))
+				if len(distinct) <= DICTIONARY_MAX_RATIO * len(data):
+					index = {v: i for i, v in enumerate(distinct)}
+					column["dict"] = distinct
+					data = [index[v] if v is not None else None for v in data]
+			column["data"] = data
+			encoded.append(column)
+		payload = {"v": FORMAT_VERSION, "n": self.num_rows, "columns": encoded}
+		text = json.dumps(payload, separators=(",", ":"), default=str)
+		return zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+
+	@classmethod
+	def from_bytes(cls, blob: bytes) -> "ColumnarResult":
+		payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+		if payload.get("v") != FORMAT_VERSION:
+			raise ValueError(f"Unsupported columnar format version: {payload.get('v')}")
+		columns, vectors = [], []
+		for column in payload["columns"]:
+			data = column["data"]
+			if "dict" in column:
+				lookup = column["dict"]
+				data = [lookup[i] if i is not None else None for i in data]
+			convert = _DECODE.get(column["type"])
+			if convert:
+				data = [convert(v) if v is not None else None for v in data]
+			columns.append(column["name"])
+			vectors.append(data)
+		return cls(columns, vectors)
@@ -0,0 +1,90 @@
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+QueryResult = Tuple[List[str], List[Sequence[Any]]]
+
+
+class StatementNotSent(Exception):
+	"""
+	The statement never reached the warehouse (connect/login failed, no usable connection), so
+	it cannot have run and is safe to retry. Any other error raised by an executor may come
+	after the statement ran, even when the client only saw a timeout or a dropped connection.
+	"""
+
+
+class QueryExecutor(Protocol):
+	"""Runs one SQL statement with pyformat binds and returns (column names, rows)."""
+
+	def execute(self, sql: str, params: Mapping[str, Any]) -> QueryResult: ...
+
+
+class SnowflakeExecutor:
+	"""
+	Executor over a snowflake-connector-python connection. `connect` is called lazily per
+	thread (connections are not shared across threads), e.g. `lambda: snowflake.connector.connect(**cfg)`.
+	`query_log` keeps (routine, query id) of the most recent calls for cost attribution.
+	"""
+
+	def __init__(self, connect: Callable[[], Any], query_log_size: int = 10000):
+		self._connect = connect
+		self._local = threading.local()
+		self.query_log: Deque[Tuple[str, str]] = deque(maxlen=query_log_size)
+
+	def _connection(self) -> Any:
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			conn = self._local.conn = self._connect()
+		return conn
+
+	def execute(self, sql: str, params: Mapping[str, Any]) -> QueryResult:
+		try:
+			cur = self._connection().cursor()
+		except Exception as exc:
+			self._local.conn = None
+			raise StatementNotSent(f"No connection: {exc}") from exc
+		try:
+			cur.execute(sql, dict(params))
+			if getattr(cur, "sfqid", None):
+				self.query_log.append((routine_name(sql), cur.sfqid))
+			columns = [d[0] for d in cur.description or []]
+			return columns, cur.fetchall() if columns else []
+		finally:
+			cur.close()
+			# Reopen a dropped connection on the next call instead of failing every call on this thread
+			is_closed = getattr(self._local.conn, "is_closed", None)
+			if callable(is_closed) and is_closed():
+				self._local.conn = None
+
+
+_ROUTINE_RE = re.compile(r"(?:TABLE\(|CALL\s+)(?:[\w$]+\.)*([\w$]+)\(", re.IGNORECASE)
+
+
+def routine_name(sql: str) -> str:
+	"""Bare, upper-case name of the UDTF or procedure a statement calls (the statement otherwise)."""
+	match = _ROUTINE_RE.search(sql)
+	return match.group(1).upper() if match else sql
+
+
+@dataclass
+class FakeQueryExecutor:
+	"""
+	In-memory stand-in for tests and local runs. `handlers` map a routine name to either a fixed
+	(columns, rows) result or a callable taking the bind values; unknown routines return no rows.
+	Every call is recorded in `calls` as (routine, params).
+	"""
+	handlers: Dict[str, Any] = field(default_factory=dict)
+	calls: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+
+	def execute(self, sql: str, params: Mapping[str, Any]) -> QueryResult:
+		routine = routine_name(sql)
+		self.calls.append((routine, dict(params)))
+		handler = self.handlers.get(routine)
+		if handler is None:
+			return [], []
+		return handler(dict(params)) if callable(handler) else handler
+
+	def count(self, routine: Optional[str] = None) -> int:
+		return sum(1 for name, _ in self.calls if routine is None or name == routine.upper())
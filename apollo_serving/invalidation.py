@@ -0,0 +1,92 @@
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .routines import normalize_fgmd
+
+# FGMD segment of cache keys whose query reads the current valid FGMD implicitly
+IMPLICIT_FGMD = "-"
+
+
+@dataclass(frozen=True)
+class Scope:
+	"""
+	Cached results a write can affect. `market=None` means every market (or, with `division`,
+	the markets of that division); `fgmd=None` means every FGMD and IMPLICIT_FGMD only the
+	entries that read the current valid FGMD.
+	"""
+	market: Optional[str] = None
+	fgmd: Optional[str] = None
+	division: Optional[str] = None
+
+
+def next_month(fgmd: str) -> str:
+	d = date.fromisoformat(fgmd)
+	return date(d.year + d.month // 12, d.month % 12 + 1, 1).isoformat()
+
+
+def _payload_markets(payload: Any) -> List[str]:
+	records = json.loads(payload) if isinstance(payload, str) else payload
+	if isinstance(records, dict):
+		records = [records]
+	markets = {str(r["market_code"]) for r in records or [] if isinstance(r, dict) and r.get("market_code")}
+	return sorted(markets)
+
+
+def _batch_save(params: Mapping[str, Any]) -> List[Scope]:
+	fgmd = normalize_fgmd(params.get("P_FORECAST_GENERATION_MONTH_DATE"))
+	markets = _payload_markets(params.get("P_FORECASTS_JSON"))
+	if not markets:
+		return [Scope(fgmd=fgmd)]
+	return [Scope(market=m, fgmd=fgmd) for m in markets]
+
+
+def _single_save(params: Mapping[str, Any]) -> List[Scope]:
+	return [Scope(market=params.get("P_MARKET_CODE"), fgmd=normalize_fgmd(params.get("P_FORECAST_GENERATION_MONTH_DATE")))]
+
+
+def _publication_change(params: Mapping[str, Any]) -> List[Scope]:
+	"""
+	Publishing/unpublishing touches the FGMD itself, consensus synced into the next FGMD, and may
+	move the current valid FGMD (so every implicit-FGMD entry is stale).
+	"""
+	fgmd = normalize_fgmd(params.get("P_FORECAST_GENERATION_MONTH_DATE_STR"))
+	market, division = params.get("P_MARKET_CODE"), params.get("P_DIVISION")
+	if fgmd is None:
+		return [Scope(market=market, division=division)]
+	return [
+		Scope(market=market, fgmd=fgmd, division=division),
+		Scope(market=market, fgmd=next_month(fgmd), division=division),
+		Scope(fgmd=IMPLICIT_FGMD),
+	]
+
+
+def _nothing(params: Mapping[str, Any]) -> List[Scope]:
+	# Writes no cached UDTF reads
+	return []
+
+
+def _everything(params: Mapping[str, Any]) -> List[Scope]:
+	# Only ids are known (forecast/group/publication), not their markets or FGMDs
+	return [Scope()]
+
+
+PROCEDURE_SCOPES: Dict[str, Callable[[Mapping[str, Any]], List[Scope]]] = {
+	"SP_BATCH_SAVE_FORECASTS": _batch_save,
+	"SP_BATCH_SAVE_FORECASTS_CHAINS": _batch_save,  # always writes the current valid FGMD
+	"SP_BATCH_SAVE_BUDGETS": _nothing,
+	"SP_SAVE_FORECAST_VERSION": _single_save,
+	"SP_SMART_SAVE_FORECAST": _single_save,
+	"SP_REVERT_FORECAST_TO_VERSION": _everything,
+	"SP_PUBLISH_DIVISION_FORECAST": _publication_change,
+	"SP_UNPUBLISH_DIVISION_FORECAST": _publication_change,
+	"SP_UNPUBLISH_MARKET_FORECAST": _publication_change,
+	"SP_UNPUBLISH_GROUP": _everything,
+	"SP_UNPUBLISH_PUBLICATION": _everything,
+}
+
+
+def scopes_for_call(procedure: str, params: Mapping[str, Any]) -> List[Scope]:
+	"""Scopes invalidated by a procedure call (`params` as returned by routines.bind_params)."""
+	return PROCEDURE_SCOPES[procedure](params)
@@ -0,0 +1,278 @@
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Sentinel meaning "no explicit value" for parameters without a SQL default
+REQUIRED = object()
+
+
+@dataclass(frozen=True)
+class Param:
+	name: str
+	type: str  # ARRAY | VARCHAR | DATE | INTEGER | NUMBER | BOOLEAN
+	default: Any = REQUIRED
+
+
+@dataclass(frozen=True)
+class Routine:
+	"""Signature of a backend function/procedure (mirrors tenants/*/backend_functions)."""
+	name: str
+	schema: str
+	params: Tuple[Param, ...]
+	# Parameter carrying the market filter (array or scalar) and the explicit FGMD, if any
+	market_param: Optional[str] = None
+	fgmd_param: Optional[str] = None
+
+	@property
+	def qualified_name(self) -> str:
+		return f"{self.schema}.{self.name}"
+
+
+def _p(name: str, type_: str, default: Any = REQUIRED) -> Param:
+	return Param(name, type_, default)
+
+
+# Cacheable read UDTFs. The depletions UDTFs read the current valid FGMD implicitly.
+UDTFS: Dict[str, Routine] = {r.name: r for r in (
+	Routine(
+		"UDTF_GET_DEPLETIONS_FORECAST", "FORECAST",
+		(
+			_p("P_FORECAST_METHODS", "VARCHAR", None),
+			_p("P_MARKETS", "ARRAY", None),
+			_p("P_CUSTOMERS", "ARRAY", None),
+			_p("P_BRANDS", "ARRAY", None),
+			_p("P_VARIANTS", "ARRAY", None),
+			_p("P_VARIANT_SIZE_PACK_DESCS", "ARRAY", None),
+		),
+		market_param="P_MARKETS",
+	),
+	Routine(
+		"UDTF_GET_DEPLETIONS_FORECAST_CHAINS", "FORECAST",
+		(
+			_p("P_FORECAST_METHODS", "VARCHAR", None),
+			_p("P_MARKETS", "ARRAY", None),
+			_p("P_CUSTOMERS", "ARRAY", None),
+			_p("P_BRANDS", "ARRAY", None),
+			_p("P_VARIANTS", "ARRAY", None),
+			_p("P_VARIANT_SIZE_PACK_DESCS", "ARRAY", None),
+			_p("P_PARENT_CHAIN_CODES", "ARRAY", None),
+		),
+		market_param="P_MARKETS",
+	),
+	Routine(
+		"UDTF_GET_MARKET_PUBLISHED_FORECAST", "FORECAST",
+		(_p("P_MARKET_CODE", "VARCHAR"), _p("P_PUBLICATION_ID", "INTEGER", None)),
+		market_param="P_MARKET_CODE",
+	),
+	Routine(
+		"UDTF_GET_DIVISION_FORECAST_PUBLICATION_HISTORY", "FORECAST",
+		(
+			_p("P_DIVISION", "VARCHAR", None),
+			_p("P_INCLUDE_UNPUBLISHED", "BOOLEAN", False),
+			_p("P_FORECAST_GENERATION_MONTH_DATE_FILTER", "DATE", None),
+		),
+		fgmd_param="P_FORECAST_GENERATION_MONTH_DATE_FILTER",
+	),
+	Routine("UDTF_GET_FORECAST_HISTORY", "FORECAST", (_p("P_FORECAST_ID", "INTEGER"),)),
+)}
+
+# Write procedures that invalidate cached reads (see invalidation.PROCEDURE_SCOPES)
+PROCEDURES: Dict[str, Routine] = {r.name: r for r in (
+	Routine(
+		"SP_BATCH_SAVE_FORECASTS", "FORECAST",
+		(
+			_p("P_FORECASTS_JSON", "VARCHAR"),
+			_p("P_FORECAST_GENERATION_MONTH_DATE", "DATE"),
+			_p("P_USER_ID", "VARCHAR"),
+			_p("P_FORECAST_STATUS", "VARCHAR"),
+		),
+		fgmd_param="P_FORECAST_GENERATION_MONTH_DATE",
+	),
+	# Budgets have no cached reads; registered for the batch-save client (batch_save.py)
+	Routine(
+		"SP_BATCH_SAVE_BUDGETS", "FORECAST",
+		(_p("P_BUDGETS_JSON", "VARCHAR"), _p("P_BUDGET_CYCLE_DATE", "DATE"), _p("P_USER_ID", "VARCHAR")),
+	),
+	Routine(
+		"SP_BATCH_SAVE_FORECASTS_CHAINS", "FORECAST",
+		(_p("P_FORECASTS_JSON", "VARCHAR"), _p("P_USER_ID", "VARCHAR"), _p("P_FORECAST_STATUS", "VARCHAR")),
+	),
+	*(
+		Routine(
+			name, "FORECAST",
+			(
+				*((_p("P_FORECAST_ID", "INTEGER"),) if name == "SP_SAVE_FORECAST_VERSION" else ()),
+				_p("P_MARKET_NAME", "VARCHAR"),
+				_p("P_MARKET_CODE", "VARCHAR"),
+				_p("P_DISTRIBUTOR_NAME", "VARCHAR"),
+				_p("P_DISTRIBUTOR_ID", "VARCHAR"),
+				_p("P_BRAND", "VARCHAR"),
+				_p("P_BRAND_ID", "VARCHAR"),
+				_p("P_VARIANT", "VARCHAR"),
+				_p("P_VARIANT_ID", "VARCHAR"),
+				_p("P_VARIANT_SIZE_PACK_DESC", "VARCHAR"),
+				_p("P_VARIANT_SIZE_PACK_ID", "VARCHAR"),
+				_p("P_FORECAST_YEAR", "INTEGER"),
+				_p("P_MONTH", "INTEGER"),
+				_p("P_FORECAST_METHOD", "VARCHAR"),
+				_p("P_FORECAST_GENERATION_MONTH_DATE", "DATE"),
+				_p("P_MANUAL_CASE_EQUIVALENT_VOLUME", "NUMBER"),
+				_p("P_USER_ID", "VARCHAR"),
+				_p("P_FORECAST_STATUS", "VARCHAR"),
+				_p("P_COMMENT", "VARCHAR", None),
+			),
+			market_param="P_MARKET_CODE",
+			fgmd_param="P_FORECAST_GENERATION_MONTH_DATE",
+		)
+		for name in ("SP_SAVE_FORECAST_VERSION", "SP_SMART_SAVE_FORECAST")
+	),
+	Routine(
+		"SP_REVERT_FORECAST_TO_VERSION", "FORECAST",
+		(
+			_p("P_FORECAST_IDS", "ARRAY"),
+			_p("P_VERSION_NUMBER", "INTEGER"),
+			_p("P_USER_ID", "VARCHAR"),
+			_p("P_COMMENT", "VARCHAR", None),
+		),
+	),
+	Routine(
+		"SP_PUBLISH_DIVISION_FORECAST", "FORECAST",
+		(
+			_p("P_FORECAST_GENERATION_MONTH_DATE_STR", "VARCHAR"),
+			_p("P_USER_ID", "VARCHAR"),
+			_p("P_DIVISION", "VARCHAR"),
+			_p("P_PUBLICATION_STATUS", "VARCHAR", "review"),
+			_p("P_PUBLICATION_NOTE", "VARCHAR", None),
+		),
+		fgmd_param="P_FORECAST_GENERATION_MONTH_DATE_STR",
+	),
+	Routine(
+		"SP_UNPUBLISH_DIVISION_FORECAST", "FORECAST",
+		(
+			_p("P_DIVISION", "VARCHAR"),
+			_p("P_FORECAST_GENERATION_MONTH_DATE_STR", "VARCHAR"),
+			_p("P_USER_ID", "VARCHAR"),
+			_p("P_NOTE", "VARCHAR", None),
+		),
+		fgmd_param="P_FORECAST_GENERATION_MONTH_DATE_STR",
+	),
+	Routine(
+		"SP_UNPUBLISH_MARKET_FORECAST", "FORECAST",
+		(
+			_p("P_MARKET_CODE", "VARCHAR"),
+			_p("P_FORECAST_GENERATION_MONTH_DATE_STR", "VARCHAR"),
+			_p("P_USER_ID", "VARCHAR"),
+			_p("P_NOTE", "VARCHAR", None),
+		),
+		market_param="P_MARKET_CODE",
+		fgmd_param="P_FORECAST_GENERATION_MONTH_DATE_STR",
+	),
+	Routine(
+		"SP_UNPUBLISH_GROUP", "FORECAST",
+		(_p("P_GROUP_ID", "INTEGER"), _p("P_USER_ID", "VARCHAR"), _p("P_NOTE", "VARCHAR", None)),
+	),
+	Routine(
+		"SP_UNPUBLISH_PUBLICATION", "FORECAST",
+		(_p("P_PUBLICATION_ID", "INTEGER"), _p("P_USER_ID", "VARCHAR"), _p("P_NOTE", "VARCHAR", None)),
+	),
+)}
+
+
+def lookup(registry: Mapping[str, Routine], name: str) -> Routine:
+	"""Find a routine by bare or schema-qualified name (case-insensitive)."""
+	key = name.strip().upper().rsplit(".", 1)[-1]
+	if key not in registry:
+		raise KeyError(f"Unknown routine '{name}'. Known: {', '.join(sorted(registry))}")
+	return registry[key]
+
+
+def normalize_fgmd(value: Any) -> Optional[str]:
+	"""FGMD as 'YYYY-MM-DD' (accepts date, datetime or an ISO date/timestamp string)."""
+	if value is None or value == "":
+		return None
+	if isinstance(value, datetime):
+		return value.date().isoformat()
+	if isinstance(value, date):
+		return value.isoformat()
+	return date.fromisoformat(str(value).strip()[:10]).isoformat()
+
+
+def _normalize_value(param: Param, value: Any) -> Any:
+	if value is None:
+		return None
+	kind = param.type
+	if kind == "ARRAY":
+		if isinstance(value, str):
+			value = json.loads(value)
+		if isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+			raise TypeError(f"{param.name} must be a list, got {type(value).__name__}")
+		# Order and duplicates do not change ARRAY_CONTAINS filters; an empty array means "no filter"
+		items = sorted({json.dumps(v, sort_keys=True, default=str) for v in value})
+		return [json.loads(v) for v in items] or None
+	if kind == "DATE":
+		return normalize_fgmd(value)
+	if kind == "INTEGER":
+		return int(value)
+	if kind == "NUMBER":
+		return float(value)
+	if kind == "BOOLEAN":
+		return bool(value)
+	return str(value)
+
+
+def bind_params(routine: Routine, params: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+	"""
+	Canonical parameter values for `routine`, in signature order.
+	Names are case-insensitive and the `P_` prefix is optional (`markets=` == `P_MARKETS=`).
+	"""
+	given: Dict[str, Any] = {}
+	for key, value in {**(params or {}), **kwargs}.items():
+		name = key.upper() if key.upper().startswith("P_") else f"P_{key.upper()}"
+		given[name] = value
+	known = {p.name for p in routine.params}
+	unknown = sorted(set(given) - known)
+	if unknown:
+		raise ValueError(f"{routine.name} has no parameter(s) {', '.join(unknown)}")
+
+	bound: Dict[str, Any] = {}
+	for param in routine.params:
+		if param.name in given:
+			bound[param.name] = _normalize_value(param, given[param.name])
+		elif param.default is REQUIRED:
+			raise ValueError(f"{routine.name} requires {param.name}")
+		else:
+			bound[param.name] = param.default
+	return bound
+
+
+def _placeholder(param: Param) -> str:
+	if param.type == "ARRAY":
+		return f"PARSE_JSON(%({param.name})s)::ARRAY"
+	if param.type == "DATE":
+		return f"%({param.name})s::DATE"
+	return f"%({param.name})s"
+
+
+def render_call(routine: Routine, bound: Mapping[str, Any], procedure: bool = False) -> Tuple[str, Dict[str, Any]]:
+	"""SQL (pyformat binds, as used by the Snowflake connector) and bind values for a call."""
+	args = ", ".join(_placeholder(p) for p in routine.params)
+	sql = (
+		f"CALL {routine.qualified_name}({args})" if procedure
+		else f"SELECT * FROM TABLE({routine.qualified_name}({args}))"
+	)
+	values: Dict[str, Any] = {}
+	for param in routine.params:
+		value = bound.get(param.name)
+		values[param.name] = json.dumps(value) if param.type == "ARRAY" and value is not None else value
+	return sql, values
+
+
+def market_scope(routine: Routine, bound: Mapping[str, Any]) -> Optional[List[str]]:
+	"""Markets a call is restricted to, or None when it spans all markets."""
+	if routine.market_param is None:
+		return None
+	value = bound.get(routine.market_param)
+	if value is None:
+		return None
+	return [str(v) for v in value] if isinstance(value, list) else [str(value)]
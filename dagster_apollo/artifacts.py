@@ -0,0 +1,153 @@
+import importlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol
+
+from .cache import cache_root, write_text_if_changed
+
+logger = logging.getLogger(__name__)
+
+# Artifacts needed for `--state` comparisons and for later inspection of a run
+STATE_ARTIFACTS = ("manifest.json", "run_results.json")
+DEFAULT_KEEP = 20
+PROD_TARGET = "prod"
+
+
+class ArtifactStore(Protocol):
+	"""
+	Versioned storage for dbt run artifacts. Implementations must make `save` atomic with
+	respect to `fetch_latest`: a partially written version is never returned as latest.
+	"""
+
+	def save(self, target: str, run_id: str, artifacts: Dict[str, bytes], metadata: Dict[str, Any]) -> str:
+		"""Store one run's artifacts and mark them as the latest good state. Returns the version id."""
+		...
+
+	def fetch_latest(self, target: str) -> Optional[Path]:
+		"""Return a local directory containing the latest good manifest.json, or None."""
+		...
+
+	def list_versions(self, target: str) -> List[str]:
+		...
+
+
+class LocalArtifactStore:
+	"""
+	Filesystem store: <root>/<target>/<version>/{manifest.json, run_results.json, metadata.json}
+	with <root>/<target>/LATEST naming the newest good version.
+	"""
+
+	def __init__(self, root: Optional[Path] = None, keep: int = DEFAULT_KEEP):
+		self.root = Path(root) if root else cache_root() / "dbt_artifacts"
+		self.keep = keep
+
+	def _target_dir(self, target: str) -> Path:
+		return self.root / target
+
+	def save(self, target: str, run_id: str, artifacts: Dict[str, bytes], metadata: Dict[str, Any]) -> str:
+		stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+		version = f"{stamp}_{re.sub(r'[^A-Za-z0-9_-]', '_', run_id)[:40]}"
+		target_dir = self._target_dir(target)
+		target_dir.mkdir(parents=True, exist_ok=True)
+		staging = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=target_dir))
+		try:
+			for name, data in artifacts.items():
+				(staging / name).write_bytes(data)
+			(staging / "metadata.json").write_text(json.dumps(metadata, indent=2, sort_keys=True, default=str))
+			os.replace(staging, target_dir / version)
+		except BaseException:
+			shutil.rmtree(staging, ignore_errors=True)
+			raise
+		write_text_if_changed(target_dir / "LATEST", version + "\n")
+		self._prune(target)
+		return version
+
+	def fetch_latest(self, target: str) -> Optional[Path]:
+		latest = self._target_dir(target) / "LATEST"
+		try:
+			version = latest.read_text().strip()
+		except FileNotFoundError:
+			return None
+		path = self._target_dir(target) / version
+		return path if (path / "manifest.json").is_file() else None
+
+	def list_versions(self, target: str) -> List[str]:
+		target_dir = self._target_dir(target)
+		if not target_dir.is_dir():
+			return []
+		return sorted(p.name for p in target_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+	def _prune(self, target: str) -> None:
+		for version in self.list_versions(target)[:-self.keep]:
+			shutil.rmtree(self._target_dir(target) / version, ignore_errors=True)
+
+
+def load_artifact_store() -> ArtifactStore:
+	"""
+	Resolve the store from DBT_ARTIFACT_STORE: unset/"local" for LocalArtifactStore
+	(DBT_ARTIFACT_STORE_DIR overrides its root), or "package.module:factory" for a custom store.
+	"""
+	spec = os.getenv("DBT_ARTIFACT_STORE", "local")
+	if spec == "local":
+		root = os.getenv("DBT_ARTIFACT_STORE_DIR")
+		return LocalArtifactStore(Path(root) if root else None)
+	module_name, sep, attr = spec.partition(":")
+	if not sep:
+		raise RuntimeError(f"Invalid DBT_ARTIFACT_STORE '{spec}'. Use 'local' or 'module:factory'.")
+	return getattr(importlib.import_module(module_name), attr)()
+
+
+def effective_target(target: Optional[str] = None) -> str:
+	return target or os.getenv("DBT_TARGET", "dev")
+
+
+def state_key(target: str, namespace: Optional[str] = None) -> str:
+	"""Store key for a target's state; namespaced tenants keep theirs under <namespace>/<target>."""
+	return f"{namespace}/{target}" if namespace else target
+
+
+def record_prod_artifacts(
+	target_path: Path,
+	run_id: str,
+	target: Optional[str] = None,
+	store: Optional[ArtifactStore] = None,
+	extra_metadata: Optional[Dict[str, Any]] = None,
+	namespace: Optional[str] = None,
+) -> Optional[str]:
+	"""
+	Save manifest.json/run_results.json of a successful invocation when it ran against prod.
+	`namespace` separates tenants sharing one store. Returns the stored version id, or None
+	when nothing was recorded.
+	"""
+	target = effective_target(target)
+	if target != PROD_TARGET:
+		return None
+	artifacts: Dict[str, bytes] = {}
+	for name in STATE_ARTIFACTS:
+		path = Path(target_path) / name
+		if not path.is_file():
+			logger.warning("Not recording prod state: %s missing from %s", name, target_path)
+			return None
+		artifacts[name] = path.read_bytes()
+	store = store or load_artifact_store()
+	metadata = {"run_id": run_id, "target": target, "recorded_at": datetime.now(timezone.utc).isoformat()}
+	metadata.update(extra_metadata or {})
+	version = store.save(state_key(target, namespace), run_id, artifacts, metadata)
+	logger.info("Recorded prod dbt state %s", version)
+	return version
+
+
+def modified_only_selection(select: Optional[List[str]]) -> List[str]:
+	"""
+	Intersect a selection with `state:modified+` (dbt intersects comma-joined criteria).
+	No selection means the whole modified subgraph.
+	"""
+	if not select:
+		return ["state:modified+"]
+	return [f"state:modified+,{s}" for s in select]
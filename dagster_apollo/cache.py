@@ -0,0 +1,263 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Files at the project root that change what `dbt parse` produces
+PROJECT_ROOT_FILES = ["dbt_project.yml", "packages.yml", "package-lock.yml", "dependencies.yml", "selectors.yml"]
+DEFAULT_RESOURCE_PATHS = ["models", "macros", "seeds", "snapshots", "tests", "analyses"]
+MAX_CACHED_MANIFESTS = 5
+# Environment read by the generated profile (profiles.py) or by env_var() in the projects. It
+# reaches the manifest at parse time (target.database/schema/role, relation names, configs), so
+# a change must miss the cache. The private key and passphrase do not, and are left out.
+MANIFEST_ENV = (
+	"SNOWFLAKE_ACCOUNT",
+	"SNOWFLAKE_USER",
+	"SNOWFLAKE_ROLE",
+	"SNOWFLAKE_DATABASE",
+	"SNOWFLAKE_WAREHOUSE",
+	"SNOWFLAKE_SCHEMA",
+	"DBT_SCHEMA",
+	"DBT_TARGETS",
+	"DBT_LOCAL_DUCKDB_PATH",
+	"RAD_SALES_EXPORT_MODE",
+)
+
+
+def cache_root() -> Path:
+	"""
+	Root directory for state shared across Dagster processes (webserver, daemon, run workers).
+	Order: DAGSTER_APOLLO_CACHE_DIR, $DAGSTER_HOME/.apollo_cache, ~/.cache/dagster_apollo.
+	"""
+	explicit = os.getenv("DAGSTER_APOLLO_CACHE_DIR")
+	if explicit:
+		root = Path(explicit)
+	elif os.getenv("DAGSTER_HOME"):
+		root = Path(os.environ["DAGSTER_HOME"]) / ".apollo_cache"
+	else:
+		root = Path.home() / ".cache" / "dagster_apollo"
+	root.mkdir(parents=True, exist_ok=True)
+	return root
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+	"""Exclusive inter-process lock (POSIX flock); a no-op where fcntl is unavailable."""
+	path.parent.mkdir(parents=True, exist_ok=True)
+	with open(path, "a+") as fh:
+		try:
+			import fcntl
+		except ImportError:  # pragma: no cover - non-POSIX
+			yield
+			return
+		fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+		try:
+			yield
+		finally:
+			fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def write_text_if_changed(path: Path, text: str, mode: int = 0o644) -> bool:
+	"""
+	Atomically write text to path unless the file already holds exactly that text.
+	Returns True when the file was (re)written.
+	"""
+	try:
+		if path.read_text(encoding="utf-8") == text:
+			return False
+	except (FileNotFoundError, UnicodeDecodeError):
+		pass
+	path.parent.mkdir(parents=True, exist_ok=True)
+	fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+	try:
+		with os.fdopen(fd, "w", encoding="utf-8") as f:
+			f.write(text)
+		os.chmod(tmp, mode)
+		os.replace(tmp, path)
+	except BaseException:
+		with contextlib.suppress(FileNotFoundError):
+			os.unlink(tmp)
+		raise
+	return True
+
+
+def _resource_paths(project_dir: Path) -> List[str]:
+	try:
+		import yaml
+		cfg = yaml.safe_load((project_dir / "dbt_project.yml").read_text()) or {}
+	except Exception:
+		return list(DEFAULT_RESOURCE_PATHS)
+	paths: List[str] = []
+	for key, default in (
+		("model-paths", ["models"]),
+		("macro-paths", ["macros"]),
+		("seed-paths", ["seeds"]),
+		("snapshot-paths", ["snapshots"]),
+		("test-paths", ["tests"]),
+		("analysis-paths", ["analyses"]),
+	):
+		paths.extend(cfg.get(key) or default)
+	return paths
+
+
+def project_fingerprint(project_dir: Path, extra: Optional[Dict[str, Any]] = None) -> str:
+	"""
+	Hash of every file that affects `dbt parse` output (project config, packages, models,
+	macros, seeds, tests...) plus `extra` (e.g. target, dbt version).
+	"""
+	h = hashlib.sha256()
+	files: List[Path] = [project_dir / name for name in PROJECT_ROOT_FILES]
+	for rel in _resource_paths(project_dir):
+		base = project_dir / rel
+		if base.is_dir():
+			files.extend(p for p in base.rglob("*") if p.is_file())
+	for path in sorted(set(files)):
+		if not path.is_file():
+			continue
+		h.update(str(path.relative_to(project_dir)).encode("utf-8"))
+		h.update(b"\0")
+		h.update(path.read_bytes())
+		h.update(b"\0")
+	h.update(json.dumps(extra or {}, sort_keys=True).encode("utf-8"))
+	return h.hexdigest()[:16]
+
+
+def packages_fingerprint(project_dir: Path) -> str:
+	h = hashlib.sha256()
+	for name in ("packages.yml", "package-lock.yml", "dependencies.yml"):
+		path = project_dir / name
+		if path.is_file():
+			h.update(name.encode("utf-8") + b"\0" + path.read_bytes())
+	return h.hexdigest()[:16]
+
+
+def _dbt_version() -> str:
+	try:
+		from importlib.metadata import version
+		return version("dbt-core")
+	except Exception:
+		return "unknown"
+
+
+class ManifestCache:
+	"""
+	Content-addressed cache of dbt parse artifacts (manifest.json + partial_parse.msgpack).
+
+	Entries live under <cache_root>/manifests/<project>/<fingerprint>/ and are shared by every
+	process that loads the code location, so restarts skip `dbt deps`/`dbt parse` when the project
+	is unchanged. A new parse is seeded with the project's newest partial_parse.msgpack to keep it
+	fast. Each project has its own lock, so several tenants can parse concurrently.
+	"""
+
+	def __init__(self, project_dir: Path, root: Optional[Path] = None, keep: int = MAX_CACHED_MANIFESTS):
+		self.project_dir = Path(project_dir)
+		self.root = (root or cache_root()) / "manifests" / self.project_dir.name
+		self.keep = keep
+		self.last_status: Optional[str] = None  # "hit" | "miss" after ensure_manifest()
+
+	def key(self) -> str:
+		return project_fingerprint(
+			self.project_dir,
+			extra={
+				"dbt_version": _dbt_version(),
+				"profile": os.getenv("DBT_PROFILE_NAME", "apollo-snowflake"),
+				"target": os.getenv("DBT_TARGET", "dev"),
+				# rendered into model configs (snowflake_warehouse) at parse time
+				"warehouse_routes": os.getenv("DBT_WAREHOUSE_ROUTES", ""),
+				"env": {name: os.getenv(name) for name in MANIFEST_ENV},
+			},
+		)
+
+	def entry_dir(self, key: str) -> Path:
+		return self.root / key
+
+	def _latest_partial_parse(self) -> Optional[Path]:
+		candidates = [p for p in self.root.glob("*/partial_parse.msgpack") if p.is_file()]
+		return max(candidates, key=lambda p: p.stat().st_mtime) if candidates else None
+
+	def _prune(self) -> None:
+		entries = sorted(
+			(p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")),
+			key=lambda p: p.stat().st_mtime,
+			reverse=True,
+		)
+		for stale in entries[self.keep:]:
+			shutil.rmtree(stale, ignore_errors=True)
+
+	def _ensure_packages(self, dbt_resource: Any) -> None:
+		"""Run `dbt deps` only when dbt_packages is missing or packages.yml/lock changed."""
+		marker = self.project_dir / "dbt_packages" / ".apollo_packages_hash"
+		wanted = packages_fingerprint(self.project_dir)
+		try:
+			if marker.read_text().strip() == wanted:
+				return
+		except FileNotFoundError:
+			pass
+		dbt_resource.cli(["deps"]).wait()
+		write_text_if_changed(marker, wanted + "\n")
+
+	def ensure_manifest(self, dbt_resource: Any) -> Path:
+		"""
+		Return the path of a manifest.json matching the current project contents, parsing
+		only on a cache miss. Safe to call concurrently from several processes.
+		"""
+		key = self.key()
+		entry = self.entry_dir(key)
+		manifest = entry / "manifest.json"
+		if manifest.is_file():
+			self.last_status = "hit"
+			self._sync_partial_parse(entry)
+			return manifest
+
+		with file_lock(self.root / ".lock"):
+			if manifest.is_file():  # another process parsed while we waited
+				self.last_status = "hit"
+				self._sync_partial_parse(entry)
+				return manifest
+
+			self.last_status = "miss"
+			started = time.perf_counter()
+			self._ensure_packages(dbt_resource)
+			staging = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.root))
+			try:
+				seed = self._latest_partial_parse()
+				if seed is not None:
+					shutil.copy2(seed, staging / "partial_parse.msgpack")
+				dbt_resource.cli(["parse"], target_path=staging).wait()
+				if not (staging / "manifest.json").is_file():
+					raise RuntimeError(f"dbt parse did not produce a manifest in {staging}")
+				if entry.exists():  # leftover from an interrupted run
+					shutil.rmtree(entry)
+				os.replace(staging, entry)
+			except BaseException:
+				shutil.rmtree(staging, ignore_errors=True)
+				raise
+			logger.info("Parsed dbt project into manifest cache %s in %.2fs", key, time.perf_counter() - started)
+			self._prune()
+			self._sync_partial_parse(entry)
+			return manifest
+
+	def _sync_partial_parse(self, entry: Path) -> None:
+		"""
+		Copy the entry's partial_parse.msgpack into the project's target/ so run-time dbt
+		invocations (which start from target/) also parse partially.
+		"""
+		src = entry / "partial_parse.msgpack"
+		if not src.is_file():
+			return
+		dst = self.project_dir / "target" / "partial_parse.msgpack"
+		try:
+			if dst.is_file() and dst.stat().st_size == src.stat().st_size and dst.stat().st_mtime >= src.stat().st_mtime:
+				return
+			dst.parent.mkdir(parents=True, exist_ok=True)
+			shutil.copy2(src, dst)
+		except OSError as e:
+			logger.debug("Could not sync partial_parse.msgpack: %s", e)
@@ -0,0 +1,219 @@
+import hashlib
+import importlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Protocol, Sequence, Tuple
+
+from dagster import DefaultSensorStatus, RunRequest, SensorEvaluationContext, SkipReason, sensor
+
+from .tenants import Tenant
+
+# Forecast marts that can refresh single market/variant size pack slices (macros/refresh_scope.sql)
+SCOPED_MODELS = (
+	"depletions_forecast_init_draft",
+	"depletions_forecast_primary_forecast_method",
+	"distributor_allocation_by_market_size_pack",
+)
+# "snowflake" (default) or "module:factory" (called with the Tenant)
+READER_ENV = "DBT_CHANGE_READER"
+DEFAULT_INTERVAL_SECONDS = 300
+# Rows are stamped with CURRENT_TIMESTAMP() when the statement runs but become visible at commit;
+# a tick only reads changes stamped at least this long ago, so open transactions have committed
+DEFAULT_MARGIN_SECONDS = 300
+# More keys than this in one tick refresh every market/variant size pack of the change's kind
+MAX_SCOPED_KEYS = 500
+
+
+@dataclass(frozen=True)
+class Change:
+	"""One edited slice. `market_code=None` means every market (product tag/planning changes)."""
+	market_code: Optional[str]
+	variant_size_pack_id: str
+	changed_at: str  # ISO timestamp, comparable as text within one reader
+
+
+@dataclass(frozen=True)
+class RefreshScope:
+	markets: FrozenSet[str]  # empty: all markets
+	variant_size_pack_ids: FrozenSet[str]  # empty: all variant size packs
+
+	def dbt_vars(self) -> Dict[str, List[str]]:
+		return {
+			"refresh_markets": sorted(self.markets),
+			"refresh_variant_size_pack_ids": sorted(self.variant_size_pack_ids),
+		}
+
+	def describe(self) -> str:
+		markets = f"{len(self.markets)} market(s)" if self.markets else "all markets"
+		vsps = f"{len(self.variant_size_pack_ids)} variant size pack(s)" if self.variant_size_pack_ids else "all variant size packs"
+		return f"{markets} x {vsps}"
+
+
+class ChangeReader(Protocol):
+	"""Reads edited market/variant size pack slices from the app's editing and tagging tables."""
+
+	def settled_mark(self, margin_s: int) -> str:
+		"""The tables' current time minus `margin_s`: changes stamped up to it have committed."""
+		...
+
+	def read_changes(self, since: str, until: str) -> List[Change]:
+		"""Changes stamped after `since`, up to and including `until`."""
+		...
+
+
+class SnowflakeChangeReader:
+	"""
+	Manual forecast edits (MANUAL_INPUT_DEPLETIONS_FORECAST.UPDATED_AT and the append-only
+	_VERSIONS.CREATED_AT, which also covers reverts) give market/variant size pack pairs; tag
+	planning changes (APOLLO_VARIANT_SIZE_PACK_TAG.UPDATED_AT) give variant size packs in every
+	market. `connect` defaults to the SNOWFLAKE_* variables of the dbt profile. Timestamps are
+	compared as TIMESTAMP_NTZ in the session time zone, as the procedures stamp them.
+	"""
+
+	CHANGES_SQL = """
+		select market_code, variant_size_pack_id, to_varchar(max(changed_at), 'YYYY-MM-DD"T"HH24:MI:SS.FF6')
+		from (
+			select market_code, variant_size_pack_id, updated_at as changed_at
+			from FORECAST.MANUAL_INPUT_DEPLETIONS_FORECAST
+			where updated_at > %(since)s::timestamp_ntz and updated_at <= %(until)s::timestamp_ntz
+			union all
+			select market_code, variant_size_pack_id, created_at
+			from FORECAST.MANUAL_INPUT_DEPLETIONS_FORECAST_VERSIONS
+			where created_at > %(since)s::timestamp_ntz and created_at <= %(until)s::timestamp_ntz
+			union all
+			select null, variant_size_pack_id, updated_at
+			from MASTER_DATA.APOLLO_VARIANT_SIZE_PACK_TAG
+			where updated_at > %(since)s::timestamp_ntz and updated_at <= %(until)s::timestamp_ntz
+		)
+		where variant_size_pack_id is not null
+		group by 1, 2
+	"""
+	SETTLED_MARK_SQL = """
+		select to_varchar(dateadd(second, -%(margin_s)s, current_timestamp()::timestamp_ntz), 'YYYY-MM-DD"T"HH24:MI:SS.FF6')
+	"""
+
+	def __init__(self, connect: Optional[Callable[[], Any]] = None):
+		if connect is None:
+			from .exports import snowflake_connect_from_env
+			connect = snowflake_connect_from_env
+		self._connect = connect
+
+	def _query(self, sql: str, params: Dict[str, Any]) -> List[Sequence[Any]]:
+		conn = self._connect()
+		try:
+			cur = conn.cursor()
+			cur.execute(sql, params)
+			rows = cur.fetchall()
+			cur.close()
+			return rows
+		finally:
+			conn.close()
+
+	def settled_mark(self, margin_s: int) -> str:
+		return self._query(self.SETTLED_MARK_SQL, {"margin_s": margin_s})[0][0]
+
+	def read_changes(self, since: str, until: str) -> List[Change]:
+		return [Change(m, v, at) for m, v, at in self._query(self.CHANGES_SQL, {"since": since, "until": until})]
+
+
+@dataclass
+class FakeChangeReader:
+	"""
+	In-memory reader for tests and local runs: `changes` play the role of the editing/tagging
+	tables and `now` is the settled mark it reports (default: the latest change).
+	"""
+	changes: List[Change] = field(default_factory=list)
+	reads: List[Tuple[str, str]] = field(default_factory=list)
+	now: Optional[str] = None
+
+	def add(self, market_code: Optional[str], variant_size_pack_id: str, changed_at: str) -> None:
+		self.changes.append(Change(market_code, variant_size_pack_id, changed_at))
+
+	def settled_mark(self, margin_s: int) -> str:
+		return self.now or max((c.changed_at for c in self.changes), default="1970-01-01T00:00:00.000000")
+
+	def read_changes(self, since: str, until: str) -> List[Change]:
+		self.reads.append((since, until))
+		return [c for c in self.changes if since < c.changed_at <= until]
+
+
+def load_change_reader(tenant: Tenant) -> ChangeReader:
+	spec = os.getenv(READER_ENV, "snowflake")
+	if spec == "snowflake":
+		return SnowflakeChangeReader()
+	module_name, sep, attr = spec.partition(":")
+	if not sep:
+		raise RuntimeError(f"Invalid {READER_ENV} '{spec}'. Use 'snowflake' or 'module:factory'.")
+	return getattr(importlib.import_module(module_name), attr)(tenant)
+
+
+def refresh_scopes(changes: Sequence[Change], max_keys: int = MAX_SCOPED_KEYS) -> List[RefreshScope]:
+	"""
+	At most two scopes: edited markets x their variant size packs, and tag changes (variant size
+	packs in every market). The first one may refresh a few extra pairs (it is a cross product);
+	that is far cheaper than a full rebuild. Oversized key lists widen to "all".
+	"""
+
+	def capped(values: set) -> FrozenSet[str]:
+		return frozenset(values) if len(values) <= max_keys else frozenset()
+
+	scopes: List[RefreshScope] = []
+	edits = [c for c in changes if c.market_code is not None]
+	if edits:
+		scopes.append(RefreshScope(
+			capped({c.market_code for c in edits}), capped({c.variant_size_pack_id for c in edits})
+		))
+	tagged = {c.variant_size_pack_id for c in changes if c.market_code is None}
+	if tagged:
+		scopes.append(RefreshScope(frozenset(), capped(tagged)))
+	return scopes
+
+
+def build_change_capture_sensor(tenant: Tenant, dbt_build_job: Any, reader: Optional[ChangeReader] = None) -> Any:
+	"""
+	Sensor that polls the editing and tagging tables every DBT_CHANGE_CAPTURE_INTERVAL_SECONDS and
+	runs the tenant's dbt_build_job over SCOPED_MODELS with only the edited markets and variant
+	size packs as vars, so the marts replace just those slices. Each tick reads the changes up to
+	the tables' clock minus DBT_CHANGE_CAPTURE_MARGIN_SECONDS and moves the cursor to that bound,
+	so a change stamped before a slow transaction committed is still read; the first tick only
+	records the bound.
+	"""
+	margin_s = int(os.getenv("DBT_CHANGE_CAPTURE_MARGIN_SECONDS", DEFAULT_MARGIN_SECONDS))
+	op_name = tenant.scoped("run_dbt_build")
+
+	@sensor(
+		name=tenant.scoped("forecast_change_capture_sensor"),
+		job=dbt_build_job,
+		minimum_interval_seconds=int(os.getenv("DBT_CHANGE_CAPTURE_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS)),
+		default_status=DefaultSensorStatus.STOPPED,
+	)
+	def forecast_change_capture_sensor(context: SensorEvaluationContext):
+		changes_from = reader or load_change_reader(tenant)
+		cursor = changes_from.settled_mark(margin_s)
+		if not context.cursor:
+			context.update_cursor(cursor)
+			return SkipReason(f"Recorded baseline change timestamp {cursor}")
+		if cursor <= context.cursor:
+			return SkipReason(f"No settled changes after {context.cursor} yet")
+
+		since = context.cursor
+		changes = changes_from.read_changes(since, cursor)
+		context.update_cursor(cursor)
+		if not changes:
+			return SkipReason(f"No edits or tag changes between {since} and {cursor}")
+		requests = []
+		for scope in refresh_scopes(changes):
+			dbt_vars = scope.dbt_vars()
+			run_key = hashlib.sha256(
+				json.dumps([cursor, dbt_vars], sort_keys=True).encode("utf-8")
+			).hexdigest()[:16]
+			context.log.info(f"Refreshing {', '.join(SCOPED_MODELS)} for {scope.describe()}")
+			requests.append(RunRequest(
+				run_key=run_key,
+				run_config={"ops": {op_name: {"config": {"select": list(SCOPED_MODELS), "vars": dbt_vars}}}},
+				tags={**tenant.run_tags, "apollo/trigger": "change_capture"},
+			))
+		return requests
+
+	return forecast_change_capture_sensor
@@ -1,18 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
 from pathlib import Path
+import contextlib
+import json
+import logging
 import os
-from typing import Any, Dict, List, Optional
-from dagster import AssetExecutionContext, Definitions, job, op, Config, ScheduleDefinition, define_asset_job
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dagster import AssetExecutionContext, Definitions, Nothing, OpExecutionContext, Out, job, op, Config, ScheduleDefinition, define_asset_job
 from dagster_dbt import (
 	DbtCliResource,
 	DbtProject,
 	dbt_assets,
-	build_schedule_from_dbt_selection,
 	build_dbt_asset_selection,
 )
 
+from .artifacts import PROD_TARGET, effective_target, load_artifact_store, modified_only_selection, record_prod_artifacts, state_key
+from .cache import ManifestCache
+from .change_capture import build_change_capture_sensor
+from .export_assets import build_rad_sales_export, export_enabled
+from .freshness import build_freshness_defs
+from .run_history import QUERY_LOG_ARGS, record_invocation_timings
+from .resume import ResumePlan, plan_resume, record_resume_state, resume_key, resume_selection, savings_report
+from .partitions import build_open_months_schedule, build_partitioned_fact_assets, partitioned_models_in_manifest
 from .profiles import ensure_profiles
+from .subgraphs import build_subgraph_assets, subgraphs_enabled
+from .tenants import Tenant, TenantDbtTranslator, discover_tenants
+from .threads import ThreadPlanner
 
-DBT_PROJECT_DIR = Path(__file__).resolve().parents[1] / "tenants" / "dbt_williamgrant"
+logger = logging.getLogger(__name__)
+
+# Tenants whose manifests are resolved (cache lookup or parse) concurrently at load time
+DEFAULT_TENANT_LOAD_WORKERS = 4
+
+# (phase, seconds) for the most recent build_defs() call
+STARTUP_TIMINGS: List[Tuple[str, float]] = []
+
+
+@contextlib.contextmanager
+def _timed_phase(name: str) -> Iterator[None]:
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		STARTUP_TIMINGS.append((name, time.perf_counter() - started))
+
+
+def log_startup_report() -> None:
+	total = sum(seconds for _, seconds in STARTUP_TIMINGS)
+	lines = [f"  {name:<28} {seconds * 1000:9.1f} ms" for name, seconds in STARTUP_TIMINGS]
+	logger.info("Definitions loaded in %.1f ms:\n%s", total * 1000, "\n".join(lines))
 
 
 class DbtBuildConfig(Config):
@@ -23,12 +60,27 @@ class DbtBuildConfig(Config):
 	state: Optional[str] = None
 	defer_: bool = False  # "defer" is reserved in Python
 	target: Optional[str] = None
+	# Build only state:modified+ against the last good prod artifacts, deferring unchanged parents
+	modified_only: bool = False
+	# Rebuild only the nodes that errored, failed or were skipped in the target's last failed build
+	resume: bool = False
+	# Directory with a failed invocation's run_results.json/manifest.json (implies resume)
+	resume_from: Optional[str] = None
 
 
-def _build_dbt_build_args(cfg: DbtBuildConfig) -> List[str]:
+def _build_dbt_build_args(cfg: DbtBuildConfig, state_dir: Optional[str] = None, resume_dir: Optional[str] = None) -> List[str]:
+	"""
+	Translate config into `dbt build` args. `state_dir` (resolved prod artifacts) turns on
+	modified-only mode: select state:modified+ and defer unchanged parents to prod.
+	`resume_dir` (a failed invocation's artifacts) selects its errored and skipped nodes instead.
+	"""
 	args: List[str] = ["build"]
-	if cfg.select:
-		for s in cfg.select:
+	if resume_dir:
+		select = resume_selection(cfg.select)
+	else:
+		select = modified_only_selection(cfg.select) if state_dir else cfg.select
+	if select:
+		for s in select:
 			args.extend(["--select", s])
 	if cfg.exclude:
 		for x in cfg.exclude:
@@ -37,77 +89,281 @@ def _build_dbt_build_args(cfg: DbtBuildConfig) -> List[str]:
 		args.append("--full-refresh")
 	if cfg.vars:
 		# dbt expects a JSON/YAML string
-		import json
 		args.extend(["--vars", json.dumps(cfg.vars)])
-	if cfg.state:
-		args.extend(["--state", cfg.state])
-	if cfg.defer_:
+	state = resume_dir or cfg.state or state_dir
+	if state:
+		args.extend(["--state", state])
+	if cfg.defer_ or state_dir:
 		args.append("--defer")
 	if cfg.target:
 		args.extend(["--target", cfg.target])
 	return args
 
 
-@op
-def run_dbt_build(config: DbtBuildConfig, dbt: DbtCliResource):
-	args = _build_dbt_build_args(config)
-	# Use wait() to avoid asset-event mapping when no manifest is provided
-	dbt.cli(args).wait()
+def _resolve_modified_state(context: OpExecutionContext, config: DbtBuildConfig, tenant: Tenant) -> Optional[str]:
+	if not config.modified_only:
+		return None
+	if config.state:
+		return config.state
+	state_dir = load_artifact_store().fetch_latest(state_key(PROD_TARGET, tenant.state_namespace))
+	if state_dir is None:
+		context.log.warning("modified_only requested but no prod state recorded yet; running a full build")
+		return None
+	context.log.info(f"Comparing against prod state {state_dir}")
+	return str(state_dir)
 
 
-@job
-def dbt_build_job():
-	run_dbt_build()  # resource bound via Definitions
+def _resolve_resume_plan(config: DbtBuildConfig, tenant: Tenant) -> Optional[ResumePlan]:
+	if config.resume_from:
+		return plan_resume(Path(config.resume_from))
+	if not config.resume:
+		return None
+	state_dir = load_artifact_store().fetch_latest(resume_key(effective_target(config.target), tenant.state_namespace))
+	return plan_resume(state_dir) if state_dir is not None else None
 
 
-def build_defs() -> Definitions:
-	# Ensure DBT_PROFILES_DIR is set and profiles.yml exists
-	ensure_profiles()
+def _asset_keys_by_unique_id(manifest: Dict[str, Any], translator: TenantDbtTranslator) -> Dict[str, Any]:
+	return {
+		uid: translator.get_asset_key(node)
+		for uid, node in manifest.get("nodes", {}).items()
+		if node.get("resource_type") in ("model", "seed", "snapshot")
+	}
+
+
+def build_tenant_op_jobs(tenant: Tenant, manifest_path: Path, planner: Optional[ThreadPlanner] = None) -> List[Any]:
+	"""
+	Configurable `dbt build` op jobs for one tenant, bound to the tenant's dbt resource.
+	`planner` sizes --threads for targets without a fixed thread count. Nodes are mapped to the
+	tenant's assets through `manifest_path`, so the op streams their materializations.
+	"""
+	translator = TenantDbtTranslator(tenant)
+
+	@op(name=tenant.scoped("run_dbt_build"), required_resource_keys={tenant.resource_key}, out=Out(Nothing))
+	def run_dbt_build(context: OpExecutionContext, config: DbtBuildConfig):
+		dbt: DbtCliResource = getattr(context.resources, tenant.resource_key)
+		resuming = bool(config.resume or config.resume_from)
+		plan = _resolve_resume_plan(config, tenant) if resuming else None
+		if resuming:
+			if plan is None:
+				context.log.warning(f"resume requested but no failed build recorded for target {effective_target(config.target)}; nothing to do")
+				return
+			context.log.info(plan.describe())
+			if not plan.rerun:
+				context.log.info("Nothing left to rebuild")
+				return
+			if config.modified_only:
+				context.log.warning("modified_only is ignored when resuming")
+			args = _build_dbt_build_args(config, resume_dir=str(plan.state_dir))
+		else:
+			args = _build_dbt_build_args(config, state_dir=_resolve_modified_state(context, config, tenant))
+		if planner:
+			args.extend(planner.cli_args(effective_target(config.target)))
+		args.extend(QUERY_LOG_ARGS)
+		context.log.info("dbt " + " ".join(args))
+		invocation = dbt.cli(args, manifest=manifest_path, dagster_dbt_translator=translator, context=context, raise_on_error=False)
+		# Materializations (models, seeds, snapshots) and test observations as each node finishes
+		yield from invocation.stream()
+		succeeded = invocation.is_successful()
+		# Per-model observations with timings and dbt status, failed nodes included
+		yield from record_invocation_timings(
+			context,
+			invocation.target_path,
+			target=config.target,
+			asset_keys=_asset_keys_by_unique_id(invocation.manifest, translator),
+		)
+		if plan is not None:
+			context.log.info(savings_report(plan, invocation.target_path))
+		# A failure is what the next resume continues from; a resume's own result replaces it
+		if plan is not None or not succeeded:
+			record_resume_state(
+				invocation.target_path,
+				context.run_id,
+				succeeded,
+				target=config.target,
+				namespace=tenant.state_namespace,
+				resumed=plan,
+			)
+		if not succeeded:
+			raise invocation.get_error()
+		# Partial builds are not a complete prod state; only record full (unselected) runs
+		if not (config.select or config.exclude or config.modified_only or resuming):
+			record_prod_artifacts(
+				invocation.target_path,
+				context.run_id,
+				target=effective_target(config.target),
+				namespace=tenant.state_namespace,
+			)
+
+	@job(name=tenant.scoped("dbt_build_job"), tags=tenant.run_tags)
+	def dbt_build_job():
+		run_dbt_build()  # resource bound via Definitions
+
+	@job(
+		name=tenant.scoped("dbt_build_modified_job"),
+		tags=tenant.run_tags,
+		config={"ops": {run_dbt_build.name: {"config": {"modified_only": True}}}},
+	)
+	def dbt_build_modified_job():
+		run_dbt_build()
+
+	@job(
+		name=tenant.scoped("dbt_build_resume_job"),
+		tags=tenant.run_tags,
+		config={"ops": {run_dbt_build.name: {"config": {"resume": True}}}},
+	)
+	def dbt_build_resume_job():
+		run_dbt_build()
+
+	return [dbt_build_job, dbt_build_modified_job, dbt_build_resume_job]
+
+
+def _ensure_manifests(tenants: List[Tenant], resources: Dict[str, DbtCliResource]) -> Tuple[Dict[str, Path], List[str]]:
+	"""
+	Resolve every tenant's manifest through its ManifestCache. Lookups (project hashing) and
+	cache-miss parses run concurrently, so load time grows with the slowest tenant, not the sum.
+	"""
 
-	my_project = DbtProject(project_dir=DBT_PROJECT_DIR)
+	def resolve(tenant: Tenant) -> Tuple[Path, str]:
+		cache = ManifestCache(tenant.project_dir)
+		manifest_path = cache.ensure_manifest(resources[tenant.resource_key])
+		return manifest_path, f"{tenant.key}:{cache.last_status}"
 
-	profiles_dir = os.environ.get("DBT_PROFILES_DIR")
-	dbt_resource = DbtCliResource(
-		project_dir=my_project,
-		profiles_dir=profiles_dir,
+	workers = int(os.getenv("DAGSTER_TENANT_LOAD_WORKERS", DEFAULT_TENANT_LOAD_WORKERS))
+	with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tenants)))) as pool:
+		resolved = list(pool.map(resolve, tenants))
+	manifests = {t.name: path for t, (path, _) in zip(tenants, resolved)}
+	return manifests, [status for _, status in resolved]
+
+
+def build_tenant_defs(tenant: Tenant, manifest_path: Path) -> Dict[str, List[Any]]:
+	"""Assets (one group per tenant), jobs, schedules and sensors for one tenant's dbt project."""
+	# Large facts are month-partitioned assets of their own (see partitions.py)
+	partitioned_models = partitioned_models_in_manifest(manifest_path)
+	planner = ThreadPlanner(manifest_path)
+	logger.info("dbt thread plan (%s):\n  %s", tenant.key, "\n  ".join(planner.describe()))
+	threads_args = planner.cli_args(effective_target())
+
+	@dbt_assets(
+		manifest=manifest_path,
+		exclude=" ".join(partitioned_models) or None,
+		name=tenant.scoped("dbt_models"),
+		dagster_dbt_translator=TenantDbtTranslator(tenant),
+		required_resource_keys={tenant.resource_key},
 	)
+	def dbt_models(context: AssetExecutionContext):
+		dbt: DbtCliResource = getattr(context.resources, tenant.resource_key)
+		invocation = dbt.cli(["build", *threads_args, *QUERY_LOG_ARGS], context=context)
+		yield from invocation.stream()
+		yield from record_invocation_timings(context, invocation.target_path, context.assets_def)
+		if not context.is_subset:
+			record_prod_artifacts(invocation.target_path, context.run_id, namespace=tenant.state_namespace)
+
+	# Opt-in: one multi-asset per subgraph, run as parallel Dagster steps (see subgraphs.py).
+	# Prod artifacts for modified-only builds are recorded by full dbt_build_job runs only.
+	model_assets = build_subgraph_assets(manifest_path, tenant, partitioned_models, planner) if subgraphs_enabled() else [dbt_models]
+	tenant_defs = _build_schedules_and_jobs(model_assets, tenant, manifest_path, planner)
+	tenant_defs["assets"] = list(model_assets)
+	# Opt-in alternative to the nightly full builds: build only what fresher sources feed
+	freshness_defs = build_freshness_defs(tenant, model_assets, manifest_path)
+	tenant_defs["jobs"].extend(freshness_defs["jobs"])
+	tenant_defs["schedules"].extend(freshness_defs["schedules"])
+	tenant_defs["sensors"] = list(freshness_defs["sensors"])
+	# Opt-in: refresh only the forecast mart slices that planners edited (see change_capture.py)
+	dbt_build_job = next(j for j in tenant_defs["jobs"] if j.name == tenant.scoped("dbt_build_job"))
+	tenant_defs["sensors"].append(build_change_capture_sensor(tenant, dbt_build_job))
+	if partitioned_models:
+		partitioned_facts = build_partitioned_fact_assets(manifest_path, partitioned_models, tenant, planner)
+		facts_job, facts_schedule = build_open_months_schedule(partitioned_facts, tenant)
+		tenant_defs["assets"].append(partitioned_facts)
+		tenant_defs["jobs"].append(facts_job)
+		tenant_defs["schedules"].append(facts_schedule)
+	# Month-partitioned rad_sales_fact export in place of the on-run-end COPY (opt-in)
+	export = build_rad_sales_export(manifest_path, tenant) if export_enabled() else None
+	if export:
+		export_asset, export_job = export
+		tenant_defs["assets"].append(export_asset)
+		tenant_defs["jobs"].append(export_job)
+	return tenant_defs
+
+
+def build_defs() -> Definitions:
+	STARTUP_TIMINGS.clear()
+
+	with _timed_phase("discover_tenants"):
+		tenants = discover_tenants()
+		if not tenants:
+			raise RuntimeError("No dbt projects found under tenants/ (or none match DAGSTER_TENANTS)")
+
+	# Ensure DBT_PROFILES_DIR is set and profiles.yml exists (rewritten only on change)
+	with _timed_phase("ensure_profiles"):
+		ensure_profiles(t.profile for t in tenants if t.profile)
 
-	# Ensure manifest exists in dev: run deps/parse only if missing
-	if not my_project.manifest_path.exists():
-		for cmd in ("deps", "parse"):
-			for evt in dbt_resource.cli([cmd]).stream():
-				pass
+	with _timed_phase("dbt_project"):
+		profiles_dir = os.environ.get("DBT_PROFILES_DIR")
+		resources: Dict[str, DbtCliResource] = {
+			t.resource_key: DbtCliResource(project_dir=DbtProject(project_dir=t.project_dir), profiles_dir=profiles_dir)
+			for t in tenants
+		}
 
-	@dbt_assets(manifest=my_project.manifest_path)
-	def dbt_models(context: AssetExecutionContext, dbt: DbtCliResource):
-		yield from dbt.cli(["build"], context=context).stream()
+	# Manifests keyed by project contents; deps/parse only run on a cache miss
+	with _timed_phase("manifests"):
+		manifests, statuses = _ensure_manifests(tenants, resources)
+	STARTUP_TIMINGS[-1] = (f"manifests ({', '.join(statuses)})", STARTUP_TIMINGS[-1][1])
 
+	defs_kwargs: Dict[str, List[Any]] = {"assets": [], "jobs": [], "schedules": [], "sensors": []}
+	for tenant in tenants:
+		with _timed_phase(f"tenant_defs ({tenant.key})"):
+			for kind, items in build_tenant_defs(tenant, manifests[tenant.name]).items():
+				defs_kwargs[kind].extend(items)
+
+	with _timed_phase("definitions"):
+		defs = Definitions(resources=resources, **defs_kwargs)
+	log_startup_report()
+	return defs
+
+
+def _dbt_selection(model_assets: List[Any], **kwargs: Any) -> Any:
+	# build_dbt_asset_selection takes exactly one assets def; subgraph mode has one per subgraph
+	return reduce(lambda a, b: a | b, (build_dbt_asset_selection([d], **kwargs) for d in model_assets))
+
+
+def _build_schedules_and_jobs(
+	model_assets: List[Any],
+	tenant: Tenant,
+	manifest_path: Path,
+	planner: Optional[ThreadPlanner] = None,
+) -> Dict[str, List[Any]]:
 	# Daily schedule (UTC 02:00) for full asset graph build via manifest
-	daily_all_models = build_schedule_from_dbt_selection(
-		[dbt_models],
-		"materialize_dbt_models_prod",
-		"0 2 * * *",
-		dbt_select="fqn:*",
+	all_models_job = define_asset_job(
+		name=tenant.scoped("materialize_dbt_models_prod"),
+		selection=_dbt_selection(model_assets, dbt_select="fqn:*"),
+		tags=tenant.run_tags,
+	)
+	daily_all_models = ScheduleDefinition(
+		name=f"{all_models_job.name}_schedule",
+		cron_schedule="0 2 * * *",
+		job=all_models_job,
 	)
 
 	# Asset-based job and schedule for "dbt build --exclude seeds/"
-	sel_excluding_seeds = build_dbt_asset_selection(
-		manifest=my_project.manifest_path,
-		dbt_select="fqn:* -resource_type:seed",
+	# (partitioned facts are not part of the model assets and run on their own schedule)
+	sel_excluding_seeds = _dbt_selection(
+		model_assets,
+		dbt_select="fqn:*",
+		dbt_exclude="resource_type:seed",
 	)
 	dbt_build_excluding_seeds_asset_job = define_asset_job(
-		name="dbt_build_excluding_seeds_asset_job",
+		name=tenant.scoped("dbt_build_excluding_seeds_asset_job"),
 		selection=sel_excluding_seeds,
+		tags=tenant.run_tags,
 	)
 	daily_build_excluding_seeds = ScheduleDefinition(
-		name="daily_dbt_build_excluding_seeds",
+		name=tenant.scoped("daily_dbt_build_excluding_seeds"),
 		cron_schedule="0 3 * * *",
 		job=dbt_build_excluding_seeds_asset_job,
 	)
 
-	return Definitions(
-		assets=[dbt_models],
-		jobs=[dbt_build_job, dbt_build_excluding_seeds_asset_job],
-		schedules=[daily_all_models, daily_build_excluding_seeds],
-		resources={"dbt": dbt_resource},
-	)
+	return {
+		"jobs": [*build_tenant_op_jobs(tenant, manifest_path, planner), dbt_build_excluding_seeds_asset_job],
+		"schedules": [daily_all_models, daily_build_excluding_seeds],
+	}
@@ -0,0 +1,110 @@
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from dagster import (
+	AssetExecutionContext,
+	AssetKey,
+	AssetSelection,
+	AutomationCondition,
+	Config,
+	MaterializeResult,
+	MetadataValue,
+	asset,
+	define_asset_job,
+)
+
+from .cache import cache_root
+from .exports import DEFAULT_WORKERS, run_export, load_export_engine
+from .profiles import local_duckdb_path
+from .tenants import Tenant, TenantDbtTranslator
+
+# "dagster" replaces the on-run-end COPY (macros/on_run_end_export_rad_sales_fact.sql skips
+# itself) with the rad_sales_fact_export asset; anything else keeps the macro
+EXPORT_MODE_ENV = "RAD_SALES_EXPORT_MODE"
+EXPORT_MODE_DAGSTER = "dagster"
+EXPORT_MODEL = "rad_sales_fact"
+
+
+def export_enabled() -> bool:
+	return os.getenv(EXPORT_MODE_ENV, "on_run_end") == EXPORT_MODE_DAGSTER
+
+
+class RadSalesExportConfig(Config):
+	start_month: Optional[str] = None  # YYYY-MM; default RAD_EXPORT_START_MONTH, else January
+	end_month: Optional[str] = None  # YYYY-MM; default current month
+	format: Optional[str] = None  # parquet | csv; default RAD_EXPORT_FORMAT, else parquet
+	force: bool = False  # re-export every month in the window
+
+
+def _model_node(manifest_path: Path) -> Optional[Dict[str, Any]]:
+	manifest = json.loads(Path(manifest_path).read_text())
+	for node in manifest.get("nodes", {}).values():
+		if node.get("resource_type") == "model" and node.get("name") == EXPORT_MODEL:
+			return node
+	return None
+
+
+def build_rad_sales_export(manifest_path: Path, tenant: Tenant) -> Optional[Tuple[Any, Any]]:
+	"""
+	Asset (and job) exporting rad_sales_fact month by month after it materializes, or None when
+	the tenant has no such model. Runs eagerly once the default automation sensor is enabled.
+	"""
+	node = _model_node(manifest_path)
+	if node is None:
+		return None
+	upstream = TenantDbtTranslator(tenant).get_asset_key(node)
+	relation = os.getenv("RAD_EXPORT_RELATION") or node.get("relation_name")
+	key = AssetKey("rad_sales_fact_export")
+	key = key if tenant.is_default else key.with_prefix(tenant.key)
+
+	@asset(
+		key=key,
+		deps=[upstream],
+		group_name=tenant.group_name,
+		automation_condition=AutomationCondition.eager(),
+		description="Month-partitioned Parquet/CSV export of rad_sales_fact with a checksum manifest",
+	)
+	def rad_sales_fact_export(context: AssetExecutionContext, config: RadSalesExportConfig) -> MaterializeResult:
+		today = date.today()
+		start = config.start_month or os.getenv("RAD_EXPORT_START_MONTH") or f"{today.year}-01"
+		end = config.end_month or today.strftime("%Y-%m")
+		fmt = config.format or os.getenv("RAD_EXPORT_FORMAT", "parquet")
+		engine = load_export_engine(
+			default_output_dir=cache_root() / "exports" / tenant.key,
+			duckdb_path=local_duckdb_path(),
+			namespace=tenant.state_namespace,
+		)
+		report = run_export(
+			engine,
+			relation,
+			start,
+			end,
+			fmt=fmt,
+			workers=int(os.getenv("RAD_EXPORT_WORKERS", DEFAULT_WORKERS)),
+			force=config.force,
+			log=context.log,
+		)
+		months = report.manifest["months"]
+		return MaterializeResult(
+			metadata={
+				"relation": relation,
+				"window": f"{start}..{end}",
+				"format": fmt,
+				"exported_months": MetadataValue.json(report.exported),
+				"unchanged_months": len(report.unchanged),
+				"removed_months": MetadataValue.json(report.removed),
+				"exported_files": report.exported_files,
+				"exported_rows": sum(months[m]["exported_rows"] for m in report.exported),
+				"manifest_months": len(months),
+			}
+		)
+
+	export_job = define_asset_job(
+		name=tenant.scoped("rad_sales_fact_export_job"),
+		selection=AssetSelection.assets(rad_sales_fact_export),
+		tags=tenant.run_tags,
+	)
+	return rad_sales_fact_export, export_job
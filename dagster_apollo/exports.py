@@ -0,0 +1,417 @@
+"""
+Month-partitioned export of rad_sales_fact (replaces the single-file on-run-end COPY).
+
+Each month is written as its own file set (Parquet or gzipped CSV) by a pool of workers. Only
+months whose fingerprint (row count + order-independent row hash) differs from the manifest are
+re-exported, and the manifest records rows, fingerprint and per-file checksums for every month.
+
+The engine is pluggable (RAD_EXPORT_ENGINE): `snowflake` unloads to an external stage,
+`duckdb` writes to a local directory from an embedded database (e.g. the `local` dbt target),
+and `module:factory` returns any object implementing ExportEngine.
+
+This module has no Dagster imports so it can run standalone against a local DuckDB file:
+	python dagster_apollo/exports.py --duckdb apollo_local.duckdb \
+		--relation main.rad_sales_daily_fact --output /tmp/slsda --start-month 2025-01
+"""
+
+import argparse
+import base64
+import hashlib
+import importlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_VERSION = 1
+FORMATS = ("parquet", "csv")
+DEFAULT_WORKERS = 4
+DEFAULT_FILE_PREFIX = "slsda"
+DEFAULT_STAGE = "APOLLO_WILLIAMGRANT.S3.STG_WILLIAMGRANT_EXPORT"
+DEFAULT_STAGE_PATH = "reconciliation/slsda"
+
+# Same reconciliation projection as macros/on_run_end_export_rad_sales_fact.sql, for one month.
+# Valid in Snowflake and DuckDB.
+EXPORT_SELECT = """
+SELECT
+	concat(year, '-', month) AS year_month,
+	month_date,
+	year,
+	market_name,
+	concat(left(distributor_id, 5), '-', right(distributor_id, 3)) AS customer_id,
+	sku_id AS partid,
+	sku_description AS part_desc,
+	sum(phys_quantity) AS phys_quantity,
+	sum(case_equivalent_quantity) AS case_equivalent_quantity
+FROM {relation}
+WHERE month_date >= '{start}' AND month_date < '{end}'
+GROUP BY ALL
+ORDER BY year_month, market_name, customer_id, partid
+"""
+
+
+@dataclass
+class ExportedFile:
+	path: str  # relative to the export root
+	bytes: int
+	checksum: str  # "<algo>:<hex>"
+
+
+@dataclass
+class MonthExport:
+	month: str  # YYYY-MM
+	rows: int  # fact rows in the month (fingerprint input)
+	fingerprint: str
+	exported_rows: int = 0  # rows written (after the reconciliation GROUP BY)
+	files: List[ExportedFile] = field(default_factory=list)
+	exported_at: Optional[str] = None
+
+
+class ExportEngine(Protocol):
+	"""Where and how months are read, written and the manifest stored."""
+
+	def fingerprints(self, relation: str, start_month: str, end_month: str) -> Dict[str, MonthExport]:
+		"""Per-month row count and fingerprint for months in [start_month, end_month]."""
+		...
+
+	def export_month(self, relation: str, month: str, fmt: str, prefix: str) -> MonthExport:
+		"""Replace the month's files and return what was written (rows and files)."""
+		...
+
+	def remove_month(self, month: str) -> None:
+		...
+
+	def read_manifest(self) -> Optional[Dict[str, Any]]:
+		...
+
+	def write_manifest(self, manifest: Dict[str, Any]) -> None:
+		...
+
+
+def month_bounds(month: str) -> tuple:
+	"""'YYYY-MM' -> ('YYYY-MM-01', first day of the next month)."""
+	d = date.fromisoformat(f"{month}-01")
+	nxt = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+	return d.isoformat(), nxt.isoformat()
+
+
+def month_dir(month: str) -> str:
+	return f"month={month}"
+
+
+def _file_name(prefix: str, month: str, fmt: str) -> str:
+	return f"{prefix}_{month}.{'parquet' if fmt == 'parquet' else 'csv.gz'}"
+
+
+class DuckDBExportEngine:
+	"""Embedded engine writing to a local directory (one file per month, sha256 checksums)."""
+
+	def __init__(self, database: str, output_dir: Path, read_only: bool = True):
+		import duckdb
+
+		self._con = duckdb.connect(database, read_only=read_only)
+		self.output_dir = Path(output_dir)
+		self.output_dir.mkdir(parents=True, exist_ok=True)
+
+	def _cursor(self) -> Any:
+		# DuckDB cursors are per-thread connections sharing the same database
+		return self._con.cursor()
+
+	def fingerprints(self, relation: str, start_month: str, end_month: str) -> Dict[str, MonthExport]:
+		start, _ = month_bounds(start_month)
+		_, end = month_bounds(end_month)
+		rows = self._cursor().execute(
+			f"""
+			SELECT strftime(month_date, '%Y-%m') AS month, count(*) AS n, bit_xor(hash(t)) AS h
+			FROM {relation} t
+			WHERE month_date >= '{start}' AND month_date < '{end}'
+			GROUP BY 1
+			"""
+		).fetchall()
+		return {m: MonthExport(month=m, rows=int(n), fingerprint=f"{n}:{h}") for m, n, h in rows}
+
+	def export_month(self, relation: str, month: str, fmt: str, prefix: str) -> MonthExport:
+		start, end = month_bounds(month)
+		target_dir = self.output_dir / month_dir(month)
+		staging = Path(tempfile.mkdtemp(prefix=f".{month}.", dir=self.output_dir))
+		try:
+			name = _file_name(prefix, month, fmt)
+			options = "FORMAT PARQUET, COMPRESSION ZSTD" if fmt == "parquet" else "FORMAT CSV, HEADER, COMPRESSION GZIP"
+			query = EXPORT_SELECT.format(relation=relation, start=start, end=end)
+			(written,) = self._cursor().execute(f"COPY ({query}) TO '{staging / name}' ({options})").fetchone()
+			shutil.rmtree(target_dir, ignore_errors=True)
+			os.replace(staging, target_dir)
+		except BaseException:
+			shutil.rmtree(staging, ignore_errors=True)
+			raise
+		files = [
+			ExportedFile(
+				path=str(p.relative_to(self.output_dir)),
+				bytes=p.stat().st_size,
+				checksum="sha256:" + hashlib.sha256(p.read_bytes()).hexdigest(),
+			)
+			for p in sorted(target_dir.iterdir())
+		]
+		return MonthExport(month=month, rows=0, fingerprint="", exported_rows=int(written), files=files)
+
+	def remove_month(self, month: str) -> None:
+		shutil.rmtree(self.output_dir / month_dir(month), ignore_errors=True)
+
+	def read_manifest(self) -> Optional[Dict[str, Any]]:
+		path = self.output_dir / MANIFEST_NAME
+		return json.loads(path.read_text()) if path.is_file() else None
+
+	def write_manifest(self, manifest: Dict[str, Any]) -> None:
+		path = self.output_dir / MANIFEST_NAME
+		tmp = path.with_suffix(".tmp")
+		tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+		os.replace(tmp, path)
+
+
+def snowflake_connect_from_env() -> Any:
+	"""snowflake.connector connection from the same SNOWFLAKE_* variables as the dbt profile."""
+	import snowflake.connector
+	from cryptography.hazmat.primitives import serialization
+
+	pem = os.getenv("SNOWFLAKE_PRIVATE_KEY_PEM")
+	if pem is None and os.getenv("SNOWFLAKE_PRIVATE_KEY_B64"):
+		pem = base64.b64decode(os.environ["SNOWFLAKE_PRIVATE_KEY_B64"]).decode("utf-8")
+	kwargs: Dict[str, Any] = {
+		"account": os.getenv("SNOWFLAKE_ACCOUNT"),
+		"user": os.getenv("SNOWFLAKE_USER"),
+		"role": os.getenv("SNOWFLAKE_ROLE"),
+		"database": os.getenv("SNOWFLAKE_DATABASE"),
+		"warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
+	}
+	if pem:
+		if "-----BEGIN" in pem and "\n" not in pem:
+			pem = pem.replace("\\n", "\n")
+		passphrase = os.getenv("SNOWFLAKE_PRIVATE_KEY_PASSPHRASE")
+		key = serialization.load_pem_private_key(pem.encode(), password=passphrase.encode() if passphrase else None)
+		kwargs["private_key"] = key.private_bytes(
+			serialization.Encoding.DER, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+		)
+	return snowflake.connector.connect(**kwargs)
+
+
+class SnowflakeExportEngine:
+	"""
+	Unloads each month with its own COPY INTO <stage>/<path>/month=YYYY-MM/ (no SINGLE, so
+	Snowflake writes the month's files in parallel too). Checksums are the stage's MD5s.
+	"""
+
+	def __init__(
+		self,
+		connect: Callable[[], Any] = snowflake_connect_from_env,
+		stage: str = DEFAULT_STAGE,
+		path: str = DEFAULT_STAGE_PATH,
+	):
+		self._connect = connect
+		self._local = threading.local()
+		self.stage = stage.lstrip("@")
+		self.path = path.strip("/")
+
+	def _query(self, sql: str) -> List[tuple]:
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			conn = self._local.conn = self._connect()
+		cur = conn.cursor()
+		try:
+			cur.execute(sql)
+			return cur.fetchall() if cur.description else []
+		finally:
+			cur.close()
+
+	def _location(self, month: Optional[str] = None) -> str:
+		return f"@{self.stage}/{self.path}/" + (f"{month_dir(month)}/" if month else "")
+
+	def fingerprints(self, relation: str, start_month: str, end_month: str) -> Dict[str, MonthExport]:
+		start, _ = month_bounds(start_month)
+		_, end = month_bounds(end_month)
+		rows = self._query(
+			f"""
+			SELECT TO_CHAR(month_date, 'YYYY-MM') AS month, COUNT(*) AS n, HASH_AGG(*) AS h
+			FROM {relation}
+			WHERE month_date >= '{start}' AND month_date < '{end}'
+			GROUP BY 1
+			"""
+		)
+		return {m: MonthExport(month=m, rows=int(n), fingerprint=f"{n}:{h}") for m, n, h in rows}
+
+	def export_month(self, relation: str, month: str, fmt: str, prefix: str) -> MonthExport:
+		start, end = month_bounds(month)
+		location = self._location(month)
+		file_format = "TYPE=PARQUET" if fmt == "parquet" else "TYPE=CSV FIELD_DELIMITER=',' COMPRESSION=GZIP"
+		self._query(f"REMOVE {location}")
+		result = self._query(
+			f"""
+			COPY INTO {location}{prefix}_{month}
+			FROM ({EXPORT_SELECT.format(relation=relation, start=start, end=end)})
+			FILE_FORMAT=({file_format})
+			HEADER=TRUE
+			OVERWRITE=TRUE
+			"""
+		)
+		written = sum(int(r[0]) for r in result) if result else 0
+		# LIST returns name (s3://.../<path>/month=.../file), size, md5, last_modified
+		marker = f"{self.path}/"
+		files = [
+			ExportedFile(path=name[name.index(marker) + len(marker):] if marker in name else name, bytes=int(size), checksum=f"md5:{md5}")
+			for name, size, md5, *_ in self._query(f"LIST {location}")
+		]
+		return MonthExport(month=month, rows=0, fingerprint="", exported_rows=written, files=sorted(files, key=lambda f: f.path))
+
+	def remove_month(self, month: str) -> None:
+		self._query(f"REMOVE {self._location(month)}")
+
+	def read_manifest(self) -> Optional[Dict[str, Any]]:
+		with tempfile.TemporaryDirectory() as tmp:
+			self._query(f"GET {self._location()}{MANIFEST_NAME} 'file://{tmp}/'")
+			path = Path(tmp) / MANIFEST_NAME
+			return json.loads(path.read_text()) if path.is_file() else None
+
+	def write_manifest(self, manifest: Dict[str, Any]) -> None:
+		with tempfile.TemporaryDirectory() as tmp:
+			path = Path(tmp) / MANIFEST_NAME
+			path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+			self._query(f"PUT 'file://{path}' {self._location()} AUTO_COMPRESS=FALSE OVERWRITE=TRUE")
+
+
+def load_export_engine(
+	default_output_dir: Optional[Path] = None,
+	duckdb_path: Optional[Path] = None,
+	namespace: Optional[str] = None,
+) -> ExportEngine:
+	"""
+	Resolve the engine from RAD_EXPORT_ENGINE: `snowflake` (default; RAD_EXPORT_STAGE and
+	RAD_EXPORT_STAGE_PATH), `duckdb` (RAD_EXPORT_DUCKDB_PATH, RAD_EXPORT_DIR) or `module:factory`.
+	`namespace` (non-default tenants) gets its own sub-path so tenants never share a manifest.
+	"""
+	spec = os.getenv("RAD_EXPORT_ENGINE", "snowflake")
+	if spec == "snowflake":
+		path = os.getenv("RAD_EXPORT_STAGE_PATH", DEFAULT_STAGE_PATH)
+		return SnowflakeExportEngine(
+			stage=os.getenv("RAD_EXPORT_STAGE", DEFAULT_STAGE),
+			path=f"{path.rstrip('/')}/{namespace}" if namespace else path,
+		)
+	if spec == "duckdb":
+		database = os.getenv("RAD_EXPORT_DUCKDB_PATH") or (str(duckdb_path) if duckdb_path else None)
+		output = os.getenv("RAD_EXPORT_DIR") or (str(default_output_dir) if default_output_dir else None)
+		if not database or not output:
+			raise RuntimeError("RAD_EXPORT_ENGINE=duckdb needs RAD_EXPORT_DUCKDB_PATH and RAD_EXPORT_DIR")
+		return DuckDBExportEngine(database, Path(output) / namespace if namespace else Path(output))
+	module_name, sep, attr = spec.partition(":")
+	if not sep:
+		raise RuntimeError(f"Invalid RAD_EXPORT_ENGINE '{spec}'. Use 'snowflake', 'duckdb' or 'module:factory'.")
+	return getattr(importlib.import_module(module_name), attr)()
+
+
+@dataclass
+class ExportReport:
+	exported: List[str]
+	unchanged: List[str]
+	removed: List[str]
+	manifest: Dict[str, Any]
+
+	@property
+	def exported_files(self) -> int:
+		return sum(len(self.manifest["months"][m]["files"]) for m in self.exported)
+
+
+def run_export(
+	engine: ExportEngine,
+	relation: str,
+	start_month: str,
+	end_month: str,
+	fmt: str = "parquet",
+	prefix: str = DEFAULT_FILE_PREFIX,
+	workers: int = DEFAULT_WORKERS,
+	force: bool = False,
+	log: logging.Logger = logger,
+) -> ExportReport:
+	"""
+	Export months in [start_month, end_month] whose fingerprint changed (all of them with
+	`force`), `workers` months at a time, then rewrite the manifest. Months in the window that
+	no longer have rows are removed from the destination and the manifest.
+	"""
+	if fmt not in FORMATS:
+		raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+	manifest = engine.read_manifest() or {}
+	if manifest.get("format") not in (None, fmt) or manifest.get("relation") not in (None, relation):
+		log.info("Export format or relation changed since the last manifest; re-exporting every month")
+		manifest, force = {}, True
+	months: Dict[str, Any] = dict(manifest.get("months", {}))
+
+	current = engine.fingerprints(relation, start_month, end_month)
+	changed = sorted(m for m, fp in current.items() if force or months.get(m, {}).get("fingerprint") != fp.fingerprint)
+	unchanged = sorted(set(current) - set(changed))
+	removed = sorted(m for m in months if start_month <= m <= end_month and m not in current)
+	log.info(
+		f"rad_sales_fact export: {len(changed)} month(s) to export, {len(unchanged)} unchanged, "
+		f"{len(removed)} to remove ({start_month}..{end_month}, {fmt}, {workers} worker(s))"
+	)
+
+	def export(month: str) -> MonthExport:
+		result = engine.export_month(relation, month, fmt, prefix)
+		result.rows, result.fingerprint = current[month].rows, current[month].fingerprint
+		result.exported_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+		log.info(f"Exported {month}: {result.exported_rows} rows in {len(result.files)} file(s)")
+		return result
+
+	try:
+		with ThreadPoolExecutor(max_workers=max(1, min(workers, len(changed) or 1))) as pool:
+			for result in pool.map(export, changed):
+				months[result.month] = asdict(result)
+		for month in removed:
+			engine.remove_month(month)
+			months.pop(month, None)
+	finally:
+		# Record whatever completed, so a retry only redoes the months that failed
+		manifest = {
+			"version": MANIFEST_VERSION,
+			"relation": relation,
+			"format": fmt,
+			"updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+			"months": dict(sorted(months.items())),
+		}
+		engine.write_manifest(manifest)
+	return ExportReport(exported=changed, unchanged=unchanged, removed=removed, manifest=manifest)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Month-partitioned rad_sales_fact export from a local DuckDB database")
+	parser.add_argument("--duckdb", required=True, help="DuckDB database file holding the relation")
+	parser.add_argument("--relation", required=True, help="Relation to export, e.g. main.rad_sales_daily_fact")
+	parser.add_argument("--output", required=True, type=Path, help="Export directory (manifest at <output>/_manifest.json)")
+	parser.add_argument("--start-month", default=f"{date.today().year}-01", help="First month YYYY-MM (default: January)")
+	parser.add_argument("--end-month", default=date.today().strftime("%Y-%m"), help="Last month YYYY-MM (default: current)")
+	parser.add_argument("--format", choices=FORMATS, default="parquet")
+	parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+	parser.add_argument("--force", action="store_true", help="Re-export every month in the window")
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+	report = run_export(
+		DuckDBExportEngine(args.duckdb, args.output),
+		args.relation,
+		args.start_month,
+		args.end_month,
+		fmt=args.format,
+		workers=args.workers,
+		force=args.force,
+	)
+	print(json.dumps({"exported": report.exported, "unchanged": report.unchanged, "removed": report.removed}))
+
+
+if __name__ == "__main__":
+	main()
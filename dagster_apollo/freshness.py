@@ -0,0 +1,239 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dagster import (
+	AssetSelection,
+	DefaultScheduleStatus,
+	DefaultSensorStatus,
+	Nothing,
+	OpExecutionContext,
+	Out,
+	RunRequest,
+	ScheduleDefinition,
+	SensorEvaluationContext,
+	SkipReason,
+	define_asset_job,
+	job,
+	op,
+	sensor,
+)
+
+from .artifacts import ArtifactStore, effective_target, load_artifact_store, state_key
+from .run_history import dbt_output_name
+from .tenants import Tenant
+
+logger = logging.getLogger(__name__)
+
+# `dbt source freshness` runs in a scheduled job (it can outlast a sensor tick); the sensor
+# only reads the sources.json that job stored
+DEFAULT_CRON = "*/30 * * * *"
+DEFAULT_INTERVAL_SECONDS = 300
+REPORT_MAX_MODELS = 50
+FRESHNESS_KEY_SUFFIX = "_source_freshness"
+# manifest.json too: stores only return versions that have one
+FRESHNESS_ARTIFACTS = ("sources.json", "manifest.json")
+
+
+def freshness_key(target: str, namespace: Optional[str] = None) -> str:
+	return state_key(f"{target}{FRESHNESS_KEY_SUFFIX}", namespace)
+
+
+def record_source_freshness(
+	target_path: Path,
+	run_id: str,
+	target: Optional[str] = None,
+	store: Optional[ArtifactStore] = None,
+	namespace: Optional[str] = None,
+) -> Optional[str]:
+	"""
+	Store a `dbt source freshness` invocation's sources.json as the latest freshness of its
+	target. Returns the stored version id, or None when the invocation wrote no results.
+	"""
+	target = effective_target(target)
+	artifacts: Dict[str, bytes] = {}
+	for name in FRESHNESS_ARTIFACTS:
+		path = Path(target_path) / name
+		if not path.is_file():
+			logger.warning("Not recording source freshness: %s missing from %s", name, target_path)
+			return None
+		artifacts[name] = path.read_bytes()
+	store = store or load_artifact_store()
+	key = freshness_key(target, namespace)
+	metadata = {"run_id": run_id, "target": target, "recorded_at": datetime.now(timezone.utc).isoformat()}
+	version = store.save(key, run_id, artifacts, metadata)
+	logger.info("Recorded source freshness %s for %s", version, key)
+	return version
+
+
+def load_source_freshness(sources_json: Path) -> Dict[str, str]:
+	"""source unique_id -> max_loaded_at from a `dbt source freshness` sources.json."""
+	try:
+		payload = json.loads(Path(sources_json).read_text())
+	except FileNotFoundError:
+		return {}
+	return {
+		r["unique_id"]: r["max_loaded_at"]
+		for r in payload.get("results", [])
+		if r.get("unique_id") and r.get("max_loaded_at")
+	}
+
+
+def _loaded_at(value: str) -> datetime:
+	return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def fresher_sources(current: Dict[str, str], previous: Dict[str, str]) -> List[str]:
+	"""
+	Sources loaded since the previous check, with dbt's `source_status:fresher` semantics:
+	max_loaded_at moved forward, or the source had no previous result.
+	"""
+	fresher = []
+	for uid, loaded_at in current.items():
+		before = previous.get(uid)
+		if before is None or _loaded_at(loaded_at) > _loaded_at(before):
+			fresher.append(uid)
+	return sorted(fresher)
+
+
+def downstream_models(manifest: Dict[str, Any], source_ids: List[str]) -> Set[str]:
+	"""All models downstream of the given sources (the `+` in `source_status:fresher+`)."""
+	child_map: Dict[str, List[str]] = manifest.get("child_map", {})
+	nodes: Dict[str, Any] = manifest.get("nodes", {})
+	seen: Set[str] = set()
+	stack = list(source_ids)
+	while stack:
+		for child in child_map.get(stack.pop(), []):
+			if child not in seen:
+				seen.add(child)
+				stack.append(child)
+	return {uid for uid in seen if nodes.get(uid, {}).get("resource_type") == "model"}
+
+
+def freshness_report(
+	fresher: List[str],
+	current: Dict[str, str],
+	previous: Dict[str, str],
+	selected: Set[str],
+	all_models: Set[str],
+	unmapped: Set[str],
+) -> Tuple[str, str]:
+	"""(one-line summary, full multi-line report) of what a fresher+ build runs and skips."""
+	skipped = sorted(all_models - selected)
+	summary = (
+		f"{len(fresher)} fresher source(s) -> build {len(selected)} of {len(all_models)} models, "
+		f"skip {len(skipped)}"
+	)
+	lines = [summary, "Fresher sources:"]
+	lines += [f"  {uid}: {previous.get(uid, '(new)')} -> {current[uid]}" for uid in fresher]
+	lines.append(f"Would build ({len(selected)}):")
+	lines += _model_lines(sorted(selected))
+	lines.append(f"Would skip ({len(skipped)}):")
+	lines += _model_lines(skipped)
+	if unmapped:
+		lines.append("Downstream but not in dbt_models (left to their own schedules):")
+		lines += _model_lines(sorted(unmapped))
+	return summary, "\n".join(lines)
+
+
+def _model_lines(unique_ids: List[str]) -> List[str]:
+	lines = [f"  {uid.split('.')[-1]}" for uid in unique_ids[:REPORT_MAX_MODELS]]
+	if len(unique_ids) > REPORT_MAX_MODELS:
+		lines.append(f"  ... and {len(unique_ids) - REPORT_MAX_MODELS} more")
+	return lines
+
+
+def build_freshness_defs(tenant: Tenant, dbt_models: List[Any], manifest_path: Path) -> Dict[str, List[Any]]:
+	"""
+	Jobs, schedule and sensor for source-freshness builds. `dbt_source_freshness_job` runs
+	`dbt source freshness` on DBT_FRESHNESS_CRON and stores sources.json in the artifact store.
+	The sensor polls the latest stored result every DBT_FRESHNESS_INTERVAL_SECONDS and, when
+	sources were loaded since the last check, materializes only the dbt_models assets downstream
+	of them (`dbt_models`: the dbt_models asset, or one per subgraph). The last seen
+	max_loaded_at per source is kept in the sensor cursor; the first tick only records it. With
+	DBT_FRESHNESS_SENSOR_DRY_RUN=1 no run is launched and the tick reports what would have been
+	built and skipped.
+	"""
+
+	@op(name=tenant.scoped("run_dbt_source_freshness"), required_resource_keys={tenant.resource_key}, out=Out(Nothing))
+	def run_dbt_source_freshness(context: OpExecutionContext):
+		dbt = getattr(context.resources, tenant.resource_key)
+		# Exit code is non-zero when a source breaches its freshness threshold; results are still written
+		invocation = dbt.cli(["source", "freshness"], raise_on_error=False).wait()
+		if record_source_freshness(invocation.target_path, context.run_id, namespace=tenant.state_namespace) is None:
+			raise invocation.get_error() or RuntimeError(f"dbt source freshness wrote no sources.json in {invocation.target_path}")
+
+	@job(name=tenant.scoped("dbt_source_freshness_job"), tags=tenant.run_tags)
+	def freshness_job():
+		run_dbt_source_freshness()  # resource bound via Definitions
+
+	freshness_schedule = ScheduleDefinition(
+		name=tenant.scoped("dbt_source_freshness_schedule"),
+		cron_schedule=os.getenv("DBT_FRESHNESS_CRON", DEFAULT_CRON),
+		job=freshness_job,
+		default_status=DefaultScheduleStatus.STOPPED,
+	)
+	fresh_sources_job = define_asset_job(
+		name=tenant.scoped("dbt_fresh_sources_job"),
+		selection=AssetSelection.assets(*dbt_models),
+		tags=tenant.run_tags,
+	)
+	keys_by_output = {name: key for assets_def in dbt_models for name, key in assets_def.keys_by_output_name.items()}
+	dry_run = os.getenv("DBT_FRESHNESS_SENSOR_DRY_RUN", "").lower() in ("1", "true", "yes")
+	manifest_cache: Dict[str, Any] = {}
+
+	@sensor(
+		name=tenant.scoped("dbt_source_freshness_sensor"),
+		job=fresh_sources_job,
+		minimum_interval_seconds=int(os.getenv("DBT_FRESHNESS_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS)),
+		default_status=DefaultSensorStatus.STOPPED,
+	)
+	def source_freshness_sensor(context: SensorEvaluationContext):
+		latest = load_artifact_store().fetch_latest(freshness_key(effective_target(), tenant.state_namespace))
+		if latest is None:
+			return SkipReason(f"No source freshness recorded yet (start {freshness_schedule.name})")
+		current = load_source_freshness(latest / "sources.json")
+		if not current:
+			return SkipReason("dbt source freshness returned no results (no sources with a freshness config?)")
+
+		previous: Optional[Dict[str, str]] = json.loads(context.cursor) if context.cursor else None
+		context.update_cursor(json.dumps({**(previous or {}), **current}, sort_keys=True))
+		if previous is None:
+			return SkipReason(f"Recorded baseline freshness for {len(current)} sources")
+		fresher = fresher_sources(current, previous)
+		if not fresher:
+			return SkipReason("No source loaded since the last check")
+
+		if "manifest" not in manifest_cache:
+			manifest_cache["manifest"] = json.loads(Path(manifest_path).read_text())
+		manifest = manifest_cache["manifest"]
+		downstream = downstream_models(manifest, fresher)
+		model_keys = {
+			uid: keys_by_output[dbt_output_name(uid)]
+			for uid, node in manifest.get("nodes", {}).items()
+			if node.get("resource_type") == "model" and dbt_output_name(uid) in keys_by_output
+		}
+		selected = downstream & set(model_keys)
+		summary, report = freshness_report(
+			fresher, current, previous, selected, set(model_keys), downstream - set(model_keys)
+		)
+		context.log.info(report)
+
+		if dry_run:
+			return SkipReason(f"DRY RUN: {summary}")
+		if not selected:
+			return SkipReason(f"{summary}; nothing to materialize")
+		run_key = hashlib.sha256(
+			json.dumps({uid: current[uid] for uid in fresher}, sort_keys=True).encode("utf-8")
+		).hexdigest()[:16]
+		return RunRequest(
+			run_key=run_key,
+			asset_selection=[model_keys[uid] for uid in sorted(selected)],
+			tags={**tenant.run_tags, "apollo/trigger": "source_freshness"},
+		)
+
+	return {"jobs": [freshness_job, fresh_sources_job], "schedules": [freshness_schedule], "sensors": [source_freshness_sensor]}
@@ -0,0 +1,116 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dagster import (
+	AssetExecutionContext,
+	AssetSelection,
+	BackfillPolicy,
+	MonthlyPartitionsDefinition,
+	RunRequest,
+	ScheduleEvaluationContext,
+	define_asset_job,
+	schedule,
+)
+from dagster_dbt import dbt_assets
+
+from .artifacts import effective_target
+from .run_history import QUERY_LOG_ARGS, record_invocation_timings
+from .tenants import Tenant, TenantDbtTranslator
+from .threads import ThreadPlanner
+
+# Large incremental facts that are materialized per month_date partition
+PARTITIONED_MODELS = ["rad_sales_fact", "depletions_summary_fact"]
+PARTITION_CONCURRENCY_KEY = "dbt_fact_partitions"
+
+# dbt vars understood by the partitioned models: month_date >= start and month_date < end
+PARTITION_START_VAR = "partition_start_month"
+PARTITION_END_VAR = "partition_end_month"
+
+
+def _env_int(key: str, default: int) -> int:
+	val = os.getenv(key)
+	return int(val) if val else default
+
+
+def month_partitions_def() -> MonthlyPartitionsDefinition:
+	# end_offset=1 exposes the current (open) month as a partition
+	return MonthlyPartitionsDefinition(
+		start_date=os.getenv("DBT_PARTITION_START", "2021-01-01"),
+		end_offset=1,
+	)
+
+
+def partition_vars(context: AssetExecutionContext) -> Dict[str, str]:
+	"""dbt vars for the run's partition range (a single month or a backfill range)."""
+	window = context.partition_time_window
+	return {
+		PARTITION_START_VAR: window.start.strftime("%Y-%m-%d"),
+		PARTITION_END_VAR: window.end.strftime("%Y-%m-%d"),
+	}
+
+
+def partitioned_models_in_manifest(manifest_path: Path) -> List[str]:
+	"""PARTITIONED_MODELS that are enabled in the manifest (disabled models have no asset)."""
+	manifest = json.loads(Path(manifest_path).read_text())
+	names = {n.get("name") for n in manifest.get("nodes", {}).values() if n.get("resource_type") == "model"}
+	return [m for m in PARTITIONED_MODELS if m in names]
+
+
+def build_partitioned_fact_assets(
+	manifest_path: Path, models: List[str], tenant: Tenant, planner: Optional[ThreadPlanner] = None
+) -> Any:
+	"""
+	month_date-partitioned assets for the large fact models. Each run passes its partition
+	bounds as dbt vars; backfills fan out into runs of DBT_BACKFILL_PARTITIONS_PER_RUN months
+	(default 1) that execute concurrently, limited by the PARTITION_CONCURRENCY_KEY pool
+	(shared by all tenants). `planner` sizes --threads for just these models.
+	"""
+	threads_args = planner.cli_args(effective_target(), models) if planner else []
+
+	@dbt_assets(
+		manifest=manifest_path,
+		select=" ".join(models),
+		name=tenant.scoped("dbt_partitioned_facts"),
+		partitions_def=month_partitions_def(),
+		dagster_dbt_translator=TenantDbtTranslator(tenant),
+		backfill_policy=BackfillPolicy.multi_run(
+			max_partitions_per_run=_env_int("DBT_BACKFILL_PARTITIONS_PER_RUN", 1)
+		),
+		op_tags={"dagster/concurrency_key": PARTITION_CONCURRENCY_KEY},
+		required_resource_keys={tenant.resource_key},
+	)
+	def dbt_partitioned_facts(context: AssetExecutionContext):
+		dbt = getattr(context.resources, tenant.resource_key)
+		dbt_vars = partition_vars(context)
+		context.log.info(f"Building {', '.join(models)} for {dbt_vars}")
+		invocation = dbt.cli(["build", "--vars", json.dumps(dbt_vars), *threads_args, *QUERY_LOG_ARGS], context=context)
+		yield from invocation.stream()
+		yield from record_invocation_timings(context, invocation.target_path, context.assets_def)
+
+	return dbt_partitioned_facts
+
+
+def build_open_months_schedule(partitioned_assets: Any, tenant: Tenant) -> Any:
+	"""
+	Daily job/schedule that only rebuilds the open months: the current month and the
+	previous DBT_OPEN_MONTHS - 1 months (late invoices), one run per month.
+	"""
+	job = define_asset_job(
+		name=tenant.scoped("dbt_partitioned_facts_job"),
+		selection=AssetSelection.assets(partitioned_assets),
+		partitions_def=month_partitions_def(),
+		tags=tenant.run_tags,
+	)
+	open_months = _env_int("DBT_OPEN_MONTHS", 3)
+
+	@schedule(name=tenant.scoped("daily_dbt_partitioned_facts_open_months"), cron_schedule="30 1 * * *", job=job)
+	def open_months_schedule(context: ScheduleEvaluationContext):
+		now: Optional[datetime] = context.scheduled_execution_time or datetime.now(timezone.utc)
+		keys = month_partitions_def().get_partition_keys(current_time=now)
+		for key in keys[-open_months:]:
+			yield RunRequest(run_key=f"{key}:{now:%Y-%m-%d}", partition_key=key)
+
+	return job, open_months_schedule
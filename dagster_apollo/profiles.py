@@ -1,6 +1,10 @@
 import os
-import tempfile
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+
+from .cache import cache_root, write_text_if_changed
+from .threads import static_threads
+from .warehouses import ROUTES_ENV, load_target_specs, routes_env_value
 
 # Load .env for local dev without overriding pre-set environment
 try:
@@ -26,15 +30,36 @@ OPTIONAL_ENV = [
 	"DBT_THREADS",
 	"DBT_SCHEMA",
 	"SNOWFLAKE_SCHEMA",
+	"DBT_LOCAL_DUCKDB_PATH",
+	"DBT_TARGETS",
 ]
 
+# Embedded target for load-testing without a Snowflake account (requires dbt-duckdb);
+# source tables come from scripts/benchmarks/synthetic_sources.py --duckdb <path>
+LOCAL_TARGET = "local"
+
 
 def _env(key: str, default: str | None = None) -> str | None:
 	val = os.getenv(key)
 	return val if val is not None else default
 
 
+def local_duckdb_path() -> Path:
+	"""DuckDB file used by the `local` target (DBT_LOCAL_DUCKDB_PATH, else under the cache root)."""
+	explicit = _env("DBT_LOCAL_DUCKDB_PATH")
+	return Path(explicit) if explicit else cache_root() / "local" / "apollo_local.duckdb"
+
+
+def _local_target(threads: int) -> Dict[str, Any]:
+	path = local_duckdb_path()
+	path.parent.mkdir(parents=True, exist_ok=True)
+	# target.database is the file stem; sources resolve to <stem>.source_data / master_data / public
+	return {"type": "duckdb", "path": str(path), "schema": "main", "threads": threads}
+
+
 def _validate_env() -> None:
+	if _env("DBT_TARGET") == LOCAL_TARGET:
+		return  # no Snowflake credentials needed for the embedded target
 	missing = [k for k in REQUIRED_ENV if _env(k) is None]
 	if _env("SNOWFLAKE_PRIVATE_KEY_PEM") is None and _env("SNOWFLAKE_PRIVATE_KEY_B64") is None:
 		missing.append("SNOWFLAKE_PRIVATE_KEY_PEM or SNOWFLAKE_PRIVATE_KEY_B64")
@@ -44,10 +69,10 @@ def _validate_env() -> None:
 		)
 
 
-def _build_profiles_dict() -> Dict[str, Any]:
+def _build_profiles_dict(extra_profile_names: Iterable[str] = ()) -> Dict[str, Any]:
 	profile_name = _env("DBT_PROFILE_NAME", "apollo-snowflake")
 	target = _env("DBT_TARGET", "dev")
-	threads = int(_env("DBT_THREADS", "24"))
+	specs = load_target_specs()
 
 	private_key = _env("SNOWFLAKE_PRIVATE_KEY_PEM")
 	if private_key is None:
@@ -63,7 +88,6 @@ def _build_profiles_dict() -> Dict[str, Any]:
 		"role": _env("SNOWFLAKE_ROLE"),
 		"database": _env("SNOWFLAKE_DATABASE"),
 		"warehouse": _env("SNOWFLAKE_WAREHOUSE"),
-		"threads": threads,
 		"client_session_keep_alive": False,
 		"reuse_connections": True,
 		"disable_ocsp_checks": False,
@@ -84,15 +108,20 @@ def _build_profiles_dict() -> Dict[str, Any]:
 		if passphrase:
 			base_target["private_key_passphrase"] = passphrase
 
-	profiles: Dict[str, Any] = {
-		profile_name: {
-			"target": target,
-			"outputs": {
-				"dev": base_target,
-				"prod": base_target,
-			},
+	# One output per generated target: own warehouse and threads (planned ones get their
+	# share of the warehouse slots here; Dagster runs pass --threads from the DAG width)
+	outputs: Dict[str, Any] = {}
+	for name, spec in specs.items():
+		outputs[name] = {
+			**base_target,
+			"warehouse": spec.warehouse or base_target["warehouse"],
+			"threads": static_threads(spec, base_target["warehouse"]),
 		}
-	}
+	outputs[LOCAL_TARGET] = _local_target(static_threads(specs["dev"], base_target["warehouse"]))
+	profiles: Dict[str, Any] = {profile_name: {"target": target, "outputs": outputs}}
+	# Tenants whose dbt_project.yml declares another profile share the same connection
+	for name in extra_profile_names:
+		profiles.setdefault(name, profiles[profile_name])
 	return profiles
 
 
@@ -101,20 +130,29 @@ def _dump_yaml(data: Dict[str, Any]) -> str:
 	return yaml.safe_dump(data, sort_keys=False)
 
 
-def ensure_profiles() -> str:
+def profiles_dir() -> Path:
+	"""Stable, private directory for the generated profiles.yml (shared across processes)."""
+	path = cache_root() / "dbt_profiles"
+	path.mkdir(mode=0o700, parents=True, exist_ok=True)
+	return path
+
+
+def ensure_profiles(profile_names: Optional[Iterable[str]] = None) -> str:
 	"""
-	Generate profiles.yml into a temp directory and set DBT_PROFILES_DIR.
-	Returns the directory path.
+	Generate profiles.yml into a stable directory and set DBT_PROFILES_DIR.
+	`profile_names` adds further profiles (e.g. those declared by tenant projects).
+	The file is only rewritten when its contents change. Returns the directory path.
 	"""
 	_validate_env()
-	profiles = _build_profiles_dict()
+	profiles = _build_profiles_dict(sorted(set(profile_names or ())))
 	yaml_text = _dump_yaml(profiles)
-	tmp = tempfile.mkdtemp(prefix="dbt_profiles_")
-	path = os.path.join(tmp, "profiles.yml")
-	with open(path, "w", encoding="utf-8") as f:
-		f.write(yaml_text)
-	os.environ["DBT_PROFILES_DIR"] = tmp
-	return tmp
+	target_dir = profiles_dir()
+	# profiles.yml may contain a private key: keep it owner-readable only
+	write_text_if_changed(target_dir / "profiles.yml", yaml_text, mode=0o600)
+	os.environ["DBT_PROFILES_DIR"] = str(target_dir)
+	# Per-layer / per-tag warehouses, read by dbt_project.yml and the warehouse_route() macro
+	os.environ[ROUTES_ENV] = routes_env_value(load_target_specs())
+	return str(target_dir)
 
 
 # Removed auto-generation at import to avoid side effects; call ensure_profiles() explicitly in code location. 
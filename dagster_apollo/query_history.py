@@ -0,0 +1,267 @@
+import importlib
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Protocol, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+# Unset/"none": no lookups; "snowflake": INFORMATION_SCHEMA.QUERY_HISTORY_BY_USER; or "module:factory"
+PROVIDER_ENV = "DBT_QUERY_HISTORY_PROVIDER"
+# Query ids bound per lookup statement
+LOOKUP_BATCH = 500
+# INFORMATION_SCHEMA query history returns at most this many rows per call, before the id filter
+RESULT_LIMIT = 10000
+# Credits per hour by warehouse size (standard warehouses)
+CREDITS_PER_HOUR = {
+	"X-SMALL": 1, "SMALL": 2, "MEDIUM": 4, "LARGE": 8, "X-LARGE": 16, "2X-LARGE": 32,
+	"3X-LARGE": 64, "4X-LARGE": 128, "5X-LARGE": 256, "6X-LARGE": 512,
+}
+
+
+@dataclass(frozen=True)
+class QueryStats:
+	query_id: str
+	elapsed_s: float
+	execution_s: float = 0.0
+	queued_s: float = 0.0  # overload + provisioning + repair
+	bytes_scanned: int = 0
+	partitions_scanned: int = 0
+	partitions_total: int = 0
+	bytes_spilled_local: int = 0
+	bytes_spilled_remote: int = 0
+	warehouse: Optional[str] = None
+	warehouse_size: Optional[str] = None
+	query_count: int = 1  # statements combined into these stats (combine_stats)
+
+	@property
+	def est_credits(self) -> float:
+		"""Execution time at the warehouse's hourly rate. An upper bound when queries share the warehouse."""
+		rate = CREDITS_PER_HOUR.get((self.warehouse_size or "").upper(), 0)
+		return self.execution_s / 3600 * rate
+
+	def metadata(self) -> Dict[str, Any]:
+		from dagster import MetadataValue
+
+		metadata: Dict[str, Any] = {
+			"query_elapsed_seconds": MetadataValue.float(self.elapsed_s),
+			"query_queued_seconds": MetadataValue.float(self.queued_s),
+			"bytes_scanned": MetadataValue.int(self.bytes_scanned),
+			"partitions_scanned": MetadataValue.int(self.partitions_scanned),
+			"partitions_total": MetadataValue.int(self.partitions_total),
+			"bytes_spilled": MetadataValue.int(self.bytes_spilled_local + self.bytes_spilled_remote),
+			"est_credits": MetadataValue.float(round(self.est_credits, 6)),
+			"query_count": MetadataValue.int(self.query_count),
+		}
+		if self.warehouse:
+			metadata["warehouse"] = MetadataValue.text(f"{self.warehouse} ({self.warehouse_size or '?'})")
+		return metadata
+
+
+def combine_stats(stats: Sequence[QueryStats]) -> QueryStats:
+	"""
+	Several statements of one node (temp-table build and merge, hooks, ...) as one QueryStats,
+	with the warehouse of the longest-running statement.
+	"""
+	if len(stats) == 1:
+		return stats[0]
+	longest = max(stats, key=lambda s: s.execution_s)
+	return QueryStats(
+		query_id=",".join(s.query_id for s in stats),
+		elapsed_s=sum(s.elapsed_s for s in stats),
+		execution_s=sum(s.execution_s for s in stats),
+		queued_s=sum(s.queued_s for s in stats),
+		bytes_scanned=sum(s.bytes_scanned for s in stats),
+		partitions_scanned=sum(s.partitions_scanned for s in stats),
+		partitions_total=sum(s.partitions_total for s in stats),
+		bytes_spilled_local=sum(s.bytes_spilled_local for s in stats),
+		bytes_spilled_remote=sum(s.bytes_spilled_remote for s in stats),
+		warehouse=longest.warehouse,
+		warehouse_size=longest.warehouse_size,
+		query_count=sum(s.query_count for s in stats),
+	)
+
+
+class QueryHistoryProvider(Protocol):
+	"""Looks up warehouse statistics for adapter query ids."""
+
+	def lookup(self, query_ids: Sequence[str], since: Optional[datetime] = None) -> Dict[str, QueryStats]:
+		"""Stats per query id; ids the provider does not (yet) know are left out. `since` bounds the search."""
+		...
+
+
+class SnowflakeQueryHistory:
+	"""
+	INFORMATION_SCHEMA.QUERY_HISTORY_BY_USER (no ACCOUNT_USAGE latency, last 7 days). Only the
+	queries of `user` (default: the connecting user, i.e. the one dbt runs as) since `since` are
+	searched, so other workloads on the account do not use up RESULT_LIMIT before the id filter.
+	`connect` defaults to the SNOWFLAKE_* variables of the dbt profile.
+	"""
+
+	def __init__(self, connect: Optional[Callable[[], Any]] = None, batch: int = LOOKUP_BATCH, user: Optional[str] = None):
+		if connect is None:
+			from .exports import snowflake_connect_from_env
+			connect = snowflake_connect_from_env
+		self._connect = connect
+		self.batch = batch
+		self.user = user
+
+	def lookup(self, query_ids: Sequence[str], since: Optional[datetime] = None) -> Dict[str, QueryStats]:
+		ids = sorted(set(query_ids))
+		if not ids:
+			return {}
+		since = since or datetime.now(timezone.utc) - timedelta(days=1)
+		found: Dict[str, QueryStats] = {}
+		conn = self._connect()
+		try:
+			cur = conn.cursor()
+			user = self.user
+			if user is None:
+				cur.execute("SELECT CURRENT_USER()")
+				user = cur.fetchone()[0]
+			for start in range(0, len(ids), self.batch):
+				chunk = ids[start:start + self.batch]
+				binds = {f"q{i}": qid for i, qid in enumerate(chunk)}
+				cur.execute(
+					"SELECT query_id, total_elapsed_time, execution_time,"
+					" queued_overload_time + queued_provisioning_time + queued_repair_time,"
+					" bytes_scanned, partitions_scanned, partitions_total,"
+					" bytes_spilled_to_local_storage, bytes_spilled_to_remote_storage,"
+					" warehouse_name, warehouse_size"
+					" FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_USER("
+					"USER_NAME => %(user)s, END_TIME_RANGE_START => %(since)s::TIMESTAMP_LTZ,"
+					f" RESULT_LIMIT => {RESULT_LIMIT}))"
+					f" WHERE query_id IN ({', '.join(f'%({k})s' for k in binds)})",
+					{"user": user, "since": since.isoformat(), **binds},
+				)
+				for row in cur.fetchall():
+					found[row[0]] = QueryStats(
+						query_id=row[0],
+						elapsed_s=(row[1] or 0) / 1000,
+						execution_s=(row[2] or 0) / 1000,
+						queued_s=(row[3] or 0) / 1000,
+						bytes_scanned=int(row[4] or 0),
+						partitions_scanned=int(row[5] or 0),
+						partitions_total=int(row[6] or 0),
+						bytes_spilled_local=int(row[7] or 0),
+						bytes_spilled_remote=int(row[8] or 0),
+						warehouse=row[9],
+						warehouse_size=row[10],
+					)
+			cur.close()
+		finally:
+			conn.close()
+		return found
+
+
+@dataclass
+class FakeQueryHistory:
+	"""In-memory provider for tests and local targets. Every lookup is recorded in `calls`."""
+	stats: Dict[str, QueryStats] = field(default_factory=dict)
+	calls: List[List[str]] = field(default_factory=list)
+
+	def add(self, stats: QueryStats) -> None:
+		self.stats[stats.query_id] = stats
+
+	def lookup(self, query_ids: Sequence[str], since: Optional[datetime] = None) -> Dict[str, QueryStats]:
+		self.calls.append(list(query_ids))
+		return {qid: self.stats[qid] for qid in query_ids if qid in self.stats}
+
+
+def load_query_history() -> Optional[QueryHistoryProvider]:
+	"""Provider from DBT_QUERY_HISTORY_PROVIDER, or None when cost attribution is off."""
+	spec = os.getenv(PROVIDER_ENV, "none")
+	if spec in ("", "none"):
+		return None
+	if spec == "snowflake":
+		return SnowflakeQueryHistory()
+	module_name, sep, attr = spec.partition(":")
+	if not sep:
+		raise RuntimeError(f"Invalid {PROVIDER_ENV} '{spec}'. Use 'none', 'snowflake' or 'module:factory'.")
+	return getattr(importlib.import_module(module_name), attr)()
+
+
+def lookup_costs(
+	provider: QueryHistoryProvider,
+	query_ids: Mapping[str, Sequence[str]],
+	since: Optional[datetime] = None,
+) -> Dict[str, QueryStats]:
+	"""
+	Stats per label (model unique_id, routine name, ...) from one bulk lookup of all their query
+	ids; a label with several queries gets their combined stats (combine_stats). Lookup failures
+	are logged and return nothing: cost attribution never fails a run. Ids the provider did not
+	find are counted in a warning, since the rollups then under-report cost.
+	"""
+	wanted = {label: [qid for qid in ids if qid] for label, ids in query_ids.items()}
+	all_ids = {qid for ids in wanted.values() for qid in ids}
+	try:
+		stats = provider.lookup(sorted(all_ids), since=since)
+	except Exception as e:
+		logger.warning("Query history lookup failed for %d queries: %s", len(all_ids), e)
+		return {}
+	_warn_missing(all_ids, stats)
+	found = {label: [stats[qid] for qid in ids if qid in stats] for label, ids in wanted.items()}
+	return {label: combine_stats(items) for label, items in found.items() if items}
+
+
+def _warn_missing(query_ids: Set[str], stats: Mapping[str, QueryStats]) -> None:
+	missing = query_ids - set(stats)
+	if missing:
+		logger.warning(
+			"%d of %d query ids not found in query history (not visible to the role, outside the lookup window"
+			" or past RESULT_LIMIT); their cost is missing from the totals",
+			len(missing), len(query_ids),
+		)
+
+
+def rollup(stats: Iterable[QueryStats]) -> Dict[str, float]:
+	"""Totals over a set of queries (one run, one routine, ...)."""
+	items = list(stats)
+	scanned = sum(s.partitions_scanned for s in items)
+	total = sum(s.partitions_total for s in items)
+	return {
+		"queries": sum(s.query_count for s in items),
+		"elapsed_s": sum(s.elapsed_s for s in items),
+		"queued_s": sum(s.queued_s for s in items),
+		"bytes_scanned": sum(s.bytes_scanned for s in items),
+		"partitions_scanned": scanned,
+		"partitions_total": total,
+		"pruned_pct": 100.0 * (1 - scanned / total) if total else 0.0,
+		"bytes_spilled": sum(s.bytes_spilled_local + s.bytes_spilled_remote for s in items),
+		"est_credits": sum(s.est_credits for s in items),
+	}
+
+
+def describe_rollup(totals: Mapping[str, float]) -> str:
+	return (
+		f"{int(totals['queries'])} queries, {totals['elapsed_s']:.1f}s elapsed ({totals['queued_s']:.1f}s queued), "
+		f"{totals['bytes_scanned'] / 1e9:.2f} GB scanned, {int(totals['partitions_scanned'])}/{int(totals['partitions_total'])} "
+		f"partitions ({totals['pruned_pct']:.0f}% pruned), {totals['bytes_spilled'] / 1e9:.2f} GB spilled, "
+		f"~{totals['est_credits']:.3f} credits"
+	)
+
+
+def routine_costs(
+	provider: QueryHistoryProvider,
+	query_log: Iterable[Sequence[str]],
+	since: Optional[datetime] = None,
+) -> Dict[str, Dict[str, float]]:
+	"""
+	Rollup per backend function from (routine, query id) pairs, e.g. apollo_serving's
+	`SnowflakeExecutor.query_log`.
+	"""
+	by_routine: Dict[str, List[str]] = {}
+	for routine, qid in query_log:
+		by_routine.setdefault(routine, []).append(qid)
+	query_ids = {qid for ids in by_routine.values() for qid in ids}
+	try:
+		stats = provider.lookup(sorted(query_ids), since=since)
+	except Exception as e:
+		logger.warning("Query history lookup failed for %d routines: %s", len(by_routine), e)
+		return {}
+	_warn_missing(query_ids, stats)
+	return {
+		routine: rollup(stats[qid] for qid in ids if qid in stats)
+		for routine, ids in sorted(by_routine.items())
+	}
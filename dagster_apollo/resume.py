@@ -0,0 +1,134 @@
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .artifacts import STATE_ARTIFACTS, ArtifactStore, effective_target, load_artifact_store, state_key
+
+logger = logging.getLogger(__name__)
+
+# run_results.json statuses a resume builds again (dbt's `result:<status>` selector values)
+RERUN_STATUSES = ("error", "fail", "skipped")
+# Artifact-store key suffix for the state the next resume of a target continues from
+RESUME_KEY_SUFFIX = "-resume"
+# Nodes whose runtime counts as model runtime in the savings report
+MODEL_RESOURCE_PREFIXES = ("model.", "seed.", "snapshot.")
+
+
+def resume_key(target: str, namespace: Optional[str] = None) -> str:
+	return state_key(f"{target}{RESUME_KEY_SUFFIX}", namespace)
+
+
+def _read_run_results(state_dir: Path) -> Dict[str, Any]:
+	path = Path(state_dir) / "run_results.json"
+	return json.loads(path.read_text()) if path.is_file() else {}
+
+
+def _pending(run_results: Dict[str, Any]) -> List[str]:
+	return [r["unique_id"] for r in run_results.get("results", []) if r.get("status") in RERUN_STATUSES]
+
+
+def _model_seconds(run_results: Dict[str, Any], statuses: Optional[Tuple[str, ...]] = None) -> Dict[str, float]:
+	return {
+		r["unique_id"]: float(r.get("execution_time") or 0.0)
+		for r in run_results.get("results", [])
+		if r.get("unique_id", "").startswith(MODEL_RESOURCE_PREFIXES) and (statuses is None or r.get("status") in statuses)
+	}
+
+
+@dataclass
+class ResumePlan:
+	"""What a resume re-runs from one failed invocation, and the model runtime it keeps."""
+	state_dir: Path
+	run_id: Optional[str]  # Dagster run that produced the state, when recorded
+	rerun: List[str]  # errored, failed and skipped unique ids
+	kept_models: Dict[str, float]  # models already built by the failed build (and earlier resumes) -> execution seconds
+	failed_run_model_s: float  # model runtime of the failed build, counted from the first failure
+
+	@property
+	def saved_s(self) -> float:
+		return sum(self.kept_models.values())
+
+	def describe(self) -> str:
+		source = f"run {self.run_id}" if self.run_id else str(self.state_dir)
+		return (
+			f"resuming {source}: {len(self.rerun)} errored/skipped node(s) to rebuild, "
+			f"{len(self.kept_models)} model(s) already built ({self.saved_s:.1f}s of model runtime)"
+		)
+
+
+def plan_resume(state_dir: Path) -> ResumePlan:
+	"""
+	Read a failed invocation's run_results.json. The metadata stored next to it (if any) adds the
+	run id and, for a resume that failed again, the models kept since the first failure.
+	"""
+	state_dir = Path(state_dir)
+	run_results = _read_run_results(state_dir)
+	metadata_path = state_dir / "metadata.json"
+	metadata = json.loads(metadata_path.read_text()) if metadata_path.is_file() else {}
+	kept = dict(metadata.get("kept_models") or {})
+	kept.update(_model_seconds(run_results, ("success",)))
+	return ResumePlan(
+		state_dir=state_dir,
+		run_id=metadata.get("run_id"),
+		rerun=_pending(run_results),
+		kept_models=kept,
+		failed_run_model_s=metadata.get("failed_run_model_s") or sum(_model_seconds(run_results).values()),
+	)
+
+
+def resume_selection(select: Optional[List[str]]) -> List[str]:
+	"""
+	`--select` values for the nodes a resume rebuilds: dbt's `result:` method reads the failed
+	run_results.json passed as `--state`, like `dbt retry` does. Selections are intersected.
+	"""
+	statuses = [f"result:{status}" for status in RERUN_STATUSES]
+	if not select:
+		return statuses
+	return [f"{status},{s}" for status in statuses for s in select]
+
+
+def savings_report(plan: ResumePlan, target_path: Path) -> str:
+	"""Model runtime of the resume vs what re-running the whole failed build would have repeated."""
+	rerun_s = sum(_model_seconds(_read_run_results(target_path)).values())
+	share = plan.saved_s / plan.failed_run_model_s if plan.failed_run_model_s else 0.0
+	return (
+		f"Resume rebuilt {len(plan.rerun)} node(s) in {rerun_s:.1f}s of model runtime and skipped "
+		f"{len(plan.kept_models)} model(s) already built: {plan.saved_s:.1f}s of model runtime saved "
+		f"({share:.0%} of the failed build's {plan.failed_run_model_s:.1f}s)"
+	)
+
+
+def record_resume_state(
+	target_path: Path,
+	run_id: str,
+	succeeded: bool,
+	target: Optional[str] = None,
+	store: Optional[ArtifactStore] = None,
+	namespace: Optional[str] = None,
+	resumed: Optional[ResumePlan] = None,
+) -> Optional[str]:
+	"""
+	Keep an ad-hoc build's artifacts as the state the next resume of its target continues from.
+	The op records failed builds and every resume, so a resume that succeeds leaves nothing to
+	rebuild while an unrelated successful build does not discard a pending failure. `resumed`
+	(the plan this build resumed) carries the models kept so far into the next savings report.
+	Returns the stored version id.
+	"""
+	target = effective_target(target)
+	artifacts: Dict[str, bytes] = {}
+	for name in STATE_ARTIFACTS:
+		path = Path(target_path) / name
+		if not path.is_file():
+			logger.warning("Not recording resume state: %s missing from %s", name, target_path)
+			return None
+		artifacts[name] = path.read_bytes()
+	store = store or load_artifact_store()
+	key = resume_key(target, namespace)
+	metadata: Dict[str, Any] = {"run_id": run_id, "target": target, "succeeded": succeeded}
+	if resumed is not None:
+		metadata.update(kept_models=resumed.kept_models, failed_run_model_s=resumed.failed_run_model_s)
+	version = store.save(key, run_id, artifacts, metadata)
+	logger.info("Recorded resume state %s for %s", version, key)
+	return version
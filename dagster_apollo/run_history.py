@@ -0,0 +1,397 @@
+import json
+import logging
+import os
+import sqlite3
+import statistics
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from .cache import cache_root
+from .query_history import QueryHistoryProvider, QueryStats, describe_rollup, load_query_history, lookup_costs, rollup
+
+logger = logging.getLogger(__name__)
+
+# Regression rule: execute time above FACTOR x rolling median AND at least MIN_DELTA seconds slower
+BASELINE_WINDOW = 10
+BASELINE_MIN_SAMPLES = 3
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_DELTA_S = 5.0
+COST_LOOKBACK_MARGIN_S = 900
+
+# dbt's debug log as JSON lines: dagster-dbt writes it to the invocation's target path, and its
+# SQLQueryStatus events carry the query id of every statement, per node (see node_query_ids)
+QUERY_LOG_ARGS = ["--log-format-file", "json"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_timings (
+	run_id TEXT NOT NULL,
+	invocation_id TEXT,
+	target TEXT,
+	recorded_at TEXT NOT NULL,
+	unique_id TEXT NOT NULL,
+	status TEXT,
+	compile_s REAL,
+	execute_s REAL,
+	total_s REAL,
+	rows_affected INTEGER,
+	query_id TEXT,
+	scope TEXT,
+	PRIMARY KEY (run_id, unique_id)
+);
+CREATE INDEX IF NOT EXISTS ix_model_timings_uid ON model_timings (unique_id, recorded_at);
+CREATE TABLE IF NOT EXISTS step_timings (
+	run_id TEXT NOT NULL,
+	step TEXT NOT NULL,
+	depends_on TEXT,
+	started_at REAL NOT NULL,
+	finished_at REAL NOT NULL,
+	status TEXT,
+	PRIMARY KEY (run_id, step)
+);
+CREATE TABLE IF NOT EXISTS query_costs (
+	run_id TEXT NOT NULL,
+	unique_id TEXT NOT NULL,
+	query_id TEXT NOT NULL,
+	elapsed_s REAL,
+	execution_s REAL,
+	queued_s REAL,
+	bytes_scanned INTEGER,
+	partitions_scanned INTEGER,
+	partitions_total INTEGER,
+	bytes_spilled_local INTEGER,
+	bytes_spilled_remote INTEGER,
+	warehouse TEXT,
+	warehouse_size TEXT,
+	query_count INTEGER,
+	PRIMARY KEY (run_id, unique_id)
+);
+"""
+
+
+def history_path() -> Path:
+	"""SQLite file holding per-model timings (DBT_TIMING_HISTORY_DB overrides)."""
+	explicit = os.getenv("DBT_TIMING_HISTORY_DB")
+	return Path(explicit) if explicit else cache_root() / "dbt_timing_history.sqlite"
+
+
+@dataclass
+class ModelTiming:
+	unique_id: str
+	status: str
+	compile_s: Optional[float]
+	execute_s: Optional[float]
+	total_s: Optional[float]
+	rows_affected: Optional[int]
+	query_id: Optional[str]
+
+	@property
+	def name(self) -> str:
+		return self.unique_id.split(".")[-1]
+
+
+def _timing_seconds(result: Dict[str, Any], phase: str) -> Optional[float]:
+	for entry in result.get("timing") or []:
+		if entry.get("name") == phase and entry.get("started_at") and entry.get("completed_at"):
+			started = datetime.fromisoformat(entry["started_at"].replace("Z", "+00:00"))
+			completed = datetime.fromisoformat(entry["completed_at"].replace("Z", "+00:00"))
+			return (completed - started).total_seconds()
+	return None
+
+
+def run_scope(run_results: Dict[str, Any]) -> str:
+	"""
+	Baseline key of an invocation: the sorted names of its dbt vars ("" for a plain run).
+	Partition runs (partitions.py) and scoped change-capture refreshes (change_capture.py)
+	only rebuild a slice, so their timings are compared with runs of the same shape only.
+	"""
+	dbt_vars = (run_results.get("args") or {}).get("vars") or {}
+	if isinstance(dbt_vars, str):
+		try:
+			dbt_vars = json.loads(dbt_vars)
+		except ValueError:
+			return dbt_vars
+	return ",".join(sorted(dbt_vars)) if isinstance(dbt_vars, dict) else ""
+
+
+def parse_run_results(run_results: Dict[str, Any]) -> List[ModelTiming]:
+	"""Extract per-model compile/execute timing, rows affected and query id from run_results.json."""
+	timings: List[ModelTiming] = []
+	for result in run_results.get("results", []):
+		unique_id = result.get("unique_id", "")
+		if not unique_id.startswith("model."):
+			continue
+		adapter = result.get("adapter_response") or {}
+		rows = adapter.get("rows_affected")
+		timings.append(
+			ModelTiming(
+				unique_id=unique_id,
+				status=str(result.get("status")),
+				compile_s=_timing_seconds(result, "compile"),
+				execute_s=_timing_seconds(result, "execute"),
+				total_s=result.get("execution_time"),
+				rows_affected=int(rows) if rows is not None else None,
+				query_id=adapter.get("query_id"),
+			)
+		)
+	return timings
+
+
+def node_query_ids(target_path: Path, invocation_id: Optional[str] = None) -> Dict[str, List[str]]:
+	"""
+	unique_id -> query ids of every statement dbt ran for the node (temp-table builds, merges,
+	hooks, tests), from the SQLQueryStatus events of the JSON dbt.log (QUERY_LOG_ARGS).
+	Statements outside any node (on-run hooks, introspection) are keyed "invocation.<id>".
+	Empty when the log is missing or not JSON.
+	"""
+	path = Path(target_path) / "dbt.log"
+	ids: Dict[str, List[str]] = {}
+	if not path.is_file():
+		return ids
+	with path.open() as f:
+		for line in f:
+			try:
+				event = json.loads(line)
+			except ValueError:
+				continue
+			info = event.get("info") or {}
+			if info.get("name") != "SQLQueryStatus":
+				continue
+			if invocation_id and info.get("invocation_id") != invocation_id:
+				continue
+			data = event.get("data") or {}
+			if not data.get("query_id"):
+				continue
+			unique_id = (data.get("node_info") or {}).get("unique_id") or f"invocation.{info.get('invocation_id')}"
+			ids.setdefault(unique_id, []).append(data["query_id"])
+	return ids
+
+
+class TimingHistory:
+	"""Local per-model timing history with rolling-median baselines."""
+
+	def __init__(self, path: Optional[Path] = None):
+		self.path = Path(path) if path else history_path()
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		with self._connect() as conn:
+			conn.executescript(SCHEMA)
+			columns = {row[1] for row in conn.execute("PRAGMA table_info(model_timings)")}
+			if "scope" not in columns:
+				conn.execute("ALTER TABLE model_timings ADD COLUMN scope TEXT")
+			columns = {row[1] for row in conn.execute("PRAGMA table_info(query_costs)")}
+			if "query_count" not in columns:
+				conn.execute("ALTER TABLE query_costs ADD COLUMN query_count INTEGER")
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=30)
+
+	def record(
+		self, run_id: str, invocation_id: Optional[str], target: Optional[str], timings: List[ModelTiming], scope: str = ""
+	) -> None:
+		recorded_at = datetime.now(timezone.utc).isoformat()
+		with self._connect() as conn:
+			conn.executemany(
+				"INSERT OR REPLACE INTO model_timings"
+				" (run_id, invocation_id, target, recorded_at, unique_id, status, compile_s, execute_s, total_s,"
+				" rows_affected, query_id, scope) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+				[
+					(
+						run_id, invocation_id, target, recorded_at, t.unique_id, t.status,
+						t.compile_s, t.execute_s, t.total_s, t.rows_affected, t.query_id, scope,
+					)
+					for t in timings
+				],
+			)
+
+	def record_step(self, run_id: str, step: str, depends_on: List[str], started_at: float, finished_at: float, status: str) -> None:
+		"""Wall time of one dbt step (subgraph execution mode, see subgraphs.py)."""
+		with self._connect() as conn:
+			conn.execute(
+				"INSERT OR REPLACE INTO step_timings VALUES (?, ?, ?, ?, ?, ?)",
+				(run_id, step, json.dumps(depends_on), started_at, finished_at, status),
+			)
+
+	def steps(self, run_id: str) -> List[Dict[str, Any]]:
+		with self._connect() as conn:
+			rows = conn.execute(
+				"SELECT step, depends_on, started_at, finished_at, status FROM step_timings WHERE run_id = ? ORDER BY started_at",
+				(run_id,),
+			).fetchall()
+		return [
+			{"step": r[0], "depends_on": json.loads(r[1] or "[]"), "started_at": r[2], "finished_at": r[3], "status": r[4]}
+			for r in rows
+		]
+
+	def run_seconds(self, run_id: str) -> Dict[str, float]:
+		"""unique_id -> total seconds of every model timed in one run."""
+		with self._connect() as conn:
+			rows = conn.execute(
+				"SELECT unique_id, total_s FROM model_timings WHERE run_id = ? AND total_s IS NOT NULL", (run_id,)
+			).fetchall()
+		return {uid: total_s for uid, total_s in rows}
+
+	def record_costs(self, run_id: str, costs: Dict[str, QueryStats]) -> None:
+		"""Warehouse statistics of each node's queries (query_history.py)."""
+		with self._connect() as conn:
+			conn.executemany(
+				"INSERT OR REPLACE INTO query_costs"
+				" (run_id, unique_id, query_id, elapsed_s, execution_s, queued_s, bytes_scanned, partitions_scanned,"
+				" partitions_total, bytes_spilled_local, bytes_spilled_remote, warehouse, warehouse_size, query_count)"
+				" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+				[
+					(
+						run_id, uid, s.query_id, s.elapsed_s, s.execution_s, s.queued_s, s.bytes_scanned,
+						s.partitions_scanned, s.partitions_total, s.bytes_spilled_local, s.bytes_spilled_remote,
+						s.warehouse, s.warehouse_size, s.query_count,
+					)
+					for uid, s in costs.items()
+				],
+			)
+
+	def run_costs(self, run_id: str) -> Dict[str, QueryStats]:
+		"""unique_id -> query statistics recorded for one run (all of its dbt invocations)."""
+		with self._connect() as conn:
+			rows = conn.execute(
+				"SELECT unique_id, query_id, elapsed_s, execution_s, queued_s, bytes_scanned, partitions_scanned,"
+				" partitions_total, bytes_spilled_local, bytes_spilled_remote, warehouse, warehouse_size,"
+				" COALESCE(query_count, 1) FROM query_costs WHERE run_id = ?",
+				(run_id,),
+			).fetchall()
+		return {r[0]: QueryStats(*r[1:]) for r in rows}
+
+	def baselines(
+		self,
+		unique_ids: List[str],
+		target: Optional[str],
+		scope: str = "",
+		exclude_run_id: Optional[str] = None,
+		window: int = BASELINE_WINDOW,
+	) -> Dict[str, List[float]]:
+		"""
+		Last `window` successful execute times per model (newest first) on the same target and
+		run scope (see run_scope), excluding one run. Rows recorded before scopes existed count
+		as plain runs.
+		"""
+		out: Dict[str, List[float]] = {}
+		with self._connect() as conn:
+			for uid in unique_ids:
+				rows = conn.execute(
+					"SELECT execute_s FROM model_timings "
+					"WHERE unique_id = ? AND status = 'success' AND execute_s IS NOT NULL AND run_id != ? "
+					"AND target IS ? AND COALESCE(scope, '') = ? "
+					"ORDER BY recorded_at DESC LIMIT ?",
+					(uid, exclude_run_id or "", target, scope, window),
+				).fetchall()
+				out[uid] = [r[0] for r in rows]
+		return out
+
+
+def is_regression(execute_s: Optional[float], history: List[float]) -> Optional[float]:
+	"""Return the baseline (median) when execute_s regresses against it, else None."""
+	if execute_s is None or len(history) < BASELINE_MIN_SAMPLES:
+		return None
+	baseline = statistics.median(history)
+	if execute_s > baseline * REGRESSION_FACTOR and execute_s - baseline >= REGRESSION_MIN_DELTA_S:
+		return baseline
+	return None
+
+
+def dbt_output_name(unique_id: str) -> str:
+	# dagster-dbt names multi-asset outputs after the node's unique_id
+	return unique_id.replace(".", "_").replace("-", "_").replace("*", "_star")
+
+
+def record_invocation_timings(
+	context: Any,
+	target_path: Path,
+	assets_def: Any = None,
+	target: Optional[str] = None,
+	history: Optional[TimingHistory] = None,
+	query_history: Optional[QueryHistoryProvider] = None,
+	asset_keys: Optional[Mapping[str, Any]] = None,
+) -> Iterator[Any]:
+	"""
+	Store per-model timing from an invocation's run_results.json and yield an AssetObservation
+	per model (when `assets_def`, or `asset_keys` by unique_id outside an asset, maps it to an
+	asset) with the timings, dbt status and a regression flag.
+	With a query-history provider (`query_history` or DBT_QUERY_HISTORY_PROVIDER), the query ids of
+	every statement of the invocation (node_query_ids; invocations need QUERY_LOG_ARGS) are looked
+	up in one batch and each model's combined warehouse cost is added to its observation. Without
+	the JSON log only run_results' adapter query id, the model's last statement, is known.
+	"""
+	from dagster import AssetObservation, MetadataValue
+
+	path = Path(target_path) / "run_results.json"
+	if not path.is_file():
+		context.log.warning(f"No run_results.json in {target_path}; timing history not recorded")
+		return
+	run_results = json.loads(path.read_text())
+	timings = parse_run_results(run_results)
+	if not timings:
+		return
+	history = history or TimingHistory()
+	invocation_id = (run_results.get("metadata") or {}).get("invocation_id")
+	target = target or os.getenv("DBT_TARGET", "dev")
+	scope = run_scope(run_results)
+	history.record(context.run_id, invocation_id, target, timings, scope=scope)
+	baselines = history.baselines([t.unique_id for t in timings], target, scope=scope, exclude_run_id=context.run_id)
+	costs = _record_costs(
+		context, target_path, run_results, invocation_id, timings, history, query_history or load_query_history()
+	)
+
+	keys_by_output = assets_def.keys_by_output_name if assets_def is not None else {}
+	for t in timings:
+		baseline = statistics.median(baselines[t.unique_id]) if baselines[t.unique_id] else None
+		regressed_vs = is_regression(t.execute_s if t.status == "success" else None, baselines[t.unique_id])
+		if regressed_vs is not None:
+			context.log.warning(
+				f"⚠️ {t.name} slowed down: execute {t.execute_s:.1f}s vs rolling median {regressed_vs:.1f}s"
+			)
+		asset_key = keys_by_output.get(dbt_output_name(t.unique_id)) or (asset_keys or {}).get(t.unique_id)
+		if asset_key is None:
+			continue
+		metadata: Dict[str, Any] = {
+			"dbt_status": t.status,
+			"compile_seconds": MetadataValue.float(t.compile_s or 0.0),
+			"execute_seconds": MetadataValue.float(t.execute_s or 0.0),
+			"baseline_execute_seconds": MetadataValue.float(baseline) if baseline is not None else MetadataValue.null(),
+			"runtime_regression": MetadataValue.bool(regressed_vs is not None),
+		}
+		if t.rows_affected is not None:
+			metadata["rows_affected"] = MetadataValue.int(t.rows_affected)
+		if t.query_id:
+			metadata["query_id"] = MetadataValue.text(t.query_id)
+		if t.unique_id in costs:
+			metadata.update(costs[t.unique_id].metadata())
+		yield AssetObservation(asset_key=asset_key, metadata=metadata)
+
+
+def _record_costs(
+	context: Any,
+	target_path: Path,
+	run_results: Dict[str, Any],
+	invocation_id: Optional[str],
+	timings: List[ModelTiming],
+	history: TimingHistory,
+	provider: Optional[QueryHistoryProvider],
+) -> Dict[str, QueryStats]:
+	if provider is None:
+		return {}
+	# Look back over the invocation plus a margin for clock skew and queueing
+	elapsed = float(run_results.get("elapsed_time") or 0)
+	since = datetime.now(timezone.utc) - timedelta(seconds=elapsed + COST_LOOKBACK_MARGIN_S)
+	query_ids = node_query_ids(target_path, invocation_id)
+	for t in timings:
+		# run_results' last-statement id covers models when the JSON log is missing
+		if t.query_id and t.query_id not in query_ids.get(t.unique_id, []):
+			query_ids.setdefault(t.unique_id, []).append(t.query_id)
+	costs = lookup_costs(provider, query_ids, since=since)
+	if not costs:
+		return {}
+	history.record_costs(context.run_id, costs)
+	context.log.info(f"Warehouse cost of this invocation: {describe_rollup(rollup(costs.values()))}")
+	run_costs = history.run_costs(context.run_id)
+	if len(run_costs) > len(costs):
+		context.log.info(f"Warehouse cost of run {context.run_id} so far: {describe_rollup(rollup(run_costs.values()))}")
+	return costs
@@ -0,0 +1,350 @@
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from dagster import AssetExecutionContext
+from dagster_dbt import DbtCliResource, dbt_assets
+
+from .artifacts import effective_target
+from .run_history import QUERY_LOG_ARGS, TimingHistory, record_invocation_timings
+from .tenants import Tenant, TenantDbtTranslator
+from .threads import ThreadPlanner
+
+# "subgraphs" splits dbt_models into one multi-asset (Dagster step, dbt invocation) per subgraph
+EXECUTION_MODE_ENV = "DBT_EXECUTION_MODE"
+EXECUTION_MODE_SUBGRAPHS = "subgraphs"
+# "folder" (default): one subgraph per domain folder (models/<layer>/<domain>, e.g. forecast,
+# fact, master, vip); "components": one per connected component of the DAG
+STRATEGY_ENV = "DBT_SUBGRAPH_STRATEGY"
+SUBGRAPH_RESOURCE_TYPES = {"model", "seed", "snapshot"}
+# Failed steps keep their target directory (run_results.json for a resume); only the newest
+# runs' directories are kept
+TARGETS_KEPT_ENV = "DBT_SUBGRAPH_TARGETS_KEPT"
+DEFAULT_TARGETS_KEPT = 5
+
+
+def subgraphs_enabled() -> bool:
+	return os.getenv(EXECUTION_MODE_ENV, "single") == EXECUTION_MODE_SUBGRAPHS
+
+
+@dataclass(frozen=True)
+class Subgraph:
+	name: str
+	unique_ids: FrozenSet[str]
+	depends_on: FrozenSet[str]  # names of the subgraphs it reads from
+
+	def select(self, nodes: Mapping[str, Any]) -> str:
+		return " ".join(sorted("fqn:" + ".".join(nodes[uid]["fqn"]) for uid in self.unique_ids))
+
+
+def _folder_key(node: Mapping[str, Any]) -> str:
+	# fqn = [project, layer, domain, ..., name]; seeds/snapshots at the root fall back to their type
+	folders = node.get("fqn", [])[1:-1]
+	if len(folders) >= 2:
+		return folders[1]
+	return folders[0] if folders else f"{node['resource_type']}s"
+
+
+def _parents(nodes: Mapping[str, Any], uid: str) -> List[str]:
+	return [p for p in (nodes[uid].get("depends_on") or {}).get("nodes", []) if p in nodes]
+
+
+def _threaded_parents(nodes: Mapping[str, Any], uid: str, members: Set[str]) -> Set[str]:
+	"""Parents in `members`, looking through nodes outside it (ephemeral models, excluded facts)."""
+	found: Set[str] = set()
+	stack, seen = _parents(nodes, uid), set()
+	while stack:
+		parent = stack.pop()
+		if parent in seen:
+			continue
+		seen.add(parent)
+		if parent in members:
+			found.add(parent)
+		else:
+			stack.extend(_parents(nodes, parent))
+	return found
+
+
+def _strongly_connected(graph: Mapping[str, Set[str]]) -> List[List[str]]:
+	"""Tarjan's SCCs of a small graph (group names -> groups they depend on)."""
+	index: Dict[str, int] = {}
+	low: Dict[str, int] = {}
+	stack: List[str] = []
+	on_stack: Set[str] = set()
+	components: List[List[str]] = []
+
+	def visit(v: str) -> None:
+		index[v] = low[v] = len(index)
+		stack.append(v)
+		on_stack.add(v)
+		for w in graph.get(v, ()):
+			if w not in index:
+				visit(w)
+				low[v] = min(low[v], low[w])
+			elif w in on_stack:
+				low[v] = min(low[v], index[w])
+		if low[v] == index[v]:
+			component = []
+			while True:
+				w = stack.pop()
+				on_stack.discard(w)
+				component.append(w)
+				if w == v:
+					break
+			components.append(sorted(component))
+
+	for v in sorted(graph):
+		if v not in index:
+			visit(v)
+	return components
+
+
+def split_subgraphs(manifest: Mapping[str, Any], exclude: Iterable[str] = (), strategy: Optional[str] = None) -> List[Subgraph]:
+	"""
+	Partition the project's models, seeds and snapshots (minus `exclude` model names) into
+	subgraphs. Folder groups that depend on each other in a cycle are merged, so the subgraphs
+	always form a DAG that Dagster can order and run in parallel.
+	"""
+	strategy = strategy or os.getenv(STRATEGY_ENV, "folder")
+	nodes: Dict[str, Any] = manifest.get("nodes", {})
+	excluded = set(exclude)
+	members = {
+		uid for uid, n in nodes.items()
+		if n.get("resource_type") in SUBGRAPH_RESOURCE_TYPES
+		and (n.get("config") or {}).get("materialized") != "ephemeral"
+		and (n.get("config") or {}).get("enabled", True)
+		and n.get("name") not in excluded
+	}
+	parents = {uid: _threaded_parents(nodes, uid, members) for uid in members}
+
+	if strategy == "components":
+		root = {uid: uid for uid in members}
+
+		def find(uid: str) -> str:
+			while root[uid] != uid:
+				root[uid] = root[root[uid]]
+				uid = root[uid]
+			return uid
+
+		for uid, ps in parents.items():
+			for p in ps:
+				root[find(p)] = find(uid)
+		group_of = {uid: find(uid) for uid in members}
+	elif strategy == "folder":
+		group_of = {uid: _folder_key(nodes[uid]) for uid in members}
+	else:
+		raise ValueError(f"{STRATEGY_ENV} must be 'folder' or 'components', got '{strategy}'")
+
+	group_deps: Dict[str, Set[str]] = {g: set() for g in group_of.values()}
+	for uid, ps in parents.items():
+		group_deps[group_of[uid]].update(group_of[p] for p in ps if group_of[p] != group_of[uid])
+	# Merge dependency cycles between groups (e.g. staging/forecast <-> marts/master)
+	merged: Dict[str, str] = {}
+	for component in _strongly_connected(group_deps):
+		for g in component:
+			merged[g] = "_".join(component)
+
+	grouped: Dict[str, Set[str]] = {}
+	for uid in members:
+		grouped.setdefault(merged[group_of[uid]], set()).add(uid)
+	if strategy == "components":
+		# Name components after their most common domain folder, numbered when that repeats
+		names: Dict[str, str] = {}
+		used: Dict[str, int] = {}
+		for key, uids in sorted(grouped.items(), key=lambda kv: (-len(kv[1]), kv[0])):
+			folders = [_folder_key(nodes[u]) for u in uids]
+			base = max(sorted(set(folders)), key=folders.count)
+			used[base] = used.get(base, 0) + 1
+			names[key] = base if used[base] == 1 else f"{base}_{used[base]}"
+		grouped = {names[k]: v for k, v in grouped.items()}
+		merged = {g: names[m] for g, m in merged.items()}
+
+	subgraphs = []
+	for name, uids in sorted(grouped.items()):
+		deps = {merged[group_of[p]] for uid in uids for p in parents[uid]} - {name}
+		subgraphs.append(Subgraph(name=name, unique_ids=frozenset(uids), depends_on=frozenset(deps)))
+	return subgraphs
+
+
+def critical_path(durations: Mapping[str, float], depends_on: Mapping[str, Iterable[str]]) -> Tuple[float, List[str]]:
+	"""Longest chain (by summed duration) through a DAG; returns (seconds, chain root-first)."""
+	memo: Dict[str, Tuple[float, List[str]]] = {}
+
+	def longest(v: str) -> Tuple[float, List[str]]:
+		if v not in memo:
+			best: Tuple[float, List[str]] = (0.0, [])
+			for parent in depends_on.get(v, ()):
+				if parent in durations:
+					candidate = longest(parent)
+					if candidate[0] > best[0]:
+						best = candidate
+			memo[v] = (best[0] + durations[v], best[1] + [v])
+		return memo[v]
+
+	return max((longest(v) for v in durations), default=(0.0, []), key=lambda r: r[0])
+
+
+def downstream_steps(failed: Iterable[str], depends_on: Mapping[str, Iterable[str]]) -> Set[str]:
+	"""Steps that read, directly or not, from a failed step: Dagster skips them."""
+	failed_steps = set(failed)
+	blocked = set(failed_steps)
+	while True:
+		downstream = {s for s, deps in depends_on.items() if s not in blocked and blocked & set(deps)}
+		if not downstream:
+			return blocked - failed_steps
+		blocked |= downstream
+
+
+def critical_path_report(
+	steps: Sequence[Mapping[str, Any]],
+	manifest: Mapping[str, Any],
+	model_seconds: Mapping[str, float],
+	skipped: Iterable[str] = (),
+) -> str:
+	"""
+	Text report for one run: wall time, summed step time, the critical path of steps (what the
+	run could not finish faster than) and the critical path of models across all steps.
+	"""
+	durations = {s["step"]: s["finished_at"] - s["started_at"] for s in steps}
+	deps = {s["step"]: s["depends_on"] for s in steps}
+	wall = max(s["finished_at"] for s in steps) - min(s["started_at"] for s in steps)
+	step_path_s, step_path = critical_path(durations, deps)
+	nodes = manifest.get("nodes", {})
+	model_deps = {uid: _threaded_parents(nodes, uid, set(model_seconds)) for uid in model_seconds if uid in nodes}
+	model_path_s, model_path = critical_path(
+		{uid: s for uid, s in model_seconds.items() if uid in model_deps}, model_deps
+	)
+	lines = [
+		f"dbt subgraphs: {len(steps)} steps, wall {wall:.1f}s, summed {sum(durations.values()):.1f}s "
+		f"({sum(durations.values()) / wall if wall else 1:.1f}x parallelism)",
+		f"Critical path of steps ({step_path_s:.1f}s): "
+		+ " -> ".join(f"{s} {durations[s]:.1f}s" for s in step_path),
+		f"Critical path of models ({model_path_s:.1f}s): "
+		+ " -> ".join(f"{uid.split('.')[-1]} {model_seconds[uid]:.1f}s" for uid in model_path),
+	]
+	failed = [s["step"] for s in steps if s["status"] != "success"]
+	if failed:
+		lines.append(f"Failed steps: {', '.join(sorted(failed))}")
+	if skipped:
+		lines.append(f"Skipped after upstream failure: {', '.join(sorted(skipped))}")
+	return "\n".join(lines)
+
+
+def shared_parse_target(project_dir: Path, manifest_path: Path, run_id: str, step: str) -> Path:
+	"""
+	Step-private dbt target directory seeded with the cached parse (partial_parse.msgpack next to
+	the cached manifest), so concurrent steps neither re-parse the project nor share target/.
+	"""
+	root = Path(project_dir) / "target" / "subgraphs"
+	prune_subgraph_targets(root, keep=int(os.getenv(TARGETS_KEPT_ENV, DEFAULT_TARGETS_KEPT)), current=run_id)
+	target = root / run_id / step
+	target.mkdir(parents=True, exist_ok=True)
+	seed = Path(manifest_path).parent / "partial_parse.msgpack"
+	if seed.is_file() and not (target / seed.name).exists():
+		shutil.copy2(seed, target / seed.name)
+	return target
+
+
+def prune_subgraph_targets(root: Path, keep: int, current: str) -> None:
+	"""Delete all but the `keep` newest run directories under target/subgraphs (never `current`)."""
+	if not root.is_dir():
+		return
+	runs = sorted((d for d in root.iterdir() if d.is_dir() and d.name != current), key=lambda d: d.stat().st_mtime, reverse=True)
+	for stale in runs[max(keep - 1, 0):]:
+		shutil.rmtree(stale, ignore_errors=True)
+
+
+def remove_step_target(target_path: Path) -> None:
+	"""Delete a finished step's target directory, and its run directory once empty."""
+	shutil.rmtree(target_path, ignore_errors=True)
+	try:
+		target_path.parent.rmdir()
+	except OSError:
+		pass  # other steps of the run still have theirs
+
+
+def build_subgraph_assets(
+	manifest_path: Path,
+	tenant: Tenant,
+	exclude: Sequence[str],
+	planner: Optional[ThreadPlanner] = None,
+	history: Optional[TimingHistory] = None,
+) -> List[Any]:
+	"""
+	One dbt multi-asset per subgraph, replacing dbt_models. Dagster orders them by their asset
+	dependencies and runs independent ones in parallel; each runs its own `dbt build`. When the
+	last step of a run finishes (steps downstream of a failed one never run) it logs the
+	critical-path report.
+	"""
+	manifest = json.loads(Path(manifest_path).read_text())
+	subgraphs = split_subgraphs(manifest, exclude)
+	op_names = {sg.name: tenant.scoped(f"dbt_models_{sg.name}") for sg in subgraphs}
+	step_deps = {sg.name: sg.depends_on for sg in subgraphs}
+	return [
+		_build_subgraph_asset(sg, manifest, manifest_path, tenant, exclude, op_names, step_deps, planner, history)
+		for sg in subgraphs
+	]
+
+
+def _build_subgraph_asset(
+	sg: Subgraph,
+	manifest: Mapping[str, Any],
+	manifest_path: Path,
+	tenant: Tenant,
+	exclude: Sequence[str],
+	op_names: Mapping[str, str],
+	step_deps: Mapping[str, FrozenSet[str]],
+	planner: Optional[ThreadPlanner],
+	history: Optional[TimingHistory],
+) -> Any:
+	threads_args = planner.cli_args(effective_target(), sg.unique_ids) if planner else []
+
+	@dbt_assets(
+		manifest=manifest_path,
+		select=sg.select(manifest["nodes"]),
+		exclude=" ".join(exclude) or None,
+		name=op_names[sg.name],
+		dagster_dbt_translator=TenantDbtTranslator(tenant),
+		required_resource_keys={tenant.resource_key},
+	)
+	def dbt_subgraph(context: AssetExecutionContext):
+		dbt: DbtCliResource = getattr(context.resources, tenant.resource_key)
+		target_path = shared_parse_target(Path(dbt.project_dir), manifest_path, context.run_id, sg.name)
+		started, status = time.time(), "failure"
+		try:
+			invocation = dbt.cli(["build", *threads_args, *QUERY_LOG_ARGS], context=context, target_path=target_path)
+			yield from invocation.stream()
+			yield from record_invocation_timings(context, invocation.target_path, context.assets_def)
+			status = "success"
+			remove_step_target(target_path)
+		finally:
+			_record_step(context, sg, op_names, step_deps, started, status, manifest, history)
+
+	return dbt_subgraph
+
+
+def _record_step(
+	context: AssetExecutionContext,
+	sg: Subgraph,
+	op_names: Mapping[str, str],
+	step_deps: Mapping[str, FrozenSet[str]],
+	started: float,
+	status: str,
+	manifest: Mapping[str, Any],
+	history: Optional[TimingHistory],
+) -> None:
+	history = history or TimingHistory()
+	history.record_step(context.run_id, sg.name, sorted(sg.depends_on), started, time.time(), status)
+	run = context.instance.get_run_by_id(context.run_id)
+	planned = run.step_keys_to_execute if run is not None else None
+	by_op = {op: name for name, op in op_names.items()}
+	expected = {by_op[k] for k in planned if k in by_op} if planned else set(op_names)
+	steps = history.steps(context.run_id)
+	skipped = expected & downstream_steps((s["step"] for s in steps if s["status"] != "success"), step_deps)
+	if expected - skipped - {s["step"] for s in steps}:
+		return  # other steps of this run are still running
+	context.log.info(critical_path_report(steps, manifest, history.run_seconds(context.run_id), skipped))
@@ -0,0 +1,106 @@
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from dagster import AssetKey
+from dagster_dbt import DagsterDbtTranslator
+
+TENANTS_DIR = Path(__file__).resolve().parents[1] / "tenants"
+TENANT_DIR_PREFIX = "dbt_"
+# Run tag limited per tenant by run_queue.tag_concurrency_limits in deploy/dagster/dagster.yaml
+TENANT_TAG = "apollo/tenant"
+# Tenant that keeps the original (unscoped) asset keys, job/schedule names and resource key
+DEFAULT_TENANT = "williamgrant"
+
+
+def tenant_name(dir_name: str) -> str:
+	"""tenants/dbt_<name> -> <name>."""
+	return dir_name[len(TENANT_DIR_PREFIX):] if dir_name.startswith(TENANT_DIR_PREFIX) else dir_name
+
+
+@dataclass(frozen=True)
+class Tenant:
+	name: str
+	project_dir: Path
+	profile: Optional[str] = None  # dbt profile declared in dbt_project.yml
+
+	@property
+	def key(self) -> str:
+		"""Identifier-safe name used for resource keys, groups, job/schedule names and tags."""
+		return re.sub(r"[^A-Za-z0-9_]", "_", self.name).lower()
+
+	@property
+	def is_default(self) -> bool:
+		return self.name == os.getenv("DAGSTER_DEFAULT_TENANT", DEFAULT_TENANT)
+
+	@property
+	def resource_key(self) -> str:
+		return "dbt" if self.is_default else f"dbt_{self.key}"
+
+	@property
+	def group_name(self) -> str:
+		return self.key
+
+	@property
+	def run_tags(self) -> Dict[str, str]:
+		return {TENANT_TAG: self.key}
+
+	@property
+	def state_namespace(self) -> Optional[str]:
+		"""Artifact-store namespace for this tenant's prod state (None keeps the default layout)."""
+		return None if self.is_default else self.key
+
+	def scoped(self, name: str) -> str:
+		"""Job/schedule/op name for this tenant; the default tenant keeps existing names."""
+		return name if self.is_default else f"{name}_{self.key}"
+
+
+def _declared_profile(project_dir: Path) -> Optional[str]:
+	try:
+		import yaml
+		cfg = yaml.safe_load((project_dir / "dbt_project.yml").read_text()) or {}
+	except Exception:
+		return None
+	profile = cfg.get("profile")
+	return str(profile) if profile else None
+
+
+def discover_tenants(root: Optional[Path] = None) -> List[Tenant]:
+	"""
+	Every dbt project directly under tenants/ (a directory with dbt_project.yml), sorted by name.
+	DAGSTER_TENANTS (comma-separated names, with or without the dbt_ prefix) restricts the set,
+	e.g. to split tenants across several code locations. DAGSTER_TENANTS_DIR replaces tenants/
+	(e.g. with the synthetic projects of scripts/benchmarks/python_tooling.py).
+	"""
+	root = Path(root or os.getenv("DAGSTER_TENANTS_DIR") or TENANTS_DIR)
+	wanted = {tenant_name(t.strip()) for t in os.getenv("DAGSTER_TENANTS", "").split(",") if t.strip()}
+	tenants: List[Tenant] = []
+	for project_dir in sorted(p for p in root.iterdir() if (p / "dbt_project.yml").is_file()):
+		name = tenant_name(project_dir.name)
+		if wanted and name not in wanted:
+			continue
+		tenants.append(Tenant(name=name, project_dir=project_dir, profile=_declared_profile(project_dir)))
+	if wanted - {t.name for t in tenants}:
+		missing = ", ".join(sorted(wanted - {t.name for t in tenants}))
+		raise RuntimeError(f"DAGSTER_TENANTS names unknown tenant(s): {missing} (looked in {root})")
+	return tenants
+
+
+class TenantDbtTranslator(DagsterDbtTranslator):
+	"""
+	Puts every dbt node of a tenant in the tenant's asset group and, for tenants other than the
+	default one, prefixes asset keys with the tenant key so identical model names cannot collide.
+	"""
+
+	def __init__(self, tenant: Tenant):
+		super().__init__()
+		self.tenant = tenant
+
+	def get_asset_key(self, dbt_resource_props: Mapping[str, Any]) -> AssetKey:
+		key = super().get_asset_key(dbt_resource_props)
+		return key if self.tenant.is_default else key.with_prefix(self.tenant.key)
+
+	def get_group_name(self, dbt_resource_props: Mapping[str, Any]) -> Optional[str]:
+		return self.tenant.group_name
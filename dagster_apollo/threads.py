@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .warehouses import TargetSpec, load_target_specs
+
+logger = logging.getLogger(__name__)
+
+# Nodes that hold a dbt thread while they run (tests are short and follow their model)
+THREADED_RESOURCE_TYPES = {"model", "seed", "snapshot"}
+# Dagster's run_queue.max_concurrent_runs default, used when no instance config is found
+DEFAULT_CONCURRENT_RUNS = 10
+
+
+def _is_threaded(node: Mapping[str, Any]) -> bool:
+	if node.get("resource_type") not in THREADED_RESOURCE_TYPES:
+		return False
+	return (node.get("config") or {}).get("materialized") != "ephemeral"
+
+
+def dag_levels(manifest: Mapping[str, Any]) -> Dict[str, int]:
+	"""
+	Level of every threaded node: the longest chain of threaded ancestors above it. Nodes of
+	one level never depend on each other, so they can all run at once. Ephemeral models are
+	inlined by dbt and pass their parents' level through.
+	"""
+	nodes: Dict[str, Any] = manifest.get("nodes", {})
+	levels: Dict[str, int] = {}
+	stack_guard: set = set()
+
+	def level(uid: str) -> int:
+		if uid in levels:
+			return levels[uid]
+		if uid in stack_guard:
+			return 0
+		stack_guard.add(uid)
+		best = 0
+		for parent in (nodes.get(uid, {}).get("depends_on") or {}).get("nodes", []):
+			if parent not in nodes:
+				continue  # sources
+			best = max(best, level(parent) + (1 if _is_threaded(nodes[parent]) else 0))
+		stack_guard.discard(uid)
+		levels[uid] = best
+		return best
+
+	for uid in nodes:
+		level(uid)
+	return {uid: lvl for uid, lvl in levels.items() if _is_threaded(nodes[uid])}
+
+
+def dag_width(levels: Mapping[str, int], unique_ids: Optional[Iterable[str]] = None) -> int:
+	"""Most threaded nodes on one level, i.e. the useful dbt --threads for the selection."""
+	wanted = set(unique_ids) if unique_ids is not None else None
+	counts: Dict[int, int] = {}
+	for uid, lvl in levels.items():
+		if wanted is None or uid in wanted:
+			counts[lvl] = counts.get(lvl, 0) + 1
+	return max(counts.values(), default=1)
+
+
+def _instance_yaml() -> Optional[Path]:
+	home = os.getenv("DAGSTER_HOME")
+	path = Path(home) / "dagster.yaml" if home else None
+	return path if path and path.is_file() else None
+
+
+def max_concurrent_runs() -> int:
+	"""
+	Dagster runs that may share the warehouse at once: DAGSTER_MAX_CONCURRENT_RUNS, else
+	run_queue.max_concurrent_runs in $DAGSTER_HOME/dagster.yaml, else DEFAULT_CONCURRENT_RUNS.
+	"""
+	explicit = os.getenv("DAGSTER_MAX_CONCURRENT_RUNS")
+	if explicit:
+		return max(1, int(explicit))
+	path = _instance_yaml()
+	if path is not None:
+		try:
+			import yaml
+			cfg = yaml.safe_load(path.read_text()) or {}
+			runs = int(((cfg.get("run_queue") or {}).get("max_concurrent_runs")) or 0)
+			if runs > 0:
+				return runs
+		except Exception as e:
+			logger.warning("Could not read run_queue.max_concurrent_runs from %s: %s", path, e)
+	return DEFAULT_CONCURRENT_RUNS
+
+
+@dataclass(frozen=True)
+class ThreadPlan:
+	target: str
+	threads: int
+	planned: bool  # False when the target has a fixed thread count
+	dag_width: int
+	concurrent_runs: int
+	query_slots: int
+
+	def describe(self) -> str:
+		if not self.planned:
+			return f"{self.target}: {self.threads} threads (fixed)"
+		share = max(1, self.query_slots // self.concurrent_runs)
+		return (
+			f"{self.target}: {self.threads} threads = min(DAG width {self.dag_width}, "
+			f"{self.query_slots} warehouse slots / {self.concurrent_runs} concurrent runs = {share})"
+		)
+
+
+def static_threads(spec: TargetSpec, default_warehouse: Optional[str], concurrent_runs: Optional[int] = None) -> int:
+	"""Threads for profiles.yml, before any manifest is known: the run's share of the slots."""
+	if spec.threads:
+		return spec.threads
+	return max(1, spec.slots(default_warehouse) // (concurrent_runs or max_concurrent_runs()))
+
+
+class ThreadPlanner:
+	"""
+	Sizes `dbt --threads` per target: as many threads as the selection's DAG is wide, but no
+	more than the run's share of the target's warehouse slots when every Dagster run slot is
+	busy. Targets with a fixed thread count (DBT_THREADS / DBT_TARGETS) are left alone.
+	"""
+
+	def __init__(
+		self,
+		manifest_path: Path,
+		specs: Optional[Mapping[str, TargetSpec]] = None,
+		concurrent_runs: Optional[int] = None,
+		default_warehouse: Optional[str] = None,
+	):
+		manifest = json.loads(Path(manifest_path).read_text())
+		self.levels = dag_levels(manifest)
+		self._names = {
+			uid: manifest["nodes"][uid].get("name") for uid in self.levels
+		}
+		self.specs = dict(specs) if specs is not None else load_target_specs()
+		self.concurrent_runs = concurrent_runs or max_concurrent_runs()
+		self.default_warehouse = default_warehouse or os.getenv("SNOWFLAKE_WAREHOUSE")
+		self._plans: Dict[Tuple[str, Optional[frozenset]], ThreadPlan] = {}
+
+	def _unique_ids(self, select: Optional[Iterable[str]]) -> Optional[frozenset]:
+		if select is None:
+			return None
+		wanted = set(select)
+		return frozenset(uid for uid, name in self._names.items() if uid in wanted or name in wanted)
+
+	def plan(self, target: str, select: Optional[Iterable[str]] = None) -> Optional[ThreadPlan]:
+		"""Plan for a target (None for targets that are not generated, e.g. local); `select`
+		restricts the DAG to these model names or unique ids."""
+		spec = self.specs.get(target)
+		if spec is None:
+			return None
+		ids = self._unique_ids(select)
+		cache_key = (target, ids)
+		if cache_key not in self._plans:
+			width = dag_width(self.levels, ids)
+			slots = spec.slots(self.default_warehouse)
+			if spec.threads:
+				threads, planned = spec.threads, False
+			else:
+				threads, planned = max(1, min(width, slots // self.concurrent_runs)), True
+			self._plans[cache_key] = ThreadPlan(target, threads, planned, width, self.concurrent_runs, slots)
+		return self._plans[cache_key]
+
+	def cli_args(self, target: str, select: Optional[Iterable[str]] = None) -> List[str]:
+		"""`--threads N` for planned targets, nothing otherwise (profiles.yml applies)."""
+		plan = self.plan(target, select)
+		return ["--threads", str(plan.threads)] if plan and plan.planned else []
+
+	def describe(self) -> List[str]:
+		return [plan.describe() for plan in (self.plan(t) for t in self.specs) if plan]
@@ -0,0 +1,97 @@
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+# Generated Snowflake targets: inline JSON, or the path of a .json/.yml file (see README)
+TARGETS_ENV = "DBT_TARGETS"
+# {target: {route: warehouse}} for dbt, written by ensure_profiles(); read by dbt_project.yml
+# (per layer) and the warehouse_route() macro (per tag)
+ROUTES_ENV = "DBT_WAREHOUSE_ROUTES"
+# dev/prod are always generated; other targets are named dev_<x> / prod_<x> and use that
+# environment's database (macros/target_env.sql)
+BASE_TARGETS = ("dev", "prod")
+AUTO_THREADS = "auto"
+# Statements one Snowflake warehouse cluster runs at once before queueing (MAX_CONCURRENCY_LEVEL)
+DEFAULT_QUERY_SLOTS = 8
+
+
+@dataclass(frozen=True)
+class TargetSpec:
+	"""
+	One generated Snowflake output. `threads=None` lets the thread planner size it (threads.py);
+	`routes` assign a warehouse per model layer (staging, marts) or tag (heavy).
+	"""
+	name: str
+	warehouse: Optional[str] = None  # default SNOWFLAKE_WAREHOUSE
+	threads: Optional[int] = None
+	query_slots: Optional[int] = None  # default DEFAULT_QUERY_SLOTS per distinct warehouse
+	routes: Dict[str, str] = field(default_factory=dict)
+
+	@property
+	def environment(self) -> str:
+		return self.name.split("_", 1)[0]
+
+	def warehouses(self, default_warehouse: Optional[str]) -> List[str]:
+		"""Distinct warehouses this target's models run on (default first)."""
+		names = [self.warehouse or default_warehouse or "", *self.routes.values()]
+		return list(dict.fromkeys(n.upper() for n in names if n))
+
+	def slots(self, default_warehouse: Optional[str]) -> int:
+		if self.query_slots:
+			return self.query_slots
+		return DEFAULT_QUERY_SLOTS * max(1, len(self.warehouses(default_warehouse)))
+
+
+def _parse_threads(value: Any, where: str) -> Optional[int]:
+	if value is None or str(value).strip().lower() == AUTO_THREADS:
+		return None
+	threads = int(value)
+	if threads < 1:
+		raise ValueError(f"{where}: threads must be >= 1 or '{AUTO_THREADS}'")
+	return threads
+
+
+def default_threads() -> Optional[int]:
+	"""DBT_THREADS as a fixed count, or None (planned) when unset or 'auto'."""
+	return _parse_threads(os.getenv("DBT_THREADS"), "DBT_THREADS")
+
+
+def _read_targets(raw: str) -> Mapping[str, Any]:
+	text = raw.strip()
+	if not text.startswith("{"):
+		path = Path(text).expanduser()
+		text = path.read_text()
+		if path.suffix in (".yml", ".yaml"):
+			import yaml
+			return yaml.safe_load(text) or {}
+	return json.loads(text)
+
+
+def load_target_specs() -> Dict[str, TargetSpec]:
+	"""
+	Targets from DBT_TARGETS ({name: {warehouse, threads, query_slots, routes}}) plus dev and
+	prod, which default to SNOWFLAKE_WAREHOUSE and DBT_THREADS when not configured.
+	"""
+	raw = os.getenv(TARGETS_ENV)
+	configured = _read_targets(raw) if raw else {}
+	specs: Dict[str, TargetSpec] = {}
+	for name, cfg in configured.items():
+		cfg = cfg or {}
+		if name.split("_", 1)[0] not in BASE_TARGETS:
+			raise ValueError(f"{TARGETS_ENV}: target '{name}' must be dev, prod, dev_<name> or prod_<name>")
+		specs[name] = TargetSpec(
+			name=name,
+			warehouse=cfg.get("warehouse"),
+			threads=_parse_threads(cfg["threads"], f"{TARGETS_ENV}.{name}") if "threads" in cfg else default_threads(),
+			query_slots=int(cfg["query_slots"]) if cfg.get("query_slots") else None,
+			routes={str(k): str(v) for k, v in (cfg.get("routes") or {}).items()},
+		)
+	for name in BASE_TARGETS:
+		specs.setdefault(name, TargetSpec(name=name, threads=default_threads()))
+	return specs
+
+
+def routes_env_value(specs: Mapping[str, TargetSpec]) -> str:
+	return json.dumps({name: spec.routes for name, spec in specs.items() if spec.routes}, sort_keys=True)
@@ -0,0 +1,898 @@
+#!/usr/bin/env python3
+"""
+Chunked, resumable, parallel Postgres -> Snowflake backfill.
+
+Replaces the one-statement-per-table INSERT OVERWRITEs in
+tenants/dbt_<tenant>/pg_migration/postgre_to_snowflake_backfill_standard_tables.sql with a
+load that can be split, parallelized and resumed. Tables are described in
+tenants/dbt_<tenant>/pg_migration/backfill_tables.json (`--config` to override):
+
+- Each table is read in keyset-paginated chunks (`WHERE (k1, k2) > (...) ORDER BY k1, k2
+  LIMIT n`) on its key, i.e. the spec's "key" or else the source table's primary key. The key
+  must be unique and NOT NULL, otherwise rows at chunk boundaries would be skipped (the final
+  source count check reports it).
+- Each chunk is shaped like the SQL did it (constant file_name / file_date, last_updated_glue
+  renamed to last_updated_at, "drop" columns removed, NOT EXISTS filter on the current table)
+  and staged as a Snappy-compressed Parquet file under `--stage-dir`.
+- `--table-workers` tables are read concurrently; staged chunks are loaded on a separate pool
+  of `--load-workers`. Columns are matched by name: source columns the target lacks are
+  ignored, target columns the chunk lacks load as NULL.
+- Targets are truncated once, before their first chunk (INSERT OVERWRITE semantics); several
+  specs may feed one target (SLSDA hist + current).
+- Every chunk records its row count and a SHA-256 checksum of its canonicalized rows. The
+  staged file is read back and must match, and the sink must report the same number of loaded
+  rows. At the end, each spec's chunk total is compared with a COUNT(*) over the source query
+  and each target's row count with the rows loaded into it.
+- Progress is checkpointed (atomically, after every chunk) to `--checkpoint`. Re-running the
+  same command resumes: staged-but-unloaded chunks are loaded (re-read from the source if the
+  file is gone) and reading continues after the last staged key. `--restart` starts over.
+  Loads are idempotent per chunk (Snowflake COPY load history, a chunk ledger table in DuckDB),
+  so a chunk that loaded right before a crash is not loaded twice.
+
+Sources: `postgresql://...` (psycopg 3, or psycopg2) or `sqlite:///path` (local stand-in).
+Sinks: `snowflake` (named connection `--profile`, PUT + COPY INTO via `--stage`) or
+`duckdb:///path` (local stand-in). Optional dependencies: pip install -r requirements-backfill.txt
+
+Usage:
+    python scripts/backfill/pg_to_snowflake_backfill.py --source postgresql://user@host/db --sink snowflake --profile apollo
+    python scripts/backfill/pg_to_snowflake_backfill.py --source "$BACKFILL_SOURCE_URL" --sink snowflake --profile apollo_wgs --only SLSDA --chunk-rows 500000
+    python scripts/backfill/pg_to_snowflake_backfill.py --source sqlite:///tmp/pg.db --sink duckdb:///tmp/sf.duckdb --schema main
+    python scripts/backfill/pg_to_snowflake_backfill.py --source "$BACKFILL_SOURCE_URL" --sink snowflake --profile apollo --dry-run
+    python scripts/backfill/pg_to_snowflake_backfill.py --source "$BACKFILL_SOURCE_URL" --sink snowflake --profile apollo --restart
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_TENANT = "williamgrant"
+STATE_DIR = REPO_ROOT / "scripts" / "backfill" / ".state"
+DEFAULT_STAGE = "@~/apollo_backfill"
+CHECKPOINT_VERSION = 1
+
+Row = Tuple[Any, ...]
+
+
+def tenant_backfill_config(tenant: str) -> Path:
+    return REPO_ROOT / "tenants" / f"dbt_{tenant}" / "pg_migration" / "backfill_tables.json"
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """One source query feeding one target table (see backfill_tables.json)."""
+    name: str
+    source: str
+    target: str
+    file_name: str
+    file_date: str
+    key: Tuple[str, ...] = ()
+    drop: Tuple[str, ...] = ()
+    last_updated_at: Optional[str] = None  # constant; default: last_updated_glue renamed
+    not_exists: Optional[Dict[str, Any]] = None  # {"source", "on": [...], "as_text": bool}
+    where: Optional[str] = None
+
+
+@dataclass
+class BackfillConfig:
+    source_schema: str
+    target_database: Optional[str]
+    target_schema: str
+    tables: List[TableSpec]
+
+
+def load_config(path: Path) -> BackfillConfig:
+    raw = json.loads(path.read_text())
+    tables = []
+    for t in raw["tables"]:
+        tables.append(TableSpec(
+            name=t["name"],
+            source=t["source"],
+            target=t["target"],
+            file_name=t["file_name"],
+            file_date=t["file_date"],
+            key=tuple(t.get("key", ())),
+            drop=tuple(c.lower() for c in t.get("drop", ())),
+            last_updated_at=t.get("last_updated_at"),
+            not_exists=t.get("not_exists"),
+            where=t.get("where"),
+        ))
+    names = [t.name for t in tables]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate table names in {path}")
+    return BackfillConfig(
+        source_schema=raw.get("source_schema", "public"),
+        target_database=raw.get("target_database"),
+        target_schema=raw.get("target_schema", "PUBLIC"),
+        tables=tables,
+    )
+
+
+def spec_fingerprint(specs: Sequence[TableSpec]) -> str:
+    payload = json.dumps([s.__dict__ for s in specs], sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------------------------
+# Keys and checksums
+# ---------------------------------------------------------------------------------------------
+
+def encode_value(value: Any) -> Any:
+    """JSON-safe, type-tagged key value for the checkpoint."""
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    return value
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        (kind, text), = value.items()
+        return {"datetime": datetime.fromisoformat, "date": date.fromisoformat, "decimal": Decimal}[kind](text)
+    return value
+
+
+def _canonical(value: Any) -> Any:
+    # Stable across the source driver and a Parquet round trip (decimal scale, timezone, bytes)
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+def rows_checksum(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    digest = hashlib.sha256(json.dumps([c.lower() for c in columns]).encode("utf-8"))
+    for row in rows:
+        digest.update(json.dumps([_canonical(v) for v in row], separators=(",", ":"), default=str).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def shape_rows(spec: TableSpec, columns: Sequence[str], rows: Sequence[Row]) -> Tuple[List[str], List[Row]]:
+    """Apply the per-table projection of the SQL backfill to a chunk read with SELECT *."""
+    keep = [i for i, c in enumerate(columns) if c.lower() not in spec.drop]
+    out_columns = [columns[i] for i in keep]
+    if spec.last_updated_at is None:
+        out_columns = ["last_updated_at" if c.lower() == "last_updated_glue" else c for c in out_columns]
+    constants: List[Tuple[str, Any]] = [
+        ("file_name", spec.file_name),
+        ("file_date", date.fromisoformat(spec.file_date)),
+    ]
+    if spec.last_updated_at is not None:
+        constants.append(("last_updated_at", datetime.fromisoformat(spec.last_updated_at)))
+    lowered = {c.lower() for c in out_columns}
+    constants = [(c, v) for c, v in constants if c not in lowered]
+    extra = tuple(v for _, v in constants)
+    out_rows = [tuple(row[i] for i in keep) + extra for row in rows]
+    return out_columns + [c for c, _ in constants], out_rows
+
+
+# ---------------------------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------------------------
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _relation(schema: Optional[str], table: str) -> str:
+    return f"{_quote(schema)}.{_quote(table)}" if schema else _quote(table)
+
+
+def source_filter(spec: TableSpec, schema: Optional[str], text_cast: str) -> List[str]:
+    """WHERE conditions of a spec's source query (alias s)."""
+    conditions = []
+    if spec.where:
+        conditions.append(f"({spec.where})")
+    if spec.not_exists:
+        cast = (lambda e: f"CAST({e} AS {text_cast})") if spec.not_exists.get("as_text") else (lambda e: e)
+        on = " AND ".join(
+            f"{cast('s.' + _quote(c))} = {cast('o.' + _quote(c))}" for c in spec.not_exists["on"]
+        )
+        conditions.append(
+            f"NOT EXISTS (SELECT 1 FROM {_relation(schema, spec.not_exists['source'])} o WHERE {on})"
+        )
+    return conditions
+
+
+def chunk_query(
+    spec: TableSpec,
+    schema: Optional[str],
+    key: Sequence[str],
+    after: Optional[Sequence[Any]],
+    placeholder: str,
+    text_cast: str = "TEXT",
+) -> str:
+    conditions = source_filter(spec, schema, text_cast)
+    if after is not None:
+        columns = ", ".join(f"s.{_quote(k)}" for k in key)
+        marks = ", ".join(placeholder for _ in key)
+        conditions.append(f"({columns}) > ({marks})")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = ", ".join(f"s.{_quote(k)}" for k in key)
+    return f"SELECT s.* FROM {_relation(schema, spec.source)} s{where} ORDER BY {order} LIMIT {placeholder}"
+
+
+def count_query(spec: TableSpec, schema: Optional[str], text_cast: str = "TEXT") -> str:
+    conditions = source_filter(spec, schema, text_cast)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT COUNT(*) FROM {_relation(schema, spec.source)} s{where}"
+
+
+class Source(Protocol):
+    """Read side of the backfill; implementations must be usable from several threads."""
+
+    def primary_key(self, table: str) -> List[str]: ...
+
+    def read_chunk(
+        self, spec: TableSpec, key: Sequence[str], after: Optional[Sequence[Any]], limit: int
+    ) -> Tuple[List[str], List[Row]]: ...
+
+    def count(self, spec: TableSpec) -> int: ...
+
+
+class PostgresSource:
+    """Postgres source over psycopg 3 (or psycopg2); one connection per thread."""
+
+    def __init__(self, dsn: str, schema: str):
+        try:
+            import psycopg  # type: ignore
+            self._connect = lambda: psycopg.connect(dsn, autocommit=True)
+        except ImportError:
+            try:
+                import psycopg2  # type: ignore
+            except ImportError as e:
+                raise RuntimeError(
+                    "Postgres sources require psycopg (pip install -r requirements-backfill.txt)"
+                ) from e
+
+            def connect() -> Any:
+                conn = psycopg2.connect(dsn)
+                conn.autocommit = True
+                return conn
+            self._connect = connect
+        self.schema = schema
+        self._local = threading.local()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Row]]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        with conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            return [d[0] for d in cur.description], [tuple(r) for r in cur.fetchall()]
+
+    def primary_key(self, table: str) -> List[str]:
+        _, rows = self._query(
+            "SELECT a.attname FROM pg_index i "
+            "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+            "WHERE i.indrelid = %s::regclass AND i.indisprimary "
+            "ORDER BY array_position(i.indkey::int2[], a.attnum)",
+            (_relation(self.schema, table),),
+        )
+        return [r[0] for r in rows]
+
+    def read_chunk(self, spec, key, after, limit):
+        sql = chunk_query(spec, self.schema, key, after, "%s")
+        return self._query(sql, list(after or ()) + [limit])
+
+    def count(self, spec: TableSpec) -> int:
+        return int(self._query(count_query(spec, self.schema))[1][0][0])
+
+
+class SQLiteSource:
+    """Local stand-in for Postgres: a SQLite file with the same tables (schema is ignored)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Row]]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES)
+        cur = conn.execute(sql, tuple(params))
+        return [d[0] for d in cur.description], [tuple(r) for r in cur.fetchall()]
+
+    def primary_key(self, table: str) -> List[str]:
+        _, rows = self._query(f"PRAGMA table_info({_quote(table)})")
+        return [r[1] for r in sorted((r for r in rows if r[5]), key=lambda r: r[5])]
+
+    def read_chunk(self, spec, key, after, limit):
+        sql = chunk_query(spec, None, key, after, "?")
+        return self._query(sql, list(after or ()) + [limit])
+
+    def count(self, spec: TableSpec) -> int:
+        return int(self._query(count_query(spec, None))[1][0][0])
+
+
+# ---------------------------------------------------------------------------------------------
+# Staging
+# ---------------------------------------------------------------------------------------------
+
+def _pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Staging requires pyarrow (pip install -r requirements-backfill.txt)") from e
+    return pa, pq
+
+
+def write_chunk(path: Path, columns: Sequence[str], rows: Sequence[Row]) -> str:
+    """Write a chunk as Snappy-compressed Parquet (atomically); returns the file's SHA-256."""
+    pa, pq = _pyarrow()
+    table = pa.table({c: pa.array([r[i] for r in rows]) for i, c in enumerate(columns)})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp, compression="snappy")
+    os.replace(tmp, path)
+    return file_sha256(path)
+
+
+def read_chunk_file(path: Path) -> Tuple[List[str], List[Row]]:
+    _, pq = _pyarrow()
+    table = pq.read_table(path)
+    columns = table.column_names
+    vectors = [table.column(c).to_pylist() for c in columns]
+    return columns, list(zip(*vectors)) if vectors else []
+
+
+# ---------------------------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------------------------
+
+class Sink(Protocol):
+    """Write side of the backfill; implementations must be usable from several threads."""
+
+    def prepare(self, target: str) -> None:
+        """Empty the target before its first chunk."""
+        ...
+
+    def load_chunk(self, target: str, chunk_id: str, path: Path) -> Optional[int]:
+        """Load one staged file; rows loaded, or None when this chunk was already loaded."""
+        ...
+
+    def count(self, target: str) -> int: ...
+
+
+class SnowflakeSink:
+    """PUT each chunk to an internal stage and COPY INTO the target (MATCH_BY_COLUMN_NAME).
+
+    COPY's load history skips a file it already loaded, which makes chunk loads idempotent
+    across resumed runs (TRUNCATE resets that history, and only happens in prepare()).
+    """
+
+    def __init__(self, profile: str, database: Optional[str], schema: str, stage: str, run_id: str):
+        try:
+            import snowflake.connector  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "Snowflake sinks require snowflake-connector-python (pip install snowflake-connector-python)"
+            ) from e
+        self._connect = lambda: snowflake.connector.connect(connection_name=profile)
+        self.database = database
+        self.schema = schema
+        self.stage = stage.rstrip("/")
+        self.run_id = run_id
+        self._local = threading.local()
+
+    def _execute(self, sql: str) -> Tuple[List[str], List[Row]]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            columns = [d[0].lower() for d in cur.description or []]
+            return columns, [tuple(r) for r in cur.fetchall()] if columns else []
+
+    def _table(self, target: str) -> str:
+        parts = [p for p in (self.database, self.schema, target) if p]
+        return ".".join(_quote(p) for p in parts)
+
+    def prepare(self, target: str) -> None:
+        self._execute(f"TRUNCATE TABLE {self._table(target)}")
+
+    def load_chunk(self, target: str, chunk_id: str, path: Path) -> Optional[int]:
+        prefix = f"{self.stage}/{self.run_id}/{Path(chunk_id).parent.as_posix()}"
+        self._execute(f"PUT 'file://{path.resolve().as_posix()}' '{prefix}/' AUTO_COMPRESS=FALSE OVERWRITE=TRUE")
+        columns, rows = self._execute(
+            f"COPY INTO {self._table(target)} FROM '{prefix}/' FILES = ('{path.name}') "
+            "FILE_FORMAT = (TYPE = PARQUET) MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE ON_ERROR = ABORT_STATEMENT"
+        )
+        self._execute(f"REMOVE '{prefix}/{path.name}'")
+        if "rows_loaded" not in columns:
+            return None  # "Copy executed with 0 files processed": already in the load history
+        result = dict(zip(columns, rows[0]))
+        if str(result.get("status", "")).upper() != "LOADED":
+            raise RuntimeError(f"COPY of {chunk_id} into {target} returned {result}")
+        return int(result["rows_loaded"])
+
+    def count(self, target: str) -> int:
+        return int(self._execute(f"SELECT COUNT(*) FROM {self._table(target)}")[1][0][0])
+
+
+class DuckDBSink:
+    """Local stand-in for Snowflake. Loads run in a transaction together with an entry in a
+    _backfill_chunks ledger, which makes them idempotent like COPY's load history."""
+
+    LEDGER = "_backfill_chunks"
+
+    def __init__(self, path: str, schema: str):
+        try:
+            import duckdb  # type: ignore
+        except ImportError as e:
+            raise RuntimeError("DuckDB sinks require duckdb (pip install -r requirements-bench.txt)") from e
+        self._conn = duckdb.connect(path)
+        self.schema = schema
+        self._lock = threading.Lock()  # DuckDB allows a single writer per database
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.LEDGER} (target VARCHAR, chunk_id VARCHAR, rows BIGINT, "
+            "PRIMARY KEY (target, chunk_id))"
+        )
+
+    def _table(self, target: str) -> str:
+        return f"{_quote(self.schema)}.{_quote(target)}"
+
+    def prepare(self, target: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(f"DELETE FROM {self._table(target)}")
+            self._conn.execute(f"DELETE FROM {self.LEDGER} WHERE target = ?", [target])
+            self._conn.execute("COMMIT")
+
+    def load_chunk(self, target: str, chunk_id: str, path: Path) -> Optional[int]:
+        with self._lock:
+            if self._conn.execute(
+                f"SELECT 1 FROM {self.LEDGER} WHERE target = ? AND chunk_id = ?", [target, chunk_id]
+            ).fetchone():
+                return None
+            target_columns = {
+                r[0].lower(): r[0]
+                for r in self._conn.execute(f"DESCRIBE {self._table(target)}").fetchall()
+            }
+            file_columns = [
+                r[0] for r in self._conn.execute("DESCRIBE SELECT * FROM read_parquet(?)", [str(path)]).fetchall()
+            ]
+            matched = [c for c in file_columns if c.lower() in target_columns]
+            names = ", ".join(_quote(target_columns[c.lower()]) for c in matched)
+            select = ", ".join(_quote(c) for c in matched)
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    f"INSERT INTO {self._table(target)} ({names}) SELECT {select} FROM read_parquet(?)", [str(path)]
+                )
+                rows = self._conn.execute("SELECT COUNT(*) FROM read_parquet(?)", [str(path)]).fetchone()[0]
+                self._conn.execute(f"INSERT INTO {self.LEDGER} VALUES (?, ?, ?)", [target, chunk_id, rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return int(rows)
+
+    def count(self, target: str) -> int:
+        with self._lock:
+            return int(self._conn.execute(f"SELECT COUNT(*) FROM {self._table(target)}").fetchone()[0])
+
+
+# ---------------------------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------------------------
+
+class Checkpoint:
+    """JSON progress file, rewritten atomically (tmp + rename) on every change."""
+
+    def __init__(self, path: Path, state: Dict[str, Any]):
+        self.path = path
+        self.state = state
+        self._lock = threading.RLock()
+
+    @classmethod
+    def open(cls, path: Path, fingerprint: str, restart: bool) -> "Checkpoint":
+        if path.exists() and not restart:
+            state = json.loads(path.read_text())
+            if state.get("version") != CHECKPOINT_VERSION or state.get("fingerprint") != fingerprint:
+                raise ValueError(
+                    f"Checkpoint {path} was written for a different table config; rerun with --restart"
+                )
+            return cls(path, state)
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": fingerprint,
+            "run_id": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6],
+            "targets": {},
+            "tables": {},
+        }
+        checkpoint = cls(path, state)
+        checkpoint.save()
+        return checkpoint
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+
+    def table(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            return self.state["tables"].setdefault(
+                name, {"key": None, "last_key": None, "read_done": False, "source_rows": None, "chunks": []}
+            )
+
+    def update(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            fn(self.state)
+            self.save()
+
+
+# ---------------------------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------------------------
+
+@dataclass
+class BackfillResult:
+    ok: bool = True
+    errors: List[str] = field(default_factory=list)
+    chunks_loaded: int = 0
+    rows_loaded: int = 0
+
+
+class Backfill:
+    def __init__(
+        self,
+        source: Source,
+        sink: Sink,
+        specs: Sequence[TableSpec],
+        checkpoint: Checkpoint,
+        stage_dir: Path,
+        chunk_rows: int,
+        table_workers: int,
+        load_workers: int,
+        keep_files: bool = False,
+        complete_targets: Optional[Sequence[str]] = None,
+    ):
+        self.source = source
+        self.sink = sink
+        self.specs = list(specs)
+        self.checkpoint = checkpoint
+        self.stage_dir = stage_dir
+        self.chunk_rows = chunk_rows
+        self.table_workers = max(1, table_workers)
+        self.load_workers = max(1, load_workers)
+        self.keep_files = keep_files
+        # Targets whose every feeding spec is in this run (only those get a target-level count check)
+        self.complete_targets = set(complete_targets if complete_targets is not None else [s.target for s in specs])
+        self.result = BackfillResult()
+        self._stop = threading.Event()
+        self._result_lock = threading.Lock()
+        # Bounds staged-but-unloaded chunks so readers cannot outrun the loaders on disk
+        self._pending = threading.BoundedSemaphore(self.load_workers * 2)
+        self._loads: List[Future] = []
+        self._loads_lock = threading.Lock()
+
+    def _fail(self, message: str) -> None:
+        logger.error(message)
+        with self._result_lock:
+            self.result.ok = False
+            self.result.errors.append(message)
+        self._stop.set()
+
+    def _key(self, spec: TableSpec) -> List[str]:
+        state = self.checkpoint.table(spec.name)
+        if state["key"]:
+            return state["key"]
+        key = list(spec.key) or self.source.primary_key(spec.source)
+        if not key:
+            raise ValueError(f"{spec.name}: {spec.source} has no primary key; set \"key\" in the table config")
+        self.checkpoint.update(lambda s: s["tables"][spec.name].__setitem__("key", key))
+        return key
+
+    def _prepare_targets(self) -> None:
+        for target in dict.fromkeys(s.target for s in self.specs):
+            if self.checkpoint.state["targets"].get(target, {}).get("prepared"):
+                continue
+            logger.info(f"Truncating target {target}")
+            self.sink.prepare(target)
+            self.checkpoint.update(lambda s, t=target: s["targets"].__setitem__(t, {"prepared": True}))
+
+    def _stage(self, spec: TableSpec, seq: int, columns: List[str], rows: List[Row]) -> Tuple[str, str, str]:
+        """Shape, checksum, write and read back one chunk; returns (file, checksum, file sha256)."""
+        shaped_columns, shaped_rows = shape_rows(spec, columns, rows)
+        checksum = rows_checksum(shaped_columns, shaped_rows)
+        relative = f"{spec.name}/chunk_{seq:06d}.parquet"
+        path = self.stage_dir / relative
+        sha = write_chunk(path, shaped_columns, shaped_rows)
+        staged_columns, staged_rows = read_chunk_file(path)
+        if len(staged_rows) != len(rows) or rows_checksum(staged_columns, staged_rows) != checksum:
+            raise RuntimeError(f"{spec.name} chunk {seq}: staged file does not match the rows read")
+        return relative, checksum, sha
+
+    def _restage(self, spec: TableSpec, chunk: Dict[str, Any]) -> None:
+        """Re-read a chunk whose staged file is gone (or damaged) and check it matches."""
+        after = [decode_value(v) for v in chunk["after"]] if chunk["after"] is not None else None
+        columns, rows = self.source.read_chunk(spec, self._key(spec), after, chunk["rows"])
+        relative, checksum, sha = self._stage(spec, chunk["seq"], columns, rows)
+        if checksum != chunk["checksum"]:
+            raise RuntimeError(f"{spec.name} chunk {chunk['seq']}: source rows changed since it was staged")
+        self.checkpoint.update(lambda s: chunk.__setitem__("file_sha256", sha))
+
+    def _load(self, spec: TableSpec, chunk: Dict[str, Any]) -> None:
+        try:
+            if self._stop.is_set():
+                return
+            path = self.stage_dir / chunk["file"]
+            if not path.exists() or file_sha256(path) != chunk["file_sha256"]:
+                logger.info(f"{spec.name} chunk {chunk['seq']}: staged file missing, re-reading from source")
+                self._restage(spec, chunk)
+            loaded = self.sink.load_chunk(spec.target, chunk["file"], path)
+            if loaded is None:
+                logger.info(f"{spec.name} chunk {chunk['seq']}: already loaded into {spec.target}")
+                loaded = chunk["rows"]
+            elif loaded != chunk["rows"]:
+                raise RuntimeError(
+                    f"{spec.name} chunk {chunk['seq']}: {spec.target} loaded {loaded} rows, expected {chunk['rows']}"
+                )
+            self.checkpoint.update(lambda s: chunk.__setitem__("loaded_rows", loaded))
+            with self._result_lock:
+                self.result.chunks_loaded += 1
+                self.result.rows_loaded += loaded
+            if not self.keep_files:
+                path.unlink(missing_ok=True)
+        except Exception as e:
+            self._fail(f"{spec.name} chunk {chunk['seq']}: load failed: {e}")
+        finally:
+            self._pending.release()
+
+    def _submit_load(self, pool: ThreadPoolExecutor, spec: TableSpec, chunk: Dict[str, Any]) -> None:
+        self._pending.acquire()
+        future = pool.submit(self._load, spec, chunk)
+        with self._loads_lock:
+            self._loads.append(future)
+
+    def _read_table(self, pool: ThreadPoolExecutor, spec: TableSpec) -> None:
+        try:
+            key = self._key(spec)
+            state = self.checkpoint.table(spec.name)
+            # Chunks staged by an interrupted run
+            for chunk in state["chunks"]:
+                if chunk["loaded_rows"] is None and not self._stop.is_set():
+                    self._submit_load(pool, spec, chunk)
+            started = time.perf_counter()
+            while not state["read_done"] and not self._stop.is_set():
+                after_encoded = state["last_key"]
+                after = [decode_value(v) for v in after_encoded] if after_encoded is not None else None
+                columns, rows = self.source.read_chunk(spec, key, after, self.chunk_rows)
+                if not rows:
+                    self.checkpoint.update(lambda s: state.__setitem__("read_done", True))
+                    break
+                index = [c.lower() for c in columns]
+                last = [encode_value(rows[-1][index.index(k.lower())]) for k in key]
+                seq = len(state["chunks"]) + 1
+                relative, checksum, sha = self._stage(spec, seq, columns, rows)
+                chunk = {
+                    "seq": seq,
+                    "after": after_encoded,
+                    "last": last,
+                    "rows": len(rows),
+                    "checksum": checksum,
+                    "file": relative,
+                    "file_sha256": sha,
+                    "loaded_rows": None,
+                }
+
+                def record(s: Dict[str, Any]) -> None:
+                    state["chunks"].append(chunk)
+                    state["last_key"] = last
+                    state["read_done"] = len(rows) < self.chunk_rows
+                self.checkpoint.update(record)
+                logger.info(f"{spec.name}: staged chunk {seq} ({len(rows)} rows)")
+                self._submit_load(pool, spec, chunk)
+            if state["read_done"] and state["source_rows"] is None:
+                source_rows = self.source.count(spec)
+                self.checkpoint.update(lambda s: state.__setitem__("source_rows", source_rows))
+                logger.info(f"{spec.name}: read finished in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            self._fail(f"{spec.name}: read failed: {e}")
+
+    def _verify(self) -> None:
+        loaded_by_target: Dict[str, int] = {}
+        for spec in self.specs:
+            state = self.checkpoint.table(spec.name)
+            read = sum(c["rows"] for c in state["chunks"])
+            loaded = sum(c["loaded_rows"] or 0 for c in state["chunks"])
+            loaded_by_target[spec.target] = loaded_by_target.get(spec.target, 0) + loaded
+            if state["source_rows"] != read:
+                self._fail(f"{spec.name}: source has {state['source_rows']} rows but {read} were read (is the key unique?)")
+            elif loaded != read:
+                self._fail(f"{spec.name}: {loaded} of {read} rows loaded")
+            else:
+                logger.info(f"{spec.name}: {read} rows in {len(state['chunks'])} chunks verified")
+        for target, expected in loaded_by_target.items():
+            if target not in self.complete_targets:
+                logger.info(f"{target}: not every spec feeding it ran, skipping the target row count check")
+                continue
+            actual = self.sink.count(target)
+            if actual != expected:
+                self._fail(f"{target}: has {actual} rows, expected {expected}")
+            else:
+                logger.info(f"{target}: {actual} rows verified")
+
+    def run(self) -> BackfillResult:
+        started = time.perf_counter()
+        self._prepare_targets()
+        with ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix="load") as load_pool:
+            with ThreadPoolExecutor(max_workers=self.table_workers, thread_name_prefix="read") as read_pool:
+                list(read_pool.map(lambda spec: self._read_table(load_pool, spec), self.specs))
+            with self._loads_lock:
+                loads = list(self._loads)
+            for future in loads:
+                future.result()
+        if self.result.ok:
+            self._verify()
+        logger.info(
+            f"Loaded {self.result.chunks_loaded} chunks ({self.result.rows_loaded} rows) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return self.result
+
+
+# ---------------------------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------------------------
+
+def open_source(url: str, schema: str) -> Source:
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresSource(url, schema)
+    if url.startswith("sqlite:///"):
+        return SQLiteSource(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported source '{url}'. Use postgresql://... or sqlite:///path")
+
+
+def open_sink(spec: str, profile: Optional[str], database: Optional[str], schema: str, stage: str, run_id: str) -> Sink:
+    if spec == "snowflake":
+        if not profile:
+            raise ValueError("--sink snowflake requires --profile")
+        return SnowflakeSink(profile, database, schema, stage, run_id)
+    if spec.startswith("duckdb:///"):
+        return DuckDBSink(spec[len("duckdb:///"):], schema)
+    raise ValueError(f"Unsupported sink '{spec}'. Use snowflake or duckdb:///path")
+
+
+def select_specs(specs: Sequence[TableSpec], only: Optional[Sequence[str]]) -> List[TableSpec]:
+    if not only:
+        return list(specs)
+    wanted = {o.lower() for o in only}
+    selected = [s for s in specs if s.name.lower() in wanted or s.target.lower() in wanted]
+    unknown = wanted - {s.name.lower() for s in selected} - {s.target.lower() for s in selected}
+    if unknown:
+        raise ValueError(f"Unknown tables for --only: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chunked, resumable Postgres -> Snowflake backfill")
+    parser.add_argument("--source", default=os.getenv("BACKFILL_SOURCE_URL"), help="postgresql://... or sqlite:///path (default: $BACKFILL_SOURCE_URL)")
+    parser.add_argument("--sink", default="snowflake", help="'snowflake' (default) or duckdb:///path")
+    parser.add_argument("--profile", choices=["apollo", "apollo_wgs"], help="Snowflake connection profile for --sink snowflake")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help=f"Tenant whose pg_migration/backfill_tables.json to use (default: {DEFAULT_TENANT})")
+    parser.add_argument("--config", type=Path, help="Table config (default: the tenant's backfill_tables.json)")
+    parser.add_argument("--database", help="Target database (default: target_database from the config)")
+    parser.add_argument("--schema", help="Target schema (default: target_schema from the config)")
+    parser.add_argument("--source-schema", help="Source schema (default: source_schema from the config)")
+    parser.add_argument("--stage", default=DEFAULT_STAGE, help=f"Snowflake stage for chunk files (default: {DEFAULT_STAGE})")
+    parser.add_argument("--only", action="append", help="Backfill only this table name or target (repeatable)")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    parser.add_argument("--table-workers", type=int, default=4, help="Tables read concurrently (default: 4)")
+    parser.add_argument("--load-workers", type=int, default=4, help="Chunks loaded concurrently (default: 4)")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: scripts/backfill/.state/<tenant>.json)")
+    parser.add_argument("--stage-dir", type=Path, help="Local directory for chunk files (default: scripts/backfill/.state/<tenant>/)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over (targets are truncated again)")
+    parser.add_argument("--keep-files", action="store_true", help="Keep local chunk files after they are loaded")
+    parser.add_argument("--dry-run", action="store_true", help="Show tables, keys, source row counts and checkpoint progress")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.source:
+        logger.error("No source: pass --source or set BACKFILL_SOURCE_URL")
+        sys.exit(2)
+    config_path = args.config or tenant_backfill_config(args.tenant)
+    config = load_config(config_path)
+    try:
+        specs = select_specs(config.tables, args.only)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(2)
+    selected_names = {s.name for s in specs}
+    complete_targets = [
+        t for t in {s.target for s in specs}
+        if all(s.name in selected_names for s in config.tables if s.target == t)
+    ]
+    checkpoint_path = args.checkpoint or STATE_DIR / f"{args.tenant}.json"
+    stage_dir = args.stage_dir or STATE_DIR / args.tenant
+    source = open_source(args.source, args.source_schema or config.source_schema)
+
+    if args.dry_run:
+        state = json.loads(checkpoint_path.read_text()) if checkpoint_path.exists() else {"tables": {}}
+        for spec in specs:
+            key = list(spec.key) or source.primary_key(spec.source)
+            done = state["tables"].get(spec.name, {})
+            progress = f"{sum(c['rows'] for c in done.get('chunks', []))} rows staged" if done else "not started"
+            logger.info(f"{spec.name} -> {spec.target}: key ({', '.join(key) or 'NONE'}), {source.count(spec)} source rows, {progress}")
+        return
+
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+        shutil.rmtree(stage_dir, ignore_errors=True)
+    checkpoint = Checkpoint.open(checkpoint_path, spec_fingerprint(config.tables), args.restart)
+    sink = open_sink(
+        args.sink,
+        args.profile,
+        args.database or config.target_database,
+        args.schema or config.target_schema,
+        args.stage,
+        checkpoint.state["run_id"],
+    )
+    logger.info(f"Backfill run {checkpoint.state['run_id']}: {len(specs)} tables, checkpoint {checkpoint_path}")
+    result = Backfill(
+        source,
+        sink,
+        specs,
+        checkpoint,
+        stage_dir,
+        chunk_rows=args.chunk_rows,
+        table_workers=args.table_workers,
+        load_workers=args.load_workers,
+        keep_files=args.keep_files,
+        complete_targets=complete_targets,
+    ).run()
+    if not result.ok:
+        logger.error(f"Backfill incomplete ({len(result.errors)} errors); rerun the same command to resume")
+    sys.exit(0 if result.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,774 @@
+#!/usr/bin/env python3
+"""
+Local latency benchmark for the forecast UDTFs and batch-save procedure.
+
+Builds an embedded DuckDB database with synthetic VW_GET_DEPLETIONS_BASE, budget, publication
+and manual-input data at a configurable scale, transpiles the Snowflake bodies of the backend
+functions from tenants/dbt_<tenant>/backend_functions (sqlglot, snowflake -> duckdb) into DuckDB
+macros, then replays a realistic mix of filter calls (market/customer/brand/variant arrays,
+including empty arrays and NULLs) and reports p50/p95 latency and rows/s per function.
+
+Absolute numbers are not Snowflake numbers; use the benchmark to compare two versions of the
+SQL on the same machine (save a baseline before a change, diff after).
+
+Benchmarked:
+- FORECAST.UDTF_GET_DEPLETIONS_FORECAST
+- FORECAST.UDTF_GET_DEPLETIONS_BUDGET
+- FORECAST.UDTF_GET_MARKET_PUBLISHED_FORECAST
+- FORECAST.SP_BATCH_SAVE_FORECASTS (statements replayed in one transaction; pre-flight checks enforced)
+
+Requires the optional benchmark dependencies: pip install -r requirements-bench.txt
+
+Usage:
+    python scripts/benchmarks/backend_latency.py
+    python scripts/benchmarks/backend_latency.py --scale 2 --calls 200 --by-mix
+    python scripts/benchmarks/backend_latency.py --save-baseline scripts/benchmarks/baselines/backend_latency.json
+    python scripts/benchmarks/backend_latency.py --baseline scripts/benchmarks/baselines/backend_latency.json --fail-on-regression
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from baseline import DEFAULT_THRESHOLD, compare, load_baseline, print_comparison, print_results, save_baseline, summarize
+
+try:
+    import duckdb
+    import sqlglot
+    from sqlglot import exp
+except ImportError as e:  # pragma: no cover - optional dependency
+    print(f"Missing benchmark dependency ({e.name}). Install with: pip install -r requirements-bench.txt", file=sys.stderr)
+    sys.exit(2)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_TENANT = "williamgrant"
+FORECAST_METHODS = ["six_month", "three_month", "twelve_month", "run_rate", "flat"]
+FGMD = date(2025, 6, 1)
+PREVIOUS_FGMD = date(2025, 5, 1)
+
+ROUTINE_RE = re.compile(r"CREATE\s+OR\s+REPLACE\s+(FUNCTION|PROCEDURE)\s+([\w.]+)\s*\(", re.IGNORECASE)
+STATEMENT_START_RE = re.compile(r"^\s*(?:BEGIN\s+)?(SELECT|MERGE|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+SELECT_INTO_RE = re.compile(r"\bINTO\s+:\w+", re.IGNORECASE)
+BIND_RE = re.compile(r":([PV]_\w+)\b")
+LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+
+DUCKDB_TYPES = {
+    "ARRAY": "VARCHAR[]",
+    "VARCHAR": "VARCHAR",
+    "TEXT": "VARCHAR",
+    "DATE": "DATE",
+    "INTEGER": "BIGINT",
+    "NUMBER": "BIGINT",
+    "BOOLEAN": "BOOLEAN",
+    "FLOAT": "DOUBLE",
+}
+
+
+class BenchmarkError(RuntimeError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Snowflake routine parsing and transpilation
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Param:
+    name: str
+    sf_type: str
+    default: Optional[str] = None
+
+    @property
+    def duckdb_type(self) -> str:
+        return DUCKDB_TYPES.get(self.sf_type.upper().split("(")[0], "VARCHAR")
+
+
+@dataclass
+class Routine:
+    kind: str  # FUNCTION | PROCEDURE
+    name: str
+    params: List[Param]
+    returns_table: bool
+    body: str
+
+
+def _split_top_level(text: str, sep: str = ",") -> List[str]:
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_routine(sql: str) -> Routine:
+    """Signature and $$ body of a `CREATE OR REPLACE FUNCTION|PROCEDURE` file."""
+    match = ROUTINE_RE.search(sql)
+    if not match:
+        raise BenchmarkError("No CREATE OR REPLACE FUNCTION/PROCEDURE found")
+    depth, i = 1, match.end()
+    while depth:
+        depth += {"(": 1, ")": -1}.get(sql[i], 0)
+        i += 1
+    params = []
+    for raw in _split_top_level(LINE_COMMENT_RE.sub("", sql[match.end():i - 1])):
+        tokens = raw.split()
+        default = None
+        if len(tokens) >= 4 and tokens[2].upper() == "DEFAULT":
+            default = " ".join(tokens[3:])
+        params.append(Param(tokens[0], tokens[1], default))
+    body_start = sql.index("$$", i) + 2
+    body = sql[body_start:sql.index("$$", body_start)]
+    returns_table = bool(re.match(r"\s*RETURNS\s+TABLE\b", sql[i:body_start], re.IGNORECASE))
+    return Routine(match.group(1).upper(), match.group(2), params, returns_table, body)
+
+
+def _json_path(node: exp.JSONPath) -> str:
+    keys = [str(part.this) for part in node.expressions if isinstance(part, exp.JSONPathKey)]
+    return "$." + ".".join(keys)
+
+
+def _to_duckdb(node: exp.Expression) -> exp.Expression:
+    """Rewrite Snowflake-only constructs the generic transpiler does not map faithfully."""
+    # x::VARIANT only exists for ARRAY_CONTAINS typing in Snowflake
+    if isinstance(node, exp.Cast) and node.to.this == exp.DataType.Type.VARIANT:
+        return node.this
+    # DuckDB rejects qualified targets in UPDATE SET (target.col = ...) and MERGE ... UPDATE SET
+    if isinstance(node, exp.Update):
+        for assignment in node.expressions:
+            if isinstance(assignment, exp.EQ) and isinstance(assignment.this, exp.Column):
+                assignment.set("this", exp.column(assignment.this.name))
+        return node
+    # value:key -> json_extract_string(value, '$.key') (text, like a Snowflake variant cast to VARCHAR)
+    if isinstance(node, exp.JSONExtract) and node.args.get("variant_extract"):
+        return exp.Anonymous(
+            this="json_extract_string",
+            expressions=[node.this, exp.Literal.string(_json_path(node.expression))],
+        )
+    # TABLE(FLATTEN(INPUT => PARSE_JSON(x))) f -> (SELECT UNNEST(CAST(x AS JSON[])) AS value) f
+    if isinstance(node, exp.TableFromRows) and isinstance(node.this, exp.Explode):
+        arg = node.this.this
+        source = arg.expression if isinstance(arg, exp.Kwarg) else arg
+        if isinstance(source, exp.ParseJSON):
+            source = source.this
+        subquery = sqlglot.parse_one(
+            f"SELECT UNNEST(CAST({source.sql(dialect='duckdb')} AS JSON[])) AS value", read="duckdb"
+        ).subquery(node.alias or "f")
+        return subquery
+    return node
+
+
+def transpile(sql: str) -> exp.Expression:
+    """Parse one Snowflake statement (bind variables become plain identifiers) into a DuckDB AST."""
+    expression = sqlglot.parse_one(BIND_RE.sub(r"\1", sql), read="snowflake")
+    return expression.transform(_to_duckdb)
+
+
+def bind_params(expression: exp.Expression, values: Dict[str, str]) -> str:
+    """Replace unqualified column references named like parameters with SQL literals."""
+    upper = {k.upper(): v for k, v in values.items()}
+
+    def substitute(node: exp.Expression) -> exp.Expression:
+        if isinstance(node, exp.Column) and not node.table and node.name.upper() in upper:
+            return sqlglot.parse_one(upper[node.name.upper()], read="duckdb")
+        return node
+
+    return expression.transform(substitute).sql(dialect="duckdb")
+
+
+def sql_literal(value: Any, param: Param) -> str:
+    if value is None:
+        return f"CAST(NULL AS {param.duckdb_type})"
+    if isinstance(value, (list, tuple)):
+        items = ", ".join("'" + str(v).replace("'", "''") + "'" for v in value)
+        return f"CAST([{items}] AS VARCHAR[])"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def install_function(con: Any, routine: Routine) -> None:
+    """Create a DuckDB macro (scalar or table) from a transpiled Snowflake SQL function."""
+    params = ", ".join(f"{p.name} := NULL" if p.default is not None else p.name for p in routine.params)
+    body = transpile(routine.body).sql(dialect="duckdb")
+    if routine.returns_table:
+        con.execute(f"CREATE OR REPLACE MACRO {routine.name}({params}) AS TABLE {body}")
+    else:
+        con.execute(f"CREATE OR REPLACE MACRO {routine.name}({params}) AS ({body})")
+
+
+def procedure_statements(routine: Routine) -> List[exp.Expression]:
+    """
+    Top-level DML/query statements of a Snowflake Scripting procedure, in order. Control flow
+    (DECLARE, IF/RAISE, assignments, BEGIN/COMMIT) is dropped; `SELECT ... INTO :var` becomes a
+    plain query whose result the caller checks.
+    """
+    statements = []
+    for chunk in _split_top_level(LINE_COMMENT_RE.sub("", routine.body), sep=";"):
+        match = STATEMENT_START_RE.match(chunk)
+        if not match:
+            continue
+        statement = chunk[match.start(1):]
+        statements.append(transpile(SELECT_INTO_RE.sub("", statement)))
+    return statements
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Dims:
+    markets: int
+    customers_per_market: int
+    size_packs: int
+    coverage: float = 0.6
+
+    @classmethod
+    def for_scale(cls, scale: float) -> "Dims":
+        return cls(
+            markets=max(2, round(12 * scale)),
+            customers_per_market=max(2, round(6 * scale ** 0.5)),
+            size_packs=max(12, round(80 * scale)),
+        )
+
+    def market_codes(self) -> List[str]:
+        return [f"USM{m:03d}" for m in range(self.markets)]
+
+    def customer_ids(self, market: int) -> List[str]:
+        return [f"{market * self.customers_per_market + c:05d}" for c in range(self.customers_per_market)]
+
+    def brands(self) -> List[str]:
+        return [f"Brand {b}" for b in range((self.size_packs + 11) // 12)]
+
+    def variants(self) -> List[str]:
+        return [f"Variant {v}" for v in range((self.size_packs + 3) // 4)]
+
+    def size_pack_ids(self) -> List[str]:
+        return [f"VSP{v:05d}" for v in range(self.size_packs)]
+
+    def size_pack_descs(self) -> List[str]:
+        return [f"Variant {v // 4} 750ml {6 * (1 + v % 4)}pk" for v in range(self.size_packs)]
+
+
+def generate_dataset(con: Any, dims: Dims, seed: int) -> Dict[str, int]:
+    """Create and fill the FORECAST tables the benchmarked routines read and write. Returns row counts."""
+    rand = lambda *cols: f"(hash({', '.join(cols)}, {seed}) % 1000000) / 1000000.0"  # noqa: E731
+    con.execute("CREATE SCHEMA IF NOT EXISTS FORECAST")
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.DEPLETIONS_FORECAST_PLATFORM_STATUS AS
+        SELECT 1 AS ID, DATE '{FGMD}' AS VALID_FORECAST_GENERATION_MONTH_DATE
+    """)
+    methods = "[" + ", ".join(f"'{m}'" for m in FORECAST_METHODS) + "]"
+    # (market, customer, size pack) combinations carried by a distributor
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE carried AS
+        SELECT
+            m, c, v,
+            format('USM{{:03d}}', m) AS market_code,
+            'Market ' || m AS market_name,
+            'Area ' || (m % 4) AS market_area_name,
+            lpad(CAST(m * {dims.customers_per_market} + c AS VARCHAR), 5, '0') AS customer_id,
+            lpad(CAST(m * {dims.customers_per_market} + c AS VARCHAR), 5, '0') || '01' AS distributor_id,
+            'Distributor ' || (m * {dims.customers_per_market} + c) AS distributor_name,
+            'Brand ' || (v // 12) AS brand,
+            'Variant ' || (v // 4) AS variant,
+            'VAR' || lpad(CAST(v // 4 AS VARCHAR), 4, '0') AS variant_id,
+            'Variant ' || (v // 4) || ' 750ml ' || (6 * (1 + v % 4)) || 'pk' AS variant_size_pack_desc,
+            format('VSP{{:05d}}', v) AS variant_size_pack_id,
+            {methods}[1 + CAST(hash(m, c, v, {seed}) % {len(FORECAST_METHODS)} AS INTEGER)] AS primary_method
+        FROM range({dims.markets}) t1(m), range({dims.customers_per_market}) t2(c), range({dims.size_packs}) t3(v)
+        WHERE {rand('m', 'c', 'v')} < {dims.coverage}
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.VW_GET_DEPLETIONS_BASE AS
+        SELECT
+            k.market_code AS MARKET_ID, k.market_name AS MARKET, k.market_area_name AS MARKET_AREA_NAME,
+            k.customer_id AS CUSTOMER_ID, k.distributor_name AS CUSTOMER,
+            k.brand AS BRAND, k.variant AS VARIANT, k.variant_id AS VARIANT_ID,
+            k.variant_size_pack_desc AS VARIANT_SIZE_PACK_DESC, k.variant_size_pack_id AS VARIANT_SIZE_PACK_ID,
+            CAST(year(mo.month_date) AS INTEGER) AS YEAR, CAST(month(mo.month_date) AS INTEGER) AS MONTH,
+            fm.method AS FORECAST_METHOD,
+            g.fgmd AS FORECAST_GENERATION_MONTH_DATE,
+            CASE WHEN mo.month_date < g.fgmd THEN 'actual_complete' ELSE 'forecast' END AS DATA_TYPE,
+            CASE WHEN {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i')} < 0.03 THEN 'manual' ELSE 'draft' END AS SOURCE_TABLE,
+            CASE WHEN {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i')} < 0.03 THEN round(200 * {rand('k.v', 'mo.i')}, 2) END AS MANUAL_CASE_EQUIVALENT_VOLUME,
+            CAST(NULL AS VARCHAR) AS PUBLICATION_STATUS,
+            CASE WHEN {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i')} < 0.03 THEN 'draft' END AS MANUAL_FORECAST_STATUS,
+            'draft' AS BASE_FORECAST_STATUS,
+            CAST(NULL AS INTEGER) AS VERSION_NUMBER,
+            CASE WHEN {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i')} < 0.03 THEN 1 END AS MANUAL_CURRENT_VERSION,
+            CAST(NULL AS INTEGER) AS GROUP_ID,
+            CAST(NULL AS INTEGER) AS PUBLICATION_ID,
+            CASE WHEN k.v % 7 = 0 THEN [1, 2] ELSE [] END AS TAG_IDS,
+            CASE WHEN k.v % 7 = 0 THEN ['core', 'focus'] ELSE [] END AS TAG_NAMES,
+            CAST(NULL AS VARCHAR) AS COMMENT,
+            round(500 * {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i', 'g.i')}, 4) AS BASE_CASE_EQUIVALENT_VOLUME,
+            round(500 * {rand('k.m', 'k.c', 'k.v', 'mo.i')}, 4) AS PY_CASE_EQUIVALENT_VOLUME,
+            round(1500 * {rand('k.c', 'k.v', 'mo.i')}, 4) AS CY_3M_CASE_EQUIVALENT_VOLUME,
+            round(3000 * {rand('k.c', 'k.v', 'mo.i')}, 4) AS CY_6M_CASE_EQUIVALENT_VOLUME,
+            round(6000 * {rand('k.c', 'k.v', 'mo.i')}, 4) AS CY_12M_CASE_EQUIVALENT_VOLUME,
+            round(1500 * {rand('k.m', 'k.v', 'mo.i')}, 4) AS PY_3M_CASE_EQUIVALENT_VOLUME,
+            round(3000 * {rand('k.m', 'k.v', 'mo.i')}, 4) AS PY_6M_CASE_EQUIVALENT_VOLUME,
+            round(6000 * {rand('k.m', 'k.v', 'mo.i')}, 4) AS PY_12M_CASE_EQUIVALENT_VOLUME,
+            round(500 * {rand('k.v', 'mo.i', 'fm.i')}, 4) AS PROJECTED_CASE_EQUIVALENT_QUANTITY,
+            round(500 * {rand('k.c', 'mo.i', 'fm.i')}, 4) AS PREV_PUBLISHED_CASE_EQUIVALENT_VOLUME,
+            round(80 + 40 * {rand('k.v')}, 2) AS GSV_RATE,
+            CASE WHEN fm.method = k.primary_method THEN 1 ELSE 0 END AS IS_PRIMARY_FORECAST_METHOD
+        FROM carried k
+        CROSS JOIN (SELECT i, DATE '{FGMD}' + INTERVAL (i - 6) MONTH AS month_date FROM range(18) r(i)) mo
+        CROSS JOIN (SELECT i, {methods}[i + 1] AS method FROM range({len(FORECAST_METHODS)}) r(i)) fm
+        CROSS JOIN (SELECT 0 AS i, DATE '{FGMD}' AS fgmd UNION ALL SELECT 1, DATE '{PREVIOUS_FGMD}') g
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.VW_GET_BUDGET_BASE AS
+        SELECT
+            DATE '{FGMD}' AS BUDGET_CYCLE_DATE, fm.method AS FORECAST_METHOD,
+            k.market_code AS MARKET_CODE, k.market_name AS MARKET_NAME, k.market_area_name AS MARKET_AREA_NAME,
+            k.distributor_id AS DISTRIBUTOR_ID, k.distributor_name AS DISTRIBUTOR_NAME,
+            k.brand AS BRAND, k.variant AS VARIANT, k.variant_id AS VARIANT_ID,
+            k.variant_size_pack_desc AS VARIANT_SIZE_PACK_DESC, k.variant_size_pack_id AS VARIANT_SIZE_PACK_ID,
+            {FGMD.year + 1} AS FORECAST_YEAR, CAST(mo.i + 1 AS INTEGER) AS MONTH,
+            {rand('k.m', 'k.c', 'k.v', 'mo.i')} < 0.02 AS IS_MANUAL_INPUT,
+            CASE WHEN k.v % 7 = 0 THEN [1, 2] ELSE [] END AS TAG_IDS,
+            CASE WHEN k.v % 7 = 0 THEN ['core', 'focus'] ELSE [] END AS TAG_NAMES,
+            CAST(NULL AS VARCHAR) AS COMMENT,
+            round(500 * {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i')}, 4) AS CASE_EQUIVALENT_VOLUME,
+            round(500 * {rand('k.m', 'k.c', 'k.v', 'mo.i')}, 4) AS PY_CASE_EQUIVALENT_VOLUME,
+            round(1500 * {rand('k.c', 'k.v', 'mo.i')}, 4) AS CY_3M_SUM,
+            round(3000 * {rand('k.c', 'k.v', 'mo.i')}, 4) AS CY_6M_SUM,
+            round(6000 * {rand('k.c', 'k.v', 'mo.i')}, 4) AS CY_12M_SUM,
+            round(1500 * {rand('k.m', 'k.v', 'mo.i')}, 4) AS PY_3M_SUM,
+            round(3000 * {rand('k.m', 'k.v', 'mo.i')}, 4) AS PY_6M_SUM,
+            round(6000 * {rand('k.m', 'k.v', 'mo.i')}, 4) AS PY_12M_SUM,
+            round(550 * {rand('k.m', 'k.c', 'k.v', 'mo.i', 'fm.i')}, 4) AS CASE_EQUIVALENT_VOLUME_GOAL
+        FROM carried k
+        CROSS JOIN range(12) mo(i)
+        CROSS JOIN (SELECT i, {methods}[i + 1] AS method FROM range({len(FORECAST_METHODS)}) r(i)) fm
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.DEPLETIONS_BUDGET_PRIMARY_METHOD AS
+        SELECT DATE '{FGMD}' AS BUDGET_CYCLE_DATE, market_code AS MARKET_CODE, distributor_id AS DISTRIBUTOR_ID,
+               variant_size_pack_id AS VARIANT_SIZE_PACK_ID, primary_method AS FORECAST_METHOD
+        FROM carried
+    """)
+    con.execute("CREATE OR REPLACE TABLE FORECAST.DEPLETIONS_BUDGET_APPROVALS (BUDGET_CYCLE_DATE DATE)")
+    # Three consensus publications per market for earlier cycles; the current cycle is unpublished
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.DEPLETIONS_FORECAST_PUBLICATIONS AS
+        SELECT
+            CAST(m * 3 + p + 1 AS INTEGER) AS PUBLICATION_ID, CAST(p + 1 AS INTEGER) AS GROUP_ID,
+            format('USM{{:03d}}', m) AS MARKET_CODE, 'user_' || (m % 5) AS PUBLISHED_BY_USER_ID,
+            CAST(DATE '{PREVIOUS_FGMD}' - INTERVAL (p) MONTH AS DATE) AS FORECAST_GENERATION_MONTH_DATE,
+            'consensus' AS PUBLICATION_STATUS,
+            CAST(DATE '{PREVIOUS_FGMD}' - INTERVAL (p) MONTH AS TIMESTAMP) + INTERVAL 20 DAY AS APPROVAL_STATUS_DATE
+        FROM range({dims.markets}) t1(m), range(3) t2(p)
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.DEPLETIONS_FORECAST_PUBLISHED_FORECASTS AS
+        SELECT
+            pub.PUBLICATION_ID, pub.MARKET_CODE, 'draft' AS SOURCE_TABLE,
+            k.distributor_id AS DISTRIBUTOR_ID, k.brand AS BRAND,
+            k.variant_size_pack_desc AS VARIANT_SIZE_PACK_DESC, k.variant_size_pack_id AS VARIANT_SIZE_PACK_ID,
+            CAST(year(pub.FORECAST_GENERATION_MONTH_DATE + INTERVAL (mo.i) MONTH) AS INTEGER) AS FORECAST_YEAR,
+            CAST(month(pub.FORECAST_GENERATION_MONTH_DATE + INTERVAL (mo.i) MONTH) AS INTEGER) AS MONTH,
+            k.primary_method AS FORECAST_METHOD,
+            round(500 * {rand('k.m', 'k.c', 'k.v', 'mo.i', 'pub.PUBLICATION_ID')}, 4) AS CASE_EQUIVALENT_VOLUME
+        FROM FORECAST.DEPLETIONS_FORECAST_PUBLICATIONS pub
+        JOIN carried k ON k.market_code = pub.MARKET_CODE
+        CROSS JOIN range(12) mo(i)
+    """)
+    con.execute("""
+        CREATE OR REPLACE TABLE FORECAST.DISTRIBUTOR_ALLOCATION_BY_MARKET_SIZE_PACK AS
+        SELECT
+            market_code, market_name, distributor_id, distributor_name, customer_id, variant_size_pack_id,
+            1.0 / COUNT(*) OVER (PARTITION BY market_code, variant_size_pack_id) AS distributor_allocation,
+            1.0 AS customer_allocation
+        FROM carried
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE FORECAST.DEPLETIONS_FORECAST_PRIMARY_FORECAST_METHOD AS
+        SELECT market_code AS MARKET_CODE, distributor_id AS DISTRIBUTOR_ID, variant_size_pack_id AS VARIANT_SIZE_PACK_ID,
+               DATE '{FGMD}' AS FORECAST_GENERATION_MONTH_DATE, primary_method AS FORECAST_METHOD
+        FROM carried
+    """)
+    con.execute("CREATE SEQUENCE IF NOT EXISTS FORECAST.SEQ_MANUAL_INPUT_DEPLETIONS_FORECAST")
+    con.execute("""
+        CREATE OR REPLACE TABLE FORECAST.MANUAL_INPUT_DEPLETIONS_FORECAST (
+            ID INTEGER DEFAULT nextval('FORECAST.SEQ_MANUAL_INPUT_DEPLETIONS_FORECAST') PRIMARY KEY,
+            MARKET_NAME VARCHAR, MARKET_CODE VARCHAR, DISTRIBUTOR_NAME VARCHAR, DISTRIBUTOR_ID VARCHAR,
+            BRAND VARCHAR, BRAND_ID VARCHAR, VARIANT VARCHAR, VARIANT_ID VARCHAR,
+            VARIANT_SIZE_PACK_DESC VARCHAR, VARIANT_SIZE_PACK_ID VARCHAR,
+            FORECAST_YEAR INTEGER, MONTH INTEGER, FORECAST_METHOD VARCHAR, FORECAST_GENERATION_MONTH_DATE DATE,
+            MANUAL_CASE_EQUIVALENT_VOLUME DOUBLE, UPDATED_BY_USER_ID VARCHAR, FORECAST_STATUS VARCHAR,
+            UPDATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP, CURRENT_VERSION INTEGER DEFAULT 1, COMMENT VARCHAR
+        )
+    """)
+    con.execute("""
+        CREATE OR REPLACE TABLE FORECAST.MANUAL_INPUT_DEPLETIONS_FORECAST_VERSIONS (
+            FORECAST_ID INTEGER, VERSION_NUMBER INTEGER,
+            MARKET_NAME VARCHAR, MARKET_CODE VARCHAR, DISTRIBUTOR_NAME VARCHAR, DISTRIBUTOR_ID VARCHAR,
+            BRAND VARCHAR, BRAND_ID VARCHAR, VARIANT VARCHAR, VARIANT_ID VARCHAR,
+            VARIANT_SIZE_PACK_DESC VARCHAR, VARIANT_SIZE_PACK_ID VARCHAR,
+            FORECAST_YEAR INTEGER, MONTH INTEGER, FORECAST_METHOD VARCHAR, FORECAST_GENERATION_MONTH_DATE DATE,
+            MANUAL_CASE_EQUIVALENT_VOLUME DOUBLE, UPDATED_BY_USER_ID VARCHAR, FORECAST_STATUS VARCHAR, COMMENT VARCHAR
+        )
+    """)
+    counts = {}
+    for table in (
+        "VW_GET_DEPLETIONS_BASE",
+        "VW_GET_BUDGET_BASE",
+        "DEPLETIONS_FORECAST_PUBLISHED_FORECASTS",
+        "DISTRIBUTOR_ALLOCATION_BY_MARKET_SIZE_PACK",
+    ):
+        counts[table] = con.execute(f"SELECT COUNT(*) FROM FORECAST.{table}").fetchone()[0]
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Workloads (filter mixes)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Call:
+    mix: str
+    args: Dict[str, Any]
+    rows_hint: int = 0  # records in the payload for procedures
+
+
+Mix = Tuple[str, int, Callable[[random.Random, Dims], Dict[str, Any]]]
+
+
+def _market(rng: random.Random, dims: Dims) -> Tuple[int, str]:
+    m = rng.randrange(dims.markets)
+    return m, dims.market_codes()[m]
+
+
+def forecast_mixes() -> List[Mix]:
+    def single_market(rng, dims):
+        return {"P_MARKETS": [_market(rng, dims)[1]]}
+
+    def market_customers(rng, dims):
+        m, code = _market(rng, dims)
+        return {"P_MARKETS": [code], "P_CUSTOMERS": rng.sample(dims.customer_ids(m), rng.randint(1, min(3, dims.customers_per_market))),
+                "P_BRANDS": [], "P_VARIANTS": [], "P_VARIANT_SIZE_PACK_DESCS": []}
+
+    def market_brands(rng, dims):
+        return {"P_MARKETS": [_market(rng, dims)[1]], "P_BRANDS": rng.sample(dims.brands(), min(2, len(dims.brands())))}
+
+    def market_variants(rng, dims):
+        return {"P_MARKETS": [_market(rng, dims)[1]], "P_VARIANTS": rng.sample(dims.variants(), 3),
+                "P_VARIANT_SIZE_PACK_DESCS": rng.sample(dims.size_pack_descs(), 2)}
+
+    def multi_market(rng, dims):
+        return {"P_MARKETS": rng.sample(dims.market_codes(), min(dims.markets, rng.randint(2, 4)))}
+
+    def market_method(rng, dims):
+        return {"P_MARKETS": [_market(rng, dims)[1]], "P_FORECAST_METHODS": rng.choice(FORECAST_METHODS)}
+
+    def all_null(rng, dims):
+        return {}
+
+    def empty_arrays(rng, dims):
+        return {"P_MARKETS": [], "P_CUSTOMERS": [], "P_BRANDS": [], "P_VARIANTS": [], "P_VARIANT_SIZE_PACK_DESCS": []}
+
+    return [
+        ("single_market", 35, single_market),
+        ("market_customers", 15, market_customers),
+        ("market_brands", 15, market_brands),
+        ("market_variants", 10, market_variants),
+        ("multi_market", 10, multi_market),
+        ("market_method", 5, market_method),
+        ("all_null", 5, all_null),
+        ("empty_arrays", 5, empty_arrays),
+    ]
+
+
+def budget_mixes() -> List[Mix]:
+    def base(rng, dims):
+        return {"P_BUDGET_CYCLE_DATE": FGMD}
+
+    def single_market(rng, dims):
+        return {**base(rng, dims), "P_MARKETS": [_market(rng, dims)[1]]}
+
+    def market_customers(rng, dims):
+        m, code = _market(rng, dims)
+        return {**base(rng, dims), "P_MARKETS": [code], "P_CUSTOMERS": rng.sample(dims.customer_ids(m), 1), "P_VARIANT_SIZE_PACK_IDS": []}
+
+    def market_size_packs(rng, dims):
+        return {**base(rng, dims), "P_MARKETS": [_market(rng, dims)[1]], "P_VARIANT_SIZE_PACK_IDS": rng.sample(dims.size_pack_ids(), 5)}
+
+    def all_methods(rng, dims):
+        return {**base(rng, dims), "P_MARKETS": [_market(rng, dims)[1]], "P_ONLY_PRIMARY": False}
+
+    def all_null(rng, dims):
+        return base(rng, dims)
+
+    def empty_arrays(rng, dims):
+        return {**base(rng, dims), "P_MARKETS": [], "P_CUSTOMERS": [], "P_VARIANT_SIZE_PACK_IDS": []}
+
+    return [
+        ("single_market", 40, single_market),
+        ("market_customers", 20, market_customers),
+        ("market_size_packs", 15, market_size_packs),
+        ("all_methods", 10, all_methods),
+        ("all_null", 5, all_null),
+        ("empty_arrays", 10, empty_arrays),
+    ]
+
+
+def published_mixes() -> List[Mix]:
+    def market(rng, dims):
+        return {"P_MARKET_CODE": _market(rng, dims)[1]}
+
+    def market_publication(rng, dims):
+        m, code = _market(rng, dims)
+        return {"P_MARKET_CODE": code, "P_PUBLICATION_ID": m * 3 + rng.randint(1, 3)}
+
+    def null_market(rng, dims):
+        return {"P_MARKET_CODE": None}
+
+    return [("market", 60, market), ("market_publication", 35, market_publication), ("null_market", 5, null_market)]
+
+
+def batch_save_mixes(batch_size: int) -> List[Mix]:
+    def records(rng, dims, with_customer: bool, with_volume: bool) -> List[Dict[str, Any]]:
+        m, code = _market(rng, dims)
+        customers = dims.customer_ids(m)
+        seen, out = set(), []
+        while len(out) < batch_size and len(seen) < batch_size * 4:
+            v = rng.randrange(dims.size_packs)
+            customer = rng.choice(customers) if with_customer else None
+            year, month = FGMD.year + rng.randint(0, 1), rng.randint(1, 12)
+            key = (customer, v, year, month)
+            if key in seen:
+                continue
+            seen.add(key)
+            record = {
+                "market_code": code,
+                "variant_size_pack_id": dims.size_pack_ids()[v],
+                "variant_size_pack_desc": dims.size_pack_descs()[v],
+                "brand": f"Brand {v // 12}",
+                "variant": f"Variant {v // 4}",
+                "forecast_year": year,
+                "month": month,
+                "forecast_method": rng.choice(FORECAST_METHODS),
+            }
+            if customer:
+                record["customer_id"] = customer
+            if with_volume:
+                record["manual_case_equivalent_volume"] = round(rng.uniform(1, 500), 2)
+                record["comment"] = "bench"
+            out.append(record)
+        return out
+
+    def payload(recs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"P_FORECASTS_JSON": json.dumps(recs), "P_FORECAST_GENERATION_MONTH_DATE": FGMD,
+                "P_USER_ID": "bench_user", "P_FORECAST_STATUS": "draft"}
+
+    return [
+        ("customer_volumes", 50, lambda rng, dims: payload(records(rng, dims, True, True))),
+        ("distributor_volumes", 35, lambda rng, dims: payload(records(rng, dims, False, True))),
+        ("method_only", 15, lambda rng, dims: payload(records(rng, dims, False, False))),
+    ]
+
+
+def build_calls(mixes: List[Mix], dims: Dims, count: int, seed: int, params: List[Param]) -> List[Call]:
+    rng = random.Random(seed)
+    names, weights, makers = zip(*[(n, w, f) for n, w, f in mixes])
+    calls = []
+    for _ in range(count):
+        i = rng.choices(range(len(names)), weights=weights)[0]
+        given = makers[i](rng, dims)
+        args = {p.name: given.get(p.name) for p in params}
+        payload = given.get("P_FORECASTS_JSON")
+        calls.append(Call(names[i], args, len(json.loads(payload)) if payload else 0))
+    return calls
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Target:
+    name: str
+    path: str  # relative to backend_functions
+    mixes: Callable[[argparse.Namespace], List[Mix]]
+    depends_on: List[str] = field(default_factory=list)
+
+
+TARGETS = [
+    Target(
+        "UDTF_GET_DEPLETIONS_FORECAST",
+        "sf_forecast_editing_workflow/udtf_get_depletions_forecast.sql",
+        lambda args: forecast_mixes(),
+        ["sf_forecast_editing_workflow/udf_get_valid_forecast_generation_month_date.sql"],
+    ),
+    Target(
+        "UDTF_GET_DEPLETIONS_BUDGET",
+        "sf_budget_workflow/udtf_get_depletions_budget.sql",
+        lambda args: budget_mixes(),
+        ["sf_budget_workflow/udf_is_budget_approved.sql"],
+    ),
+    Target(
+        "UDTF_GET_MARKET_PUBLISHED_FORECAST",
+        "sf_forecast_publishing_workflow/udtf_get_market_published_forecast.sql",
+        lambda args: published_mixes(),
+    ),
+    Target(
+        "SP_BATCH_SAVE_FORECASTS",
+        "sf_forecast_editing_workflow/sp_batch_save_forecasts.sql",
+        lambda args: batch_save_mixes(args.batch_size),
+        ["sf_forecast_publishing_workflow/udf_is_depletions_forecast_published.sql"],
+    ),
+]
+
+
+def _function_runner(con: Any, routine: Routine) -> Callable[[Call], int]:
+    def run(call: Call) -> int:
+        args = ", ".join(sql_literal(call.args[p.name], p) for p in routine.params)
+        return len(con.execute(f"SELECT * FROM {routine.name}({args})").fetchall())
+
+    return run
+
+
+def _procedure_runner(con: Any, routine: Routine) -> Callable[[Call], int]:
+    statements = procedure_statements(routine)
+    params = {p.name: p for p in routine.params}
+
+    def run(call: Call) -> int:
+        literals = {name: sql_literal(call.args[name], p) for name, p in params.items()}
+        bound = [bind_params(stmt, literals) for stmt in statements]
+        con.execute("BEGIN TRANSACTION")
+        try:
+            for i, sql in enumerate(bound, 1):
+                result = con.execute(sql).fetchall()
+                # Pre-flight checks (SELECT ... INTO) must come back empty/zero, as in the procedure
+                if sql.lstrip().upper().startswith("SELECT") and result and result[0][0]:
+                    raise BenchmarkError(f"{routine.name} pre-flight check {i} failed ({call.mix}): {result[0][0]}")
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        return call.rows_hint
+
+    return run
+
+
+def run_target(con: Any, backend_dir: Path, target: Target, args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    for dep in target.depends_on:
+        install_function(con, parse_routine((backend_dir / dep).read_text()))
+    routine = parse_routine((backend_dir / target.path).read_text())
+    if routine.kind == "PROCEDURE":
+        runner = _procedure_runner(con, routine)
+    else:
+        install_function(con, routine)
+        runner = _function_runner(con, routine)
+
+    calls = build_calls(target.mixes(args), args.dims, args.warmup + args.calls, args.seed, routine.params)
+    for call in calls[:args.warmup]:
+        runner(call)
+    samples: Dict[str, List[Tuple[float, int]]] = {}
+    for call in calls[args.warmup:]:
+        started = time.perf_counter()
+        rows = runner(call)
+        samples.setdefault(call.mix, []).append((time.perf_counter() - started, rows))
+
+    def stats(entries: Sequence[Tuple[float, int]]) -> Dict[str, Any]:
+        return summarize([s for s, _ in entries], sum(r for _, r in entries))
+
+    results = {target.name: stats([e for entries in samples.values() for e in entries])}
+    if args.by_mix:
+        for mix in sorted(samples):
+            results[f"{target.name}[{mix}]"] = stats(samples[mix])
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark forecast UDTFs/procedures on a local DuckDB replica")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help=f"Tenant under tenants/ (default: {DEFAULT_TENANT})")
+    parser.add_argument("--scale", type=float, default=1.0, help="Synthetic data scale (1.0 ≈ 12 markets, 80 size packs)")
+    parser.add_argument("--calls", type=int, default=100, help="Measured calls per function (default: 100)")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured warm-up calls per function (default: 5)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Records per SP_BATCH_SAVE_FORECASTS call (default: 50)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data and call mix (default: 42)")
+    parser.add_argument("--threads", type=int, default=None, help="DuckDB threads (default: DuckDB's choice)")
+    parser.add_argument("--only", action="append", default=None, help="Benchmark only this function (repeatable)")
+    parser.add_argument("--by-mix", action="store_true", help="Also report each filter mix separately")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regression threshold (default: 0.20)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any function regressed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    args.dims = Dims.for_scale(args.scale)
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    backend_dir = REPO_ROOT / "tenants" / (args.tenant if args.tenant.startswith("dbt_") else f"dbt_{args.tenant}") / "backend_functions"
+    targets = [t for t in TARGETS if not args.only or t.name in {o.upper() for o in args.only}]
+    if not targets:
+        logger.error(f"No benchmark matches --only {args.only}; choose from {[t.name for t in TARGETS]}")
+        sys.exit(2)
+
+    con = duckdb.connect()
+    if args.threads:
+        con.execute(f"SET threads = {args.threads}")
+    started = time.perf_counter()
+    counts = generate_dataset(con, args.dims, args.seed)
+    logger.info(
+        f"🧪 Synthetic data (scale={args.scale}) in {time.perf_counter() - started:.1f}s: "
+        + ", ".join(f"{t}={n:,}" for t, n in counts.items())
+    )
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for target in targets:
+        logger.info(f"⏱️  {target.name}: {args.warmup} warm-up + {args.calls} calls")
+        try:
+            results.update(run_target(con, backend_dir, target, args))
+        except (BenchmarkError, duckdb.Error, sqlglot.errors.SqlglotError) as e:
+            logger.error(f"❌ {target.name}: {e}")
+            sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+    meta = {"scale": args.scale, "calls": args.calls, "seed": args.seed, "tenant": args.tenant, "duckdb": duckdb.__version__}
+    regressed = False
+    if args.baseline:
+        rows = compare(results, load_baseline(args.baseline), args.threshold)
+        print_comparison(rows, args.threshold)
+        regressed = any(r["status"] == "regressed" for r in rows)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, meta)
+        logger.info(f"💾 Baseline saved to {args.save_baseline}")
+    sys.exit(1 if regressed and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Latency statistics and baseline comparison shared by the benchmark scripts in this directory.
+
+A baseline is a JSON file: {"meta": {...}, "results": {<name>: {"p50_ms": ..., "p95_ms": ..., ...}}}.
+Cases are compared on LATENCY_METRICS unless the caller passes others (e.g. "peak_kib").
+"""
+
+import json
+import math
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# A case regresses when a compared metric (p50, p95, ...) is this much higher than the baseline (0.20 = 20%)
+DEFAULT_THRESHOLD = 0.20
+LATENCY_METRICS = ("p50_ms", "p95_ms")
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0..100) of a non-empty sample."""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies_s: Sequence[float], rows: int) -> Dict[str, Any]:
+    """p50/p95/mean latency in ms and rows per second over all calls of one case."""
+    total = sum(latencies_s)
+    return {
+        "calls": len(latencies_s),
+        "p50_ms": round(percentile(latencies_s, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies_s, 95) * 1000, 3),
+        "mean_ms": round(total / len(latencies_s) * 1000, 3),
+        "rows": rows,
+        "rows_per_s": round(rows / total, 1) if total > 0 else None,
+    }
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> None:
+    payload = {
+        "meta": {
+            "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            **(meta or {}),
+        },
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: Sequence[str] = LATENCY_METRICS,
+) -> List[Dict[str, Any]]:
+    """One row per case with per-metric deltas vs the baseline and a regression flag (higher is worse)."""
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, current in results.items():
+        base = base_results.get(name)
+        if base is None:
+            rows.append({"name": name, "status": "new"})
+            continue
+        row: Dict[str, Any] = {"name": name}
+        for metric in metrics:
+            before, after = base.get(metric), current.get(metric)
+            row[f"{metric}_before"] = before
+            row[f"{metric}_after"] = after
+            row[f"{metric}_change"] = round(after / before - 1, 3) if before and after is not None else None
+        changes = [row[f"{m}_change"] for m in metrics if row[f"{m}_change"] is not None]
+        row["status"] = "regressed" if any(c > threshold for c in changes) else (
+            "improved" if changes and all(c < -threshold for c in changes) else "ok"
+        )
+        rows.append(row)
+    return rows
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'case':<40} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10} {'rows/s':>12}")
+    for name, r in results.items():
+        rows_per_s = f"{r['rows_per_s']:,.0f}" if r.get("rows_per_s") is not None else "-"
+        print(f"{name:<40} {r['calls']:>6} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['mean_ms']:>10.2f} {rows_per_s:>12}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float, metrics: Sequence[str] = LATENCY_METRICS) -> None:
+    icons = {"ok": "  ", "improved": "🚀", "regressed": "🐢", "new": "🆕"}
+    labels = [metric.split("_")[0] for metric in metrics]
+    print(f"\nvs baseline (threshold ±{threshold:.0%}):")
+    print(f"   {'case':<40} " + " ".join(f"{label + ' before':>11} {label + ' after':>10} {'Δ':>7}" for label in labels))
+    for row in rows:
+        if row["status"] == "new":
+            print(f"{icons['new']} {row['name']:<40} (not in baseline)")
+            continue
+        cells = []
+        for metric in metrics:
+            before, after, change = row[f"{metric}_before"], row[f"{metric}_after"], row[f"{metric}_change"]
+            cells.append(
+                (f"{before:>11.2f}" if before is not None else f"{'-':>11}") + " "
+                + (f"{after:>10.2f}" if after is not None else f"{'-':>10}") + " "
+                + (f"{change:>+7.0%}" if change is not None else f"{'-':>7}")
+            )
+        print(f"{icons[row['status']]} {row['name']:<40} {' '.join(cells)}")
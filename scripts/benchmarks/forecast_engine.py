@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the apollo_forecast what-if engine.
+
+Builds a random monthly cube (default 20,000 market x distributor x variant size pack series,
+36 months) and times:
+- trend_factors:        rolling sums and trend factors for every series (one history)
+- monthend_projection:  month-end projection for every series from [series, day] arrays
+- scenarios[batch=N]:   evaluate_scenarios() over --scenarios market-scoped what-ifs, N per
+                        vectorized pass; rows/s is scenarios per second
+
+Results use the latency format of baseline.py, so they can be saved and compared like the
+backend benchmark's.
+
+Requires: pip install -r requirements-forecast.txt
+
+Usage:
+    python scripts/benchmarks/forecast_engine.py
+    python scripts/benchmarks/forecast_engine.py --series 50000 --scenarios 256 --batch 1 --batch 64
+    python scripts/benchmarks/forecast_engine.py --save-baseline scripts/benchmarks/baselines/forecast_engine.json
+    python scripts/benchmarks/forecast_engine.py --baseline scripts/benchmarks/baselines/forecast_engine.json --fail-on-regression
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from baseline import DEFAULT_THRESHOLD, compare, load_baseline, print_comparison, print_results, save_baseline, summarize
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover - optional dependency
+    print(f"Missing benchmark dependency ({e.name}). Install with: pip install -r requirements-forecast.txt", file=sys.stderr)
+    sys.exit(2)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from apollo_forecast import DailySales, Scenario, evaluate_scenarios, monthend_projection, trend_factors  # noqa: E402
+from apollo_forecast.monthend import MONTH_DAYS  # noqa: E402
+from apollo_forecast.synthetic import random_cube  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+END = date(2025, 6, 12)
+DEFAULT_BATCHES = [1, 8, 32, 128]
+
+
+def random_daily(keys: List[Any], seed: int) -> DailySales:
+    rng = np.random.default_rng(seed)
+    shape = (len(keys), MONTH_DAYS)
+    cy_present = rng.random(shape) < 0.3
+    cy_present[:, END.day:] = False  # the month is in progress
+    py_present = rng.random(shape) < 0.3
+    py_present[:, 30:] = False  # June has 30 days
+    cy = np.where(cy_present, rng.gamma(2.0, 2.0, shape), 0.0)
+    py = np.where(py_present, rng.gamma(2.0, 2.0, shape), 0.0)
+    return DailySales("distributor", keys, date(END.year, END.month, 1), cy, cy * 0.8, cy_present, py, py * 0.8, py_present)
+
+
+def market_scenarios(count: int, seed: int) -> List[Scenario]:
+    rng = np.random.default_rng(seed)
+    return [
+        Scenario(f"s{i}", float(rng.uniform(0.5, 1.5)), where={"market_code": [f"MKT{int(rng.integers(40)):02d}"]})
+        for i in range(count)
+    ]
+
+
+def time_case(run: Callable[[], Any], calls: int, warmup: int, rows: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        run()
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, rows * calls)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the apollo_forecast what-if engine")
+    parser.add_argument("--series", type=int, default=20000, help="Series in the cube (default: 20000)")
+    parser.add_argument("--months", type=int, default=36, help="Months of history (default: 36)")
+    parser.add_argument("--scenarios", type=int, default=128, help="Scenarios per evaluation (default: 128)")
+    parser.add_argument("--batch", type=int, action="append", default=None, help=f"Scenarios per pass (repeatable; default: {DEFAULT_BATCHES})")
+    parser.add_argument("--calls", type=int, default=10, help="Measured calls per case (default: 10)")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured warm-up calls per case (default: 2)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data and scenarios (default: 42)")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regression threshold (default: 0.20)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any case regressed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    cube = random_cube(args.series, args.months, END, seed=args.seed)
+    daily = random_daily(cube.keys, args.seed)
+    scenarios = market_scenarios(args.scenarios, args.seed)
+    logger.info(
+        f"🧪 {args.series:,} series x {args.months} months, {args.scenarios} scenarios "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    results: Dict[str, Dict[str, Any]] = {
+        "trend_factors": time_case(lambda: trend_factors(cube), args.calls, args.warmup, 1),
+        "monthend_projection": time_case(lambda: monthend_projection(daily, END), args.calls, args.warmup, 1),
+    }
+    for batch in args.batch or DEFAULT_BATCHES:
+        logger.info(f"⏱️  scenarios[batch={batch}]: {args.warmup} warm-up + {args.calls} calls")
+        results[f"scenarios[batch={batch}]"] = time_case(
+            lambda: evaluate_scenarios(cube, scenarios, batch=batch), args.calls, args.warmup, len(scenarios)
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+    meta = {"series": args.series, "months": args.months, "scenarios": args.scenarios, "seed": args.seed, "numpy": np.__version__}
+    regressed = False
+    if args.baseline:
+        rows = compare(results, load_baseline(args.baseline), args.threshold)
+        print_comparison(rows, args.threshold)
+        regressed = any(r["status"] == "regressed" for r in rows)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, meta)
+        logger.info(f"💾 Baseline saved to {args.save_baseline}")
+    sys.exit(1 if regressed and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Parity check of the apollo_forecast engine against the dbt forecast SQL on synthetic data.
+
+Loads synthetic depletions_forecast_sales_history rows into an embedded DuckDB database and
+renders the real SQL from tenants/dbt_<tenant>: the depletions_forecast_init_draft(_chains)
+CTEs through trend_factors_calculated, forecast__calc_trend_factors, and
+forecast__monthend_projection (fgmd and window modes, distributor and chain grains). The
+dbt context is stubbed: ref() is the bare model name, no backfill, not incremental. It then
+transpiles that SQL (sqlglot, snowflake -> duckdb), runs it, and compares every row with the
+engine's output for the same data.
+
+Checks:
+- rolling_sums:     cy/py 3/6/12-month sums and the set of forecast series
+- trend_factors:    run_rate_3m and the capped 3/6/12-month trend factors
+- calc_trend_factors macro (distributor grain)
+- scenarios:        batched evaluate_scenarios() against the single-history engine
+- monthend_projection: projected case-equivalent/physical quantity, method, progress date
+
+Exits 1 on any mismatch. Requires: pip install -r requirements-bench.txt -r requirements-forecast.txt
+
+Usage:
+    python scripts/benchmarks/forecast_parity.py
+    python scripts/benchmarks/forecast_parity.py --seeds 10 --markets 6 --verbose
+"""
+
+import argparse
+import csv
+import logging
+import math
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import duckdb
+    import jinja2
+    import numpy as np
+    import sqlglot
+except ImportError as e:  # pragma: no cover - optional dependency
+    print(
+        f"Missing parity dependency ({e.name}). Install with: "
+        "pip install -r requirements-bench.txt -r requirements-forecast.txt",
+        file=sys.stderr,
+    )
+    sys.exit(2)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from apollo_forecast import GRAINS, Scenario, evaluate_scenarios, forecast_volumes, monthend_projection, trend_factors  # noqa: E402
+from apollo_forecast.synthetic import COLUMNS, Dims, cube_from_history, daily_from_history, sales_history  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "williamgrant"
+# Synthetic data ends mid-month, like a nightly build
+DEFAULT_END = date(2025, 6, 12)
+# SQL sums number(38,8) decimals and divides with Snowflake/DuckDB scale rules; the engine uses float64
+REL_TOLERANCE = 1e-6
+ABS_TOLERANCE = 1e-6
+MODELS = {"distributor": "depletions_forecast_init_draft", "chain": "depletions_forecast_init_draft_chains"}
+TREND_COLUMNS = (
+    "cy_3m_sum", "cy_6m_sum", "cy_12m_sum", "py_3m_sum", "py_6m_sum", "py_12m_sum",
+    "run_rate_3m", "trend_factor_3m", "trend_factor_6m", "trend_factor_12m",
+)
+CUT_RE = re.compile(r",\s*(?:--[^\n]*\n\s*)*trend_factors_unpivoted\s+as\s*\(", re.IGNORECASE)
+
+
+@dataclass
+class CheckResult:
+    name: str
+    rows: int = 0
+    mismatches: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+class Renderer:
+    """Renders tenant models and macros with a stub dbt context (no dbt needed)."""
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir
+        self.env = jinja2.Environment(extensions=["jinja2.ext.do"], undefined=jinja2.StrictUndefined)
+        context = {
+            "ref": lambda name: name,
+            "source": lambda schema, name: name,
+            "var": lambda name, default=None: default,
+            "config": lambda **kwargs: "",
+            "is_incremental": lambda: False,
+            "refresh_scope_active": lambda: False,
+            "refresh_scope": lambda *args, **kwargs: "true",
+            "warehouse_route": lambda *routes: "",
+            "this": "this",
+            "execute": False,
+        }
+        macro_text = "\n".join(p.read_text() for p in sorted((project_dir / "macros" / "forecast").glob("*.sql")))
+        module = self.env.from_string(macro_text).make_module(context)
+        self.context = {
+            **context,
+            "forecast__monthend_projection": module.forecast__monthend_projection,
+            "forecast__calc_trend_factors": module.forecast__calc_trend_factors,
+        }
+
+    def macro(self, name: str, *args: Any) -> str:
+        return str(self.context[name](*args))
+
+    def model(self, name: str) -> str:
+        path = self.project_dir / "models" / "marts" / "forecast" / f"{name}.sql"
+        return self.env.from_string(path.read_text()).render(**self.context)
+
+
+def to_duckdb(sql: str) -> str:
+    return sqlglot.transpile(sql, read="snowflake", write="duckdb")[0]
+
+
+def load_history(con: Any, rows: Sequence[Sequence[Any]]) -> None:
+    con.execute(
+        "CREATE OR REPLACE TABLE sales_rows (invoice_date DATE, year INTEGER, month INTEGER, month_date DATE,"
+        " market_name VARCHAR, market_code VARCHAR, distributor_id VARCHAR, distributor_name VARCHAR,"
+        " parent_chain_code VARCHAR, parent_chain_name VARCHAR, is_forecast_chain BOOLEAN,"
+        " variant_size_pack_id VARCHAR, phys_quantity DOUBLE, case_equivalent_quantity DOUBLE)"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sales_rows.csv"
+        with path.open("w", newline="") as f:
+            csv.writer(f).writerows(rows)
+        con.execute(f"COPY sales_rows FROM '{path}' (HEADER false, NULLSTR '')")
+    # Product descriptives the models carry along are functions of the variant size pack
+    con.execute(
+        "CREATE OR REPLACE VIEW depletions_forecast_sales_history AS SELECT *,"
+        " 'Brand ' || right(variant_size_pack_id, 1) AS brand, right(variant_size_pack_id, 1) AS brand_id,"
+        " 'Variant ' || right(variant_size_pack_id, 2) AS variant, right(variant_size_pack_id, 2) AS variant_id,"
+        " 'Pack ' || variant_size_pack_id AS variant_size_pack_desc,"
+        " phys_quantity::DECIMAL(38, 8) AS projection_phys_quantity,"
+        " case_equivalent_quantity::DECIMAL(38, 8) AS projection_case_equivalent_quantity"
+        " FROM sales_rows"
+    )
+
+
+def _close(a: Any, b: Any) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(float(a), float(b), rel_tol=REL_TOLERANCE, abs_tol=ABS_TOLERANCE)
+
+
+def _compare(
+    result: CheckResult,
+    sql_rows: Dict[Tuple[str, ...], Dict[str, Any]],
+    engine_rows: Dict[Tuple[str, ...], Dict[str, Any]],
+    columns: Iterable[str],
+) -> None:
+    result.rows = len(sql_rows)
+    for key in sorted(set(sql_rows) ^ set(engine_rows), key=str):
+        side = "SQL" if key in sql_rows else "engine"
+        result.mismatches.append(f"{key}: only in {side}")
+    for key in sorted(set(sql_rows) & set(engine_rows), key=str):
+        for column in columns:
+            expected, actual = sql_rows[key][column], engine_rows[key][column]
+            same = expected == actual if isinstance(expected, (str, date)) else _close(expected, actual)
+            if not same:
+                result.mismatches.append(f"{key} {column}: SQL {expected!r} != engine {actual!r}")
+
+
+def _fetch(con: Any, sql: str, key_columns: Sequence[str]) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+    cursor = con.execute(sql)
+    names = [d[0].lower() for d in cursor.description]
+    rows = {}
+    for values in cursor.fetchall():
+        row = dict(zip(names, values))
+        rows[tuple(row[k] for k in key_columns)] = row
+    return rows
+
+
+def check_trend_factors(con: Any, renderer: Renderer, rows: Sequence[Sequence[Any]], grain: str) -> List[CheckResult]:
+    model_sql = renderer.model(MODELS[grain])
+    cut = CUT_RE.search(model_sql)
+    if cut is None:
+        raise RuntimeError(f"{MODELS[grain]}: no trend_factors_unpivoted CTE to stop at")
+    keys = list(GRAINS[grain])
+    join = " and ".join(f"tf.{k} = rs.{k}" for k in keys)
+    sql = (
+        model_sql[:cut.start()]
+        + "\nselect tf.*, rs.cy_3m_sum, rs.cy_6m_sum, rs.cy_12m_sum, rs.py_3m_sum, rs.py_6m_sum, rs.py_12m_sum"
+        + f"\nfrom trend_factors_calculated tf join rolling_sums rs on {join} and rs.month_date = tf.latest_complete_month_date"
+    )
+    sql_rows = _fetch(con, to_duckdb(sql), keys)
+
+    cube = cube_from_history(rows, grain)
+    factors = trend_factors(cube)
+    engine_rows = {
+        key: {column: float(getattr(factors, column)[i]) for column in TREND_COLUMNS}
+        for i, key in enumerate(cube.keys) if factors.active[i]
+    }
+    results = [CheckResult(f"trend_factors[{grain}]")]
+    _compare(results[0], sql_rows, engine_rows, TREND_COLUMNS)
+
+    if grain == "distributor":
+        macro_sql = (
+            model_sql[:cut.start()]
+            + "\nselect * from "
+            + renderer.macro("forecast__calc_trend_factors", "rolling_sums")
+        )
+        macro_rows = _fetch(con, to_duckdb(macro_sql), keys)
+        results.append(CheckResult("calc_trend_factors"))
+        _compare(results[1], macro_rows, engine_rows, TREND_COLUMNS[6:])
+    return results
+
+
+def check_scenarios(rows: Sequence[Sequence[Any]], grain: str) -> CheckResult:
+    """Batched evaluate_scenarios() against trend_factors()/forecast_volumes() on the same
+    scaled histories: the baseline, all history doubled, and one market over recent months."""
+    cube = cube_from_history(rows, grain)
+    market = cube.keys[0][0]
+    recent = cube.months[-8].astype("datetime64[D]").item()
+    scenarios = [
+        Scenario("base", 1.0),
+        Scenario("double", 2.0),
+        Scenario("one_market_recent", 1.3, where={"market_code": [market]}, start=recent),
+    ]
+    batch = evaluate_scenarios(cube, scenarios, batch=2)
+    result = CheckResult(f"scenarios[{grain}]", rows=len(scenarios))
+    for i, scenario in enumerate(scenarios):
+        scale = np.ones_like(cube.values)
+        rows_mask = cube.select(**scenario.where) if scenario.where else np.ones(len(cube.keys), dtype=bool)
+        first = cube.month_index(scenario.start) if scenario.start else 0
+        scale[rows_mask, first:] = scenario.scale
+        values = cube.values * scale
+        factors = trend_factors(cube, values=values)
+        totals = forecast_volumes(cube, factors, values=values)[..., factors.active, :].sum(axis=-2)
+        for column in TREND_COLUMNS:
+            if not np.allclose(getattr(batch.factors, column)[i], getattr(factors, column), rtol=REL_TOLERANCE, atol=ABS_TOLERANCE):
+                result.mismatches.append(f"{scenario.name} {column} differs from trend_factors()")
+        if not np.allclose(batch.volumes[i], totals, rtol=REL_TOLERANCE, atol=ABS_TOLERANCE):
+            result.mismatches.append(f"{scenario.name} forecast totals differ from forecast_volumes()")
+    return result
+
+
+def check_monthend(
+    con: Any, renderer: Renderer, rows: Sequence[Sequence[Any]], grain: str, mode: str, fgmd: date
+) -> CheckResult:
+    macro_grain = "chain" if grain == "chain" else "distributor"
+    window = 3 if mode == "window" else 1
+    sql = (
+        f"with run_details as (select '{fgmd.isoformat()}'::date as forecast_generation_month_date)\n"
+        f"select * from {renderer.macro('forecast__monthend_projection', macro_grain, mode, window)}"
+    )
+    keys = list(GRAINS[grain])
+    sql_rows = _fetch(con, to_duckdb(sql), keys + ["month_date"])
+
+    control_date = max(r[COLUMNS.index("invoice_date")] for r in rows)
+    months = [fgmd] if mode == "fgmd" else [
+        date(control_date.year - (control_date.month - i < 1), (control_date.month - i - 1) % 12 + 1, 1)
+        for i in range(window - 1, -1, -1)
+    ]
+    engine_rows: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+    for month in months:
+        projection = monthend_projection(daily_from_history(rows, month, grain), control_date)
+        methods = projection.method_names()
+        for i, key in enumerate(projection.keys):
+            if not projection.valid[i]:
+                continue
+            engine_rows[key + (month,)] = {
+                "projected_case_equivalent_quantity": float(projection.projected_case_equivalent_quantity[i]),
+                "projected_phys_quantity": float(projection.projected_phys_quantity[i]),
+                "projection_method_used": methods[i],
+                "market_max_invoice_date": projection.market_max_invoice_date[i].item(),
+            }
+    result = CheckResult(f"monthend_projection[{grain},{mode}]")
+    _compare(result, sql_rows, engine_rows, (
+        "projected_case_equivalent_quantity", "projected_phys_quantity", "projection_method_used", "market_max_invoice_date",
+    ))
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check apollo_forecast against the dbt forecast SQL on synthetic data")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help=f"Tenant under tenants/ (default: {DEFAULT_TENANT})")
+    parser.add_argument("--seeds", type=int, default=3, help="Synthetic datasets to check (default: 3)")
+    parser.add_argument("--markets", type=int, default=Dims.markets, help=f"Markets per dataset (default: {Dims.markets})")
+    parser.add_argument("--end", type=date.fromisoformat, default=DEFAULT_END, help=f"Last invoice date (default: {DEFAULT_END})")
+    parser.add_argument("--verbose", action="store_true", help="Print every mismatch, not just the first five per check")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    project_dir = REPO_ROOT / "tenants" / (args.tenant if args.tenant.startswith("dbt_") else f"dbt_{args.tenant}")
+    renderer = Renderer(project_dir)
+    fgmd = date(args.end.year, args.end.month, 1)
+    failed = False
+    for seed in range(args.seeds):
+        rows = sales_history(Dims(markets=args.markets), args.end, seed=seed)
+        con = duckdb.connect()
+        load_history(con, rows)
+        results: List[CheckResult] = []
+        for grain in GRAINS:
+            results.extend(check_trend_factors(con, renderer, rows, grain))
+            results.append(check_scenarios(rows, grain))
+            for mode in ("fgmd", "window"):
+                results.append(check_monthend(con, renderer, rows, grain, mode, fgmd))
+        for result in results:
+            icon = "✅" if result.ok else "❌"
+            logger.info(f"{icon} seed {seed} {result.name}: {result.rows} rows, {len(result.mismatches)} mismatches")
+            for line in result.mismatches if args.verbose else result.mismatches[:5]:
+                logger.info(f"    {line}")
+            failed |= not result.ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Benchmark and profiling suite for the Python paths of the orchestration and deploy tooling.
+
+Generates synthetic dbt tenant projects (--nodes, default 50 / 500 / 5,000 manifest nodes:
+models in domain folders over sources, seeds and schema tests, with a layered ref() DAG),
+parses each once into the manifest cache with the `local` (dbt-duckdb) target, then times:
+- import[nodes=N]:                `import dagster_apollo` in a fresh interpreter, which runs
+                                  build_defs() against the cached manifest (peak = child RSS)
+- build_defs[nodes=N]:            build_defs() in-process, warm manifest cache
+- asset_selection[...,nodes=N]:   build_dbt_asset_selection() over the tenant's dbt assets,
+                                  resolved against the asset graph (`all` = the nightly
+                                  schedule's selection, `upstream` = +path:models/forecast)
+- ensure_profiles:                profiles.yml generation (unchanged file, no rewrite)
+- build_dbt_build_args:           DbtBuildConfig -> `dbt build` args (plain, modified-only, resume)
+- clean_all_files[jobs=N]:        SQLCleaner.clean_all_files() over every tenant, dry run
+- deploy[cli|session,jobs=N]:     deploy() of the default tenant's backend functions with a fake
+                                  `snow` executable (cli) or an in-memory connection (session)
+
+rows/s counts manifest nodes, SQL files or build_dbt_build_args calls, depending on the case.
+Every case records p50/p95/mean latency and peak memory (`peak_kib`: tracemalloc peak of one
+traced call in this process, or the child's max RSS for import cases). --profile-dir writes
+one cProfile file per case (`<case>.prof`; render with snakeviz or flameprof) and the
+`-X importtime` log of each import case. Results use the format of baseline.py: --output
+writes them as JSON, and --baseline compares p50, p95 and peak memory with a committed baseline.
+
+Absolute numbers depend on the machine; compare runs on the same one. The dagster, dagster-dbt
+and dbt-core versions are stored with the results: --baseline warns when they differ from the
+installed ones, and refuses to compare with --fail-on-regression. The committed baseline was
+saved on the versions pinned in requirements.dagster.txt.
+
+Requires the Dagster requirements plus dbt-duckdb: pip install -r requirements.dagster.txt -r requirements-bench.txt
+
+Usage:
+    python scripts/benchmarks/python_tooling.py
+    python scripts/benchmarks/python_tooling.py --nodes 50 --nodes 5000 --case build_defs --profile-dir /tmp/apollo_profiles
+    python scripts/benchmarks/python_tooling.py --output /tmp/python_tooling.json
+    python scripts/benchmarks/python_tooling.py --save-baseline scripts/benchmarks/baselines/python_tooling.json
+    python scripts/benchmarks/python_tooling.py --baseline scripts/benchmarks/baselines/python_tooling.json --fail-on-regression
+"""
+
+import argparse
+import cProfile
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import logging
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from baseline import DEFAULT_THRESHOLD, LATENCY_METRICS, compare, load_baseline, print_comparison, print_results, save_baseline, summarize
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+sys.path.insert(0, str(REPO_ROOT / "scripts" / "deploy"))
+
+
+def _missing_dependency() -> Optional[str]:
+    for module in ("dagster", "dagster_dbt", "dbt.adapters.duckdb"):
+        try:
+            if importlib.util.find_spec(module) is None:
+                return module
+        except ModuleNotFoundError:  # a parent package is missing
+            return module
+    return None
+
+
+_missing = _missing_dependency()
+if _missing:  # pragma: no cover - optional dependency
+    print(
+        f"Missing benchmark dependency ({_missing}). "
+        "Install with: pip install -r requirements.dagster.txt -r requirements-bench.txt",
+        file=sys.stderr,
+    )
+    sys.exit(2)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODES = [50, 500, 5000]
+DEFAULT_WORK_DIR = Path(tempfile.gettempdir()) / "apollo_python_tooling"
+COMPARED_METRICS = (*LATENCY_METRICS, "peak_kib")
+# Bump when the generated projects change, so cached projects are rewritten
+GENERATOR_VERSION = 1
+# Package versions recorded in the results; a baseline saved on other versions is not comparable
+VERSIONED_PACKAGES = ("dagster", "dagster-dbt", "dbt-core")
+# Model folders in DAG order, with their share of the models
+MODEL_FOLDERS = [("vip", 0.3), ("master", 0.3), ("fact", 0.25), ("forecast", 0.15)]
+
+# Run in a fresh interpreter: time the import (which builds the definitions) and report max RSS
+IMPORT_CHILD = """
+import json, resource, sys, time
+profiler = None
+if len(sys.argv) > 1:
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+started = time.perf_counter()
+import dagster_apollo
+elapsed = time.perf_counter() - started
+if profiler is not None:
+    profiler.disable()
+    profiler.dump_stats(sys.argv[1])
+try:
+    # ru_maxrss survives exec on Linux (it would report the parent's peak); VmHWM does not
+    with open("/proc/self/status") as status:
+        maxrss = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+except OSError:
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+print(json.dumps({"seconds": elapsed, "maxrss_kib": maxrss}))
+"""
+
+
+class FakeDeployConnection:
+    """In-memory DeployConnection for session deploys (`--connector <module>:FakeDeployConnection`)."""
+
+    def __init__(self, profile: str):
+        self.statements = 0
+
+    def execute(self, statement: str) -> None:
+        self.statements += 1
+
+    def close(self) -> None:
+        pass
+
+
+def tenant_key(nodes: int) -> str:
+    return f"bench_n{nodes}"
+
+
+def write_synthetic_project(root: Path, nodes: int, seed: int) -> Path:
+    """
+    A dbt project under root/dbt_<tenant_key> with about `nodes` manifest nodes: 2% seeds,
+    25% schema tests (not_null/unique), the rest models. Staging (vip) models read sources and
+    every later model refs 1-3 models of earlier folders, so selections walk a deep DAG.
+    Rewritten only when the size, seed or generator changes.
+    """
+    name = tenant_key(nodes)
+    project_dir = root / f"dbt_{name}"
+    spec = json.dumps({"nodes": nodes, "seed": seed, "generator": GENERATOR_VERSION})
+    marker = project_dir / ".bench_spec"
+    if marker.is_file() and marker.read_text() == spec:
+        return project_dir
+
+    rng = random.Random(seed)
+    seeds = max(1, nodes // 50)
+    tests = nodes // 4
+    models = max(len(MODEL_FOLDERS), nodes - seeds - tests)
+    sources = max(2, models // 20)
+
+    for sub in ("models", "seeds"):
+        path = project_dir / sub
+        if path.is_dir():
+            for f in sorted(path.rglob("*"), reverse=True):
+                if f.is_file():
+                    f.unlink()
+                else:
+                    f.rmdir()
+    (project_dir / "seeds").mkdir(parents=True, exist_ok=True)
+    (project_dir / "dbt_project.yml").write_text(
+        f"name: '{name}'\nversion: '1.0.0'\nconfig-version: 2\nprofile: 'apollo-snowflake'\n"
+        'model-paths: ["models"]\nseed-paths: ["seeds"]\n'
+        f"models:\n  {name}:\n    +materialized: view\n"
+    )
+    for i in range(seeds):
+        (project_dir / "seeds" / f"seed_{i:04d}.csv").write_text("id,amount\n1,1.0\n2,2.0\n")
+
+    tables = [f"table_{i:04d}" for i in range(sources)]
+    source_yml = ["version: 2", "sources:", "  - name: bench_source", "    schema: source_data", "    loaded_at_field: loaded_at",
+                  "    freshness:", "      warn_after: {count: 24, period: hour}", "    tables:"]
+    source_yml += [f"      - name: {t}" for t in tables]
+    (project_dir / "models").mkdir(parents=True, exist_ok=True)
+    (project_dir / "models" / "sources.yml").write_text("\n".join(source_yml) + "\n")
+
+    built: List[str] = []
+    tests_left = tests
+    # Two tests on every n-th model, spread over all folders
+    tested_every = max(1, models // max(1, (tests + 1) // 2))
+    start = 0
+    for folder_no, (folder, share) in enumerate(MODEL_FOLDERS):
+        count = models - start if folder_no == len(MODEL_FOLDERS) - 1 else max(1, round(models * share))
+        folder_dir = project_dir / "models" / folder
+        folder_dir.mkdir(parents=True, exist_ok=True)
+        upstream = list(built)
+        schema_yml = ["version: 2", "models:"]
+        for i in range(start, start + count):
+            model = f"{folder}_{i:05d}"
+            if not upstream:
+                parents = [f"{{{{ source('bench_source', '{rng.choice(tables)}') }}}}"]
+            else:
+                # Mostly recent parents, so the DAG is deep rather than one wide fan-out
+                window = upstream[-200:]
+                parents = [f"{{{{ ref('{p}') }}}}" for p in sorted(set(rng.choices(window, k=rng.randint(1, 3))))]
+                if folder == "master" and rng.random() < 0.1:
+                    parents.append(f"{{{{ ref('seed_{rng.randrange(seeds):04d}') }}}}")
+            body = "\nunion all\n".join(f"select id, amount from {p}" for p in parents)
+            (folder_dir / f"{model}.sql").write_text(body + "\n")
+            if tests_left > 0 and i % tested_every == 0:
+                kinds = ["not_null", "unique"][:min(2, tests_left)]
+                tests_left -= len(kinds)
+                schema_yml += [f"  - name: {model}", "    columns:", "      - name: id", "        tests:"]
+                schema_yml += [f"          - {kind}" for kind in kinds]
+            built.append(model)
+        if len(schema_yml) > 2:
+            (folder_dir / "schema.yml").write_text("\n".join(schema_yml) + "\n")
+        start += count
+    marker.write_text(spec)
+    return project_dir
+
+
+def case_slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.=-]+", "_", name)
+
+
+def measure(
+    name: str,
+    run: Callable[[], Any],
+    calls: int,
+    warmup: int,
+    rows: int,
+    profile_dir: Optional[Path],
+) -> Dict[str, Any]:
+    """Latency over `calls` calls, then one call under tracemalloc and (with profile_dir) one under cProfile."""
+    logger.info(f"⏱️  {name}: {warmup} warm-up + {calls} calls")
+    for _ in range(warmup):
+        run()
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - started)
+    result = summarize(latencies, rows * calls)
+
+    tracemalloc.start()
+    try:
+        run()
+        result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+    if profile_dir:
+        profiler = cProfile.Profile()
+        profiler.runcall(run)
+        profiler.dump_stats(str(profile_dir / f"{case_slug(name)}.prof"))
+    return result
+
+
+def measure_import(name: str, env: Dict[str, str], calls: int, nodes: int, profile_dir: Optional[Path]) -> Dict[str, Any]:
+    """`import dagster_apollo` in `calls` fresh interpreters; peak_kib is the largest child RSS."""
+    logger.info(f"⏱️  {name}: {calls} fresh interpreters")
+
+    def child(*extra: str, flags: Tuple[str, ...] = ()) -> subprocess.CompletedProcess:
+        completed = subprocess.run(
+            [sys.executable, *flags, "-c", IMPORT_CHILD, *extra],
+            cwd=REPO_ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{completed.stderr[-2000:]}")
+        return completed
+
+    latencies, peaks = [], []
+    for _ in range(calls):
+        report = json.loads(child().stdout.strip().splitlines()[-1])
+        latencies.append(report["seconds"])
+        peaks.append(report["maxrss_kib"])
+    result = summarize(latencies, nodes * calls)
+    result["peak_kib"] = float(max(peaks))
+
+    if profile_dir:
+        child(str(profile_dir / f"{case_slug(name)}.prof"))
+        (profile_dir / f"{case_slug(name)}.importtime.txt").write_text(child(flags=("-X", "importtime")).stderr)
+    return result
+
+
+def build_args_configs() -> List[Tuple[Any, Dict[str, Any]]]:
+    from dagster_apollo.dbt_assets import DbtBuildConfig
+
+    return [
+        (DbtBuildConfig(select=["tag:forecast", "path:models/fact"], exclude=["resource_type:seed"], vars={"month": "2025-06"}), {}),
+        (DbtBuildConfig(select=["tag:forecast"], modified_only=True, target="prod"), {"state_dir": "/tmp/state"}),
+        (DbtBuildConfig(resume=True, full_refresh=True), {"resume_dir": "/tmp/failed"}),
+    ]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark and profile the orchestration and deploy tooling")
+    parser.add_argument("--nodes", type=int, action="append", default=None, help=f"Manifest nodes per synthetic project (repeatable; default: {DEFAULT_NODES})")
+    parser.add_argument("--case", action="append", default=None, help="Only run cases whose name starts with this (repeatable)")
+    parser.add_argument("--calls", type=int, default=5, help="Measured calls per case (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured warm-up calls per case (default: 1)")
+    parser.add_argument("--import-calls", type=int, default=3, help="Fresh interpreters per import case (default: 3)")
+    parser.add_argument("--repeat", type=int, default=1000, help="Inner repetitions of the build_dbt_build_args case (default: 1000)")
+    parser.add_argument("--jobs", type=int, default=8, help="Workers for the parallel clean/deploy cases (default: 8)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic projects (default: 42)")
+    parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR, help=f"Synthetic projects, manifest cache and fake snow (default: {DEFAULT_WORK_DIR})")
+    parser.add_argument("--profile-dir", type=Path, default=None, help="Write a cProfile file per case (and import-time logs) here")
+    parser.add_argument("--output", type=Path, default=None, help="Write results (with run metadata) as JSON")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regression threshold (default: 0.20)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any case regressed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def package_versions() -> Dict[str, str]:
+    return {name: importlib.metadata.version(name) for name in VERSIONED_PACKAGES}
+
+
+def check_baseline_versions(baseline: Dict[str, Any], versions: Dict[str, str]) -> List[str]:
+    """Packages whose installed version differs from the one the baseline was saved with."""
+    meta = baseline.get("meta", {})
+    return [
+        f"{name} {meta.get(name, 'unknown')} (baseline) vs {version} (installed)"
+        for name, version in versions.items()
+        if meta.get(name) != version
+    ]
+
+
+def main() -> None:
+    args = parse_args()
+    versions = package_versions()
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    mismatches = check_baseline_versions(baseline, versions) if baseline else []
+    if mismatches:
+        logger.warning(f"⚠️ Baseline was saved on other package versions: {'; '.join(mismatches)}")
+        if args.fail_on_regression:
+            logger.error("❌ Not comparing against a baseline from other versions; regenerate it with --save-baseline")
+            sys.exit(2)
+    sizes = sorted(set(args.nodes or DEFAULT_NODES))
+    work_dir = args.work_dir.resolve()
+    if args.profile_dir:
+        args.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    def wanted(name: str) -> bool:
+        return not args.case or any(name.startswith(prefix) for prefix in args.case)
+
+    # Local target only: no Snowflake credentials, manifests cached under the work dir
+    tenant_roots = {n: work_dir / f"tenants_n{n}" for n in sizes}
+    os.environ.update({
+        "DBT_TARGET": "local",
+        "DAGSTER_APOLLO_CACHE_DIR": str(work_dir / "cache"),
+        "DBT_LOCAL_DUCKDB_PATH": str(work_dir / "local.duckdb"),
+        "DAGSTER_TENANTS_DIR": str(tenant_roots[sizes[0]]),
+    })
+    os.environ.pop("DAGSTER_TENANTS", None)
+    started = time.perf_counter()
+    for n in sizes:
+        write_synthetic_project(tenant_roots[n], n, args.seed)
+    logger.info(f"🧪 Synthetic projects ({', '.join(map(str, sizes))} nodes) in {time.perf_counter() - started:.1f}s")
+
+    # Importing the package builds the definitions of the smallest project
+    importlib.import_module("dagster_apollo")
+    from dagster_apollo import dbt_assets
+    from dagster_apollo.dbt_assets import _build_dbt_build_args, build_defs
+    from dagster_apollo.profiles import ensure_profiles
+    from dagster_apollo.tenants import Tenant
+    from dagster_dbt import build_dbt_asset_selection
+
+    # Parse every project once (manifest cache miss); the cases below run against the cache
+    defs_by_size = {}
+    for n in sizes:
+        os.environ["DAGSTER_TENANTS_DIR"] = str(tenant_roots[n])
+        started = time.perf_counter()
+        defs_by_size[n] = build_defs()
+        phases = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in dbt_assets.STARTUP_TIMINGS)
+        logger.info(f"📦 {n} nodes: definitions in {time.perf_counter() - started:.1f}s ({phases})")
+    logging.getLogger("dagster_apollo").setLevel(logging.WARNING)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for n in sizes:
+        name = f"import[nodes={n}]"
+        if wanted(name):
+            env = {**os.environ, "DAGSTER_TENANTS_DIR": str(tenant_roots[n])}
+            results[name] = measure_import(name, env, args.import_calls, n, args.profile_dir)
+
+    for n in sizes:
+        os.environ["DAGSTER_TENANTS_DIR"] = str(tenant_roots[n])
+        name = f"build_defs[nodes={n}]"
+        if wanted(name):
+            results[name] = measure(name, build_defs, args.calls, args.warmup, n, args.profile_dir)
+
+        defs = defs_by_size[n]
+        op_name = Tenant(tenant_key(n), tenant_roots[n]).scoped("dbt_models")
+        models_def = next(a for a in defs.assets if getattr(a, "op", None) is not None and a.op.name == op_name)
+        asset_graph = defs.resolve_asset_graph()
+        for label, kwargs in (
+            ("all", {"dbt_select": "fqn:*", "dbt_exclude": "resource_type:seed"}),
+            ("upstream", {"dbt_select": "+path:models/forecast"}),
+        ):
+            name = f"asset_selection[{label},nodes={n}]"
+            if wanted(name):
+                results[name] = measure(
+                    name,
+                    lambda kwargs=kwargs: build_dbt_asset_selection([models_def], **kwargs).resolve(asset_graph),
+                    args.calls, args.warmup, n, args.profile_dir,
+                )
+
+    if wanted("ensure_profiles"):
+        results["ensure_profiles"] = measure("ensure_profiles", ensure_profiles, args.calls * 10, args.warmup, 1, args.profile_dir)
+
+    if wanted("build_dbt_build_args"):
+        configs = build_args_configs()
+
+        def build_args() -> None:
+            for _ in range(args.repeat):
+                for cfg, kwargs in configs:
+                    _build_dbt_build_args(cfg, **kwargs)
+
+        results["build_dbt_build_args"] = measure(
+            "build_dbt_build_args", build_args, args.calls, args.warmup, args.repeat * len(configs), args.profile_dir
+        )
+
+    if any(wanted(f"clean_all_files[jobs={j}]") for j in (1, args.jobs)):
+        from clean_sql_files import SQLCleaner
+
+        logging.getLogger("clean_sql_files").setLevel(logging.WARNING)
+        for jobs in sorted({1, args.jobs}):
+            name = f"clean_all_files[jobs={jobs}]"
+            if wanted(name):
+                cleaner = SQLCleaner(dry_run=True, jobs=jobs, tenants=["all"])
+                files = len(cleaner.find_sql_files())
+                results[name] = measure(name, cleaner.clean_all_files, args.calls, args.warmup, files, args.profile_dir)
+
+    deploy_cases = [(f"deploy[cli,jobs={j}]", False, j) for j in sorted({1, args.jobs})] + [(f"deploy[session,jobs={args.jobs}]", True, args.jobs)]
+    if any(wanted(name) for name, _, _ in deploy_cases):
+        import deploy_backend_functions as deployer
+
+        logging.getLogger("deploy_backend_functions").setLevel(logging.WARNING)
+        # `snow sql -c <profile> -f <file>` that succeeds without connecting anywhere
+        fake_bin = work_dir / "bin"
+        fake_bin.mkdir(parents=True, exist_ok=True)
+        (fake_bin / "snow").write_text("#!/bin/sh\nexit 0\n")
+        (fake_bin / "snow").chmod(0o755)
+        os.environ["PATH"] = f"{fake_bin}{os.pathsep}{os.environ['PATH']}"
+        files = len(deployer.find_sql_files(deployer.tenant_backend_functions_dir(deployer.DEFAULT_TENANT)))
+        for name, session, jobs in deploy_cases:
+            if not wanted(name):
+                continue
+
+            def run_deploy(session: bool = session, jobs: int = jobs) -> None:
+                ok = deployer.deploy(
+                    "apollo", "BENCH_DB", "FORECAST", dry_run=False, jobs=jobs, session=session,
+                    connector=f"{__name__}:FakeDeployConnection", state_file=work_dir / "deploy_state.json",
+                )
+                if not ok:
+                    raise RuntimeError("deploy() failed with the fake snow CLI")
+
+            results[name] = measure(name, run_deploy, args.calls, args.warmup, files, args.profile_dir)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+        print(f"\n{'case':<40} {'peak KiB':>12}")
+        for name, r in results.items():
+            print(f"{name:<40} {r['peak_kib']:>12,.0f}")
+
+    meta = {"nodes": sizes, "seed": args.seed, "calls": args.calls, "generator": GENERATOR_VERSION, **versions}
+    regressed = False
+    if baseline:
+        rows = compare(results, baseline, args.threshold, COMPARED_METRICS)
+        print_comparison(rows, args.threshold, COMPARED_METRICS)
+        regressed = any(r["status"] == "regressed" for r in rows)
+    if args.output:
+        save_baseline(args.output, results, meta)
+        logger.info(f"💾 Results written to {args.output}")
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, meta)
+        logger.info(f"💾 Baseline saved to {args.save_baseline}")
+    if args.profile_dir:
+        logger.info(f"🔥 Profiles in {args.profile_dir} (snakeviz <file>.prof, or flameprof <file>.prof > flame.svg)")
+    sys.exit(1 if regressed and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+Synthetic VIP / Hyperion source data for load-testing the dbt models.
+
+Writes the source tables read by the staging and mart models (vip.*, master_data.*, plus the
+ifs.products and public.util_data tables apollo_sku_master and the division hierarchy need) as
+Parquet files, at a volume multiple of a 1x baseline that roughly matches one month-end load:
+
+    1x   =    50 distributors,  5k outlets,   ~1M slsda rows,  ~120k deplda rows
+    10x  =   500 distributors, 50k outlets,  ~10M slsda rows,  ~1.2M deplda rows
+    100x = 5,000 distributors, 500k outlets, ~100M slsda rows, ~12M deplda rows
+
+Volume grows with distributors (and their outlets and invoice lines); the product catalogue and
+market list stay fixed, as they do in production. Every table is generated in DuckDB in chunks
+of --chunk-rows rows, each chunk streamed straight to its own Parquet file, so memory stays
+bounded at any volume. Rows are a pure function of (row index, --seed): reruns are identical.
+
+Layout: <output>/<schema>/<table>/part-00000.parquet ... plus <output>/_manifest.json.
+
+With --duckdb <file> the tables are also registered as views (source_data.*, master_data.*,
+public.*) in that DuckDB database, together with DuckDB macros for the Snowflake scalar
+functions the staging models use (TRY_TO_DATE, TO_CHAR, REGEXP_SUBSTR, INITCAP, PARSE_JSON).
+Point the `local` dbt target at the same file (DBT_LOCAL_DUCKDB_PATH) to build against it.
+
+Not generated: master_data.apollo_variant_size_pack_tag (built by the model of the same name)
+and source tables no model reads (srschain, hyperion_translation, vistaar_*, apollo_product_tags).
+
+Requires the optional benchmark dependencies: pip install -r requirements-bench.txt
+
+Usage:
+    python scripts/benchmarks/synthetic_sources.py --volume 1 --output /tmp/apollo_sources/1x
+    python scripts/benchmarks/synthetic_sources.py --volume 100 --output /data/apollo_sources/100x --chunk-rows 5000000
+    python scripts/benchmarks/synthetic_sources.py --volume 10 --output /tmp/apollo_sources/10x \\
+        --duckdb ~/.cache/dagster_apollo/local/apollo_local.duckdb
+    DBT_TARGET=local DBT_LOCAL_DUCKDB_PATH=~/.cache/dagster_apollo/local/apollo_local.duckdb \\
+        dbt build --project-dir tenants/dbt_williamgrant --select +rad_sales_fact
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+try:
+    import duckdb
+except ImportError as e:  # pragma: no cover - optional dependency
+    print(f"Missing benchmark dependency ({e.name}). Install with: pip install -r requirements-bench.txt", file=sys.stderr)
+    sys.exit(2)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+FIRST_MONTH = "2024-01-01"
+
+# (Hyperion state name, market code) pairs; names match the mapping in markets_hyperion.sql
+MARKETS = [
+    ("California", "CA"), ("Texas", "TX"), ("Florida", "FL"), ("Illinois", "IL"), ("Ohio", "OH"),
+    ("Georgia (USA)", "GA"), ("New York Metro", "NYM"), ("Upstate New York", "NYU"), ("New Jersey", "NJ"),
+    ("Pennsylvania", "PA"), ("Michigan", "MI"), ("Massachusetts", "MA"), ("Virginia", "VA"),
+    ("Washington", "WA"), ("Arizona", "AZ"), ("Colorado", "CO"), ("Tennessee", "TN"), ("Oregon", "OR"),
+    ("Utah", "UT"), ("Minnesota", "MN"),
+]
+DIVISIONS = ["US Commercial Regions", "Green Book"]
+CLASSES_OF_TRADE = ["01", "02", "03", "04", "05", "06", "07", "08", "09", "10"]
+SIZE_PACKS = [(6, 750), (12, 750), (12, 1000), (6, 1750), (24, 375), (12, 500)]
+FORECAST_METHODS = ["6mo", "3mo", "12mo", "flat", "run rate"]
+
+
+@dataclass
+class Volume:
+    multiple: int
+    distributors: int
+    outlets_per_distributor: int = 100
+    months: int = 24
+    lines_per_outlet_month: int = 8
+    skus: int = 600
+    skus_per_distributor: int = 100
+    chains: int = 400
+
+    @classmethod
+    def of(cls, multiple: int) -> "Volume":
+        return cls(multiple=multiple, distributors=50 * multiple)
+
+    @property
+    def outlets(self) -> int:
+        return self.distributors * self.outlets_per_distributor
+
+
+@dataclass
+class TableSpec:
+    schema: str
+    name: str
+    rows: Callable[[Volume], int]
+    select: Callable[[Volume, int], str]  # SELECT over `range(lo, hi) t(i)`, given (volume, seed)
+
+
+def _rand(seed: int, *cols: str) -> str:
+    """Uniform [0, 1) derived from the given expressions and the seed."""
+    return f"((hash({', '.join(cols)}, {seed}) % 1000000) / 1000000.0)"
+
+
+def _pick(values: List[str], index_sql: str) -> str:
+    items = ", ".join("'" + v.replace("'", "''") + "'" for v in values)
+    return f"([{items}])[1 + CAST(({index_sql}) % {len(values)} AS INTEGER)]"
+
+
+def _dist_id(d: str) -> str:
+    return f"lpad(CAST({d} AS VARCHAR), 5, '0') || '01'"
+
+
+def _customer_id(d: str) -> str:
+    return f"lpad(CAST({d} AS VARCHAR), 5, '0')"
+
+
+def _sku(s: str) -> str:
+    return f"'WG' || lpad(CAST({s} AS VARCHAR), 5, '0')"
+
+
+def _variant_id(s: str) -> str:
+    return f"lpad(CAST(10000 + ({s}) // 6 AS VARCHAR), 5, '0')"
+
+
+def _units(s: str) -> str:
+    return f"([{', '.join(str(u) for u, _ in SIZE_PACKS)}])[1 + CAST(({s}) % {len(SIZE_PACKS)} AS INTEGER)]"
+
+
+def _volume_ml(s: str) -> str:
+    return f"([{', '.join(str(ml) for _, ml in SIZE_PACKS)}])[1 + CAST(({s}) % {len(SIZE_PACKS)} AS INTEGER)]"
+
+
+def _market(d: str, field: int) -> str:
+    return _pick([m[field] for m in MARKETS], d)
+
+
+# --- vip --------------------------------------------------------------------------------
+
+def _slsda(v: Volume, seed: int) -> str:
+    # i -> (distributor, outlet, month, line)
+    lines, months, outlets = v.lines_per_outlet_month, v.months, v.outlets_per_distributor
+    return f"""
+        SELECT
+            {_dist_id('d')} AS dist_id,
+            'O' || lpad(CAST(o AS VARCHAR), 7, '0') AS acct_nbr,
+            {_sku('s')} AS supp_item,
+            'DI' || lpad(CAST(s AS VARCHAR), 6, '0') AS dist_item,
+            strftime(month_date + CAST(28 * {_rand(seed, 'i', "'day'")} AS INTEGER), '%Y%m%d') AS invoice_date,
+            strftime(month_date, '%Y%m') AS depletion_period,
+            'INV' || lpad(CAST(i // {lines} AS VARCHAR), 10, '0') AS invoice_nbr,
+            CAST(i % {lines} + 1 AS BIGINT) AS invoice_line,
+            CASE WHEN {_rand(seed, 'i', "'uom'")} < 0.8 THEN 'C' ELSE 'B' END AS uom,
+            round(1 + 20 * {_rand(seed, 'i', "'qty'")}, 0) AS qty,
+            round(50 + 400 * {_rand(seed, 'i', "'net'")}, 2) AS net_price,
+            round(60 + 450 * {_rand(seed, 'i', "'net'")}, 2) AS front
+        FROM (
+            SELECT
+                i,
+                i // ({lines} * {months} * {outlets}) AS d,
+                i // ({lines} * {months}) AS o,
+                CAST(DATE '{FIRST_MONTH}' + INTERVAL ((i // {lines}) % {months}) MONTH AS DATE) AS month_date,
+                ((i // ({lines} * {months} * {outlets})) * 7 + CAST({v.skus_per_distributor} * {_rand(seed, 'i', "'sku'")} AS BIGINT)) % {v.skus} AS s
+            FROM range({{lo}}, {{hi}}) t(i)
+        )
+    """
+
+
+def _deplda(v: Volume, seed: int) -> str:
+    # i -> (distributor, carried sku, month)
+    months, carried = v.months, v.skus_per_distributor
+    return f"""
+        SELECT
+            {_dist_id('d')} AS dist_id,
+            strftime(month_date, '%Y%m') AS depl_year_mon,
+            strftime(month_date, '%Y%m') AS depletion_period,
+            {_sku('s')} AS supplier_item,
+            'DI' || lpad(CAST(s AS VARCHAR), 6, '0') AS dist_item,
+            round(200 * {_rand(seed, 'i', "'boh'")}, 2) AS begin_on_hand,
+            round(150 * {_rand(seed, 'i', "'rec'")}, 2) AS receipts,
+            round(5 * {_rand(seed, 'i', "'tin'")}, 2) AS trans_in,
+            round(5 * {_rand(seed, 'i', "'tout'")}, 2) AS trans_out,
+            round(2 * {_rand(seed, 'i', "'ret'")}, 2) AS returns,
+            round(1 * {_rand(seed, 'i', "'brk'")}, 2) AS breakage,
+            round(1 * {_rand(seed, 'i', "'smp'")}, 2) AS samples,
+            0.0 AS adjustments,
+            round(20 * {_rand(seed, 'i', "'chg'")} - 10, 2) AS total_inv_chg,
+            round(200 * {_rand(seed, 'i', "'eoh'")}, 2) AS end_on_hand,
+            round(50 * {_rand(seed, 'i', "'ord'")}, 2) AS on_order,
+            round(150 * {_rand(seed, 'i', "'sales'")}, 2) AS total_sales,
+            round(5 * {_rand(seed, 'i', "'nr'")}, 2) AS non_retail,
+            round(100 * {_rand(seed, 'i', "'off'")}, 2) AS off_premise,
+            round(45 * {_rand(seed, 'i', "'on'")}, 2) AS on_premise,
+            0.0 AS military_on,
+            0.0 AS military_off,
+            0.0 AS sub_dist_sales,
+            0.0 AS transport,
+            0.0 AS un_classified,
+            CAST(strftime(month_date + INTERVAL 35 DAY, '%Y%m%d') AS BIGINT) AS audit_date,
+            'VIPLOAD' AS audit_user,
+            CAST(strftime(month_date + INTERVAL 36 DAY, '%Y%m%d') AS BIGINT) AS out_audit_date,
+            'VIPLOAD' AS out_audit_user,
+            {_dist_id('d')} AS alt_dist_id
+        FROM (
+            SELECT
+                i,
+                i // ({carried} * {months}) AS d,
+                ((i // ({carried} * {months})) * 7 + (i // {months}) % {carried}) % {v.skus} AS s,
+                CAST(DATE '{FIRST_MONTH}' + INTERVAL (i % {months}) MONTH AS DATE) AS month_date
+            FROM range({{lo}}, {{hi}}) t(i)
+        )
+    """
+
+
+def _distda(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            {_dist_id('i')} AS distributor_id,
+            'Distributor ' || i AS distributor_name,
+            (i * 13 % 9000 + 100) || ' Commerce Way' AS street,
+            'City ' || (i % 300) AS city,
+            {_market('i', 1)} AS state,
+            lpad(CAST(10000 + i * 37 % 89999 AS VARCHAR), 5, '0') AS zip,
+            '555-' || lpad(CAST(i % 10000 AS VARCHAR), 4, '0') AS phone,
+            'Contact ' || i AS contact_1_name,
+            'contact' || i || '@distributor.example' AS contact_1_email,
+            CASE WHEN i % 10 = 0 THEN NULL ELSE {_dist_id('i - i % 10')} END AS parent_id,
+            'Rep ' || (i % 40) AS distributor_rep,
+            CAST(1 + i % 5 AS INTEGER) AS distributor_rank,
+            CASE WHEN {_rand(seed, 'i', "'cert'")} < 0.95 THEN 'Certified' ELSE 'Pending' END AS certification_status,
+            'Phase ' || (1 + i % 3) AS phase,
+            strftime(DATE '{FIRST_MONTH}' + INTERVAL ({v.months} - 1) MONTH + INTERVAL 1 MONTH - INTERVAL 1 DAY, '%Y%m%d') AS last_audit_month_eom,
+            CASE WHEN {_market('i', 1)} IN ('OR', 'UT') THEN 'GB' ELSE 'USC' END AS division_code,
+            CASE WHEN {_market('i', 1)} IN ('OR', 'UT') THEN '{DIVISIONS[1]}' ELSE '{DIVISIONS[0]}' END AS division_description,
+            'A' || (i % {len(MARKETS)} // 5) AS area_code,
+            'Area ' || (i % {len(MARKETS)} // 5) AS area_description,
+            'USA' || {_market('i', 1)} || '1' AS market_code,
+            {_market('i', 0)} AS market_description
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _vipout(v: Volume, seed: int) -> str:
+    per = v.outlets_per_distributor
+    return f"""
+        SELECT
+            'O' AS recordtype,
+            {_dist_id(f'i // {per}')} AS distid,
+            'O' || lpad(CAST(i AS VARCHAR), 7, '0') AS rscust,
+            'VP' || lpad(CAST(i AS VARCHAR), 8, '0') AS vpid,
+            'Outlet ' || i AS vpdba,
+            'Outlet ' || i || ' LLC' AS vplnam,
+            (i % 9000 + 1) || ' Main St' AS vpaddr,
+            CAST(NULL AS VARCHAR) AS vpaddr2,
+            'City ' || (i % 2000) AS vpcity,
+            {_market(f'i // {per}', 1)} AS vpstat,
+            lpad(CAST(i * 7919 % 999999999 AS VARCHAR), 9, '0') AS vpzip9,
+            'County ' || (i % 150) AS vpcoun,
+            'USA' AS vpctry,
+            '555-' || lpad(CAST(i % 10000 AS VARCHAR), 4, '0') AS vpphon,
+            CASE WHEN {_rand(seed, 'i', "'chain'")} < 0.3 THEN 'CH' || lpad(CAST(i % {v.chains} AS VARCHAR), 4, '0') END AS vpchn,
+            CAST(i % 500 AS VARCHAR) AS vpstore,
+            CASE WHEN i % 11 = 0 THEN 'Y' ELSE 'N' END AS vpfranind,
+            'A' AS vpcsts,
+            'OW' || lpad(CAST(i % 100 AS VARCHAR), 3, '0') AS vpiocode,
+            {_pick(CLASSES_OF_TRADE, 'i * 31')} AS vpcot,
+            'S' || (i % 20) AS vpsubchnl,
+            'C' || (i % 20) AS vpcustyp,
+            CASE WHEN i % 3 = 0 THEN 'ON' ELSE 'OFF' END AS vpprem,
+            'A' AS vpstatus,
+            'Y' AS vpmalt,
+            'Y' AS vpwine,
+            'Y' AS vpspirits,
+            CAST(NULL AS VARCHAR) AS vpbuygrp,
+            round(25 + 20 * {_rand(seed, 'i', "'lat'")}, 6) AS vplat,
+            round(-120 + 45 * {_rand(seed, 'i', "'lon'")}, 6) AS vplong,
+            lpad(CAST(i % 99999 AS VARCHAR), 5, '0') AS vpfips,
+            CAST(i % 400 AS VARCHAR) AS vpmsacd,
+            CAST(NULL AS VARCHAR) AS vpfutur1,
+            CAST(NULL AS VARCHAR) AS vpfutur2,
+            '20150101' AS vpopen,
+            CAST(NULL AS VARCHAR) AS vpclosed,
+            CAST(NULL AS VARCHAR) AS vptransid,
+            CAST(NULL AS VARCHAR) AS vptransdt,
+            CAST(NULL AS VARCHAR) AS vpoldid,
+            CAST(NULL AS VARCHAR) AS vpaltdist,
+            CAST(NULL AS VARCHAR) AS vpparent,
+            CAST(NULL AS VARCHAR) AS vpltlncd,
+            CAST(NULL AS VARCHAR) AS vpfips15,
+            'N' AS vpdraft,
+            TIMESTAMP '{FIRST_MONTH}' + INTERVAL (i % 700) DAY AS last_updated_at,
+            'TD' || i AS tdlinkid
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _outda(v: Volume, seed: int) -> str:
+    # Distributor-reported outlet file: every outlet, different column names than vipout
+    per = v.outlets_per_distributor
+    return f"""
+        SELECT
+            'O' || lpad(CAST(i AS VARCHAR), 7, '0') AS account,
+            {_dist_id(f'i // {per}')} AS dist_id,
+            'Outlet ' || i AS dba,
+            (i % 9000 + 1) || ' Main St' AS addr1,
+            CAST(NULL AS VARCHAR) AS addr2,
+            'City ' || (i % 2000) AS city,
+            {_market(f'i // {per}', 1)} AS state,
+            lpad(CAST(i * 7919 % 999999999 AS VARCHAR), 9, '0') AS zip9,
+            'USA' AS country,
+            'A' AS status,
+            CASE WHEN i % 4 = 0 THEN 'CH' || lpad(CAST(i % {v.chains} AS VARCHAR), 4, '0') END AS chain,
+            CAST(NULL AS VARCHAR) AS chain2,
+            'A' AS chain_status,
+            {_pick(CLASSES_OF_TRADE, 'i * 31')} AS class_of_trade
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _vocot(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            {_pick(CLASSES_OF_TRADE, 'i // 20')} AS ctcot,
+            'Class of trade ' || (i // 20) AS ctcotdesc,
+            'S' || (i % 20) AS ctscot,
+            'Sub class ' || (i % 20) AS ctscotdesc,
+            CASE WHEN i // 20 % 3 = 0 THEN 'ON' ELSE 'OFF' END AS wkprem,
+            CASE WHEN i // 20 % 3 = 0 THEN 'On Premise' ELSE 'Off Premise' END AS wkpremdesc,
+            'L' || (i % 4) AS wklictyp,
+            'License type ' || (i % 4) AS wklictypd
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _vochain(v: Volume, seed: int) -> str:
+    return """
+        SELECT
+            'CH' || lpad(CAST(i AS VARCHAR), 4, '0') AS vpchn,
+            'Chain ' || i AS vpchnm,
+            'CH' || lpad(CAST(i - i % 10 AS VARCHAR), 4, '0') AS vpparchn,
+            'Parent chain ' || (i - i % 10) AS vpparnm
+        FROM range({lo}, {hi}) t(i)
+    """
+
+
+def _voownhier(v: Volume, seed: int) -> str:
+    return """
+        SELECT
+            'OW' || lpad(CAST(i AS VARCHAR), 3, '0') AS vpochnhcd1,
+            'OW2' || (i // 4) AS vpochnhcd2,
+            'OW3' || (i // 16) AS vpochnhcd3,
+            'OW4' || (i // 64) AS vpochnhcd4,
+            'A' AS vpochnstat,
+            'Owner ' || i AS vpochnhnm1,
+            'Owner group ' || (i // 4) AS vpochnhnm2,
+            'Owner region ' || (i // 16) AS vpochnhnm3,
+            'Owner parent ' || (i // 64) AS vpochnhnm4
+        FROM range({lo}, {hi}) t(i)
+    """
+
+
+def _voowndesc(v: Volume, seed: int) -> str:
+    return """
+        SELECT
+            'OW' || lpad(CAST(i AS VARCHAR), 3, '0') AS vpchnhcd,
+            'Owner ' || i AS vpchnhdesc
+        FROM range({lo}, {hi}) t(i)
+    """
+
+
+def _vipvalue(v: Volume, seed: int) -> str:
+    return """
+        SELECT 'VPCUSTYP' AS field, 'C' || i AS code, 'Cuisine ' || i AS "desc"
+        FROM range({lo}, {hi}) t(i)
+    """
+
+
+def _srsvalue(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            'V' AS record_type,
+            'ROCOT' AS field_name,
+            'Retail outlet class of trade' AS field_desc,
+            {_pick(CLASSES_OF_TRADE, 'i')} AS value,
+            'Class of trade ' || i AS value_desc
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _itm2da(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            {_sku('i')} AS supplier_item,
+            'Variant ' || (i // 6) || ' ' || {_units('i')} || 'x' || {_volume_ml('i')} || 'ml' AS "desc",
+            'Variant ' || (i // 6) AS generic_cat1,
+            {_variant_id('i')} AS generic_cat2,
+            {_pick(['Scotch Whisky', 'Gin', 'Rum', 'Tequila', 'Vodka'], 'i // 24')} AS generic_cat3,
+            {_variant_id('i')} || '000' AS generic_cat5,
+            'Brand ' || (i // 24) AS brand_desc,
+            lpad(CAST(i // 24 AS VARCHAR), 2, '0') AS brand_code,
+            {_units('i')} AS units,
+            {_units('i')} * {_volume_ml('i')} AS ext_m_lp_case,
+            'A' AS status,
+            '20200101' AS activation_date,
+            '00000000' AS deactivation_date,
+            round(5 + 15 * {_rand(seed, 'i', "'wt'")}, 2) AS weight,
+            round(35 + 15 * {_rand(seed, 'i', "'abv'")}, 1) AS alcohol_pct,
+            CAST(NULL AS INTEGER) AS vintage,
+            {_volume_ml('i')} || 'ML' AS unit_volume_desc,
+            CAST(10000000000000 + i AS BIGINT) AS case_gtin,
+            CAST(20000000000000 + i AS BIGINT) AS retail_gtin
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+# --- master_data ------------------------------------------------------------------------
+
+def _hyperion_customer_master(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            {_customer_id('i')} AS customer_id,
+            {_customer_id('i')} || ' - Distributor ' || i AS customer_actual_data,
+            'USA - ' || {_market('i', 0)} AS market,
+            'USA' || {_market('i', 1)} || '1' AS market_id,
+            'M' || lpad(CAST(i % {len(MARKETS)} AS VARCHAR), 3, '0') AS market_coding,
+            'C' || {_customer_id('i')} AS customer_coding,
+            'Planning group ' || (i // 5) AS planning_member,
+            'PG' || (i // 5) AS planning_member_id,
+            'PGC' || (i // 5) AS planning_member_coding,
+            'Level ' || (i % 3) AS customer_stat_level,
+            'L' || (i % 3) AS customer_stat_level_id,
+            'LC' || (i % 3) AS customer_stat_level_coding
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _hyperion_customer_planning_group_mapping(v: Volume, seed: int) -> str:
+    return """
+        SELECT lpad(CAST(i AS VARCHAR), 5, '0') AS customer_id, 'Planning group ' || (i // 5) AS planning_group
+        FROM range({lo}, {hi}) t(i)
+    """
+
+
+def _hyperion_sku_master(v: Volume, seed: int) -> str:
+    # size_pack like '12x75' (units x centilitres), as parsed by stg_hyperion__sku_master
+    return f"""
+        SELECT
+            'B' || lpad(CAST(i // 24 AS VARCHAR), 3, '0') || ' - Brand ' || (i // 24) AS brand,
+            'V' || {_variant_id('i')} || ' - Variant ' || (i // 6) AS variant,
+            {_units('i')} || 'x' || CAST({_volume_ml('i')} / 10 AS INTEGER) AS size_pack,
+            'Variant ' || (i // 6) || ' ' || {_units('i')} || 'x' || CAST({_volume_ml('i')} / 10 AS INTEGER) AS hyperion_sku,
+            'HP' || lpad(CAST(i AS VARCHAR), 6, '0') AS hp_coding,
+            {_sku('i')} AS sku_id,
+            'SP' || (i % {len(SIZE_PACKS)}) AS size_pack_id,
+            'V' || {_variant_id('i')} AS variant_id,
+            'B' || lpad(CAST(i // 24 AS VARCHAR), 3, '0') AS brand_id
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _hyperion_sku_forecast_method(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            {_units('i')} || 'x' || CAST({_volume_ml('i')} / 10 AS INTEGER) AS hyperion_sku,
+            {_pick(FORECAST_METHODS, f"hash(i, {seed})")} AS forecast_method
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _hyperion_gsv_rates(v: Volume, seed: int) -> str:
+    # i -> (customer, size pack); keyed by the customer's market and planning member
+    packs = len(SIZE_PACKS)
+    return f"""
+        SELECT
+            'USA - ' || {_market(f'i // {packs}', 0)} AS market,
+            'Planning group ' || (i // {packs} // 5) AS planning_member,
+            {_units('i')} || 'x' || CAST({_volume_ml('i')} / 10 AS INTEGER) AS size_pack,
+            round(120 + 80 * {_rand(seed, 'i', "'wh'")}, 2) AS warehouse,
+            round(110 + 80 * {_rand(seed, 'i', "'di'")}, 2) AS direct_import
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _nrm_system_translation(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            {_sku('i')} AS part,
+            'N' || {_variant_id('i')} || '-' || {_volume_ml('i')} AS nielsen_variant_size,
+            'J' || {_variant_id('i')} || '-' || {_volume_ml('i')} AS jenda_variant_size,
+            'A' || {_variant_id('i')} || '-' || {_volume_ml('i')} AS nabca_variant_size
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+def _market_settings(v: Volume, seed: int) -> str:
+    return f"""
+        SELECT
+            CAST(i + 1 AS INTEGER) AS id,
+            {_market('i', 0)} AS market_name,
+            {_market('i', 1)} AS market_code,
+            '{{{{"forecast_enabled": true}}}}' AS settings
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+# --- ifs / public -----------------------------------------------------------------------
+
+def _ifs_products(v: Volume, seed: int) -> str:
+    # A slice of the catalogue (imports) is mastered in IFS rather than VIP
+    return f"""
+        SELECT
+            {_sku('s')} AS item_number,
+            'IFS Variant ' || (s // 6) AS item_name,
+            'Brand ' || (s // 24) AS brand_name,
+            lpad(CAST(s // 24 AS VARCHAR), 2, '0') AS brand_key,
+            'Variant ' || (s // 6) AS label_name,
+            {_variant_id('s')} AS label_key,
+            {_units('s')} AS units_per_case,
+            {_volume_ml('s')} / 1000.0 AS size_volume,
+            'Active' AS active_flag,
+            40.0 AS abv,
+            CAST(NULL AS INTEGER) AS vintage,
+            CAST(30000000000000 + s AS BIGINT) AS gtin
+        FROM (SELECT i * 5 AS s FROM range({{lo}}, {{hi}}) t(i))
+    """
+
+
+def _util_data(v: Volume, seed: int) -> str:
+    by_division: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
+    for n, (name, code) in enumerate(MARKETS):
+        division = DIVISIONS[1] if code in ("OR", "UT") else DIVISIONS[0]
+        by_division.setdefault(division, {}).setdefault(f"Region {n // 5}", []).append(
+            {"market_id": f"USA{code}1", "market_name": name}
+        )
+    # Braces are doubled because the statement is later passed through str.format(lo=, hi=)
+    payload = json.dumps(by_division).replace("'", "''").replace("{", "{{").replace("}", "}}")
+    return f"""
+        SELECT 'markets_by_division' AS table_name, '{payload}' AS data
+        FROM range({{lo}}, {{hi}}) t(i)
+    """
+
+
+TABLES = [
+    TableSpec("source_data", "slsda", lambda v: v.outlets * v.months * v.lines_per_outlet_month, _slsda),
+    TableSpec("source_data", "deplda", lambda v: v.distributors * v.skus_per_distributor * v.months, _deplda),
+    TableSpec("source_data", "distda", lambda v: v.distributors, _distda),
+    TableSpec("source_data", "vipout", lambda v: v.outlets, _vipout),
+    TableSpec("source_data", "outda", lambda v: v.outlets, _outda),
+    TableSpec("source_data", "vocot", lambda v: len(CLASSES_OF_TRADE) * 20, _vocot),
+    TableSpec("source_data", "vochain", lambda v: v.chains, _vochain),
+    TableSpec("source_data", "voownhier", lambda v: 100, _voownhier),
+    TableSpec("source_data", "voowndesc", lambda v: 100, _voowndesc),
+    TableSpec("source_data", "vipvalue", lambda v: 20, _vipvalue),
+    TableSpec("source_data", "srsvalue", lambda v: len(CLASSES_OF_TRADE), _srsvalue),
+    TableSpec("source_data", "itm2da", lambda v: v.skus, _itm2da),
+    TableSpec("source_data", "products", lambda v: v.skus // 5, _ifs_products),
+    TableSpec("master_data", "hyperion_customer_master", lambda v: v.distributors, _hyperion_customer_master),
+    TableSpec("master_data", "hyperion_customer_planning_group_mapping", lambda v: v.distributors, _hyperion_customer_planning_group_mapping),
+    TableSpec("master_data", "hyperion_sku_master", lambda v: v.skus, _hyperion_sku_master),
+    TableSpec("master_data", "hyperion_sku_forecast_method", lambda v: len(SIZE_PACKS), _hyperion_sku_forecast_method),
+    TableSpec("master_data", "hyperion_gsv_rates", lambda v: v.distributors * len(SIZE_PACKS), _hyperion_gsv_rates),
+    TableSpec("master_data", "nrm_system_translation", lambda v: v.skus, _nrm_system_translation),
+    TableSpec("master_data", "market_settings", lambda v: len(MARKETS), _market_settings),
+    TableSpec("public", "util_data", lambda v: 1, _util_data),
+]
+
+# Snowflake scalar functions used by the staging/master models, for the embedded (DuckDB) target.
+# Only the argument shapes the models use are covered.
+SNOWFLAKE_COMPAT_MACROS = [
+    """CREATE OR REPLACE MACRO try_to_date(s, fmt) AS CAST(CASE fmt
+        WHEN 'YYYYMM' THEN try_strptime(CAST(s AS VARCHAR), '%Y%m')
+        WHEN 'YYYYMMDD' THEN try_strptime(CAST(s AS VARCHAR), '%Y%m%d')
+        ELSE try_strptime(CAST(s AS VARCHAR), '%Y-%m-%d') END AS DATE)""",
+    """CREATE OR REPLACE MACRO to_char(d, fmt) AS CASE fmt
+        WHEN 'MMMM' THEN monthname(d) WHEN 'MON' THEN strftime(d, '%b') ELSE strftime(d, '%Y-%m-%d') END""",
+    "CREATE OR REPLACE MACRO regexp_substr(s, pattern, pos, occurrence, params, grp) AS nullif(regexp_extract(s, pattern, grp), '')",
+    "CREATE OR REPLACE MACRO initcap(s) AS array_to_string(list_transform(string_split(lower(s), ' '), w -> upper(w[1]) || w[2:]), ' ')",
+    "CREATE OR REPLACE MACRO parse_json(s) AS CAST(s AS JSON)",
+]
+
+
+def write_table(con, spec: TableSpec, volume: Volume, seed: int, output: Path, chunk_rows: int) -> Dict[str, int]:
+    """Stream one table to <output>/<schema>/<name>/part-*.parquet, chunk by chunk."""
+    table_dir = output / spec.schema / spec.name
+    table_dir.mkdir(parents=True, exist_ok=True)
+    for stale in table_dir.glob("part-*.parquet"):
+        stale.unlink()
+    total = spec.rows(volume)
+    template = spec.select(volume, seed)
+    files = 0
+    for part, lo in enumerate(range(0, total, chunk_rows)):
+        hi = min(lo + chunk_rows, total)
+        path = table_dir / f"part-{part:05d}.parquet"
+        con.execute(
+            f"COPY ({template.format(lo=lo, hi=hi)}) TO '{path}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+        )
+        files += 1
+    return {"rows": total, "files": files}
+
+
+def register_views(db_path: Path, output: Path, written: List[TableSpec]) -> None:
+    """Expose the Parquet tables as views in a DuckDB file (the `local` dbt target's database)."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(db_path))
+    try:
+        for macro in SNOWFLAKE_COMPAT_MACROS:
+            con.execute(macro)
+        for spec in written:
+            con.execute(f"CREATE SCHEMA IF NOT EXISTS {spec.schema}")
+            files = (output / spec.schema / spec.name).resolve() / "*.parquet"
+            con.execute(f"CREATE OR REPLACE VIEW {spec.schema}.{spec.name} AS SELECT * FROM read_parquet('{files}')")
+    finally:
+        con.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic VIP/Hyperion source tables as Parquet")
+    parser.add_argument("--volume", type=int, default=1, help="Multiple of the 1x baseline (e.g. 1, 10, 100)")
+    parser.add_argument("--output", type=Path, required=True, help="Output directory for the Parquet files")
+    parser.add_argument("--seed", type=int, default=42, help="Seed (default: 42)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help=f"Rows per Parquet file (default: {DEFAULT_CHUNK_ROWS:,})")
+    parser.add_argument("--only", action="append", default=None, help="Generate only this table (repeatable)")
+    parser.add_argument("--memory-limit", default="2GB", help="DuckDB memory limit while generating (default: 2GB)")
+    parser.add_argument("--threads", type=int, default=None, help="DuckDB threads (default: DuckDB's choice)")
+    parser.add_argument("--duckdb", type=Path, default=None, help="Also register the tables as views in this DuckDB file")
+    parser.add_argument("--dry-run", action="store_true", help="Print the row counts per table and exit")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.volume < 1 or args.chunk_rows < 1:
+        logger.error("--volume and --chunk-rows must be positive")
+        sys.exit(2)
+    volume = Volume.of(args.volume)
+    specs = [s for s in TABLES if not args.only or s.name in set(args.only)]
+    if not specs:
+        logger.error(f"No table matches --only {args.only}; choose from {[s.name for s in TABLES]}")
+        sys.exit(2)
+
+    if args.dry_run:
+        for spec in specs:
+            print(f"{spec.schema + '.' + spec.name:<55} {spec.rows(volume):>14,}")
+        return
+
+    con = duckdb.connect()
+    con.execute(f"SET memory_limit = '{args.memory_limit}'")
+    con.execute("SET preserve_insertion_order = false")
+    if args.threads:
+        con.execute(f"SET threads = {args.threads}")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    manifest_path = args.output / "_manifest.json"
+    manifest = {"volume": args.volume, "seed": args.seed, "first_month": FIRST_MONTH, "tables": {}}
+    if args.only and manifest_path.exists():
+        previous = json.loads(manifest_path.read_text())
+        if (previous.get("volume"), previous.get("seed")) == (args.volume, args.seed):
+            manifest["tables"] = previous.get("tables", {})
+    started = time.perf_counter()
+    for spec in specs:
+        t0 = time.perf_counter()
+        stats = write_table(con, spec, volume, args.seed, args.output, args.chunk_rows)
+        elapsed = time.perf_counter() - t0
+        manifest["tables"][f"{spec.schema}.{spec.name}"] = stats
+        logger.info(
+            f"📦 {spec.schema}.{spec.name}: {stats['rows']:,} rows in {stats['files']} file(s), "
+            f"{elapsed:.1f}s ({stats['rows'] / elapsed if elapsed > 0 else 0:,.0f} rows/s)"
+        )
+    con.close()
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n")
+    logger.info(f"✅ {len(specs)} tables written to {args.output} in {time.perf_counter() - started:.1f}s")
+
+    if args.duckdb:
+        register_views(args.duckdb.expanduser(), args.output, specs)
+        logger.info(f"🦆 Registered views and Snowflake compatibility macros in {args.duckdb}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,30 @@
 SQL File Cleanup Script
 
 This script removes hardcoded USE DATABASE and USE SCHEMA statements from all SQL files
-in the backend_functions directory to prepare them for dynamic deployment.
+in a tenant's backend_functions directory to prepare them for dynamic deployment.
+`--tenant` selects tenants under tenants/ (repeatable, or `all`); files of every selected
+tenant are cleaned in one pool.
+
+Rewrites are driven by REWRITE_RULES and applied in a single tokenizer-based pass per file:
+comments and string literals are never rewritten, USE statements are only removed at the
+top level (indented ones included, never inside $$ bodies), and files are processed on a
+process pool. `--benchmark` reports throughput in files/s and MB/s.
 
 Usage:
-    python clean_sql_files.py [--dry-run]
+    python clean_sql_files.py [--dry-run] [--jobs N] [--benchmark] [--tenant NAME ...|all]
 """
 
+import argparse
+import bisect
 import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 import logging
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -23,66 +35,184 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class SQLCleaner:
-    def __init__(self, dry_run: bool = False):
-        self.dry_run = dry_run
-        self.project_root = Path(__file__).resolve().parent.parent
-        self.backend_functions_dir = self.project_root / "tenants" / "dbt_williamgrant" / "backend_functions"
-        self.backup_dir = self.project_root / "scripts" / "deploy" / "backups"
 
-    def find_sql_files(self) -> List[Path]:
-        """Find all SQL files in the backend_functions directory"""
-        sql_files = list(self.backend_functions_dir.rglob("*.sql"))
-        logger.info(f"Found {len(sql_files)} SQL files")
-        return sql_files
+@dataclass(frozen=True)
+class RewriteRule:
+    """Literal qualifier rewrite applied to SQL code (never to comments or string literals)."""
+    find: str
+    replace: str
 
-    def clean_sql_content(self, content: str) -> str:
-        """Remove hardcoded USE DATABASE and USE SCHEMA statements and database/schema qualifications"""
-        lines = content.split('\n')
-        cleaned_lines = []
-        removed_lines = []
-        modifications = []
+    @property
+    def description(self) -> str:
+        return f"{self.find} → {self.replace}"
 
-        for line_num, line in enumerate(lines, 1):
-            original_line = line
 
-            # Check for USE DATABASE or USE SCHEMA statements
-            if re.match(r'^USE\s+DATABASE\s+', line, re.IGNORECASE) or \
-               re.match(r'^USE\s+SCHEMA\s+', line, re.IGNORECASE):
-                removed_lines.append(f"Line {line_num}: {original_line}")
-                continue  # Skip this line
+# Order matters only for reporting: changes on a line are listed in table order
+REWRITE_RULES: Tuple[RewriteRule, ...] = (
+    RewriteRule('APOLLO_WILLIAMGRANT.FORECAST.', 'FORECAST.'),
+    RewriteRule('APOLLO_DEVELOPMENT.FORECAST.', 'FORECAST.'),
+    RewriteRule('APOLLO_WILLIAMGRANT.MASTER_DATA.', 'MASTER_DATA.'),
+    RewriteRule('APOLLO_DEVELOPMENT.MASTER_DATA.', 'MASTER_DATA.'),
+)
 
-            # Remove database/schema qualifications from object names
-            modified_line = original_line
-            changes_in_line = []
+# Comments, $$ bodies and single-quoted strings; everything else is code.
+# Double quotes are identifiers in Snowflake and stay part of the code.
+_TOKEN_RE = re.compile(
+    r"(?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))"
+    r"|(?P<dollar>\$\$.*?(?:\$\$|\Z))"
+    r"|(?P<string>'(?:[^'\\]|\\.|'')*(?:'|\Z))"
+    r"|(?P<code>(?:[^-/$']|-(?!-)|/(?!\*)|\$(?!\$))+)",
+    re.DOTALL,
+)
+_USE_LINE_RE = re.compile(r"^[^\S\n]*USE[^\S\n]+(?:DATABASE|SCHEMA)[^\S\n]+", re.IGNORECASE | re.MULTILINE)
+
+
+class SQLRewriteEngine:
+    """Single-pass, SQL-aware rewrite engine built from a rule table.
+
+    All rule patterns are compiled once into one alternation, so each code token is scanned
+    a single time regardless of the number of rules.
+    """
+
+    def __init__(self, rules: Tuple[RewriteRule, ...] = REWRITE_RULES):
+        self.rules = rules
+        # Longest first so overlapping qualifiers resolve to the most specific rule
+        order = sorted(range(len(rules)), key=lambda i: len(rules[i].find), reverse=True)
+        self._rule_re = re.compile(
+            "|".join(f"(?P<r{i}>(?<![\\w$]){re.escape(rules[i].find)})" for i in order)
+        )
+
+    def _rewrite_code(
+        self, code: str, offset: int, line_starts: List[int], hits: Dict[int, Set[int]]
+    ) -> str:
+        def repl(m: "re.Match[str]") -> str:
+            rule_idx = int(m.lastgroup[1:])
+            line_no = bisect.bisect_right(line_starts, offset + m.start())
+            hits.setdefault(line_no, set()).add(rule_idx)
+            return self.rules[rule_idx].replace
+
+        return self._rule_re.sub(repl, code)
+
+    def _rewrite_tokens(
+        self,
+        text: str,
+        offset: int,
+        line_starts: List[int],
+        hits: Dict[int, Set[int]],
+        code_spans: Optional[List[Tuple[int, int]]],
+    ) -> str:
+        out: List[str] = []
+        for m in _TOKEN_RE.finditer(text):
+            kind = m.lastgroup
+            token = m.group()
+            start = offset + m.start()
+            if kind == "code":
+                if code_spans is not None:
+                    code_spans.append((start, start + len(token)))
+                out.append(self._rewrite_code(token, start, line_starts, hits))
+            elif kind == "dollar":
+                # $$ bodies are SQL scripts: rewrite their code, but they never contribute USE lines
+                closed = token.endswith("$$") and len(token) >= 4
+                inner = token[2:-2] if closed else token[2:]
+                body = self._rewrite_tokens(inner, start + 2, line_starts, hits, None)
+                out.append("$$" + body + ("$$" if closed else ""))
+            else:
+                out.append(token)
+        return "".join(out)
+
+    def rewrite(self, content: str) -> Tuple[str, List[str]]:
+        """Return (cleaned content, change report lines).
+
+        The report lists removed USE lines first, then per-line qualifier rewrites.
+        """
+        line_starts = [0] + [m.end() for m in re.finditer("\n", content)]
+        hits: Dict[int, Set[int]] = {}
+        code_spans: List[Tuple[int, int]] = []
+        rewritten = self._rewrite_tokens(content, 0, line_starts, hits, code_spans)
+
+        span_starts = [start for start, _ in code_spans]
+        use_lines: Set[int] = set()
+        for m in _USE_LINE_RE.finditer(content):
+            idx = bisect.bisect_right(span_starts, m.start()) - 1
+            # The whole match must lie in one top-level code token
+            if idx >= 0 and code_spans[idx][0] <= m.start() and m.end() <= code_spans[idx][1]:
+                use_lines.add(bisect.bisect_right(line_starts, m.start()))
+
+        original_lines = content.split('\n')
+        # Rules never add or remove newlines, so line numbers line up with the original
+        cleaned_lines = [
+            line for line_no, line in enumerate(rewritten.split('\n'), 1) if line_no not in use_lines
+        ]
+        removed = [f"Line {n}: {original_lines[n - 1]}" for n in sorted(use_lines)]
+        modifications = [
+            f"Line {n}: {', '.join(self.rules[i].description for i in sorted(hits[n]))}"
+            for n in sorted(hits)
+            if n not in use_lines
+        ]
+        return '\n'.join(cleaned_lines), removed + modifications
+
+
+_ENGINE = SQLRewriteEngine()
+
+
+def _clean_file_task(
+    file_path: Path, project_root: Path, backup_dir: Path, dry_run: bool
+) -> Tuple[bool, List[Tuple[int, str]], int]:
+    """Process-pool entry point. Returns (success, log records, bytes read)."""
+    cleaner = SQLCleaner(dry_run=dry_run)
+    cleaner.project_root = project_root
+    cleaner.backup_dir = backup_dir
+    records: List[Tuple[int, str]] = []
+    ok = cleaner.clean_file(file_path, records)
+    try:
+        size = file_path.stat().st_size
+    except OSError:
+        size = 0
+    return ok, records, size
 
-            # Pattern: APOLLO_WILLIAMGRANT.FORECAST.object_name → FORECAST.object_name
-            if 'APOLLO_WILLIAMGRANT.FORECAST.' in modified_line:
-                modified_line = modified_line.replace('APOLLO_WILLIAMGRANT.FORECAST.', 'FORECAST.')
-                changes_in_line.append('APOLLO_WILLIAMGRANT.FORECAST. → FORECAST.')
 
-            # Pattern: APOLLO_DEVELOPMENT.FORECAST.object_name → FORECAST.object_name
-            if 'APOLLO_DEVELOPMENT.FORECAST.' in modified_line:
-                modified_line = modified_line.replace('APOLLO_DEVELOPMENT.FORECAST.', 'FORECAST.')
-                changes_in_line.append('APOLLO_DEVELOPMENT.FORECAST. → FORECAST.')
+DEFAULT_TENANT = "williamgrant"
 
-            # Pattern: APOLLO_WILLIAMGRANT.MASTER_DATA.object_name → MASTER_DATA.object_name
-            if 'APOLLO_WILLIAMGRANT.MASTER_DATA.' in modified_line:
-                modified_line = modified_line.replace('APOLLO_WILLIAMGRANT.MASTER_DATA.', 'MASTER_DATA.')
-                changes_in_line.append('APOLLO_WILLIAMGRANT.MASTER_DATA. → MASTER_DATA.')
 
-            # Pattern: APOLLO_DEVELOPMENT.MASTER_DATA.object_name → MASTER_DATA.object_name
-            if 'APOLLO_DEVELOPMENT.MASTER_DATA.' in modified_line:
-                modified_line = modified_line.replace('APOLLO_DEVELOPMENT.MASTER_DATA.', 'MASTER_DATA.')
-                changes_in_line.append('APOLLO_DEVELOPMENT.MASTER_DATA. → MASTER_DATA.')
+def tenant_backend_dirs(project_root: Path, tenants: Optional[List[str]] = None) -> List[Path]:
+    """backend_functions directories of the named tenants (with or without the dbt_ prefix, or "all")."""
+    tenants_root = project_root / "tenants"
+    names = tenants or [DEFAULT_TENANT]
+    if "all" in names:
+        return sorted(p / "backend_functions" for p in tenants_root.iterdir() if (p / "backend_functions").is_dir())
+    dirs = []
+    for name in names:
+        backend_dir = tenants_root / (name if name.startswith("dbt_") else f"dbt_{name}") / "backend_functions"
+        if not backend_dir.is_dir():
+            raise FileNotFoundError(f"No backend_functions directory for tenant '{name}': {backend_dir}")
+        dirs.append(backend_dir)
+    return dirs
 
-            cleaned_lines.append(modified_line)
 
-            # Track modifications
-            if changes_in_line and modified_line != original_line:
-                modifications.append(f"Line {line_num}: {', '.join(changes_in_line)}")
+class SQLCleaner:
+    def __init__(
+        self,
+        dry_run: bool = False,
+        jobs: Optional[int] = None,
+        benchmark: bool = False,
+        tenants: Optional[List[str]] = None,
+    ):
+        self.dry_run = dry_run
+        self.jobs = jobs or os.cpu_count() or 1
+        self.benchmark = benchmark
+        self.project_root = Path(__file__).resolve().parent.parent
+        self.backend_functions_dirs = tenant_backend_dirs(self.project_root, tenants)
+        self.backup_dir = self.project_root / "scripts" / "deploy" / "backups"
+
+    def find_sql_files(self) -> List[Path]:
+        """Find all SQL files in the selected tenants' backend_functions directories"""
+        sql_files = [f for d in self.backend_functions_dirs for f in sorted(d.rglob("*.sql"))]
+        logger.info(f"Found {len(sql_files)} SQL files")
+        return sql_files
 
-        return '\n'.join(cleaned_lines), removed_lines + modifications
+    def clean_sql_content(self, content: str) -> Tuple[str, List[str]]:
+        """Remove hardcoded USE DATABASE and USE SCHEMA statements and database/schema qualifications"""
+        return _ENGINE.rewrite(content)
 
     def create_backup(self, file_path: Path) -> Path:
         """Create a backup of the original file"""
@@ -100,10 +230,20 @@ class SQLCleaner:
 
         return backup_path
 
-    def clean_file(self, file_path: Path) -> bool:
-        """Clean a single SQL file"""
+    def clean_file(self, file_path: Path, records: Optional[List[Tuple[int, str]]] = None) -> bool:
+        """Clean a single SQL file.
+
+        When `records` is given, log records are collected there instead of being emitted, so
+        results from worker processes can be logged in file order by the parent.
+        """
+        def log(level: int, msg: str) -> None:
+            if records is None:
+                logger.log(level, msg)
+            else:
+                records.append((level, msg))
+
         try:
-            logger.info(f"Processing {file_path.relative_to(self.project_root)}")
+            log(logging.INFO, f"Processing {file_path.relative_to(self.project_root)}")
 
             # Read the original content
             content = file_path.read_text()
@@ -112,36 +252,60 @@ class SQLCleaner:
             cleaned_content, removed_lines = self.clean_sql_content(content)
 
             if not removed_lines:
-                logger.info(f"  ℹ️ No changes needed for {file_path.name}")
+                log(logging.INFO, f"  ℹ️ No changes needed for {file_path.name}")
                 return True
 
             # Show what will be cleaned
-            logger.info(f"  🧹 Cleaning {len(removed_lines)} items:")
+            log(logging.INFO, f"  🧹 Cleaning {len(removed_lines)} items:")
             for removed_line in removed_lines:
-                logger.info(f"    {removed_line}")
+                log(logging.INFO, f"    {removed_line}")
 
             if self.dry_run:
-                logger.info(f"  🔍 DRY RUN: Would modify {file_path.name}")
+                log(logging.INFO, f"  🔍 DRY RUN: Would modify {file_path.name}")
                 return True
 
             # Create backup
             backup_path = self.create_backup(file_path)
-            logger.info(f"  💾 Backup created: {backup_path}")
+            log(logging.INFO, f"  💾 Backup created: {backup_path}")
 
             # Write cleaned content
             file_path.write_text(cleaned_content)
-            logger.info(f"  ✅ Cleaned {file_path.name}")
+            log(logging.INFO, f"  ✅ Cleaned {file_path.name}")
 
             return True
 
         except Exception as e:
-            logger.error(f"  ❌ Error processing {file_path.name}: {str(e)}")
+            log(logging.ERROR, f"  ❌ Error processing {file_path.name}: {str(e)}")
             return False
 
+    def _clean_files(self, sql_files: List[Path]) -> List[Tuple[bool, int]]:
+        """Clean files, in parallel when jobs > 1. Returns (success, bytes) per file, in input order."""
+        if self.jobs <= 1 or len(sql_files) <= 1:
+            results = []
+            for sql_file in sql_files:
+                ok = self.clean_file(sql_file)
+                results.append((ok, sql_file.stat().st_size if sql_file.exists() else 0))
+            return results
+
+        results = []
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(sql_files))) as pool:
+            futures = [
+                pool.submit(_clean_file_task, f, self.project_root, self.backup_dir, self.dry_run)
+                for f in sql_files
+            ]
+            # Emit logs in submission order so output is identical to a sequential run
+            for future in futures:
+                ok, records, size = future.result()
+                for level, msg in records:
+                    logger.log(level, msg)
+                results.append((ok, size))
+        return results
+
     def clean_all_files(self) -> bool:
         """Clean all SQL files"""
         logger.info(f"🧹 Starting SQL cleanup (dry_run={self.dry_run})")
-        logger.info(f"Target directory: {self.backend_functions_dir}")
+        for backend_dir in self.backend_functions_dirs:
+            logger.info(f"Target directory: {backend_dir}")
 
         sql_files = self.find_sql_files()
 
@@ -149,14 +313,11 @@ class SQLCleaner:
             logger.warning("No SQL files found")
             return True
 
-        success_count = 0
-        failure_count = 0
-
-        for sql_file in sql_files:
-            if self.clean_file(sql_file):
-                success_count += 1
-            else:
-                failure_count += 1
+        started = time.perf_counter()
+        results = self._clean_files(sql_files)
+        elapsed = time.perf_counter() - started
+        success_count = sum(1 for ok, _ in results if ok)
+        failure_count = len(results) - success_count
 
         # Summary
         logger.info(f"\n📊 Cleanup Summary:")
@@ -167,6 +328,14 @@ class SQLCleaner:
         if not self.dry_run and success_count > 0:
             logger.info(f"\n💾 Backups stored in: {self.backup_dir}")
 
+        if self.benchmark:
+            total_mb = sum(size for _, size in results) / (1024 * 1024)
+            rate = elapsed if elapsed > 0 else float("inf")
+            logger.info(
+                f"\n⚡ Throughput: {len(results)} files, {total_mb:.2f} MB in {elapsed:.3f}s "
+                f"→ {len(results) / rate:.1f} files/s, {total_mb / rate:.2f} MB/s (jobs={self.jobs})"
+            )
+
         if failure_count > 0:
             logger.error(f"❌ Cleanup completed with {failure_count} failures")
             return False
@@ -174,11 +343,26 @@ class SQLCleaner:
             logger.info("🎉 All files cleaned successfully!")
             return True
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Remove hardcoded database/schema references from backend SQL files")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without modifying files")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count; 1 = in-process)")
+    parser.add_argument("--benchmark", action="store_true", help="Report throughput in files/s and MB/s")
+    parser.add_argument(
+        "--tenant",
+        action="append",
+        default=None,
+        help=f"Tenant under tenants/ to clean (repeatable, or 'all'; default: {DEFAULT_TENANT})",
+    )
+    return parser.parse_args()
+
+
 def main():
-    dry_run = "--dry-run" in sys.argv
+    args = parse_args()
+    dry_run = args.dry_run
 
     try:
-        cleaner = SQLCleaner(dry_run=dry_run)
+        cleaner = SQLCleaner(dry_run=dry_run, jobs=args.jobs, benchmark=args.benchmark, tenants=args.tenant)
         success = cleaner.clean_all_files()
 
         if dry_run:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+dbt model timing report.
+
+Reads the per-model timing history that the Dagster dbt assets record after every run
+(dagster_apollo/run_history.py) and prints:
+- the slowest models (median execute time over their recent successful runs)
+- the models that slowed down the most (recent median vs the median of the runs before)
+
+The history is a local SQLite file; its location is resolved the same way as in Dagster:
+DBT_TIMING_HISTORY_DB, else <cache>/dbt_timing_history.sqlite where <cache> is
+DAGSTER_APOLLO_CACHE_DIR, $DAGSTER_HOME/.apollo_cache or ~/.cache/dagster_apollo.
+
+Usage:
+    python scripts/dbt_timing_report.py
+    python scripts/dbt_timing_report.py --top 20 --recent 5 --json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def default_history_path() -> Path:
+    explicit = os.getenv("DBT_TIMING_HISTORY_DB")
+    if explicit:
+        return Path(explicit)
+    if os.getenv("DAGSTER_APOLLO_CACHE_DIR"):
+        root = Path(os.environ["DAGSTER_APOLLO_CACHE_DIR"])
+    elif os.getenv("DAGSTER_HOME"):
+        root = Path(os.environ["DAGSTER_HOME"]) / ".apollo_cache"
+    else:
+        root = Path.home() / ".cache" / "dagster_apollo"
+    return root / "dbt_timing_history.sqlite"
+
+
+def load_history(db_path: Path, target: Optional[str] = None) -> Dict[str, List[float]]:
+    """unique_id -> successful execute times, oldest first."""
+    conn = sqlite3.connect(db_path)
+    try:
+        sql = (
+            "SELECT unique_id, execute_s FROM model_timings "
+            "WHERE status = 'success' AND execute_s IS NOT NULL"
+        )
+        params: List[Any] = []
+        if target:
+            sql += " AND target = ?"
+            params.append(target)
+        sql += " ORDER BY recorded_at"
+        history: Dict[str, List[float]] = {}
+        for uid, execute_s in conn.execute(sql, params):
+            history.setdefault(uid, []).append(execute_s)
+        return history
+    finally:
+        conn.close()
+
+
+def build_report(history: Dict[str, List[float]], top: int, recent: int) -> Dict[str, Any]:
+    slowest = []
+    slowdowns = []
+    for uid, times in history.items():
+        recent_times = times[-recent:]
+        slowest.append({
+            "model": uid.split(".")[-1],
+            "unique_id": uid,
+            "runs": len(times),
+            "median_execute_s": round(statistics.median(recent_times), 2),
+            "last_execute_s": round(times[-1], 2),
+        })
+        earlier = times[:-recent][-recent * 2:]
+        if len(earlier) >= 2 and len(recent_times) >= 2:
+            before = statistics.median(earlier)
+            after = statistics.median(recent_times)
+            slowdowns.append({
+                "model": uid.split(".")[-1],
+                "unique_id": uid,
+                "before_median_s": round(before, 2),
+                "recent_median_s": round(after, 2),
+                "delta_s": round(after - before, 2),
+                "ratio": round(after / before, 2) if before > 0 else None,
+            })
+    slowest.sort(key=lambda r: r["median_execute_s"], reverse=True)
+    slowdowns.sort(key=lambda r: r["delta_s"], reverse=True)
+    return {
+        "slowest": slowest[:top],
+        "slowed_down": [r for r in slowdowns if r["delta_s"] > 0][:top],
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("🐢 Slowest models (median execute time, recent runs)")
+    print(f"   {'model':<55} {'median s':>9} {'last s':>9} {'runs':>5}")
+    for r in report["slowest"]:
+        print(f"   {r['model']:<55} {r['median_execute_s']:>9.2f} {r['last_execute_s']:>9.2f} {r['runs']:>5}")
+    print("\n📈 Largest slowdowns (recent median vs earlier median)")
+    if not report["slowed_down"]:
+        print("   (none)")
+        return
+    print(f"   {'model':<55} {'before s':>9} {'recent s':>9} {'delta s':>9} {'ratio':>6}")
+    for r in report["slowed_down"]:
+        ratio = f"{r['ratio']:.2f}" if r["ratio"] is not None else "-"
+        print(
+            f"   {r['model']:<55} {r['before_median_s']:>9.2f} {r['recent_median_s']:>9.2f} "
+            f"{r['delta_s']:>+9.2f} {ratio:>6}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report slowest and regressing dbt models from timing history")
+    parser.add_argument("--db", type=Path, default=None, help="Timing history SQLite file")
+    parser.add_argument("--target", default=None, help="Only include runs against this dbt target (e.g. prod)")
+    parser.add_argument("--top", type=int, default=10, help="Rows per section (default: 10)")
+    parser.add_argument("--recent", type=int, default=5, help="Runs that count as 'recent' (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of tables")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    db_path = args.db or default_history_path()
+    if not db_path.exists():
+        print(f"No timing history found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+    report = build_report(load_history(db_path, args.target), top=args.top, recent=args.recent)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,24 @@
 """
 Deploy backend functions/UDFs to Snowflake using Snow CLI.
 
-- Scans tenants/dbt_williamgrant/backend_functions recursively
+- Scans tenants/dbt_<tenant>/backend_functions recursively (`--tenant`, default williamgrant)
 - Excludes any files matching '*_ddl*.sql' (DDL and DDL chain files)
 - Executes remaining .sql files via `snow sql -c <profile> -f <file>`
 - Supports optional `--database` and `--schema` which are prepended as USE statements
 - Supports `--dry-run` to preview actions
+- Supports `--jobs N` to deploy independent files concurrently. Object references in the
+  SQL bodies (e.g. SP_BATCH_SAVE_FORECASTS → UDF_IS_DEPLETIONS_FORECAST_PUBLISHED) are
+  used to order files into topological waves; each wave runs on a pool of N workers.
+- Supports `--session` to send statements over long-lived connections (one per worker)
+  instead of one Snow CLI process per file. Database/schema are set once per connection
+  and statements are executed from memory (no temp files). `--connector module:factory`
+  plugs in a different connection implementation (e.g. a local stand-in).
+- Records a normalized SQL hash per file/object and target (profile, database, schema) in a
+  deploy state file. `--changed-only` redeploys only files whose hash changed plus the files
+  that depend on them; with `--dry-run` the plan is shown as changed/unchanged/dependent.
+- Supports `--lint-fail-on <severity>` to run the static performance linter (lint_backend_sql.py)
+  over the files first and abort when a finding is at or above that severity. Findings listed in
+  the linter's baseline (perf_lint_baseline.json) are logged as known and do not abort.
 
 Connection profiles:
 - apollo     → development (dev)
@@ -16,17 +29,31 @@ Usage:
     python scripts/deploy/deploy_backend_functions.py --profile apollo --database APOLLO_DEVELOPMENT --schema FORECAST
     python scripts/deploy/deploy_backend_functions.py --profile apollo_wgs --schema FORECAST
     python scripts/deploy/deploy_backend_functions.py --profile apollo --dry-run
+    python scripts/deploy/deploy_backend_functions.py --profile apollo --schema FORECAST --jobs 8
+    python scripts/deploy/deploy_backend_functions.py --profile apollo --schema FORECAST --session --jobs 4
+    python scripts/deploy/deploy_backend_functions.py --profile apollo_wgs --schema FORECAST --changed-only --dry-run
+    python scripts/deploy/deploy_backend_functions.py --profile apollo --tenant <name> --schema FORECAST --dry-run
+    python scripts/deploy/deploy_backend_functions.py --profile apollo_wgs --schema FORECAST --lint-fail-on error
 """
 
 import argparse
+import hashlib
+import importlib
+import json
 import logging
 import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Set, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -36,16 +63,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent
-BACKEND_FUNCTIONS_DIR = REPO_ROOT / "tenants" / "dbt_williamgrant" / "backend_functions"
+DEFAULT_TENANT = "williamgrant"
+BACKEND_FUNCTIONS_DIR = REPO_ROOT / "tenants" / f"dbt_{DEFAULT_TENANT}" / "backend_functions"
+DEFAULT_STATE_FILE = REPO_ROOT / "scripts" / "deploy" / ".deploy_state.json"
+
+# Objects created by a file, e.g. "CREATE OR REPLACE PROCEDURE FORECAST.SP_BATCH_SAVE_FORECASTS("
+CREATE_OBJECT_RE = re.compile(
+    r"\bCREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:SECURE|TEMPORARY|TRANSIENT|HYBRID)\s+)*"
+    r"(?:PROCEDURE|FUNCTION|TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    r"(?:[A-Za-z_][\w$]*\.){0,2}([A-Za-z_][\w$]*)",
+    re.IGNORECASE,
+)
+LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+IDENTIFIER_RE = re.compile(r"[A-Za-z_][\w$]*")
+
+
+def tenant_backend_functions_dir(tenant: str) -> Path:
+    """tenants/dbt_<tenant>/backend_functions (the dbt_ prefix is optional in `tenant`)."""
+    return REPO_ROOT / "tenants" / (tenant if tenant.startswith("dbt_") else f"dbt_{tenant}") / "backend_functions"
 
 
-def find_sql_files() -> List[Path]:
+def find_sql_files(backend_dir: Path = BACKEND_FUNCTIONS_DIR) -> List[Path]:
     """Find all non-DDL SQL files under backend_functions."""
-    if not BACKEND_FUNCTIONS_DIR.exists():
-        logger.error(f"Backend functions directory not found: {BACKEND_FUNCTIONS_DIR}")
+    if not backend_dir.exists():
+        logger.error(f"Backend functions directory not found: {backend_dir}")
         return []
 
-    all_sql = list(BACKEND_FUNCTIONS_DIR.rglob("*.sql"))
+    all_sql = list(backend_dir.rglob("*.sql"))
 
     def is_excluded(p: Path) -> bool:
         # Exclude any file with '_ddl' in the stem, e.g. *_ddl.sql, *_ddl_chains.sql
@@ -63,6 +108,113 @@ def find_sql_files() -> List[Path]:
     return sorted(filtered)
 
 
+def strip_sql_comments(sql: str) -> str:
+    """Remove line and block comments so commented-out references do not create dependencies."""
+    return LINE_COMMENT_RE.sub("", BLOCK_COMMENT_RE.sub("", sql))
+
+
+def created_objects(sql: str) -> Set[str]:
+    """Return the (unqualified, upper-cased) names of objects created by a SQL script."""
+    return {m.group(1).upper() for m in CREATE_OBJECT_RE.finditer(strip_sql_comments(sql))}
+
+
+def build_dependency_graph(sql_files: List[Path]) -> Dict[Path, Set[Path]]:
+    """Map each file to the files whose objects it references.
+
+    A file depends on another when its body mentions an object that the other file creates,
+    e.g. UDTF_GET_DEPLETIONS_FORECAST → UDF_GET_VALID_FORECAST_GENERATION_MONTH_DATE.
+    """
+    bodies = {p: strip_sql_comments(p.read_text()) for p in sql_files}
+    owner: Dict[str, Path] = {}
+    for path in sql_files:
+        for name in created_objects(bodies[path]):
+            if name in owner and owner[name] != path:
+                logger.warning(f"Object {name} is created by both {owner[name].name} and {path.name}")
+                continue
+            owner[name] = path
+
+    graph: Dict[Path, Set[Path]] = {}
+    for path in sql_files:
+        referenced = {tok.upper() for tok in IDENTIFIER_RE.findall(bodies[path])}
+        graph[path] = {owner[name] for name in referenced if name in owner and owner[name] != path}
+    return graph
+
+
+def strongly_connected_components(graph: Dict[Path, Set[Path]]) -> List[Set[Path]]:
+    """Strongly connected components of the dependency graph (iterative Tarjan)."""
+    index: Dict[Path, int] = {}
+    lowlink: Dict[Path, int] = {}
+    stack: List[Path] = []
+    on_stack: Set[Path] = set()
+    components: List[Set[Path]] = []
+    for root in sorted(graph):
+        if root in index:
+            continue
+        work: List[Tuple[Path, Iterator[Path]]] = [(root, iter(sorted(graph[root])))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(graph.get(child, ())))))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component: Set[Path] = set()
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.add(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def break_cycles(graph: Dict[Path, Set[Path]]) -> Dict[Path, Set[Path]]:
+    """Copy of the graph without the edges inside dependency cycles.
+
+    Files that reference each other (e.g. two procedures calling one another) cannot be
+    ordered; Snowflake resolves those references at call time, so they deploy in the same wave.
+    """
+    component_of: Dict[Path, int] = {}
+    for i, component in enumerate(strongly_connected_components(graph)):
+        if len(component) > 1:
+            logger.warning("Dependency cycle between: " + ", ".join(sorted(p.name for p in component)))
+        for path in component:
+            component_of[path] = i
+    return {path: {d for d in deps if component_of.get(d) != component_of[path]} for path, deps in graph.items()}
+
+
+def plan_waves(graph: Dict[Path, Set[Path]]) -> List[List[Path]]:
+    """Group files into topological waves; every file only depends on files in earlier waves.
+
+    Edges inside dependency cycles are ignored (break_cycles), so the files of a cycle share
+    a wave.
+    """
+    remaining = {path: set(deps) for path, deps in break_cycles(graph).items()}
+    waves: List[List[Path]] = []
+    while remaining:
+        ready = sorted(path for path, deps in remaining.items() if not deps)
+        waves.append(ready)
+        for path in ready:
+            del remaining[path]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return waves
+
+
 def build_temp_sql(original_sql_path: Path, database: Optional[str], schema: Optional[str]) -> Tuple[Path, bool]:
     """If database/schema provided, create a temp SQL that prepends USE statements; else return the original path.
 
@@ -108,64 +260,515 @@ def run_snow_sql(profile: str, sql_file: Path) -> int:
     return completed.returncode
 
 
-def deploy(profile: str, database: Optional[str], schema: Optional[str], dry_run: bool) -> bool:
-    logger.info(f"Starting deployment (profile={profile}, database={database}, schema={schema}, dry_run={dry_run})")
-    if profile not in {"apollo", "apollo_wgs"}:
-        logger.error("Invalid profile. Use 'apollo' (dev) or 'apollo_wgs' (prod).")
-        return False
+def tokenize_sql(sql: str) -> Iterator[Tuple[str, str]]:
+    """Yield (kind, text) tokens for a SQL script.
 
-    sql_files = find_sql_files()
-    if not sql_files:
-        logger.warning("No deployable SQL files found.")
-        return True
+    Kinds: "comment" (-- or /* */), "dollar" ($$ ... $$ body), "string" ('...' or "..."),
+    "semicolon", "space" and "code". Concatenating all token texts reproduces the input.
+    """
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        two = sql[i:i + 2]
+        if two == "--":
+            end = sql.find("\n", i)
+            end = n if end == -1 else end
+            yield "comment", sql[i:end]
+            i = end
+        elif two == "/*":
+            end = sql.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            yield "comment", sql[i:end]
+            i = end
+        elif two == "$$":
+            end = sql.find("$$", i + 2)
+            end = n if end == -1 else end + 2
+            yield "dollar", sql[i:end]
+            i = end
+        elif ch in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if sql[j] == "\\" and ch == "'":
+                    j += 2
+                    continue
+                if sql[j] == ch:
+                    if sql[j + 1:j + 2] == ch:  # doubled quote escape
+                        j += 2
+                        continue
+                    break
+                j += 1
+            yield "string", sql[i:j + 1]
+            i = j + 1
+        elif ch == ";":
+            yield "semicolon", ch
+            i += 1
+        elif ch.isspace():
+            j = i + 1
+            while j < n and sql[j].isspace():
+                j += 1
+            yield "space", sql[i:j]
+            i = j
+        else:
+            j = i + 1
+            while j < n and not sql[j].isspace() and sql[j] not in "'\";" and sql[j:j + 2] not in ("--", "/*", "$$"):
+                j += 1
+            yield "code", sql[i:j]
+            i = j
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """Split a SQL script into statements on top-level semicolons.
+
+    Semicolons inside quotes, comments and $$ ... $$ bodies do not terminate a statement.
+    Statements consisting only of comments/whitespace are dropped.
+    """
+    statements: List[str] = []
+    buf: List[str] = []
+    has_code = False
+    for kind, text in tokenize_sql(sql):
+        if kind == "semicolon":
+            if has_code:
+                statements.append("".join(buf).strip())
+            buf, has_code = [], False
+            continue
+        if kind not in ("comment", "space"):
+            has_code = True
+        buf.append(text)
+    if has_code:
+        statements.append("".join(buf).strip())
+    return statements
 
-    successes = 0
-    failures = 0
-    failed_files: List[str] = []
 
-    for sql_path in sql_files:
-        rel = sql_path.relative_to(REPO_ROOT)
-        logger.info(f"Deploying: {rel}")
+def normalize_sql(sql: str) -> str:
+    """Normalize a SQL script for change detection.
 
-        if dry_run:
-            logger.info("  🔍 DRY RUN: Would execute via Snow CLI")
+    Comments outside $$ bodies are dropped and whitespace runs collapse to one space. Inside
+    $$ bodies only trailing whitespace and blank lines are normalized, since bodies may not be SQL.
+    """
+    parts: List[str] = []
+    for kind, text in tokenize_sql(sql):
+        if kind == "comment":
             continue
+        if kind == "space":
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+            continue
+        if kind == "dollar":
+            lines = [line.rstrip() for line in text.splitlines()]
+            text = "\n".join(line for line in lines if line)
+        parts.append(text)
+    return "".join(parts).strip()
+
+
+def sql_hash(sql: str) -> str:
+    return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()
+
+
+def state_target_key(profile: str, database: Optional[str], schema: Optional[str]) -> str:
+    return f"{profile}|{database or ''}|{schema or ''}"
+
+
+def load_deploy_state(state_file: Path) -> Dict[str, Any]:
+    if not state_file.exists():
+        return {"version": 1, "targets": {}}
+    try:
+        return json.loads(state_file.read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable deploy state {state_file}: {e}")
+        return {"version": 1, "targets": {}}
+
+
+def save_deploy_state(state_file: Path, state: Dict[str, Any]) -> None:
+    """Write the state file atomically."""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_file.with_suffix(state_file.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp, state_file)
+
+
+def plan_changes(
+    hashes: Dict[Path, str],
+    graph: Dict[Path, Set[Path]],
+    target_state: Dict[str, Any],
+) -> Dict[Path, str]:
+    """Classify files as "changed", "dependent" (depends on a changed file) or "unchanged"."""
+    plan: Dict[Path, str] = {}
+    for path, digest in hashes.items():
+        entry = target_state.get(str(path.relative_to(REPO_ROOT)))
+        plan[path] = "changed" if entry is None or entry.get("hash") != digest else "unchanged"
+
+    dependents: Dict[Path, Set[Path]] = {path: set() for path in graph}
+    for path, deps in graph.items():
+        for dep in deps:
+            dependents[dep].add(path)
+    frontier = [path for path, status in plan.items() if status == "changed"]
+    while frontier:
+        for child in dependents[frontier.pop()]:
+            if plan[child] == "unchanged":
+                plan[child] = "dependent"
+                frontier.append(child)
+    return plan
 
-        temp_path: Optional[Path] = None
-        is_temp = False
+
+class DeployConnection(Protocol):
+    """Minimal connection interface used by session deploys."""
+
+    def execute(self, statement: str) -> None:
+        """Execute a single SQL statement; raise on failure."""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class SnowflakeDeployConnection:
+    """DeployConnection backed by snowflake-connector-python.
+
+    Uses the named connection from ~/.snowflake/connections.toml / config.toml, i.e. the same
+    profiles the Snow CLI reads.
+    """
+
+    def __init__(self, profile: str):
+        try:
+            import snowflake.connector  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "Session deploys require snowflake-connector-python (pip install snowflake-connector-python)"
+            ) from e
+        self._conn = snowflake.connector.connect(connection_name=profile)
+
+    def execute(self, statement: str) -> None:
+        with self._conn.cursor() as cur:
+            cur.execute(statement)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+ConnectionFactory = Callable[[str], DeployConnection]
+
+
+def load_connection_factory(spec: str) -> ConnectionFactory:
+    """Resolve --connector: 'snowflake' or an import path 'package.module:factory'.
+
+    The factory is called with the profile name and must return a DeployConnection.
+    """
+    if spec == "snowflake":
+        return SnowflakeDeployConnection
+    module_name, sep, attr = spec.partition(":")
+    if not sep or not module_name or not attr:
+        raise ValueError(f"Invalid connector '{spec}'. Use 'snowflake' or 'module:factory'.")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class SessionPool:
+    """Small pool of long-lived connections that run deploy files from memory.
+
+    Connections are opened lazily (up to `size`) and each one issues USE DATABASE / USE SCHEMA
+    once, right after it is opened.
+    """
+
+    def __init__(
+        self,
+        factory: ConnectionFactory,
+        profile: str,
+        size: int,
+        database: Optional[str],
+        schema: Optional[str],
+    ):
+        self._factory = factory
+        self._profile = profile
+        self._size = size
+        self._database = database
+        self._schema = schema
+        self._idle: List[DeployConnection] = []
+        self._opened: List[DeployConnection] = []
+        self._slots_in_use = 0  # opened + currently opening
+        self._cond = threading.Condition()
+
+    def _open(self) -> DeployConnection:
+        conn = self._factory(self._profile)
+        if self._database:
+            conn.execute(f"USE DATABASE {self._database}")
+        if self._schema:
+            conn.execute(f"USE SCHEMA {self._schema}")
+        return conn
+
+    def _acquire(self) -> DeployConnection:
+        with self._cond:
+            while not self._idle and self._slots_in_use >= self._size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._slots_in_use += 1
+        # Open outside the lock so slow handshakes do not serialize workers
+        try:
+            conn = self._open()
+        except Exception:
+            with self._cond:
+                self._slots_in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opened.append(conn)
+        return conn
+
+    def _release(self, conn: DeployConnection) -> None:
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def deploy_file(self, sql_path: Path) -> Tuple[int, float]:
+        """Run every statement of a file on one pooled connection. Returns (exit code, seconds)."""
+        started = time.perf_counter()
+        statements = split_sql_statements(sql_path.read_text())
         try:
-            temp_path, is_temp = build_temp_sql(sql_path, database, schema)
-            rc = run_snow_sql(profile=profile, sql_file=temp_path)
-            if rc == 0:
-                logger.info("  ✅ Success")
-                successes += 1
-            else:
-                logger.error(f"  ❌ Failed with exit code {rc}")
-                failures += 1
-                failed_files.append(str(rel))
+            conn = self._acquire()
+        except Exception as e:
+            logger.error(f"  ❌ Could not open connection for {sql_path.name}: {e}")
+            return 1, time.perf_counter() - started
+        try:
+            for stmt_no, stmt in enumerate(statements, 1):
+                try:
+                    conn.execute(stmt)
+                except Exception as e:
+                    logger.error(f"  ❌ {sql_path.name} statement {stmt_no}/{len(statements)} failed: {e}")
+                    return 1, time.perf_counter() - started
         finally:
-            if is_temp and temp_path is not None:
+            self._release(conn)
+        return 0, time.perf_counter() - started
+
+    def close(self) -> None:
+        with self._cond:
+            conns = self._opened
+            self._idle, self._opened, self._slots_in_use = [], [], 0
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        logger.info(f"Closed {len(conns)} deploy session(s)")
+
+
+@dataclass
+class FileResult:
+    path: Path
+    wave: int
+    status: str  # "success" | "failed" | "skipped" | "unchanged"
+    seconds: float = 0.0
+    returncode: Optional[int] = None
+
+
+def deploy_file(profile: str, sql_path: Path, database: Optional[str], schema: Optional[str]) -> Tuple[int, float]:
+    """Deploy one SQL file via Snow CLI. Returns (exit code, elapsed seconds)."""
+    started = time.perf_counter()
+    temp_path: Optional[Path] = None
+    is_temp = False
+    try:
+        temp_path, is_temp = build_temp_sql(sql_path, database, schema)
+        rc = run_snow_sql(profile=profile, sql_file=temp_path)
+    finally:
+        if is_temp and temp_path is not None:
+            try:
+                tmpdir = temp_path.parent
+                temp_path.unlink(missing_ok=True)
+                # remove the temp directory if empty
                 try:
-                    tmpdir = temp_path.parent
-                    temp_path.unlink(missing_ok=True)
-                    # remove the temp directory if empty
-                    try:
-                        tmpdir.rmdir()
-                    except OSError:
-                        pass
-                except Exception:
+                    tmpdir.rmdir()
+                except OSError:
                     pass
+            except Exception:
+                pass
+    return rc, time.perf_counter() - started
+
+
+def log_timing_summary(results: List[FileResult], wall_seconds: float) -> None:
+    """Print per-file timings, slowest first."""
+    icons = {"success": "✅", "failed": "❌", "skipped": "⏭️"}
+    logger.info("\n⏱️  Timing Summary (slowest first):")
+    for res in sorted(results, key=lambda r: r.seconds, reverse=True):
+        rel = res.path.relative_to(REPO_ROOT)
+        logger.info(f"   {icons[res.status]} {res.seconds:8.2f}s  wave {res.wave:<2} {rel}")
+    total = sum(r.seconds for r in results)
+    logger.info(f"   Σ file time: {total:.2f}s | wall time: {wall_seconds:.2f}s")
+
+
+def _run_waves(
+    waves: List[List[Path]],
+    graph: Dict[Path, Set[Path]],
+    results: Dict[Path, FileResult],
+    run_one: Callable[[Path, int], FileResult],
+    jobs: int,
+) -> None:
+    """Run waves in order on a worker pool; files whose dependencies did not succeed are skipped."""
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for wave_no, wave in enumerate(waves, 1):
+            runnable: List[Path] = []
+            for sql_path in wave:
+                if sql_path in results:  # unchanged in --changed-only mode
+                    continue
+                # A dependency without a result shares this wave (dependency cycle): not blocking
+                blocked = [
+                    d for d in graph[sql_path]
+                    if d in results and results[d].status not in ("success", "unchanged")
+                ]
+                if blocked:
+                    logger.error(
+                        f"  ⏭️  Skipping {sql_path.relative_to(REPO_ROOT)}: "
+                        f"dependency failed ({', '.join(sorted(d.name for d in blocked))})"
+                    )
+                    results[sql_path] = FileResult(sql_path, wave_no, "skipped")
+                else:
+                    runnable.append(sql_path)
+            for res in executor.map(lambda p: run_one(p, wave_no), runnable):
+                results[res.path] = res
+
+
+def deploy(
+    profile: str,
+    database: Optional[str],
+    schema: Optional[str],
+    dry_run: bool,
+    jobs: int = 1,
+    session: bool = False,
+    connector: str = "snowflake",
+    changed_only: bool = False,
+    state_file: Path = DEFAULT_STATE_FILE,
+    tenant: str = DEFAULT_TENANT,
+    lint_fail_on: Optional[str] = None,
+) -> bool:
+    logger.info(
+        f"Starting deployment (tenant={tenant}, profile={profile}, database={database}, schema={schema}, "
+        f"dry_run={dry_run}, jobs={jobs}, session={session}, changed_only={changed_only})"
+    )
+    if profile not in {"apollo", "apollo_wgs"}:
+        logger.error("Invalid profile. Use 'apollo' (dev) or 'apollo_wgs' (prod).")
+        return False
+    if jobs < 1:
+        logger.error("--jobs must be at least 1.")
+        return False
+
+    sql_files = find_sql_files(tenant_backend_functions_dir(tenant))
+    if not sql_files:
+        logger.warning("No deployable SQL files found.")
+        return True
+
+    if lint_fail_on:
+        from lint_backend_sql import blocking, lint_files, load_baseline, mark_known
+
+        # Accepted findings (perf_lint_baseline.json) are logged as known and never block
+        findings = mark_known(lint_files(sql_files), load_baseline())
+        failing = blocking(findings, lint_fail_on)
+        for f in findings:
+            log = logger.error if f in failing else logger.warning
+            log(f"{f.path}:{f.line}:{f.column}: {f.severity} {f.rule}{' (known)' if f.known else ''} {f.message}")
+        if failing:
+            logger.error(f"Performance lint: {len(failing)} finding(s) at or above '{lint_fail_on}'; aborting deploy.")
+            return False
+        logger.info(f"Performance lint: {len(findings)} finding(s), none blocking at or above '{lint_fail_on}'")
+
+    graph = build_dependency_graph(sql_files)
+    waves = plan_waves(graph)
+    logger.info(f"Planned {len(waves)} dependency wave(s) for {len(sql_files)} files")
+
+    sources = {p: p.read_text() for p in sql_files}
+    hashes = {p: sql_hash(sql) for p, sql in sources.items()}
+    state = load_deploy_state(state_file)
+    target_key = state_target_key(profile, database, schema)
+    target_state: Dict[str, Any] = state.setdefault("targets", {}).setdefault(target_key, {})
+    plan = plan_changes(hashes, graph, target_state)
+    counts = {status: sum(1 for v in plan.values() if v == status) for status in ("changed", "dependent", "unchanged")}
+    logger.info(
+        f"Change plan vs {state_file.name} [{target_key}]: {counts['changed']} changed, "
+        f"{counts['dependent']} dependent, {counts['unchanged']} unchanged"
+    )
+
+    results: Dict[Path, FileResult] = {}
+    if changed_only:
+        for wave_no, wave in enumerate(waves, 1):
+            for sql_path in wave:
+                if plan[sql_path] == "unchanged":
+                    results[sql_path] = FileResult(sql_path, wave_no, "unchanged")
+
+    if dry_run:
+        icons = {"changed": "✏️ ", "dependent": "🔗", "unchanged": "💤"}
+        for wave_no, wave in enumerate(waves, 1):
+            logger.info(f"Wave {wave_no}:")
+            for sql_path in wave:
+                deps = ", ".join(sorted(d.stem for d in graph[sql_path]))
+                suffix = f" (after: {deps})" if deps else ""
+                action = "Would skip" if sql_path in results else "Would deploy"
+                logger.info(
+                    f"  🔍 DRY RUN: {icons[plan[sql_path]]} {plan[sql_path]:<9} {action} "
+                    f"{sql_path.relative_to(REPO_ROOT)}{suffix}"
+                )
+        return True
 
+    if changed_only and len(results) == len(sql_files):
+        logger.info("Nothing to deploy: all files unchanged for this target.")
+        return True
+
+    pool: Optional[SessionPool] = None
+    if session:
+        try:
+            factory = load_connection_factory(connector)
+        except (ValueError, ImportError, AttributeError) as e:
+            logger.error(f"Could not load connector: {e}")
+            return False
+        pool = SessionPool(factory, profile, size=jobs, database=database, schema=schema)
+        runner: Callable[[Path], Tuple[int, float]] = pool.deploy_file
+    else:
+        def runner(sql_path: Path) -> Tuple[int, float]:
+            return deploy_file(profile, sql_path, database, schema)
+
+    wall_started = time.perf_counter()
+
+    def run_one(sql_path: Path, wave_no: int) -> FileResult:
+        rel = sql_path.relative_to(REPO_ROOT)
+        logger.info(f"Deploying: {rel}")
+        rc, seconds = runner(sql_path)
+        if rc == 0:
+            logger.info(f"  ✅ Success: {rel} ({seconds:.2f}s)")
+            return FileResult(sql_path, wave_no, "success", seconds, rc)
+        logger.error(f"  ❌ Failed with exit code {rc}: {rel}")
+        return FileResult(sql_path, wave_no, "failed", seconds, rc)
+
+    try:
+        _run_waves(waves, graph, results, run_one, jobs)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    wall_seconds = time.perf_counter() - wall_started
+    ordered = [results[p] for p in sql_files if results[p].status != "unchanged"]
+    successes = sum(1 for r in ordered if r.status == "success")
+    failed_files = [str(r.path.relative_to(REPO_ROOT)) for r in ordered if r.status != "success"]
+
+    # Only successful deploys advance the recorded state; failures stay "changed" for next run
+    deployed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    for res in ordered:
+        if res.status == "success":
+            target_state[str(res.path.relative_to(REPO_ROOT))] = {
+                "objects": sorted(created_objects(sources[res.path])),
+                "hash": hashes[res.path],
+                "database": database,
+                "schema": schema,
+                "deployed_at": deployed_at,
+            }
+    save_deploy_state(state_file, state)
+
+    log_timing_summary(ordered, wall_seconds)
     logger.info("\n📊 Deployment Summary:")
     logger.info(f"   ✅ Successful: {successes}")
-    logger.info(f"   ❌ Failed: {failures}")
-    logger.info(f"   📁 Total processed: {len(sql_files)}")
-    if failures > 0:
-        logger.error("   🔎 Failed files:")
+    logger.info(f"   ❌ Failed: {len(failed_files)}")
+    logger.info(f"   💤 Unchanged (skipped): {len(sql_files) - len(ordered)}")
+    logger.info(f"   📁 Total processed: {len(ordered)}")
+    if failed_files:
+        logger.error("   🔎 Failed or skipped files:")
         for f in failed_files:
             logger.error(f"     - {f}")
 
-    return failures == 0
+    return not failed_files
 
 
 def parse_args() -> argparse.Namespace:
@@ -174,12 +777,62 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--database", required=False, help="Snowflake database to USE before executing each file")
     parser.add_argument("--schema", required=False, help="Snowflake schema to USE before executing each file")
     parser.add_argument("--dry-run", action="store_true", help="List actions without executing")
+    parser.add_argument(
+        "--tenant",
+        default=DEFAULT_TENANT,
+        help=f"Tenant under tenants/ whose backend_functions to deploy (default: {DEFAULT_TENANT})",
+    )
+    parser.add_argument(
+        "--session",
+        action="store_true",
+        help="Reuse long-lived connections (one per job) instead of one Snow CLI process per file",
+    )
+    parser.add_argument(
+        "--connector",
+        default="snowflake",
+        help="Connection implementation for --session: 'snowflake' (default) or 'module:factory'",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Deploy only files whose normalized SQL changed since the last recorded deploy, plus dependents",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        default=DEFAULT_STATE_FILE,
+        help=f"Deploy state file (default: {DEFAULT_STATE_FILE.relative_to(REPO_ROOT)})",
+    )
+    parser.add_argument(
+        "--lint-fail-on",
+        choices=["info", "warning", "error"],
+        default=None,
+        help="Run lint_backend_sql.py first and abort when a finding is at or above this severity",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of files to deploy concurrently within a dependency wave (default: 1)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    ok = deploy(profile=args.profile, database=args.database, schema=args.schema, dry_run=args.dry_run)
+    ok = deploy(
+        profile=args.profile,
+        database=args.database,
+        schema=args.schema,
+        dry_run=args.dry_run,
+        jobs=args.jobs,
+        session=args.session,
+        connector=args.connector,
+        changed_only=args.changed_only,
+        state_file=args.state_file,
+        tenant=args.tenant,
+        lint_fail_on=args.lint_fail_on,
+    )
     sys.exit(0 if ok else 1)
 
 
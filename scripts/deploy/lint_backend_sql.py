@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Static performance linter for backend_functions SQL.
+
+Parses every file that deploy_backend_functions.find_sql_files() would deploy and flags
+procedure/function patterns that are costly on Snowflake:
+
+- PERF001 repeated-json-parse: the same payload is PARSE_JSON'ed (and FLATTENed) in several
+  statements of one routine; parse it once into a temporary table or variable instead.
+- PERF002 scalar-udf-per-row: a scalar SQL UDF is called with column arguments, so it is
+  evaluated for every row (often a subquery per row); join its logic instead.
+- PERF003 loop-dml: a FOR / WHILE / LOOP / REPEAT body (cursor or resultset loop) issues DML,
+  CALL or EXECUTE IMMEDIATE, i.e. one round trip per row; use a set-based statement.
+- PERF004 array-contains-filter: ARRAY_CONTAINS(<column>::VARIANT, <array>) is evaluated row by
+  row and blocks micro-partition pruning; filter with IN (SELECT VALUE FROM TABLE(FLATTEN(...)))
+  or a join.
+- PERF005 commit-in-loop: COMMIT inside a loop serializes the batch into many transactions.
+
+Comments and string literals are ignored. A finding can be suppressed with a comment on the
+flagged line or the line above it: `-- perf-lint: disable=PERF003` (comma-separated codes, or
+`all`); `-- perf-lint: disable-file=PERF004` anywhere in a file suppresses a rule for the file.
+Accepted debt that should stay out of the deployed routines is listed in a baseline file
+(`--baseline`, default perf_lint_baseline.json next to this script): entries of path, rule,
+routine and reason. Matching findings are still reported, marked `known`, but never block.
+
+Output is text (`path:line:col: severity CODE message`) or JSON (`--format json`); the exit code
+is 1 when any finding is at or above `--fail-on` (default: error), so deploys can be gated on it
+(deploy_backend_functions.py --lint-fail-on runs the same check before deploying).
+
+Usage:
+    python scripts/deploy/lint_backend_sql.py
+    python scripts/deploy/lint_backend_sql.py --format json --fail-on warning
+    python scripts/deploy/lint_backend_sql.py --tenant <name> --rule PERF003 --rule PERF005
+    python scripts/deploy/lint_backend_sql.py --list-rules
+    python scripts/deploy/lint_backend_sql.py --no-baseline
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from deploy_backend_functions import (
+    DEFAULT_TENANT,
+    REPO_ROOT,
+    find_sql_files,
+    tenant_backend_functions_dir,
+    tokenize_sql,
+)
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("info", "warning", "error")
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "perf_lint_baseline.json"
+
+
+@dataclass(frozen=True)
+class Rule:
+    code: str
+    name: str
+    severity: str
+    summary: str
+
+
+RULES: Dict[str, Rule] = {r.code: r for r in (
+    Rule("PERF001", "repeated-json-parse", "warning", "Same JSON payload parsed/flattened in several statements"),
+    Rule("PERF002", "scalar-udf-per-row", "warning", "Scalar UDF called with column arguments (evaluated per row)"),
+    Rule("PERF003", "loop-dml", "error", "Row-by-row loop issuing DML / CALL / EXECUTE IMMEDIATE"),
+    Rule("PERF004", "array-contains-filter", "warning", "ARRAY_CONTAINS on a column blocks partition pruning"),
+    Rule("PERF005", "commit-in-loop", "error", "COMMIT inside a loop"),
+)}
+
+
+@dataclass
+class Finding:
+    path: str
+    line: int
+    column: int
+    rule: str
+    severity: str
+    message: str
+    routine: Optional[str] = None
+    known: bool = False  # listed in the baseline: reported, never blocking
+
+
+@dataclass
+class Routine:
+    name: str  # unqualified, upper-cased
+    kind: str  # FUNCTION | PROCEDURE
+    params: Set[str]
+    returns_table: bool
+    body_start: int  # offset of the body in the file text
+    line_offset: int  # newlines before the body, to turn body lines into file lines
+    masked_body: str  # comments and string literals blanked, offsets preserved
+
+
+ROUTINE_HEADER_RE = re.compile(
+    r"\bCREATE\s+(?:OR\s+REPLACE\s+)?(?:SECURE\s+)?(FUNCTION|PROCEDURE)\s+(?:[\w$]+\.){0,2}([\w$]+)\s*\(",
+    re.IGNORECASE,
+)
+RETURNS_TABLE_RE = re.compile(r"\bRETURNS\s+TABLE\b", re.IGNORECASE)
+PARSE_JSON_RE = re.compile(r"\bPARSE_JSON\s*\(", re.IGNORECASE)
+FLATTEN_RE = re.compile(r"\bFLATTEN\s*\(", re.IGNORECASE)
+ARRAY_CONTAINS_RE = re.compile(r"\bARRAY_CONTAINS\s*\(", re.IGNORECASE)
+CALL_RE = re.compile(r"\b(?:[\w$]+\.)?([\w$]+)\s*\(")
+IDENT_RE = re.compile(r"(?<![:\w$.])([A-Za-z_][\w$]*)(?!\s*\()")
+QUALIFIED_RE = re.compile(r"\b[A-Za-z_][\w$]*\.[A-Za-z_][\w$]*")
+LOOP_TOKEN_RE = re.compile(
+    r"\b(END\s+(?:FOR|WHILE|REPEAT|LOOP)|FOR\s+[\w$]+\s+IN|WHILE|REPEAT|LOOP|DO)\b",
+    re.IGNORECASE,
+)
+LOOP_BODY_STMT_RE = re.compile(
+    r"\b(INSERT\s+(?:INTO|OVERWRITE)|UPDATE\s+[\w$.]+\s+(?:AS\s+)?(?:[\w$]+\s+)?SET|DELETE\s+FROM|MERGE\s+INTO|CALL|EXECUTE\s+IMMEDIATE|COMMIT)\b",
+    re.IGNORECASE,
+)
+SUPPRESS_RE = re.compile(r"--\s*perf-lint:\s*disable(-file)?\s*=\s*([\w, ]+)", re.IGNORECASE)
+DML_KEYWORDS_RE = re.compile(r"\b(SELECT|INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+# Identifiers that are not column references when they appear in call arguments
+NON_COLUMN_WORDS = {
+    "AS", "NULL", "TRUE", "FALSE", "AND", "OR", "NOT", "IS", "IN", "CASE", "WHEN", "THEN", "ELSE", "END",
+    "VARIANT", "VARCHAR", "STRING", "TEXT", "NUMBER", "INTEGER", "INT", "FLOAT", "DOUBLE", "BOOLEAN",
+    "DATE", "TIMESTAMP", "TIMESTAMP_NTZ", "TIMESTAMP_LTZ", "ARRAY", "OBJECT", "DECIMAL", "BIGINT",
+    "INPUT", "PATH", "OUTER", "RECURSIVE", "MODE", "DISTINCT", "CURRENT_DATE", "CURRENT_TIMESTAMP",
+}
+
+
+def mask_sql(sql: str) -> str:
+    """Blank comments and string literals (newlines kept) so offsets and line numbers still match."""
+    parts = []
+    for kind, text in tokenize_sql(sql):
+        if kind in ("comment", "string"):
+            parts.append(re.sub(r"[^\n]", " ", text))
+        else:
+            parts.append(text)
+    return "".join(parts)
+
+
+def _line_col(text: str, offset: int) -> Tuple[int, int]:
+    line = text.count("\n", 0, offset) + 1
+    return line, offset - (text.rfind("\n", 0, offset) + 1) + 1
+
+
+def _balanced_args(text: str, open_paren: int) -> Tuple[str, int]:
+    """Text between the parenthesis at `open_paren` and its match, and the offset after it."""
+    depth = 0
+    for i in range(open_paren, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[open_paren + 1:i], i + 1
+    return text[open_paren + 1:], len(text)
+
+
+def _split_args(args: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(args):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(args[start:i])
+            start = i + 1
+    parts.append(args[start:])
+    return [p.strip() for p in parts]
+
+
+def _normalize(expr: str) -> str:
+    return re.sub(r"\s+", "", expr).upper()
+
+
+def parse_routines(sql: str) -> List[Routine]:
+    """Functions/procedures defined with a $$ body in a SQL script."""
+    routines: List[Routine] = []
+    offset = 0
+    statement_start = 0
+    for kind, text in tokenize_sql(sql):
+        if kind == "semicolon":
+            statement_start = offset + 1
+        elif kind == "dollar":
+            header = mask_sql(sql[statement_start:offset])
+            match = ROUTINE_HEADER_RE.search(header)
+            if match:
+                signature, _ = _balanced_args(header, match.end() - 1)
+                params = {p.split()[0].upper() for p in _split_args(signature) if p.split()}
+                routines.append(Routine(
+                    name=match.group(2).upper(),
+                    kind=match.group(1).upper(),
+                    params=params,
+                    returns_table=bool(RETURNS_TABLE_RE.search(header, match.end())),
+                    body_start=offset + 2,
+                    line_offset=sql.count("\n", 0, offset + 2),
+                    masked_body=mask_sql(text[2:-2] if text.endswith("$$") else text[2:]),
+                ))
+        offset += len(text)
+    return routines
+
+
+def _column_refs(expr: str, params: Set[str]) -> List[str]:
+    """Identifiers in an expression that are neither bind variables, routine parameters nor keywords."""
+    refs = QUALIFIED_RE.findall(expr)
+    stripped = QUALIFIED_RE.sub(" ", expr)
+    for ident in IDENT_RE.findall(stripped):
+        upper = ident.upper()
+        if upper in params or upper in NON_COLUMN_WORDS:
+            continue
+        refs.append(ident)
+    return refs
+
+
+def check_repeated_json_parse(routine: Routine) -> Iterator[Tuple[int, str]]:
+    body = routine.masked_body
+    occurrences: Dict[str, List[int]] = defaultdict(list)
+    for match in PARSE_JSON_RE.finditer(body):
+        args, _ = _balanced_args(body, match.end() - 1)
+        occurrences[_normalize(args)].append(match.start())
+    for payload, offsets in occurrences.items():
+        if len(offsets) < 2:
+            continue
+        flattens = sum(
+            1 for m in FLATTEN_RE.finditer(body)
+            if payload in _normalize(_balanced_args(body, m.end() - 1)[0])
+        )
+        lines = [_line_col(body, o)[0] + routine.line_offset for o in offsets]
+        yield offsets[1], (
+            f"PARSE_JSON({payload}) is evaluated {len(offsets)} times in {routine.name} "
+            f"(lines {', '.join(map(str, lines))}; {flattens} FLATTEN(s) over it); "
+            "parse once into a temporary table or variable and reuse it"
+        )
+
+
+def check_scalar_udf_per_row(routine: Routine, scalar_udfs: Set[str]) -> Iterator[Tuple[int, str]]:
+    body = routine.masked_body
+    for match in CALL_RE.finditer(body):
+        name = match.group(1).upper()
+        if name not in scalar_udfs or name == routine.name:
+            continue
+        args, _ = _balanced_args(body, match.end() - 1)
+        refs = _column_refs(args, routine.params)
+        if refs:
+            yield match.start(), (
+                f"{name}({', '.join(sorted(set(refs)))} ...) is evaluated once per row; "
+                "join the lookup it performs (or precompute it per distinct key) instead"
+            )
+
+
+def check_array_contains(routine: Routine) -> Iterator[Tuple[int, str]]:
+    body = routine.masked_body
+    for match in ARRAY_CONTAINS_RE.finditer(body):
+        args, _ = _balanced_args(body, match.end() - 1)
+        parts = _split_args(args)
+        if len(parts) != 2:
+            continue
+        value, array = parts
+        if _column_refs(value, routine.params):
+            yield match.start(), (
+                f"ARRAY_CONTAINS({' '.join(value.split())}, {' '.join(array.split())}) filters row by row "
+                "and prevents partition pruning; use IN (SELECT VALUE FROM TABLE(FLATTEN(...))) or a join"
+            )
+
+
+def _loops(body: str) -> List[Tuple[str, int, int]]:
+    """(kind, start, end) of every FOR/WHILE/LOOP/REPEAT block, innermost first."""
+    stack: List[List] = []  # [kind, start, awaiting_body]
+    loops: List[Tuple[str, int, int]] = []
+    for match in LOOP_TOKEN_RE.finditer(body):
+        token = " ".join(match.group(1).upper().split())
+        if token.startswith("END "):
+            if stack:
+                kind, start, _ = stack.pop()
+                loops.append((kind, start, match.end()))
+        elif token.startswith("FOR ") or token == "WHILE":
+            stack.append([token.split()[0], match.start(), True])
+        elif token in ("DO", "LOOP") and stack and stack[-1][2]:
+            stack[-1][2] = False  # body of the pending FOR/WHILE starts
+        elif token in ("LOOP", "REPEAT"):
+            stack.append([token, match.start(), False])
+    return loops
+
+
+def check_loops(routine: Routine) -> Iterator[Tuple[str, int, str]]:
+    body = routine.masked_body
+    flagged: List[Tuple[int, int]] = []
+    # Outermost first so nested loops inside a flagged loop are not reported twice
+    for kind, start, end in sorted(_loops(body), key=lambda l: (l[1], -l[2])):
+        if any(s <= start and end <= e for s, e in flagged):
+            continue
+        statements = [(m.start(), " ".join(m.group(1).upper().split()[:2])) for m in LOOP_BODY_STMT_RE.finditer(body, start, end)]
+        commits = [o for o, stmt in statements if stmt == "COMMIT"]
+        work = [(o, stmt) for o, stmt in statements if stmt != "COMMIT"]
+        if work:
+            flagged.append((start, end))
+            listed = ", ".join(f"{stmt.split()[0]} (line {_line_col(body, o)[0] + routine.line_offset})" for o, stmt in work[:6])
+            more = f" and {len(work) - 6} more" if len(work) > 6 else ""
+            yield "PERF003", start, (
+                f"{kind} loop in {routine.name} runs {len(work)} statement(s) per iteration: {listed}{more}; "
+                "rewrite as a set-based INSERT/UPDATE/MERGE over the whole batch"
+            )
+        for offset in commits:
+            yield "PERF005", offset, f"COMMIT inside a {kind} loop in {routine.name}; commit once after the batch"
+
+
+def _suppressions(sql: str) -> Tuple[Dict[int, Set[str]], Set[str]]:
+    by_line: Dict[int, Set[str]] = defaultdict(set)
+    file_wide: Set[str] = set()
+    for number, line in enumerate(sql.splitlines(), 1):
+        for match in SUPPRESS_RE.finditer(line):
+            codes = {c.strip().upper() for c in match.group(2).split(",") if c.strip()}
+            if match.group(1):
+                file_wide |= codes
+            else:
+                by_line[number] |= codes
+    return by_line, file_wide
+
+
+def _suppressed(code: str, line: int, by_line: Dict[int, Set[str]], file_wide: Set[str]) -> bool:
+    for codes in (file_wide, by_line.get(line, set()), by_line.get(line - 1, set())):
+        if code in codes or "ALL" in codes:
+            return True
+    return False
+
+
+def lint_files(sql_files: Iterable[Path], rules: Optional[Set[str]] = None) -> List[Finding]:
+    """Lint the given files; scalar UDFs are recognized across the whole file set."""
+    sources = {p: p.read_text() for p in sql_files}
+    parsed = {p: parse_routines(sql) for p, sql in sources.items()}
+    scalar_udfs = {
+        r.name for routines in parsed.values() for r in routines if r.kind == "FUNCTION" and not r.returns_table
+    }
+    enabled = rules or set(RULES)
+
+    findings: List[Finding] = []
+    for path, routines in parsed.items():
+        sql = sources[path]
+        by_line, file_wide = _suppressions(sql)
+        display = str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+
+        def add(code: str, routine: Routine, body_offset: int, message: str) -> None:
+            if code not in enabled:
+                return
+            line, column = _line_col(sql, routine.body_start + body_offset)
+            if _suppressed(code, line, by_line, file_wide):
+                return
+            findings.append(Finding(display, line, column, code, RULES[code].severity, message, routine.name))
+
+        for routine in routines:
+            for offset, message in check_repeated_json_parse(routine):
+                add("PERF001", routine, offset, message)
+            for offset, message in check_scalar_udf_per_row(routine, scalar_udfs):
+                add("PERF002", routine, offset, message)
+            for code, offset, message in check_loops(routine):
+                add(code, routine, offset, message)
+            for offset, message in check_array_contains(routine):
+                add("PERF004", routine, offset, message)
+    findings.sort(key=lambda f: (f.path, f.line, f.column, f.rule))
+    return findings
+
+
+def load_baseline(path: Optional[Path] = DEFAULT_BASELINE) -> Set[Tuple[str, str, str]]:
+    """(path, rule, routine) of accepted findings; line numbers are left out so edits elsewhere keep matching."""
+    if path is None or not path.is_file():
+        return set()
+    entries = json.loads(path.read_text())["known"]
+    return {(e["path"], e["rule"].upper(), e["routine"].upper()) for e in entries}
+
+
+def mark_known(findings: Iterable[Finding], known: Set[Tuple[str, str, str]]) -> List[Finding]:
+    findings = list(findings)
+    for f in findings:
+        f.known = (f.path, f.rule, (f.routine or "").upper()) in known
+    return findings
+
+
+def blocking(findings: Iterable[Finding], fail_on: str) -> List[Finding]:
+    """Findings at or above the `fail_on` severity ('never' blocks nothing), known ones excepted."""
+    if fail_on == "never":
+        return []
+    threshold = SEVERITIES.index(fail_on)
+    return [f for f in findings if not f.known and SEVERITIES.index(f.severity) >= threshold]
+
+
+def summarize(findings: List[Finding], files: int) -> Dict[str, object]:
+    return {
+        "files": files,
+        "findings": len(findings),
+        "by_severity": {s: sum(1 for f in findings if f.severity == s) for s in SEVERITIES},
+        "by_rule": {code: sum(1 for f in findings if f.rule == code) for code in RULES},
+        "known": sum(1 for f in findings if f.known),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lint backend_functions SQL for performance anti-patterns")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help=f"Tenant under tenants/ (default: {DEFAULT_TENANT})")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format (default: text)")
+    parser.add_argument(
+        "--fail-on",
+        choices=[*SEVERITIES, "never"],
+        default="error",
+        help="Exit 1 when a finding is at or above this severity (default: error)",
+    )
+    parser.add_argument("--rule", action="append", default=None, help="Only run this rule code (repeatable)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help=f"Accepted findings, reported as known (default: {DEFAULT_BASELINE.name})")
+    parser.add_argument("--no-baseline", action="store_true", help="Ignore the baseline: every finding can block")
+    parser.add_argument("--list-rules", action="store_true", help="List the rules and exit")
+    parser.add_argument("paths", nargs="*", type=Path, help="Lint these files instead of the tenant's deployable files")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.list_rules:
+        for rule in RULES.values():
+            print(f"{rule.code}  {rule.name:<22} {rule.severity:<8} {rule.summary}")
+        return
+    rules = {r.upper() for r in args.rule} if args.rule else None
+    if rules and rules - set(RULES):
+        print(f"Unknown rule(s): {', '.join(sorted(rules - set(RULES)))}", file=sys.stderr)
+        sys.exit(2)
+
+    logging.basicConfig(level=logging.WARNING if args.format == "json" else logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sql_files = [p.resolve() for p in args.paths] if args.paths else find_sql_files(tenant_backend_functions_dir(args.tenant))
+    findings = mark_known(lint_files(sql_files, rules), set() if args.no_baseline else load_baseline(args.baseline))
+    failing = blocking(findings, args.fail_on)
+
+    if args.format == "json":
+        print(json.dumps({
+            "summary": {**summarize(findings, len(sql_files)), "fail_on": args.fail_on, "blocking": len(failing)},
+            "findings": [asdict(f) for f in findings],
+        }, indent=2))
+    else:
+        for f in findings:
+            print(f"{f.path}:{f.line}:{f.column}: {f.severity} {f.rule}{' (known)' if f.known else ''} {f.message}")
+        summary = summarize(findings, len(sql_files))
+        counts = ", ".join(f"{n} {s}" for s, n in summary["by_severity"].items() if n)
+        known = f", {summary['known']} known" if summary["known"] else ""
+        print(f"\n{len(sql_files)} files, {len(findings)} finding(s){f' ({counts})' if counts else ''}{known}; "
+              f"{len(failing)} blocking at or above --fail-on={args.fail_on}")
+    sys.exit(1 if failing else 0)
+
+
+if __name__ == "__main__":
+    main()
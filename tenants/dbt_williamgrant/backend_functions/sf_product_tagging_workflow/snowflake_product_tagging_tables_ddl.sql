@@ -45,6 +45,9 @@ ALTER TABLE MASTER_DATA.APOLLO_VARIANT_SIZE_PACK_TAG
   ADD COLUMN IF NOT EXISTS CUSTOMER_ID_EXCLUSIONS ARRAY DEFAULT ARRAY_CONSTRUCT();
 ALTER TABLE MASTER_DATA.APOLLO_VARIANT_SIZE_PACK_TAG
   ADD COLUMN IF NOT EXISTS IS_CUSTOM_PRODUCT BOOLEAN DEFAULT FALSE;
+-- Set by SP_BATCH_UPDATE_APOLLO_VARIANT_SIZE_PACK_TAGS; read by the change-capture sensor (dagster_apollo/change_capture.py)
+ALTER TABLE MASTER_DATA.APOLLO_VARIANT_SIZE_PACK_TAG
+  ADD COLUMN IF NOT EXISTS UPDATED_AT TIMESTAMP_NTZ;
 
 -- Enforce NOT NULL where appropriate
 -- IS_PLANNED remains nullable by design for test gating
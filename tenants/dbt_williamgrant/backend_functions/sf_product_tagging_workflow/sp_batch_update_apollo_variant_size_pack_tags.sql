@@ -194,7 +194,8 @@ BEGIN
                     IS_PLANNED = COALESCE(:V_IS_PLANNED_STR, IS_PLANNED),
                     MARKET_CODE_EXCLUSIONS = CASE WHEN :V_MARKET_CODE_EXCLUSIONS IS NOT NULL THEN :V_MARKET_CODE_EXCLUSIONS ELSE COALESCE(MARKET_CODE_EXCLUSIONS, ARRAY_CONSTRUCT()) END,
                     CUSTOMER_ID_EXCLUSIONS = CASE WHEN :V_CUSTOMER_ID_EXCLUSIONS IS NOT NULL THEN :V_CUSTOMER_ID_EXCLUSIONS ELSE COALESCE(CUSTOMER_ID_EXCLUSIONS, ARRAY_CONSTRUCT()) END,
-                    IS_CUSTOM_PRODUCT = COALESCE(:V_IS_CUSTOM_PRODUCT, IS_CUSTOM_PRODUCT)
+                    IS_CUSTOM_PRODUCT = COALESCE(:V_IS_CUSTOM_PRODUCT, IS_CUSTOM_PRODUCT),
+                    UPDATED_AT = CURRENT_TIMESTAMP()
                 WHERE VARIANT_SIZE_PACK_ID = :V_VARIANT_SIZE_PACK_ID;
 
                 -- Mark for realtime sync if relevant fields were provided
@@ -210,10 +211,10 @@ BEGIN
                         RAISE missing_desc_for_custom_ex;
                     END IF;
                     INSERT INTO MASTER_DATA.APOLLO_VARIANT_SIZE_PACK_TAG
-                        (VARIANT_SIZE_PACK_ID, VARIANT_SIZE_PACK_DESC, TAG_IDS, TAG_NAMES, IS_PLANNED, MARKET_CODE_EXCLUSIONS, CUSTOMER_ID_EXCLUSIONS, IS_CUSTOM_PRODUCT)
+                        (VARIANT_SIZE_PACK_ID, VARIANT_SIZE_PACK_DESC, TAG_IDS, TAG_NAMES, IS_PLANNED, MARKET_CODE_EXCLUSIONS, CUSTOMER_ID_EXCLUSIONS, IS_CUSTOM_PRODUCT, UPDATED_AT)
                     SELECT
                         :V_VARIANT_SIZE_PACK_ID, :V_INPUT_DESC, :V_PROCESSED_TAG_IDS, :V_PROCESSED_TAG_NAMES,
-                        :V_IS_PLANNED_STR, COALESCE(:V_MARKET_CODE_EXCLUSIONS, ARRAY_CONSTRUCT()), COALESCE(:V_CUSTOMER_ID_EXCLUSIONS, ARRAY_CONSTRUCT()), TRUE;
+                        :V_IS_PLANNED_STR, COALESCE(:V_MARKET_CODE_EXCLUSIONS, ARRAY_CONSTRUCT()), COALESCE(:V_CUSTOMER_ID_EXCLUSIONS, ARRAY_CONSTRUCT()), TRUE, CURRENT_TIMESTAMP();
 
                     -- Mark for realtime sync if relevant fields were provided
                     IF (V_IS_PLANNED_KEY_PROVIDED OR V_MARKET_CODE_EXCLUSIONS IS NOT NULL OR V_CUSTOMER_ID_EXCLUSIONS IS NOT NULL) THEN
@@ -229,10 +230,10 @@ BEGIN
 
                     IF (V_VSP_DESC_FROM_MASTER IS NOT NULL) THEN
                         INSERT INTO MASTER_DATA.APOLLO_VARIANT_SIZE_PACK_TAG
-                            (VARIANT_SIZE_PACK_ID, VARIANT_SIZE_PACK_DESC, TAG_IDS, TAG_NAMES, IS_PLANNED, MARKET_CODE_EXCLUSIONS, CUSTOMER_ID_EXCLUSIONS, IS_CUSTOM_PRODUCT)
+                            (VARIANT_SIZE_PACK_ID, VARIANT_SIZE_PACK_DESC, TAG_IDS, TAG_NAMES, IS_PLANNED, MARKET_CODE_EXCLUSIONS, CUSTOMER_ID_EXCLUSIONS, IS_CUSTOM_PRODUCT, UPDATED_AT)
                         SELECT
                             :V_VARIANT_SIZE_PACK_ID, :V_VSP_DESC_FROM_MASTER, :V_PROCESSED_TAG_IDS, :V_PROCESSED_TAG_NAMES,
-                            :V_IS_PLANNED_STR, COALESCE(:V_MARKET_CODE_EXCLUSIONS, ARRAY_CONSTRUCT()), COALESCE(:V_CUSTOMER_ID_EXCLUSIONS, ARRAY_CONSTRUCT()), FALSE;
+                            :V_IS_PLANNED_STR, COALESCE(:V_MARKET_CODE_EXCLUSIONS, ARRAY_CONSTRUCT()), COALESCE(:V_CUSTOMER_ID_EXCLUSIONS, ARRAY_CONSTRUCT()), FALSE, CURRENT_TIMESTAMP();
 
                         -- Mark for realtime sync if relevant fields were provided
                         IF (V_IS_PLANNED_KEY_PROVIDED OR V_MARKET_CODE_EXCLUSIONS IS NOT NULL OR V_CUSTOMER_ID_EXCLUSIONS IS NOT NULL) THEN
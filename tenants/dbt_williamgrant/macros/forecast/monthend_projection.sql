@@ -2,10 +2,11 @@
 -- grain: 'distributor' | 'chain'
 -- mode: 'fgmd' uses rd.forecast_generation_month_date; 'window' uses last N months from control_date
 -- window_months: number of months to generate when mode == 'window'
+-- Both grains read depletions_forecast_sales_history (day x distributor x parent chain x vsp)
 (
 with control_date as (
     select max(invoice_date) as effective_current_date
-    from {{ ref('rad_invoice_level_sales') }}
+    from {{ ref('depletions_forecast_sales_history') }}
 ),
 
 -- Target months to process
@@ -73,19 +74,19 @@ sales_data_prepared as (
         s.distributor_id,
         s.distributor_name,
         {% if grain == 'chain' %}
-        s.vip_parent_chain_name as parent_chain_name,
-        s.vip_parent_chain_code as parent_chain_code,
+        s.parent_chain_name,
+        s.parent_chain_code,
         {% endif %}
         s.variant_size_pack_id,
-        s.phys_quantity::number(38,8) as phys_quantity,
-        s.case_equivalent_quantity::number(38,8) as case_equivalent_quantity
-    from {{ ref('rad_invoice_level_sales') }} s
+        s.projection_phys_quantity as phys_quantity,
+        s.projection_case_equivalent_quantity as case_equivalent_quantity
+    from {{ ref('depletions_forecast_sales_history') }} s
     where (s.year, s.month) in (
         select year(month_start_date) - 1, month(month_start_date)
         from target_processing_months
     )
     {% if grain == 'chain' %}
-      and s.vip_parent_chain_code is not null and s.vip_parent_chain_code != '' and s.vip_parent_chain_code != '33333'
+      and s.is_forecast_chain
     {% endif %}
     union all
     select
@@ -99,19 +100,19 @@ sales_data_prepared as (
         s.distributor_id,
         s.distributor_name,
         {% if grain == 'chain' %}
-        s.vip_parent_chain_name as parent_chain_name,
-        s.vip_parent_chain_code as parent_chain_code,
+        s.parent_chain_name,
+        s.parent_chain_code,
         {% endif %}
         s.variant_size_pack_id,
-        s.phys_quantity::number(38,8) as phys_quantity,
-        s.case_equivalent_quantity::number(38,8) as case_equivalent_quantity
-    from {{ ref('rad_invoice_level_sales') }} s
+        s.projection_phys_quantity as phys_quantity,
+        s.projection_case_equivalent_quantity as case_equivalent_quantity
+    from {{ ref('depletions_forecast_sales_history') }} s
     where (s.year, s.month) in (
         select year(month_start_date), month(month_start_date)
         from target_processing_months
     )
     {% if grain == 'chain' %}
-      and s.vip_parent_chain_code is not null and s.vip_parent_chain_code != '' and s.vip_parent_chain_code != '33333'
+      and s.is_forecast_chain
     {% endif %}
 ),
 
@@ -1,7 +1,7 @@
 {% macro get_database_name() %}
-    {% if target.name == 'dev' %}
+    {% if target_env() == 'dev' %}
         {{ return('apollo_development') }}
-    {% elif target.name == 'prod' %}
+    {% elif target_env() == 'prod' %}
         {{ return('apollo_williamgrant') }}
     {% else %}
         {{ return('apollo_development') }}  {# Default to dev database #}
@@ -2,7 +2,10 @@
 {#
   Exports the rad_sales_fact model to S3 via the external stage @STG_WILLIAMGRANT_EXPORT
   under the path 'reconciliation' with a filename prefix 'slsda'.
-  Runs only when target.name == 'prod'.
+  Runs only when target.name == 'prod' and not for month-partitioned runs
+  (those run concurrently per partition; the full daily build exports once).
+  With RAD_SALES_EXPORT_MODE=dagster the month-partitioned rad_sales_fact_export asset
+  (dagster_apollo/exports.py) exports instead, outside the dbt run.
 #}
 
   {% if target.name != 'prod' %}
@@ -10,6 +13,16 @@
     {% do return(none) %}
   {% endif %}
 
+  {% if env_var('RAD_SALES_EXPORT_MODE', 'on_run_end') == 'dagster' %}
+    {{ log('Skipping rad_sales_fact export: handled by the Dagster rad_sales_fact_export asset.', info=True) }}
+    {% do return(none) %}
+  {% endif %}
+
+  {% if var('partition_start_month', none) is not none %}
+    {{ log('Skipping rad_sales_fact export: partitioned run (' ~ var('partition_start_month') ~ ').', info=True) }}
+    {% do return(none) %}
+  {% endif %}
+
   {% set rad_sales_relation = ref('rad_sales_fact') %}
   {% set export_stage_name = 'APOLLO_WILLIAMGRANT.S3.STG_WILLIAMGRANT_EXPORT' %}
   {% set export_stage_path = 'reconciliation' %}
@@ -0,0 +1,40 @@
+{% macro refresh_scope_active() %}
+    {#-
+      True when a scoped refresh was requested (dagster_apollo/change_capture.py):
+        dbt build --vars '{"refresh_markets": ["USANY1"], "refresh_variant_size_pack_ids": ["HE009-6-750"]}'
+      Either list may be empty (all markets / all variant size packs), not both.
+    -#}
+    {{ return((var('refresh_markets', []) | length > 0) or (var('refresh_variant_size_pack_ids', []) | length > 0)) }}
+{% endmacro %}
+
+{% macro refresh_scope_in_list(column, values) -%}
+    {{ column }} in ({% for value in values %}'{{ value | string | replace("'", "''") }}'{% if not loop.last %}, {% endif %}{% endfor %})
+{%- endmacro %}
+
+{% macro refresh_scope(market_column='market_code', vsp_column='variant_size_pack_id') -%}
+    {#- Predicate restricting rows to the requested markets x variant size packs ("true" when unscoped) -#}
+    {%- set markets = var('refresh_markets', []) -%}
+    {%- set vsps = var('refresh_variant_size_pack_ids', []) -%}
+    {%- if markets | length > 0 and vsps | length > 0 -%}
+        ({{ refresh_scope_in_list(market_column, markets) }} and {{ refresh_scope_in_list(vsp_column, vsps) }})
+    {%- elif markets | length > 0 -%}
+        {{ refresh_scope_in_list(market_column, markets) }}
+    {%- elif vsps | length > 0 -%}
+        {{ refresh_scope_in_list(vsp_column, vsps) }}
+    {%- else -%}
+        true
+    {%- endif -%}
+{%- endmacro %}
+
+{% macro refresh_scope_delete(generation_column=none) -%}
+    {#-
+      pre_hook of scoped refreshes: delete the requested slices before the model inserts them
+      again. delete+insert alone only replaces keys present in the new rows, so a slice that now
+      yields no rows (is_planned turned off, a new market/customer exclusion) would survive.
+      `generation_column` limits the delete to the current (latest) generation.
+    -#}
+    {%- if refresh_scope_active() and is_incremental() -%}
+        delete from {{ this }} where {{ refresh_scope() }}
+        {%- if generation_column %} and {{ generation_column }} = (select max({{ generation_column }}) from {{ this }}){% endif %}
+    {%- endif -%}
+{%- endmacro %}
@@ -0,0 +1,4 @@
+{% macro target_env() %}
+    {#- dev / prod for the generated targets dev, prod, dev_<name> and prod_<name> (dagster_apollo/warehouses.py) -#}
+    {{ return(target.name.split('_')[0]) }}
+{% endmacro %}
@@ -0,0 +1,15 @@
+{% macro warehouse_route() %}
+    {#-
+      Warehouse for the first of the given routes (tags or layers) that the current target
+      assigns one to in DBT_TARGETS, else the target's warehouse. Use it in model configs:
+        config(tags=['heavy'], snowflake_warehouse=warehouse_route('heavy', 'marts'))
+      (layers are routed in dbt_project.yml; a model config overrides its layer's).
+    -#}
+    {% set routes = fromjson(env_var('DBT_WAREHOUSE_ROUTES', '{}')).get(target.name, {}) %}
+    {% for route in varargs %}
+        {% if routes.get(route) %}
+            {{ return(routes[route]) }}
+        {% endif %}
+    {% endfor %}
+    {{ return(target.get('warehouse')) }}
+{% endmacro %}
@@ -9,6 +9,10 @@
 
 {# {% set use_history_data = var('use_history_data', true) %} #}
 
+{# Partitioned runs (Dagster month_date partitions) pass explicit bounds: [partition_start_month, partition_end_month) #}
+{% set partition_start_month = var('partition_start_month', none) %}
+{% set partition_end_month = var('partition_end_month', none) %}
+
 with 
 current_data as (
   select
@@ -50,7 +54,12 @@ current_data as (
     c.alt_dist_id
   from 
     {{ ref('stg_vip__depletions') }} c
-  {% if is_incremental() %}
+  {% if partition_start_month is not none %}
+    where DATE_FROM_PARTS(c.year, c.month, 1) >= '{{ partition_start_month }}'::date
+    {% if partition_end_month is not none %}
+      and DATE_FROM_PARTS(c.year, c.month, 1) < '{{ partition_end_month }}'::date
+    {% endif %}
+  {% elif is_incremental() %}
     where c.month_date >= (select (max(month_date)- INTERVAL '3 MONTH')::DATE from {{ this }})
   {% endif %}
 ),
@@ -1,6 +1,8 @@
 {{
   config(
     materialized = 'incremental',
+    tags = ['heavy'],
+    snowflake_warehouse = warehouse_route('heavy', 'marts'),
     incremental_strategy = 'delete+insert',
     alias = 'rad_sales_daily_fact',
     on_schema_change = 'sync_all_columns',
@@ -10,7 +12,11 @@
 
 {# unique_key = ['month_date', 'distributor_id', 'outlet_id', 'sku_id', 'distributor_item_id', 'invoice_date', 'invoice_number', 'invoice_line'] #}
 
-{% if is_incremental() %}
+{# Partitioned runs (Dagster month_date partitions) pass explicit bounds: [partition_start_month, partition_end_month) #}
+{% set partition_start_month = var('partition_start_month', none) %}
+{% set partition_end_month = var('partition_end_month', none) %}
+
+{% if is_incremental() and partition_start_month is none %}
 {% set sql_statement %}
   (select (max(month_date) - INTERVAL '6 MONTH')::DATE from {{ this }} where month_date > current_date - INTERVAL '3 MONTH')
 {% endset %}
@@ -37,7 +43,12 @@ current_data as (
     c.frontline_amount
   from 
     {{ ref('stg_vip__sales') }} c
-  {% if is_incremental() %}
+  {% if partition_start_month is not none %}
+  where c.month_date >= '{{ partition_start_month }}'::date
+    {% if partition_end_month is not none %}
+    and c.month_date < '{{ partition_end_month }}'::date
+    {% endif %}
+  {% elif is_incremental() %}
   where c.month_date >= '{{ max_month_date }}'
   {% endif %}
 )
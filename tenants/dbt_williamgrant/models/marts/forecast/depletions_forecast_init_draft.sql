@@ -1,10 +1,16 @@
+{#- Scoped refreshes (refresh_scope.sql) delete and rebuild only their market/variant size pack slices -#}
 {{
   config(
     materialized = 'incremental',
+    tags = ['heavy'],
+    snowflake_warehouse = warehouse_route('heavy', 'marts'),
     incremental_strategy = 'delete+insert',
-    unique_key = ['forecast_generation_month_date'],
+    unique_key = ['forecast_generation_month_date', 'market_code', 'variant_size_pack_id'] if refresh_scope_active() else ['forecast_generation_month_date'],
     on_schema_change = 'sync_all_columns',
     cluster_by = ['forecast_generation_month_date', 'market_code', 'forecast_method'],
+    pre_hook=[
+      "{{ refresh_scope_delete('forecast_generation_month_date') }}"
+    ],
     post_hook=[
       "update {{ this }} set is_current_forecast_generation = 0 where forecast_generation_month_date < (select max(forecast_generation_month_date) from {{ this }})"
     ],
@@ -14,10 +20,17 @@
 }}
 
 {% set backfill_fgmd = var('backfill_fgmd', none) %}
+{#- Current generation of a scoped refresh, read at compile time: the pre_hook may delete all of its rows -#}
+{% set scope_fgmd = none %}
+{% if execute and is_incremental() and refresh_scope_active() %}
+  {% set scope_fgmd = run_query("select max(forecast_generation_month_date) from " ~ this).columns[0].values()[0] %}
+{% endif %}
 
 -- Depletions Forecast Incremental Table - Calculates depletion forecasts using various methods (3m, 6m, 9m, flat)
 -- Captures monthly snapshots based on latest complete month.
 -- Supports backfilling via dbt run --vars '{"backfill_fgmd": "2025-07-01"}'
+-- Supports market/variant size pack refreshes of the current generation via
+--   dbt run --vars '{"refresh_markets": [...], "refresh_variant_size_pack_ids": [...]}'
 
 with source_data as (
   -- Select base data, ensure month_date is present or constructed
@@ -38,7 +51,8 @@ with source_data as (
     DATEADD(YEAR, 1, rad.month_date) as forecast_ref_date,
     sum(coalesce(rad.case_equivalent_quantity, 0)) as case_equivalent_depletions
   from
-    {{ ref('rad_distributor_level_sales') }} rad
+    -- Shared with the chain models; summing over parent chains gives the distributor grain
+    {{ ref('depletions_forecast_sales_history') }} rad
   {% if backfill_fgmd %}
   -- When backfilling, only include data up to the month before the backfill FGMD
   where rad.month_date <= '{{ backfill_fgmd }}'::date
@@ -691,6 +705,10 @@ where coalesce(lower(tagp.is_planned), 'true') != 'false'
   {% if backfill_fgmd %}
   -- Backfill mode: Only process the specific FGMD
   id.forecast_generation_month_date = '{{ backfill_fgmd }}'::date
+  {% elif refresh_scope_active() %}
+  -- Scoped refresh: only the requested slices of the current generation (never starts a new one)
+  id.forecast_generation_month_date = {{ "'" ~ scope_fgmd ~ "'::date" if scope_fgmd else 'null' }}
+  and {{ refresh_scope('id.market_code', 'id.variant_size_pack_id') }}
   {% else %}
   -- Normal mode: Include rows if they belong to a new forecast generation month
   -- (works for both logic_driven and previous_consensus data sources)
@@ -1,6 +1,8 @@
 {{
   config(
     materialized = 'incremental',
+    tags = ['heavy'],
+    snowflake_warehouse = warehouse_route('heavy', 'marts'),
     incremental_strategy = 'delete+insert',
     unique_key = ['forecast_generation_month_date'],
     on_schema_change = 'sync_all_columns',
@@ -26,8 +28,8 @@ with source_data as (
     market_code,
     distributor_name,
     distributor_id,
-    vip_parent_chain_name as parent_chain_name,
-    vip_parent_chain_code as parent_chain_code,
+    parent_chain_name,
+    parent_chain_code,
     brand,
     brand_id,
     variant,
@@ -40,8 +42,9 @@ with source_data as (
     DATEADD(YEAR, 1, month_date) as forecast_ref_date,
     sum(coalesce(case_equivalent_quantity, 0)) as case_equivalent_depletions
   from
-    {{ ref('rad_invoice_level_sales') }}
-  where vip_parent_chain_code is not null and vip_parent_chain_code != '' and vip_parent_chain_code != '33333'
+    -- Shared with the distributor models (one scan of the invoice-level sales)
+    {{ ref('depletions_forecast_sales_history') }}
+  where is_forecast_chain
   {% if backfill_fgmd %}
   -- When backfilling, only include data up to the month before the backfill FGMD
   and month_date <= '{{ backfill_fgmd }}'::date
@@ -541,9 +544,9 @@ planned_zero_rows as (
     cast(null as float) as py_6m_sum,
     cast(null as float) as py_12m_sum
   from (
-    select distinct market_code, market_name, distributor_id, distributor_name, vip_parent_chain_code as parent_chain_code, vip_parent_chain_name as parent_chain_name
-    from {{ ref('rad_invoice_level_sales') }}
-    where vip_parent_chain_code is not null and vip_parent_chain_code != '' and vip_parent_chain_code != '33333'
+    select distinct market_code, market_name, distributor_id, distributor_name, parent_chain_code, parent_chain_name
+    from {{ ref('depletions_forecast_sales_history') }}
+    where is_forecast_chain
   ) cu
   cross join future_months_template fmt
   cross join run_details rd
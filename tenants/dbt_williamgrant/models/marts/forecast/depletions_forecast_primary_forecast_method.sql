@@ -56,6 +56,8 @@ forecast_data_with_potential_method as (
   and fci.is_current_forecast_generation = 1
   {% if is_incremental() %}
   and fci.forecast_generation_month_date >= (select coalesce(max(forecast_generation_month_date), '1970-01-01'::DATE) from {{ this }})
+  -- Scoped refresh (refresh_scope.sql): only the requested market/variant size pack slices
+  and {{ refresh_scope('fci.market_code', 'fci.variant_size_pack_id') }}
   {% endif %}
 ), primary_forecast_stage as (
   select
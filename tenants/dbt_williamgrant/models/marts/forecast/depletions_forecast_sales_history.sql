@@ -0,0 +1,42 @@
+{{
+  config(
+    materialized = 'table',
+    tags = ['heavy'],
+    snowflake_warehouse = warehouse_route('heavy', 'marts'),
+    cluster_by = ['month_date', 'market_code']
+  )
+}}
+
+-- Shared sales history for the distributor and chain forecast models: one scan of
+-- rad_invoice_level_sales at the finest grain both need (day x distributor x parent chain x
+-- variant size pack). Distributor models sum over parent chains; chain models keep
+-- is_forecast_chain rows. Outlet, invoice and SKU columns are dropped, which is what makes
+-- this much smaller than the invoice-level table.
+--   case_equivalent_quantity / phys_quantity: plain sums, as rad_distributor_level_sales sums them
+--   projection_*: invoice rows cast to number(38,8) before summing, as forecast__monthend_projection
+--   always did, so re-summing them is exact
+select
+  invoice_date,
+  year,
+  month,
+  month_date,
+  market_name,
+  market_code,
+  distributor_id,
+  distributor_name,
+  vip_parent_chain_code as parent_chain_code,
+  vip_parent_chain_name as parent_chain_name,
+  (vip_parent_chain_code is not null and vip_parent_chain_code != '' and vip_parent_chain_code != '33333') as is_forecast_chain,
+  brand,
+  brand_id,
+  variant,
+  variant_id,
+  variant_size_pack_desc,
+  variant_size_pack_id,
+  sum(phys_quantity) as phys_quantity,
+  sum(case_equivalent_quantity) as case_equivalent_quantity,
+  sum(phys_quantity::number(38,8)) as projection_phys_quantity,
+  sum(case_equivalent_quantity::number(38,8)) as projection_case_equivalent_quantity
+from
+  {{ ref('rad_invoice_level_sales') }}
+group by all
@@ -1,7 +1,12 @@
+{#- Rebuilt in full, except for scoped refreshes (refresh_scope.sql), which replace only the
+    requested market/variant size pack slices: every allocation is computed per slice -#}
 {{
   config(
-    materialized = 'table',
-    cluster_by = ['market_code']
+    materialized = 'incremental' if refresh_scope_active() else 'table',
+    incremental_strategy = 'delete+insert',
+    unique_key = ['market_code', 'variant_size_pack_id'],
+    cluster_by = ['market_code'],
+    pre_hook = ["{{ refresh_scope_delete() }}"]
   )
 }}
 
@@ -25,9 +30,12 @@ select
   distributor_id,
   variant_size_pack_id,
   sum(case_equivalent_quantity) as sum_case_equivalent_depletions
-from {{ ref('rad_distributor_level_sales') }}
+from {{ ref('depletions_forecast_sales_history') }}
 where month_date >= date_trunc('month', current_date) - INTERVAL '12 MONTH'
   and month_date < date_trunc('month', current_date)
+  {% if is_incremental() %}
+  and {{ refresh_scope() }}
+  {% endif %}
 group by 1,2,3,4,5,6
 ),
 
@@ -43,6 +51,9 @@ forecast_universe_by_market as (
   from {{ ref('depletions_forecast_init_draft') }} fc
   where fc.forecast_generation_month_date >= '{{ previous_forecast_generation_month_date }}'
     and fc.data_type in ('forecast','zero_seeded')
+    {% if is_incremental() %}
+    and {{ refresh_scope('fc.market_code', 'fc.variant_size_pack_id') }}
+    {% endif %}
 ),
 
 -- Identify distributor/VSP combos missing from sales
@@ -23,11 +23,11 @@ select
   left(distributor_id,5) as customer_id,
   distributor_name,
   distributor_id,
-  vip_parent_chain_code as parent_chain_code,
-  vip_parent_chain_name,
+  parent_chain_code,
+  parent_chain_name as vip_parent_chain_name,
   variant_size_pack_id,
   sum(case_equivalent_quantity) as sum_case_equivalent_depletions
-from {{ ref('rad_invoice_level_sales') }}
+from {{ ref('depletions_forecast_sales_history') }}
 where month_date >= date_trunc('month', current_date) - INTERVAL '12 MONTH'
   and month_date < date_trunc('month', current_date)
 group by all
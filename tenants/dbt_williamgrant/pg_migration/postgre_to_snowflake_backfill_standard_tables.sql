@@ -1,3 +1,7 @@
+-- One-shot version of the standard-table backfill. For large tables, prefer the chunked,
+-- resumable loader (same tables and projections, see backfill_tables.json):
+--   python scripts/backfill/pg_to_snowflake_backfill.py --source postgresql://... --sink snowflake --profile apollo
+
 INSERT OVERWRITE INTO "APOLLO_WILLIAMGRANT"."SOURCE_DATA"."SLSDA"
 SELECT
   rcd_type,
@@ -0,0 +1,10 @@
+import sys
+import types
+from pathlib import Path
+
+# dagster_apollo/__init__.py builds the Definitions, which needs Snowflake credentials and a
+# parsed dbt project; register the package bare so tests can import its helper modules.
+if "dagster_apollo" not in sys.modules:
+	package = types.ModuleType("dagster_apollo")
+	package.__path__ = [str(Path(__file__).resolve().parent.parent / "dagster_apollo")]
+	sys.modules["dagster_apollo"] = package
@@ -0,0 +1,30 @@
+import json
+from collections import Counter
+
+from apollo_serving import BatchSaver, FakeBatchSaveExecutor
+
+RECORDS = [
+	dict(market_code=f"M{m}", variant_size_pack_id=f"V{v}", forecast_year=2025, month=1, forecast_method="six_month", manual_case_equivalent_volume=1)
+	for m in range(20)
+	for v in range(50)
+]
+
+
+def test_sent_chunks_are_never_resent():
+	fake = FakeBatchSaveExecutor(failure_rate=0.3, lost_response_rate=0.2, seed=3)
+	with BatchSaver(fake, max_chunk_records=100, backoff_s=0) as saver:
+		result = saver.save_forecasts(RECORDS, "2025-03-01", "user", "draft")
+	committed = Counter(json.dumps(r, sort_keys=True) for r in fake.saved["SP_BATCH_SAVE_FORECASTS"])
+	assert max(committed.values()) == 1
+	assert result.unknown_rows and not result.ok
+	assert len(committed) == len(result.saved_rows) + len(result.unknown_rows)
+	assert sum(c.attempts - 1 for c in result.chunks) > 0  # connect failures were retried
+
+
+def test_published_market_fails_only_its_chunks():
+	fake = FakeBatchSaveExecutor(published_markets={"M3"})
+	with BatchSaver(fake, max_chunk_records=50) as saver:
+		result = saver.save_forecasts(RECORDS, "2025-03-01", "user", "draft")
+	assert result.failed_markets == ["M3"]
+	assert not result.unknown_rows
+	assert len(result.saved_rows) == len(RECORDS) - 50
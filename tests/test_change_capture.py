@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("dagster_dbt")
+
+from dagster import build_sensor_context, job, op  # noqa: E402
+
+from dagster_apollo.change_capture import FakeChangeReader, build_change_capture_sensor  # noqa: E402
+from dagster_apollo.tenants import Tenant  # noqa: E402
+
+
+@op
+def noop():
+	pass
+
+
+@job
+def dbt_build_job():
+	noop()
+
+
+def _tick(sensor, cursor):
+	context = build_sensor_context(cursor=cursor)
+	result = sensor(context)
+	return context.cursor, result
+
+
+def test_change_committed_after_a_tick_is_still_read(tmp_path):
+	reader = FakeChangeReader(now="2026-10-01T10:00:00.000000")
+	sensor = build_change_capture_sensor(Tenant("williamgrant", tmp_path), dbt_build_job, reader=reader)
+	cursor, _ = _tick(sensor, None)
+	# Visible but not settled yet: left for the next tick
+	reader.add("USANY1", "HE009-6-750", "2026-10-01T10:04:00.000000")
+	cursor, result = _tick(sensor, cursor)
+	assert cursor == "2026-10-01T10:00:00.000000" and not isinstance(result, list)
+	# Stamped earlier, committed after the previous tick
+	reader.add("USACA1", "HE009-6-750", "2026-10-01T10:03:00.000000")
+	reader.now = "2026-10-01T10:05:00.000000"
+	cursor, requests = _tick(sensor, cursor)
+	assert cursor == reader.now
+	assert requests[0].run_config["ops"]["run_dbt_build"]["config"]["vars"]["refresh_markets"] == ["USACA1", "USANY1"]
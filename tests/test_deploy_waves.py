@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts" / "deploy"))
+
+import deploy_backend_functions as deployer  # noqa: E402
+
+
+def _write(path: Path, sql: str) -> Path:
+    path.write_text(sql)
+    return path
+
+
+def test_two_file_cycle_deploys_in_one_wave(tmp_path, monkeypatch):
+    monkeypatch.setattr(deployer, "REPO_ROOT", tmp_path)
+    a = _write(tmp_path / "a.sql", "CREATE OR REPLACE PROCEDURE FORECAST.SP_A() AS $$ CALL SP_B(); $$;")
+    b = _write(tmp_path / "b.sql", "CREATE OR REPLACE PROCEDURE FORECAST.SP_B() AS $$ CALL SP_A(); $$;")
+    c = _write(tmp_path / "c.sql", "CREATE OR REPLACE FUNCTION FORECAST.UDF_C() AS $$ SELECT SP_A() $$;")
+
+    graph = deployer.build_dependency_graph([a, b, c])
+    assert graph[a] == {b} and graph[b] == {a}
+    waves = deployer.plan_waves(graph)
+    assert waves == [[a, b], [c]]
+
+    ran = []
+    results = {}
+
+    def run_one(path, wave_no):
+        ran.append(path)
+        return deployer.FileResult(path, wave_no, "success")
+
+    deployer._run_waves(waves, graph, results, run_one, jobs=2)
+    assert sorted(ran) == [a, b, c]
+    assert all(r.status == "success" for r in results.values())
+
+
+def test_failed_cycle_member_skips_dependents(tmp_path, monkeypatch):
+    monkeypatch.setattr(deployer, "REPO_ROOT", tmp_path)
+    a = _write(tmp_path / "a.sql", "CREATE PROCEDURE SP_A() AS $$ CALL SP_B(); $$;")
+    b = _write(tmp_path / "b.sql", "CREATE PROCEDURE SP_B() AS $$ CALL SP_A(); $$;")
+    c = _write(tmp_path / "c.sql", "CREATE FUNCTION UDF_C() AS $$ SELECT SP_B() $$;")
+    graph = deployer.build_dependency_graph([a, b, c])
+    results = {}
+
+    def run_one(path, wave_no):
+        return deployer.FileResult(path, wave_no, "failed" if path == b else "success", returncode=1 if path == b else 0)
+
+    deployer._run_waves(deployer.plan_waves(graph), graph, results, run_one, jobs=1)
+    assert results[a].status == "success"
+    assert results[c].status == "skipped"
@@ -0,0 +1,33 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+for module in ("duckdb", "jinja2", "numpy", "sqlglot"):
+    pytest.importorskip(module)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts" / "benchmarks"))
+
+import duckdb  # noqa: E402
+import forecast_parity as parity  # noqa: E402
+from apollo_forecast import GRAINS  # noqa: E402
+from apollo_forecast.synthetic import Dims, sales_history  # noqa: E402
+
+
+def test_engine_matches_the_dbt_sql_on_a_small_cube():
+    renderer = parity.Renderer(parity.REPO_ROOT / "tenants" / f"dbt_{parity.DEFAULT_TENANT}")
+    end = parity.DEFAULT_END
+    rows = sales_history(Dims(markets=2, distributors_per_market=2, chains_per_distributor=2, variant_size_packs=4), end, seed=0)
+    con = duckdb.connect()
+    parity.load_history(con, rows)
+
+    results = []
+    for grain in GRAINS:
+        results.extend(parity.check_trend_factors(con, renderer, rows, grain))
+        results.append(parity.check_scenarios(rows, grain))
+        for mode in ("fgmd", "window"):
+            results.append(parity.check_monthend(con, renderer, rows, grain, mode, date(end.year, end.month, 1)))
+
+    assert all(result.rows for result in results)
+    assert {result.name: result.mismatches[:5] for result in results if not result.ok} == {}
@@ -0,0 +1,13 @@
+from dagster_apollo.cache import ManifestCache
+
+
+def test_key_changes_with_profile_database(tmp_path, monkeypatch):
+	(tmp_path / "dbt_project.yml").write_text("name: apollo\n")
+	cache = ManifestCache(tmp_path, root=tmp_path / "cache")
+	monkeypatch.setenv("SNOWFLAKE_DATABASE", "APOLLO_DEV")
+	dev = cache.key()
+	monkeypatch.setenv("SNOWFLAKE_DATABASE", "APOLLO_PROD")
+	assert cache.key() != dev
+	monkeypatch.setenv("SNOWFLAKE_PRIVATE_KEY_PASSPHRASE", "rotated")
+	monkeypatch.setenv("SNOWFLAKE_DATABASE", "APOLLO_DEV")
+	assert cache.key() == dev
@@ -0,0 +1,62 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dbt.adapters.duckdb")
+duckdb = pytest.importorskip("duckdb")
+from dbt.cli.main import dbtRunner  # noqa: E402
+
+MACROS = Path(__file__).resolve().parent.parent / "tenants" / "dbt_williamgrant" / "macros" / "refresh_scope.sql"
+
+# Same shape as the scoped forecast marts: delete+insert on the slice key, planned slices only
+MODEL = """
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['market_code', 'variant_size_pack_id'],
+    pre_hook=["{{ refresh_scope_delete() }}"]
+) }}
+select market_code, variant_size_pack_id, volume
+from main.tags
+where is_planned
+{% if is_incremental() %}
+  and {{ refresh_scope() }}
+{% endif %}
+"""
+
+
+def _project(tmp_path):
+	(tmp_path / "macros").mkdir()
+	(tmp_path / "models").mkdir()
+	shutil.copy(MACROS, tmp_path / "macros")
+	(tmp_path / "models" / "slices.sql").write_text(MODEL)
+	(tmp_path / "dbt_project.yml").write_text("name: scope_test\nversion: '1.0'\nprofile: scope_test\nconfig-version: 2\n")
+	db = tmp_path / "scope.duckdb"
+	(tmp_path / "profiles.yml").write_text(
+		f"scope_test:\n  target: local\n  outputs:\n    local:\n      type: duckdb\n      path: '{db}'\n      schema: main\n"
+	)
+	with duckdb.connect(str(db)) as con:
+		con.execute("create table tags (market_code varchar, variant_size_pack_id varchar, volume int, is_planned boolean)")
+		con.execute("insert into tags values ('M1', 'V1', 1, true), ('M1', 'V2', 2, true), ('M2', 'V1', 3, true)")
+	return db
+
+
+def _build(tmp_path, dbt_vars=None):
+	args = ["run", "--project-dir", str(tmp_path), "--profiles-dir", str(tmp_path)]
+	if dbt_vars:
+		args += ["--vars", json.dumps(dbt_vars)]
+	assert dbtRunner().invoke(args).success
+
+
+def test_slice_that_shrinks_to_empty_is_deleted(tmp_path):
+	db = _project(tmp_path)
+	_build(tmp_path)
+	with duckdb.connect(str(db)) as con:
+		con.execute("update tags set is_planned = false where market_code = 'M1' and variant_size_pack_id = 'V1'")
+		con.execute("update tags set volume = 20 where market_code = 'M1' and variant_size_pack_id = 'V2'")
+	_build(tmp_path, {"refresh_markets": ["M1"], "refresh_variant_size_pack_ids": ["V1", "V2"]})
+	with duckdb.connect(str(db)) as con:
+		rows = con.execute("select * from slices order by 1, 2").fetchall()
+	assert rows == [("M1", "V2", 20), ("M2", "V1", 3)]
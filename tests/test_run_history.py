@@ -0,0 +1,75 @@
+import json
+import sqlite3
+
+from dagster_apollo.query_history import FakeQueryHistory, QueryStats, lookup_costs, rollup
+from dagster_apollo.run_history import ModelTiming, TimingHistory, node_query_ids, run_scope
+
+UID = "model.apollo.fact_sales"
+
+
+def _timing(execute_s):
+	return ModelTiming(UID, "success", 0.1, execute_s, execute_s, None, None)
+
+
+def test_baselines_are_keyed_by_target_and_scope(tmp_path):
+	history = TimingHistory(tmp_path / "history.sqlite")
+	history.record("prod-1", None, "prod", [_timing(100.0)])
+	history.record("dev-1", None, "dev", [_timing(10.0)])
+	partition = run_scope({"args": {"vars": {"partition_start": "2026-01-01", "partition_end": "2026-02-01"}}})
+	history.record("part-1", None, "prod", [_timing(3.0)], scope=partition)
+
+	assert history.baselines([UID], "prod")[UID] == [100.0]
+	assert history.baselines([UID], "dev")[UID] == [10.0]
+	assert history.baselines([UID], "prod", scope=partition)[UID] == [3.0]
+	assert run_scope({"args": {"vars": {}}}) == ""
+
+
+def test_existing_history_gains_scope_column(tmp_path):
+	path = tmp_path / "history.sqlite"
+	with sqlite3.connect(path) as conn:
+		conn.execute(
+			"CREATE TABLE model_timings (run_id TEXT NOT NULL, invocation_id TEXT, target TEXT, recorded_at TEXT NOT NULL,"
+			" unique_id TEXT NOT NULL, status TEXT, compile_s REAL, execute_s REAL, total_s REAL, rows_affected INTEGER,"
+			" query_id TEXT, PRIMARY KEY (run_id, unique_id))"
+		)
+		conn.execute("INSERT INTO model_timings VALUES ('old', NULL, 'prod', '2026-01-01', ?, 'success', 0, 7, 7, NULL, NULL)", (UID,))
+	history = TimingHistory(path)
+	history.record("new", None, "prod", [_timing(8.0)])
+	assert sorted(history.baselines([UID], "prod")[UID]) == [7.0, 8.0]
+
+
+def _query_event(invocation_id, query_id, unique_id=None):
+	data = {"elapsed": 1.0, "query_id": query_id, "status": "SUCCESS 1"}
+	if unique_id:
+		data["node_info"] = {"unique_id": unique_id}
+	return json.dumps({"info": {"name": "SQLQueryStatus", "invocation_id": invocation_id}, "data": data})
+
+
+def test_costs_cover_every_statement_of_a_node(tmp_path):
+	test_uid = "test.apollo.not_null_fact_sales_id"
+	(tmp_path / "dbt.log").write_text(
+		"\n".join(
+			[
+				_query_event("inv-old", "q-old", UID),
+				_query_event("inv", "q-temp", UID),
+				_query_event("inv", "q-merge", UID),
+				_query_event("inv", "q-test", test_uid),
+				_query_event("inv", "q-hook"),
+				json.dumps({"info": {"name": "LogModelResult", "invocation_id": "inv"}, "data": {}}),
+			]
+		)
+	)
+	ids = node_query_ids(tmp_path, "inv")
+	assert ids == {UID: ["q-temp", "q-merge"], test_uid: ["q-test"], "invocation.inv": ["q-hook"]}
+
+	provider = FakeQueryHistory()
+	for qid, seconds in [("q-temp", 30.0), ("q-merge", 10.0), ("q-test", 2.0), ("q-hook", 1.0)]:
+		provider.add(QueryStats(qid, seconds, seconds, 0.0, 100, 1, 2, 0, 0, "WH", "Small"))
+	costs = lookup_costs(provider, ids)
+	assert provider.calls == [["q-hook", "q-merge", "q-temp", "q-test"]]
+	assert costs[UID].execution_s == 40.0 and costs[UID].query_count == 2
+	assert rollup(costs.values())["queries"] == 4
+
+	history = TimingHistory(tmp_path / "history.sqlite")
+	history.record_costs("run-1", costs)
+	assert history.run_costs("run-1")[UID] == costs[UID]
@@ -0,0 +1,53 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dagster_dbt")
+
+from dagster_apollo.run_history import TimingHistory  # noqa: E402
+from dagster_apollo.subgraphs import Subgraph, _record_step, prune_subgraph_targets, remove_step_target  # noqa: E402
+
+
+def test_finished_steps_and_old_runs_are_removed(tmp_path):
+	root = tmp_path / "target" / "subgraphs"
+	for i in range(4):
+		(root / f"run{i}" / "forecast").mkdir(parents=True)
+		os.utime(root / f"run{i}", (i, i))
+	prune_subgraph_targets(root, keep=3, current="run9")
+	assert sorted(d.name for d in root.iterdir()) == ["run2", "run3"]
+
+	(root / "run9" / "fact").mkdir(parents=True)
+	(root / "run9" / "vip").mkdir()
+	remove_step_target(root / "run9" / "fact")
+	assert [d.name for d in (root / "run9").iterdir()] == ["vip"]
+	remove_step_target(root / "run9" / "vip")
+	assert not (root / "run9").exists()
+
+
+def test_failed_run_reports_once_the_steps_left_are_skipped(tmp_path):
+	subgraphs = [
+		Subgraph("staging", frozenset(), frozenset()),
+		Subgraph("fact", frozenset(), frozenset({"staging"})),
+		Subgraph("forecast", frozenset(), frozenset({"fact"})),
+		Subgraph("vip", frozenset(), frozenset()),
+	]
+	op_names = {sg.name: f"dbt_models_{sg.name}" for sg in subgraphs}
+	step_deps = {sg.name: sg.depends_on for sg in subgraphs}
+	history = TimingHistory(tmp_path / "history.sqlite")
+	logged = []
+	context = SimpleNamespace(
+		run_id="run-1",
+		instance=SimpleNamespace(get_run_by_id=lambda run_id: None),
+		log=SimpleNamespace(info=logged.append),
+	)
+	by_name = {sg.name: sg for sg in subgraphs}
+	for name, status in [("staging", "success"), ("fact", "failure")]:
+		_record_step(context, by_name[name], op_names, step_deps, time.time(), status, {"nodes": {}}, history)
+	assert logged == []  # vip is still running
+
+	_record_step(context, by_name["vip"], op_names, step_deps, time.time(), "success", {"nodes": {}}, history)
+	assert len(logged) == 1
+	assert "Failed steps: fact" in logged[0]
+	assert "Skipped after upstream failure: forecast" in logged[0]